@@ -1,13 +1,17 @@
 import sys
 
+from .lookup_cache import LookupCache
+
 class ArabicNLPAdapter:
     """
     Adapter for Arabic NLP tasks using CAMeL Tools.
     Provides morphology analysis, diacritization, and tokenization.
     """
-    def __init__(self):
+    def __init__(self, root_cache_size=10000):
         self.morphology_analyzer = None
         self.diacritizer = None
+        # Roots found by the morphology analyzer, one analysis per word
+        self.root_cache = LookupCache('camel.roots', root_cache_size)
         self._initialize_tools()
 
     def _initialize_tools(self):
@@ -79,6 +83,25 @@ class ArabicNLPAdapter:
         if not self.morphology_analyzer:
             return word
 
+        found, root = self.root_cache.lookup(word)
+        if not found:
+            root = self._analyze_root(word)
+            self.root_cache.put(word, root)
+        return root
+
+    def extract_roots(self, words):
+        """
+        Extracts the roots of a batch of words, in order.
+        Each distinct word is analyzed once.
+        """
+        words = list(words)
+        roots = {}
+        for word in words:
+            if word not in roots:
+                roots[word] = self.extract_root(word)
+        return [roots[word] for word in words]
+
+    def _analyze_root(self, word):
         try:
             analyses = self.morphology_analyzer.analyze(word)
             if analyses:
@@ -12,10 +12,14 @@ Original source: TypeScript in /vocabulary/arramoozDictionaryAdapter.ts
 
 import sqlite3
 import os
-from typing import Dict, List, Optional, Tuple
+import struct
+from typing import Dict, Iterable, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+from .arramooz_lexicon import CompiledLexicon, compile_lexicon, default_lexicon_path
+from .lookup_cache import CacheStats, LookupCache
+
 
 class FoundationWordType(Enum):
     """نوع الكلمة الأساسية"""
@@ -70,20 +74,33 @@ class ArramoozAdapter:
     
     يوفر الوصول إلى 40,850 كلمة عربية من قاعدة بيانات Arramooz
     Provides access to 40,850 Arabic words from Arramooz database
+
+    With preload=True the nouns and verbs tables are compiled once into a
+    memory-mapped lexicon file (see arramooz_lexicon) and searched there
+    instead of through SQLite queries.
     """
     
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, preload: bool = False, lexicon_path: str = None,
+                 cache_size: int = 10000, cache_ttl: Optional[float] = None):
         """
         تهيئة المحول
         
         Args:
             db_path: مسار قاعدة البيانات (اختياري)
+            preload: استخدام المعجم المترجم بدلاً من استعلامات SQLite
+            lexicon_path: مسار المعجم المترجم (افتراضياً بجانب قاعدة البيانات)
+            cache_size: أقصى عدد للكلمات في الذاكرة المؤقتة
+            cache_ttl: مدة صلاحية المدخل بالثواني (None: بلا انتهاء)
         """
         self.db_path = db_path
         self.conn: Optional[sqlite3.Connection] = None
-        self.cache: Dict[str, FoundationWord] = {}
-        self.root_cache: Dict[str, List[FoundationWord]] = {}
+        # نتائج SQLite، بما فيها الكلمات غير الموجودة
+        self.cache = LookupCache('arramooz.words', cache_size, cache_ttl)
+        self.root_cache = LookupCache('arramooz.roots', cache_size, cache_ttl)
         self.is_loaded = False
+        self.preload = preload
+        self.lexicon_path = lexicon_path
+        self.lexicon: Optional[CompiledLexicon] = None
     
     def _find_database(self) -> Optional[str]:
         """البحث عن ملف قاعدة البيانات في مسارات متعددة"""
@@ -131,6 +148,14 @@ class ArramoozAdapter:
             return False
         
         self.db_path = found_path
+
+        if self.preload:
+            self.lexicon = self._open_lexicon()
+            if self.lexicon is not None:
+                self.is_loaded = True
+                total = sum(self.lexicon.rows.values())
+                print(f'✅ تم تحميل معجم Arramooz المترجم بنجاح ({total:,} كلمة)')
+                return True
         
         try:
             self.conn = sqlite3.connect(self.db_path)
@@ -154,29 +179,51 @@ class ArramoozAdapter:
         Returns:
             FoundationWord أو None إذا لم توجد
         """
-        if not self.is_loaded or not self.conn:
+        if not self.is_loaded or not (self.conn or self.lexicon):
             raise RuntimeError('قاعدة البيانات غير محملة. استخدم load_database() أولاً.')
         
         # تطبيع الكلمة (إزالة ال التعريف)
-        normalized = self._normalize_word(word)
-        
-        # البحث في الذاكرة المؤقتة
-        if normalized in self.cache:
-            return self.cache[normalized]
-        
-        # البحث في جدول الأسماء
-        result = self._search_in_nouns(normalized)
-        if result:
-            self.cache[normalized] = result
+        return self._find_normalized(self._normalize_word(word))
+
+    def lookup_many(self, words: Iterable[str]) -> List[Optional[FoundationWord]]:
+        """
+        البحث عن مجموعة كلمات دفعة واحدة
+        Look up a batch of words; each distinct word is searched once
+
+        Returns:
+            قائمة بنتيجة كل كلمة بالترتيب (None لما لم يوجد)
+        """
+        if not self.is_loaded or not (self.conn or self.lexicon):
+            raise RuntimeError('قاعدة البيانات غير محملة. استخدم load_database() أولاً.')
+
+        found: Dict[str, Optional[FoundationWord]] = {}
+        results = []
+        for word in words:
+            normalized = self._normalize_word(word)
+            if normalized not in found:
+                found[normalized] = self._find_normalized(normalized)
+            results.append(found[normalized])
+        return results
+
+    def _find_normalized(self, normalized: str) -> Optional[FoundationWord]:
+        """البحث عن كلمة مطبعة"""
+        if self.lexicon is not None:
+            noun, verb = self.lexicon.word_rows(normalized)
+            result = self._convert_noun_to_foundation_word(noun) if noun else None
+            if not result and verb:
+                result = self._convert_verb_to_foundation_word(verb)
             return result
-        
-        # البحث في جدول الأفعال
-        result = self._search_in_verbs(normalized)
-        if result:
-            self.cache[normalized] = result
+
+        # البحث في الذاكرة المؤقتة
+        found, result = self.cache.lookup(normalized)
+        if found:
             return result
         
-        return None
+        # البحث في جدول الأسماء ثم في جدول الأفعال
+        result = self._search_in_nouns(normalized) or self._search_in_verbs(normalized)
+        # تخزين النتيجة حتى لو لم توجد الكلمة
+        self.cache.put(normalized, result)
+        return result
     
     def search_by_root(self, root: str, limit: int = 20) -> List[FoundationWord]:
         """
@@ -190,12 +237,20 @@ class ArramoozAdapter:
         Returns:
             قائمة الكلمات المشتقة من الجذر
         """
-        if not self.is_loaded or not self.conn:
+        if not self.is_loaded or not (self.conn or self.lexicon):
             raise RuntimeError('قاعدة البيانات غير محملة. استخدم load_database() أولاً.')
+
+        if self.lexicon is not None:
+            nouns = (self._convert_noun_to_foundation_word(row)
+                     for row in self.lexicon.root_rows(root, 'nouns', limit))
+            verbs = (self._convert_verb_to_foundation_word(row)
+                     for row in self.lexicon.root_rows(root, 'verbs', limit))
+            return [word for word in (*nouns, *verbs) if word]
         
-        # البحث في الذاكرة المؤقتة
-        if root in self.root_cache:
-            return self.root_cache[root]
+        # البحث في الذاكرة المؤقتة (النتيجة تتبع الحد أيضاً)
+        found, cached = self.root_cache.lookup((root, limit))
+        if found:
+            return cached
         
         results = []
         
@@ -222,7 +277,7 @@ class ArramoozAdapter:
             print(f'خطأ في البحث بالجذر في الأفعال: {e}')
         
         # حفظ في الذاكرة المؤقتة
-        self.root_cache[root] = results
+        self.root_cache.put((root, limit), results)
         
         return results
     
@@ -234,6 +289,10 @@ class ArramoozAdapter:
         Returns:
             قاموس بالإحصائيات
         """
+        if self.is_loaded and self.lexicon is not None:
+            nouns, verbs = self.lexicon.rows['nouns'], self.lexicon.rows['verbs']
+            return {'nouns': nouns, 'verbs': verbs, 'total': nouns + verbs}
+
         if not self.is_loaded or not self.conn:
             return {'nouns': 0, 'verbs': 0, 'total': 0}
         
@@ -255,17 +314,44 @@ class ArramoozAdapter:
             print(f'خطأ في الحصول على الإحصائيات: {e}')
             return {'nouns': 0, 'verbs': 0, 'total': 0}
     
+    def cache_statistics(self) -> List[CacheStats]:
+        """إحصائيات الذاكرة المؤقتة / Cache statistics of the word and root caches"""
+        return [self.cache.stats(), self.root_cache.stats()]
+
     def close(self):
         """إغلاق قاعدة البيانات"""
         if self.conn:
             self.conn.close()
             self.conn = None
             self.is_loaded = False
+        if self.lexicon:
+            self.lexicon.close()
+            self.lexicon = None
+            self.is_loaded = False
     
     # ═══════════════════════════════════════════════════════════════
     # دوال مساعدة خاصة
     # ═══════════════════════════════════════════════════════════════
     
+    def _open_lexicon(self) -> Optional[CompiledLexicon]:
+        """فتح المعجم المترجم، وإعادة ترجمته إن تغيرت قاعدة البيانات"""
+        path = self.lexicon_path or default_lexicon_path(self.db_path)
+        try:
+            lexicon = CompiledLexicon(path)
+            if lexicon.is_current(self.db_path):
+                return lexicon
+            lexicon.close()
+        except (OSError, ValueError, struct.error):
+            # غير موجود أو تالف أو من إصدار آخر
+            pass
+
+        try:
+            compile_lexicon(self.db_path, path)
+            return CompiledLexicon(path)
+        except (OSError, ValueError, struct.error, sqlite3.Error) as e:
+            print(f'⚠️ تعذر تجهيز المعجم المترجم، سيتم استخدام SQLite: {e}')
+            return None
+
     def _normalize_word(self, word: str) -> str:
         """تطبيع الكلمة (إزالة ال التعريف)"""
         if word.startswith('ال'):
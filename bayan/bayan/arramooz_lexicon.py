@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+"""
+معجم Arramooz المترجم: ملف ثنائي يقرأ عبر mmap
+Compiled Arramooz lexicon: one binary file read through mmap
+
+compile_lexicon() turns the nouns and verbs tables of an Arramooz SQLite
+database into a file of flat uint32 arrays, and CompiledLexicon maps it
+back without loading it:
+
+- a string pool (UTF-8, each value once, tagged with its SQLite type)
+  with an offset array;
+- one row-major array of string ids per table, in rowid order;
+- the sorted word keys (every unvocalized, normalized and stamped value)
+  with the first noun and first verb row each one matches, and an
+  open-addressing hash table over them for O(1) lookup;
+- the sorted roots with an offset index into noun and verb posting lists.
+
+Rows come back as the same dicts `SELECT *` gives, so ArramoozAdapter
+builds the same FoundationWord objects from either source.  Each file
+records the size and modification time of the database it was built
+from; is_current() tells whether that still matches.
+"""
+
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import sys
+import tempfile
+import zlib
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+MAGIC = b'BYLX'
+FORMAT_VERSION = 1
+LEXICON_SUFFIX = '.bylex'
+
+TABLES = ('nouns', 'verbs')
+WORD_COLUMNS = ('unvocalized', 'normalized', 'stamped')
+
+NONE = 0xFFFFFFFF  # Missing string or row
+
+# magic, version, source size, source mtime (ns), meta length
+_HEADER = struct.Struct('<4sIQQI')
+_TAGS = {str: b's', int: b'i', float: b'f', bytes: b'b'}
+
+
+def default_lexicon_path(db_path: str) -> str:
+    """The compiled lexicon kept beside db_path"""
+    return db_path + LEXICON_SUFFIX
+
+
+def _hash(data: bytes) -> int:
+    return zlib.crc32(data)
+
+
+class _Builder:
+    """Collects the arrays of a lexicon file"""
+
+    def __init__(self):
+        self.pool = bytearray()
+        self.offsets = array('I', [0])
+        self.ids: Dict[Tuple[bytes, bytes], int] = {}
+
+    def string(self, value) -> int:
+        if value is None:
+            return NONE
+        tag = _TAGS.get(type(value), b's')
+        data = value if tag == b'b' else str(value).encode('utf-8')
+        key = (tag, data)
+        sid = self.ids.get(key)
+        if sid is None:
+            sid = self.ids[key] = len(self.offsets) - 1
+            self.pool += tag + data
+            self.offsets.append(len(self.pool))
+        return sid
+
+
+def _hash_table(keys: List[bytes]) -> array:
+    """Open addressing table: slot -> key position + 1 (0 is empty)"""
+    capacity = 1
+    while capacity < 2 * len(keys):
+        capacity *= 2
+    slots = array('I', [0]) * capacity
+    mask = capacity - 1
+    for position, key in enumerate(keys):
+        slot = _hash(key) & mask
+        while slots[slot]:
+            slot = (slot + 1) & mask
+        slots[slot] = position + 1
+    return slots
+
+
+def compile_lexicon(db_path: str, path: Optional[str] = None) -> str:
+    """
+    Compile the nouns and verbs tables of db_path into a lexicon file.
+
+    Args:
+        db_path (str): Arramooz SQLite database
+        path (str): Output file, by default beside the database
+
+    Returns:
+        str: The path written
+    """
+    path = path or default_lexicon_path(db_path)
+    stat = os.stat(db_path)
+    builder = _Builder()
+    arrays = {}
+    meta = {'columns': {}, 'rows': {}}
+    words: Dict[str, List[int]] = {}  # key -> [noun row, verb row]
+    roots: Dict[str, Tuple[List[int], List[int]]] = {}
+
+    conn = sqlite3.connect(db_path)
+    try:
+        for table_no, table in enumerate(TABLES):
+            cursor = conn.execute(f'SELECT * FROM {table} ORDER BY rowid')
+            columns = [description[0] for description in cursor.description]
+            cells = array('I')
+            row_no = -1
+            for row_no, row in enumerate(cursor):
+                cells.extend(builder.string(value) for value in row)
+                record = dict(zip(columns, row))
+                for column in WORD_COLUMNS:
+                    value = record.get(column)
+                    if isinstance(value, str):
+                        entry = words.setdefault(value, [NONE, NONE])
+                        if entry[table_no] == NONE:
+                            entry[table_no] = row_no
+                root = record.get('root')
+                if isinstance(root, str):
+                    roots.setdefault(root, ([], []))[table_no].append(row_no)
+            meta['columns'][table] = columns
+            meta['rows'][table] = row_no + 1
+            arrays[table] = cells
+    finally:
+        conn.close()
+
+    word_keys = sorted(words)
+    arrays['word_keys'] = array('I', (builder.string(key) for key in word_keys))
+    arrays['word_nouns'] = array('I', (words[key][0] for key in word_keys))
+    arrays['word_verbs'] = array('I', (words[key][1] for key in word_keys))
+    arrays['word_hash'] = _hash_table([key.encode('utf-8') for key in word_keys])
+
+    root_keys = sorted(roots)
+    arrays['root_keys'] = array('I', (builder.string(key) for key in root_keys))
+    arrays['root_hash'] = _hash_table([key.encode('utf-8') for key in root_keys])
+    for table_no, table in enumerate(TABLES):
+        offsets = array('I', [0])
+        postings = array('I')
+        for key in root_keys:
+            postings.extend(roots[key][table_no])
+            offsets.append(len(postings))
+        arrays[f'root_{table}_offsets'] = offsets
+        arrays[f'root_{table}'] = postings
+    arrays['string_offsets'] = builder.offsets
+
+    # Sections are laid out after the header and meta, each 4-byte aligned
+    sections = {}
+    blobs = [('pool', bytes(builder.pool))]
+    for name, values in arrays.items():
+        if sys.byteorder != 'little':
+            values = array('I', values)
+            values.byteswap()
+        blobs.append((name, values.tobytes()))
+    meta['sections'] = sections
+    offset = 0
+    for name, data in blobs:
+        sections[name] = [offset, len(data)]
+        offset += (len(data) + 3) & ~3
+    meta_bytes = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+    meta_bytes += b' ' * (-(_HEADER.size + len(meta_bytes)) % 4)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, stat.st_size, stat.st_mtime_ns, len(meta_bytes)))
+            f.write(meta_bytes)
+            for name, data in blobs:
+                f.write(data)
+                f.write(b'\0' * (-len(data) % 4))
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return path
+
+
+class CompiledLexicon:
+    """
+    Read-only view of a compiled lexicon file.
+    معجم مترجم للقراءة فقط
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, self.source_size, self.source_mtime_ns, meta_length = \
+                _HEADER.unpack_from(self._mmap, 0)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"{path} is not a version {FORMAT_VERSION} Bayan lexicon")
+            meta = json.loads(self._mmap[_HEADER.size:_HEADER.size + meta_length])
+        except Exception:
+            self._mmap.close()
+            raise
+        self.columns: Dict[str, List[str]] = meta['columns']
+        self.rows: Dict[str, int] = meta['rows']
+        base = _HEADER.size + meta_length
+        view = memoryview(self._mmap)
+        self._views = []
+        self._pool = view[base + meta['sections']['pool'][0]:][:meta['sections']['pool'][1]]
+        self._views.append(self._pool)
+        self._arrays = {}
+        for name, (offset, length) in meta['sections'].items():
+            if name != 'pool':
+                self._arrays[name] = self._uint32(view[base + offset:base + offset + length])
+        self._views.append(view)
+
+    def _uint32(self, data):
+        if sys.byteorder == 'little':
+            values = data.cast('I')
+            self._views.append(values)
+            return values
+        values = array('I', data.tobytes())
+        values.byteswap()
+        return values
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._arrays = {}
+        self._mmap.close()
+
+    def is_current(self, db_path: str) -> bool:
+        """Whether the file was built from db_path as it is now"""
+        try:
+            stat = os.stat(db_path)
+        except OSError:
+            return False
+        return (stat.st_size, stat.st_mtime_ns) == (self.source_size, self.source_mtime_ns)
+
+    def word_rows(self, word: str) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """The first noun row and first verb row with word as unvocalized,
+        normalized or stamped form"""
+        position = self._find(word, 'word_keys', 'word_hash')
+        if position is None:
+            return None, None
+        return (self._row('nouns', self._arrays['word_nouns'][position]),
+                self._row('verbs', self._arrays['word_verbs'][position]))
+
+    def root_rows(self, root: str, table: str, limit: Optional[int] = None) -> List[Dict]:
+        """Rows of table with the given root, in table order"""
+        position = self._find(root, 'root_keys', 'root_hash')
+        if position is None:
+            return []
+        offsets = self._arrays[f'root_{table}_offsets']
+        start, end = offsets[position], offsets[position + 1]
+        if limit is not None and limit >= 0:
+            # As in SQLite, a negative LIMIT means no limit
+            end = min(end, start + limit)
+        postings = self._arrays[f'root_{table}']
+        return [self._row(table, postings[i]) for i in range(start, end)]
+
+    def _find(self, text, keys_name, hash_name) -> Optional[int]:
+        data = text.encode('utf-8')
+        slots = self._arrays[hash_name]
+        keys = self._arrays[keys_name]
+        mask = len(slots) - 1
+        slot = _hash(data) & mask
+        while True:
+            entry = slots[slot]
+            if not entry:
+                return None
+            if self._bytes(keys[entry - 1]) == b's' + data:
+                return entry - 1
+            slot = (slot + 1) & mask
+
+    def _bytes(self, sid):
+        offsets = self._arrays['string_offsets']
+        return self._pool[offsets[sid]:offsets[sid + 1]].tobytes()
+
+    def _value(self, sid):
+        if sid == NONE:
+            return None
+        data = self._bytes(sid)
+        tag, body = data[:1], data[1:]
+        if tag == b's':
+            return body.decode('utf-8')
+        if tag == b'i':
+            return int(body)
+        if tag == b'f':
+            return float(body)
+        return body
+
+    def _row(self, table, row_no) -> Optional[Dict]:
+        if row_no == NONE:
+            return None
+        columns = self.columns[table]
+        cells = self._arrays[table]
+        start = row_no * len(columns)
+        return {column: self._value(cells[start + i]) for i, column in enumerate(columns)}
@@ -4,10 +4,22 @@ Abstract Syntax Tree (AST) nodes for Bayan Language
 """
 
 class ASTNode:
-    """Base class for all AST nodes with optional source position"""
-    line = None
-    column = None
-    filename = None
+    """Base class for all AST nodes with optional source position.
+
+    Nodes keep their fields in __slots__ (no per-instance __dict__), so
+    every subclass lists the fields it sets, including the optional ones
+    other modules fill in later; those get explicit defaults in __init__.
+    A position that was never set reads as None.
+    """
+    __slots__ = ('line', 'column', 'filename', 'parent')
+
+    _POSITION_FIELDS = frozenset(('line', 'column', 'filename'))
+
+    def __getattr__(self, name):
+        # Only reached for unset slots and unknown names
+        if name in ASTNode._POSITION_FIELDS:
+            return None
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
 
     def with_pos(self, line=None, column=None, filename=None):
         self.line = line
@@ -15,10 +27,64 @@ class ASTNode:
         self.filename = filename
         return self
 
+
+_SLOT_DESCRIPTORS = {}
+
+
+def _slot_descriptors(cls):
+    """[(name, member descriptor)] for every slot of cls and its bases"""
+    descriptors = _SLOT_DESCRIPTORS.get(cls)
+    if descriptors is None:
+        descriptors = []
+        for klass in reversed(cls.__mro__):
+            slots = klass.__dict__.get('__slots__', ())
+            for name in (slots,) if isinstance(slots, str) else slots:
+                if name not in ('__dict__', '__weakref__'):
+                    descriptors.append((name, klass.__dict__[name]))
+        _SLOT_DESCRIPTORS[cls] = descriptors
+    return descriptors
+
+
+def node_fields(obj):
+    """Return {name: value} for the attributes set on obj, from its slots
+    and instance dict, or None for values that keep no attributes"""
+    cls = type(obj)
+    descriptors = _slot_descriptors(cls)
+    has_dict = hasattr(obj, '__dict__')
+    if not descriptors and not has_dict:
+        return None
+    fields = {}
+    for name, descriptor in descriptors:
+        try:
+            fields[name] = descriptor.__get__(obj, cls)
+        except AttributeError:
+            pass
+    if has_dict:
+        fields.update(obj.__dict__)
+    return fields
+
+
+def iter_nodes(node):
+    """Yield node and every AST node below it (lists included, parent links skipped)"""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (list, tuple)):
+            stack.extend(node)
+            continue
+        fields = node_fields(node)
+        if fields is None:
+            continue
+        yield node
+        for key, value in fields.items():
+            if key != 'parent' and (isinstance(value, (list, tuple)) or node_fields(value) is not None):
+                stack.append(value)
+
 # ============ Traditional Programming Nodes ============
 
 class Program(ASTNode):
     """Root node of the program"""
+    __slots__ = ('statements',)
     def __init__(self, statements):
         self.statements = statements
 
@@ -27,6 +93,7 @@ class Program(ASTNode):
 
 class Block(ASTNode):
     """A block of statements"""
+    __slots__ = ('statements',)
     def __init__(self, statements):
         self.statements = statements
 
@@ -35,6 +102,7 @@ class Block(ASTNode):
 
 class Assignment(ASTNode):
     """Variable assignment: x = 5"""
+    __slots__ = ('name', 'value')
     def __init__(self, name, value):
         self.name = name
         self.value = value
@@ -44,6 +112,7 @@ class Assignment(ASTNode):
 
 class BinaryOp(ASTNode):
     """Binary operation: a + b"""
+    __slots__ = ('operator', 'left', 'right')
     def __init__(self, operator, left, right):
         self.operator = operator
         self.left = left
@@ -54,6 +123,7 @@ class BinaryOp(ASTNode):
 
 class UnaryOp(ASTNode):
     """Unary operation: -x, not x"""
+    __slots__ = ('operator', 'operand')
     def __init__(self, operator, operand):
         self.operator = operator
         self.operand = operand
@@ -66,6 +136,7 @@ class TernaryOp(ASTNode):
 
     Python-style ternary: true_value if condition else false_value
     """
+    __slots__ = ('condition', 'true_value', 'false_value')
     def __init__(self, condition, true_value, false_value):
         self.condition = condition
         self.true_value = true_value
@@ -76,6 +147,7 @@ class TernaryOp(ASTNode):
 
 class Number(ASTNode):
     """Numeric literal"""
+    __slots__ = ('value',)
     def __init__(self, value):
         self.value = value
 
@@ -84,6 +156,7 @@ class Number(ASTNode):
 
 class String(ASTNode):
     """String literal"""
+    __slots__ = ('value',)
     def __init__(self, value):
         self.value = value
 
@@ -95,6 +168,7 @@ class FString(ASTNode):
 
     Stores the raw f-string content and parsed parts for interpolation.
     """
+    __slots__ = ('raw_value', 'parts')
     def __init__(self, raw_value, parts=None):
         self.raw_value = raw_value  # The raw f-string content (without f prefix and quotes)
         self.parts = parts or []     # List of (is_expr, content) tuples
@@ -104,6 +178,7 @@ class FString(ASTNode):
 
 class Boolean(ASTNode):
     """Boolean literal"""
+    __slots__ = ('value',)
     def __init__(self, value):
         self.value = value
 
@@ -112,12 +187,14 @@ class Boolean(ASTNode):
 
 class NoneLiteral(ASTNode):
     """None literal"""
+    __slots__ = ()
     def __repr__(self):
         return "NoneLiteral()"
 
 
 class Variable(ASTNode):
     """Variable reference"""
+    __slots__ = ('name',)
     def __init__(self, name):
         self.name = name
 
@@ -126,6 +203,7 @@ class Variable(ASTNode):
 
 class List(ASTNode):
     """List literal: [1, 2, 3]"""
+    __slots__ = ('elements',)
     def __init__(self, elements):
         self.elements = elements
 
@@ -134,6 +212,7 @@ class List(ASTNode):
 
 class ListComprehension(ASTNode):
     """List comprehension: [expr for x in iterable if cond]"""
+    __slots__ = ('expr', 'var_name', 'iterable', 'condition')
     def __init__(self, expr, var_name, iterable, condition=None):
         self.expr = expr
         self.var_name = var_name
@@ -146,6 +225,7 @@ class ListComprehension(ASTNode):
 
 class DictComprehension(ASTNode):
     """Dict comprehension: {key_expr: val_expr for var in iterable if cond}"""
+    __slots__ = ('key_expr', 'val_expr', 'var_name', 'iterable', 'condition')
     def __init__(self, key_expr, val_expr, var_name, iterable, condition=None):
         self.key_expr = key_expr
         self.val_expr = val_expr
@@ -159,6 +239,7 @@ class DictComprehension(ASTNode):
 
 class SetComprehension(ASTNode):
     """Set comprehension: {expr for var in iterable if cond}"""
+    __slots__ = ('expr', 'var_name', 'iterable', 'condition')
     def __init__(self, expr, var_name, iterable, condition=None):
         self.expr = expr
         self.var_name = var_name
@@ -173,6 +254,7 @@ class ListPattern(ASTNode):
     """List pattern for Prolog-style matching: [H|T] or [H1, H2|T]
     Also used for regular pattern matching: [x, y, z]
     """
+    __slots__ = ('head_elements', 'tail', 'elements')
     def __init__(self, head_elements, tail=None):
         self.head_elements = head_elements  # List of head elements
         self.tail = tail  # Tail variable or expression (None for regular patterns)
@@ -186,6 +268,7 @@ class ListPattern(ASTNode):
 
 class Slice(ASTNode):
     """Slice expression: list[start:end:step]"""
+    __slots__ = ('start', 'end', 'step')
     def __init__(self, start=None, end=None, step=None):
         self.start = start
         self.end = end
@@ -196,6 +279,7 @@ class Slice(ASTNode):
 
 class Tuple(ASTNode):
     """Tuple literal: (1, 2, 3)"""
+    __slots__ = ('elements',)
     def __init__(self, elements):
         self.elements = elements
 
@@ -204,6 +288,7 @@ class Tuple(ASTNode):
 
 class Set(ASTNode):
     """Set literal: {1, 2, 3}"""
+    __slots__ = ('elements',)
     def __init__(self, elements):
         self.elements = elements
 
@@ -212,6 +297,7 @@ class Set(ASTNode):
 
 class IsExpression(ASTNode):
     """Arithmetic evaluation in logic context: ?X is 5 + 3"""
+    __slots__ = ('variable', 'expression')
     def __init__(self, variable, expression):
         self.variable = variable  # Variable to bind result to
         self.expression = expression  # Arithmetic expression to evaluate
@@ -221,16 +307,19 @@ class IsExpression(ASTNode):
 
 class AsyncFunctionDef(ASTNode):
     """Async function definition: async def name(params): body"""
+    __slots__ = ('name', 'params', 'body', 'decorators')
     def __init__(self, name, params, body):
         self.name = name
         self.params = params
         self.body = body
+        self.decorators = []  # Set by the parser
 
     def __repr__(self):
         return f"AsyncFunctionDef({self.name}, {len(self.params)} params)"
 
 class AwaitExpr(ASTNode):
     """Await expression: await coroutine()"""
+    __slots__ = ('expression',)
     def __init__(self, expression):
         self.expression = expression
 
@@ -239,6 +328,7 @@ class AwaitExpr(ASTNode):
 
 class YieldExpr(ASTNode):
     """Yield expression: yield value"""
+    __slots__ = ('value',)
     def __init__(self, value=None):
         self.value = value
 
@@ -247,6 +337,7 @@ class YieldExpr(ASTNode):
 
 class WithStatement(ASTNode):
     """With statement: with expr as var: body"""
+    __slots__ = ('context_expr', 'target_var', 'body')
     def __init__(self, context_expr, target_var, body):
         self.context_expr = context_expr
         self.target_var = target_var  # Can be None
@@ -262,6 +353,7 @@ class TypeAnnotation(ASTNode):
     """Type annotation: int, str, List[int], etc.
     تعليق النوع: صحيح، نص، قائمة[صحيح]، إلخ
     """
+    __slots__ = ('base_type', 'type_params')
     def __init__(self, base_type, type_params=None):
         self.base_type = base_type  # "int", "str", "List", etc.
         self.type_params = type_params or []  # For generic types like List[int]
@@ -277,6 +369,7 @@ class GenericType(ASTNode):
     """Generic type parameter: T, K, V
     معامل نوع عام
     """
+    __slots__ = ('name', 'bound')
     def __init__(self, name, bound=None):
         self.name = name  # e.g., "T"
         self.bound = bound  # Optional constraint, e.g., T extends Comparable
@@ -291,6 +384,7 @@ class UnionType(ASTNode):
     """Union type: int | str or Union[int, str]
     نوع اتحاد
     """
+    __slots__ = ('types',)
     def __init__(self, types):
         self.types = types  # List of TypeAnnotation
 
@@ -303,6 +397,7 @@ class OptionalType(ASTNode):
     """Optional type: Optional[int] or int?
     نوع اختياري
     """
+    __slots__ = ('inner_type',)
     def __init__(self, inner_type):
         self.inner_type = inner_type
 
@@ -314,6 +409,7 @@ class CallableType(ASTNode):
     """Callable type: Callable[[int, str], bool]
     نوع قابل للاستدعاء
     """
+    __slots__ = ('param_types', 'return_type')
     def __init__(self, param_types, return_type):
         self.param_types = param_types  # List of TypeAnnotation
         self.return_type = return_type  # TypeAnnotation
@@ -327,6 +423,7 @@ class TypedVariable(ASTNode):
     """Variable with type annotation: x: int = 5
     متغير مع تعليق النوع
     """
+    __slots__ = ('name', 'type_annotation', 'value')
     def __init__(self, name, type_annotation, value=None):
         self.name = name
         self.type_annotation = type_annotation
@@ -342,6 +439,7 @@ class EnumDef(ASTNode):
     """Enum definition: enum Color { RED, GREEN, BLUE }
     تعريف تعداد
     """
+    __slots__ = ('name', 'members')
     def __init__(self, name, members):
         self.name = name
         self.members = members  # List of (name, value) tuples
@@ -354,6 +452,7 @@ class InterfaceDef(ASTNode):
     """Interface definition: interface Drawable { def draw(): ... }
     تعريف واجهة
     """
+    __slots__ = ('name', 'methods', 'extends')
     def __init__(self, name, methods, extends=None):
         self.name = name
         self.methods = methods  # List of method signatures
@@ -367,6 +466,7 @@ class MethodSignature(ASTNode):
     """Method signature for interfaces: def method(param: int) -> str
     توقيع الدالة للواجهات
     """
+    __slots__ = ('name', 'params', 'return_type')
     def __init__(self, name, params, return_type=None):
         self.name = name
         self.params = params  # List of (name, type) tuples
@@ -377,6 +477,7 @@ class MethodSignature(ASTNode):
 
 class Cut(ASTNode):
     """Cut operator: ! (prevents backtracking in logic programming)"""
+    __slots__ = ()
     def __init__(self):
         pass
 
@@ -385,9 +486,11 @@ class Cut(ASTNode):
 
 class Decorator(ASTNode):
     """Decorator: @decorator_name or @decorator(args)"""
+    __slots__ = ('name', 'args', 'named_args')
     def __init__(self, name, args=None):
         self.name = name
         self.args = args if args is not None else []
+        self.named_args = {}
 
     def __repr__(self):
         if self.args:
@@ -413,6 +516,7 @@ class PropertyDescriptor:
 
 class DataclassField(ASTNode):
     """A field in a dataclass"""
+    __slots__ = ('name', 'type_annotation', 'default_value')
     def __init__(self, name, type_annotation=None, default_value=None):
         self.name = name
         self.type_annotation = type_annotation
@@ -423,6 +527,7 @@ class DataclassField(ASTNode):
 
 class Dict(ASTNode):
     """Dictionary literal: {key: value}"""
+    __slots__ = ('pairs',)
     def __init__(self, pairs):
         self.pairs = pairs  # List of (key, value) tuples
 
@@ -431,6 +536,7 @@ class Dict(ASTNode):
 
 class PhraseStatement(ASTNode):
     """Nominal phrase sugar inside hybrid blocks: e.g., محمد الطبيب. or عصير العنب[of]."""
+    __slots__ = ('text', 'relation')
     def __init__(self, text, relation=None):
         self.text = text
         self.relation = relation
@@ -440,11 +546,13 @@ class PhraseStatement(ASTNode):
 
 class Parameter(ASTNode):
     """Function parameter with optional default value and support for *args/**kwargs"""
+    __slots__ = ('name', 'default_value', 'is_varargs', 'is_kwargs', 'type_annotation')
     def __init__(self, name, default_value=None, is_varargs=False, is_kwargs=False):
         self.name = name
         self.default_value = default_value
         self.is_varargs = is_varargs  # *args
         self.is_kwargs = is_kwargs    # **kwargs
+        self.type_annotation = None
 
     def has_default(self):
         """Check if this parameter has a default value"""
@@ -463,6 +571,7 @@ class Parameter(ASTNode):
 
 class NamedArgument(ASTNode):
     """Named argument in function call: func(name=value)"""
+    __slots__ = ('name', 'value')
     def __init__(self, name, value):
         self.name = name
         self.value = value
@@ -472,6 +581,7 @@ class NamedArgument(ASTNode):
 
 class KeyValuePair(ASTNode):
     """Key-value pair sugar used in special call contexts: head(key: value)."""
+    __slots__ = ('key', 'value')
     def __init__(self, key, value):
         self.key = key
         self.value = value
@@ -483,6 +593,7 @@ class SimilarityDecl(ASTNode):
     """Syntactic sugar statement: Head(Key1:Score1, Key2:Score2, ...)
     Lowers at runtime to asserting similar(Head, Key, Score, Kind, Domain) facts.
     """
+    __slots__ = ('head', 'pairs', 'kind', 'domain', 'default')
     def __init__(self, head, pairs, kind=None, domain=None, default=None):
         self.head = head  # string head name
         self.pairs = pairs  # list[KeyValuePair]
@@ -497,6 +608,7 @@ class CollectExpr(ASTNode):
     """Sugar: collect ?Var from predicate(...) [limit N] [unique]
     Evaluates to a Python list of bound values for Var.
     """
+    __slots__ = ('var_name', 'goal', 'limit', 'unique')
     def __init__(self, var_name, goal, limit=None, unique=False):
         # var_name without leading '?'
         self.var_name = var_name
@@ -511,6 +623,7 @@ class TopkExpr(ASTNode):
     """Sugar: topk K of ?Var by ?Score where predicate(...)
     Evaluates to list of top-k values of Var by descending Score.
     """
+    __slots__ = ('k', 'var_name', 'score_name', 'goal')
     def __init__(self, k, var_name, score_name, goal):
         self.k = k
         self.var_name = var_name  # without '?'
@@ -524,6 +637,7 @@ class ArgmaxExpr(ASTNode):
     """Sugar: argmax ?Var by ?Score where predicate(...)
     Evaluates to the best value of Var by descending Score.
     """
+    __slots__ = ('var_name', 'score_name', 'goal')
     def __init__(self, var_name, score_name, goal):
         self.var_name = var_name
         self.score_name = score_name
@@ -536,6 +650,7 @@ class ChooseExpr(ASTNode):
     """Sugar: choose { key: weight, ... } / اختر { ... }
     Evaluates to one key sampled according to weights.
     """
+    __slots__ = ('mapping',)
     def __init__(self, mapping_dict):
         # mapping_dict is a Dict AST node
         self.mapping = mapping_dict
@@ -549,6 +664,7 @@ class ChooseExpr(ASTNode):
 
 class SampleAssign(ASTNode):
     """Sugar: x ~ Dist(args) assigns a sampled value to variable x."""
+    __slots__ = ('var_name', 'dist_call')
     def __init__(self, var_name, dist_call):
         self.var_name = var_name
         self.dist_call = dist_call  # FunctionCall AST
@@ -558,6 +674,7 @@ class SampleAssign(ASTNode):
 
 class FunctionCall(ASTNode):
     """Function call: func(arg1, arg2, name=value)"""
+    __slots__ = ('name', 'function_name', 'arguments', 'named_arguments')
     def __init__(self, name, arguments, named_arguments=None):
         self.name = name
         # Backward-compat: older parser/users expect .function_name
@@ -570,12 +687,24 @@ class FunctionCall(ASTNode):
 
 class FunctionDef(ASTNode):
     """Function definition with support for default parameters and decorators"""
+    __slots__ = ('name', 'parameters', 'body', 'decorators', 'code_object', 'return_type',
+                 'requires', 'ensures', '_is_static', '_is_classmethod', '_is_abstract')
     def __init__(self, name, parameters, body, decorators=None):
         self.name = name
         # parameters can be strings (old format) or Parameter objects (new format)
         self.parameters = parameters
         self.body = body
         self.decorators = decorators if decorators is not None else []
+        # Compiled body for BytecodeVM: None until tried, False if unsupported
+        self.code_object = None
+        self.return_type = None
+        # Design-by-contract clauses (lists of expressions), set by the parser
+        self.requires = None
+        self.ensures = None
+        # Set by the interpreter from the decorators
+        self._is_static = False
+        self._is_classmethod = False
+        self._is_abstract = False
 
     def __repr__(self):
         dec_str = f", {len(self.decorators)} decorators" if self.decorators else ""
@@ -583,6 +712,7 @@ class FunctionDef(ASTNode):
 
 class LambdaExpression(ASTNode):
     """Lambda expression: lambda x, y: x + y"""
+    __slots__ = ('parameters', 'body')
     def __init__(self, parameters, body):
         self.parameters = parameters  # List of parameter names
         self.body = body  # Expression node
@@ -592,6 +722,8 @@ class LambdaExpression(ASTNode):
 
 class ClassDef(ASTNode):
     """Class definition with support for decorators"""
+    __slots__ = ('name', 'base_class', 'base_classes', 'body', 'decorators', '_is_abstract',
+                 '_is_dataclass', '_dataclass_fields')
     def __init__(self, name, base_class, body, base_classes=None, decorators=None):
         self.name = name
         # Backward-compat single base
@@ -600,6 +732,10 @@ class ClassDef(ASTNode):
         self.base_classes = base_classes
         self.body = body
         self.decorators = decorators if decorators is not None else []
+        # Set by the interpreter from the decorators
+        self._is_abstract = False
+        self._is_dataclass = False
+        self._dataclass_fields = None
 
     def __repr__(self):
         dec_str = f", {len(self.decorators)} decorators" if self.decorators else ""
@@ -607,6 +743,7 @@ class ClassDef(ASTNode):
 
 class ObjectInstance(ASTNode):
     """Object instance"""
+    __slots__ = ('class_name', 'arguments')
     def __init__(self, class_name, arguments):
         self.class_name = class_name
         self.arguments = arguments
@@ -616,6 +753,7 @@ class ObjectInstance(ASTNode):
 
 class AttributeAccess(ASTNode):
     """Attribute access (obj.attr)"""
+    __slots__ = ('object_expr', 'attribute_name')
     def __init__(self, object_expr, attribute_name):
         self.object_expr = object_expr
         self.attribute_name = attribute_name
@@ -625,6 +763,7 @@ class AttributeAccess(ASTNode):
 
 class MethodCall(ASTNode):
     """Method call (obj.method()) with support for named arguments"""
+    __slots__ = ('object_expr', 'method_name', 'arguments', 'named_arguments')
     def __init__(self, object_expr, method_name, arguments, named_arguments=None):
         self.object_expr = object_expr
         self.method_name = method_name
@@ -636,6 +775,7 @@ class MethodCall(ASTNode):
 
 class SubscriptAccess(ASTNode):
     """Indexing access (obj[index])"""
+    __slots__ = ('object_expr', 'index_expr')
     def __init__(self, object_expr, index_expr):
         self.object_expr = object_expr
         self.index_expr = index_expr
@@ -645,6 +785,7 @@ class SubscriptAccess(ASTNode):
 
 class AttributeAssignment(ASTNode):
     """Attribute assignment: obj.attr = value"""
+    __slots__ = ('object_expr', 'attribute_name', 'value')
     def __init__(self, object_expr, attribute_name, value):
         self.object_expr = object_expr
         self.attribute_name = attribute_name
@@ -655,6 +796,7 @@ class AttributeAssignment(ASTNode):
 
 class SubscriptAssignment(ASTNode):
     """Subscript assignment: obj[index] = value"""
+    __slots__ = ('object_expr', 'index_expr', 'value')
     def __init__(self, object_expr, index_expr, value):
         self.object_expr = object_expr
         self.index_expr = index_expr
@@ -665,6 +807,7 @@ class SubscriptAssignment(ASTNode):
 
 class SelfReference(ASTNode):
     """Self reference"""
+    __slots__ = ()
     def __init__(self):
         pass
 
@@ -673,6 +816,7 @@ class SelfReference(ASTNode):
 
 class SuperCall(ASTNode):
     """Super call for parent class with support for named arguments"""
+    __slots__ = ('method_name', 'arguments', 'named_arguments')
     def __init__(self, method_name, arguments, named_arguments=None):
         self.method_name = method_name
         self.arguments = arguments
@@ -683,6 +827,7 @@ class SuperCall(ASTNode):
 
 class ImportStatement(ASTNode):
     """Import statement"""
+    __slots__ = ('module_name', 'alias')
     def __init__(self, module_name, alias=None):
         self.module_name = module_name
         self.alias = alias
@@ -692,6 +837,7 @@ class ImportStatement(ASTNode):
 
 class FromImportStatement(ASTNode):
     """From ... import statement"""
+    __slots__ = ('module_name', 'names', 'aliases')
     def __init__(self, module_name, names, aliases=None):
         self.module_name = module_name
         self.names = names
@@ -702,6 +848,7 @@ class FromImportStatement(ASTNode):
 
 class IfStatement(ASTNode):
     """If statement"""
+    __slots__ = ('condition', 'then_branch', 'else_branch')
     def __init__(self, condition, then_branch, else_branch=None):
         self.condition = condition
         self.then_branch = then_branch
@@ -712,25 +859,30 @@ class IfStatement(ASTNode):
 
 class ForLoop(ASTNode):
     """For loop"""
+    __slots__ = ('variable', 'iterable', 'body', 'invariants')
     def __init__(self, variable, iterable, body):
         self.variable = variable
         self.iterable = iterable
         self.body = body
+        self.invariants = None
 
     def __repr__(self):
         return f"ForLoop({self.variable}, iterable, body)"
 
 class WhileLoop(ASTNode):
     """While loop"""
+    __slots__ = ('condition', 'body', 'invariants')
     def __init__(self, condition, body):
         self.condition = condition
         self.body = body
+        self.invariants = None
 
     def __repr__(self):
         return f"WhileLoop(condition, body)"
 
 class ReturnStatement(ASTNode):
     """Return statement"""
+    __slots__ = ('value',)
     def __init__(self, value=None):
         self.value = value
 
@@ -739,16 +891,19 @@ class ReturnStatement(ASTNode):
 
 class BreakStatement(ASTNode):
     """Break statement"""
+    __slots__ = ()
     def __repr__(self):
         return "BreakStatement()"
 
 class ContinueStatement(ASTNode):
     """Continue statement"""
+    __slots__ = ()
     def __repr__(self):
         return "ContinueStatement()"
 
 class PrintStatement(ASTNode):
     """Print statement"""
+    __slots__ = ('value',)
     def __init__(self, value):
         self.value = value
 
@@ -759,6 +914,7 @@ class PrintStatement(ASTNode):
 
 class RaiseStatement(ASTNode):
     """Raise statement"""
+    __slots__ = ('value',)
     def __init__(self, value=None):
         self.value = value
 
@@ -767,6 +923,7 @@ class RaiseStatement(ASTNode):
 
 class ExceptHandler(ASTNode):
     """Except handler: except [Type] [as alias]: body"""
+    __slots__ = ('type_name', 'alias', 'body')
     def __init__(self, type_name=None, alias=None, body=None):
         self.type_name = type_name
         self.alias = alias
@@ -777,6 +934,7 @@ class ExceptHandler(ASTNode):
 
 class TryExceptFinally(ASTNode):
     """Try/Except/Finally statement"""
+    __slots__ = ('try_block', 'handlers', 'finally_block')
     def __init__(self, try_block, handlers=None, finally_block=None):
         self.try_block = try_block
         self.handlers = handlers or []
@@ -788,6 +946,7 @@ class TryExceptFinally(ASTNode):
 
 class LogicalFact(ASTNode):
     """Logical fact: parent(john, mary). Optionally with probability via fact[0.8]."""
+    __slots__ = ('predicate', 'probability')
     def __init__(self, predicate, probability=None):
         self.predicate = predicate
         self.probability = probability  # Optional float in [0,1]
@@ -799,6 +958,7 @@ class LogicalFact(ASTNode):
 
 class LogicalRule(ASTNode):
     """Logical rule: grandparent(X, Z) :- parent(X, Y), parent(Y, Z)."""
+    __slots__ = ('head', 'body')
     def __init__(self, head, body):
         self.head = head
         self.body = body  # List of predicates
@@ -808,15 +968,27 @@ class LogicalRule(ASTNode):
 
 class LogicalQuery(ASTNode):
     """Logical query: ?- parent(X, john)."""
+    __slots__ = ('goal',)
     def __init__(self, goal):
         self.goal = goal
 
     def __repr__(self):
         return f"LogicalQuery({self.goal})"
 
+class TableDirective(ASTNode):
+    """Tabling directive: :- table ancestor/2, path/2."""
+    __slots__ = ('predicates',)
+    def __init__(self, predicates):
+        self.predicates = predicates  # List of (name, arity) pairs
+
+    def __repr__(self):
+        specs = ", ".join(f"{name}/{arity}" for name, arity in self.predicates)
+        return f"TableDirective({specs})"
+
 class QueryExpression(ASTNode):
     """Query as expression: query predicate(...) where condition?
     Returns list of matching bindings."""
+    __slots__ = ('goal', 'where_clause')
     def __init__(self, goal, where_clause=None):
         self.goal = goal
         self.where_clause = where_clause
@@ -828,6 +1000,7 @@ class QueryExpression(ASTNode):
 
 class LogicalPredicate(ASTNode):
     """Logical predicate: parent(X, Y)"""
+    __slots__ = ('name', 'arguments')
     def __init__(self, name, arguments):
         self.name = name
         self.arguments = arguments
@@ -837,6 +1010,7 @@ class LogicalPredicate(ASTNode):
 
 class LogicalVariable(ASTNode):
     """Logical variable: ?X, ?Y"""
+    __slots__ = ('name',)
     def __init__(self, name):
         self.name = name
 
@@ -845,6 +1019,7 @@ class LogicalVariable(ASTNode):
 
 class ExpressionTerm(ASTNode):
     """Wrapper for expressions used as logical terms (e.g., rec[0] in query)"""
+    __slots__ = ('expression',)
     def __init__(self, expression):
         self.expression = expression
 
@@ -853,6 +1028,7 @@ class ExpressionTerm(ASTNode):
 
 class LogicalConstant(ASTNode):
     """Logical constant: atom, number, string"""
+    __slots__ = ('value',)
     def __init__(self, value):
         self.value = value
 
@@ -861,6 +1037,7 @@ class LogicalConstant(ASTNode):
 
 class LogicalConjunction(ASTNode):
     """Logical AND: goal1, goal2"""
+    __slots__ = ('goals',)
     def __init__(self, goals):
         self.goals = goals
 
@@ -869,6 +1046,7 @@ class LogicalConjunction(ASTNode):
 
 class LogicalDisjunction(ASTNode):
     """Logical OR: goal1; goal2"""
+    __slots__ = ('goals',)
     def __init__(self, goals):
         self.goals = goals
 
@@ -881,6 +1059,7 @@ class CauseEffectStatement(ASTNode):
     Represents causal relationships with physical/logical reasons.
     Example: سبب_نتيجة("رفع_شيء_لفوق", "يسقط", "جاذبية", 1.0).
     """
+    __slots__ = ('condition', 'result', 'cause', 'strength', 'domain')
     def __init__(self, condition, result, cause, strength=None, domain=None):
         self.condition = condition  # The condition/action
         self.result = result  # The effect/result
@@ -897,6 +1076,7 @@ class RelationStatement(ASTNode):
     Represents semantic relationships between concepts.
     Example: علاقة("الاستحمام", "في", "حمام", 0.9).
     """
+    __slots__ = ('from_concept', 'relation_type', 'to_concept', 'strength')
     def __init__(self, from_concept, relation_type, to_concept, strength=None):
         self.from_concept = from_concept
         self.relation_type = relation_type
@@ -908,6 +1088,7 @@ class RelationStatement(ASTNode):
 
 class LogicalNegation(ASTNode):
     """Logical NOT: \\+ goal"""
+    __slots__ = ('goal',)
     def __init__(self, goal):
         self.goal = goal
 
@@ -918,6 +1099,7 @@ class LogicalNegation(ASTNode):
 
 class HybridBlock(ASTNode):
     """Hybrid block combining traditional and logical code"""
+    __slots__ = ('traditional_stmts', 'logical_stmts')
     def __init__(self, traditional_stmts, logical_stmts):
         self.traditional_stmts = traditional_stmts
         self.logical_stmts = logical_stmts
@@ -927,6 +1109,7 @@ class HybridBlock(ASTNode):
 
 class LogicalIfStatement(ASTNode):
     """If statement with logical condition"""
+    __slots__ = ('condition', 'then_branch', 'else_branch')
     def __init__(self, condition, then_branch, else_branch=None):
         self.condition = condition  # Can be a logical query
         self.then_branch = then_branch
@@ -940,6 +1123,7 @@ class LogicalIfStatement(ASTNode):
 
 class EntityDef(ASTNode):
     """Entity definition: entity <name> { ... } where body is a dict-like structure"""
+    __slots__ = ('name', 'body')
     def __init__(self, name, body):
         self.name = name
         self.body = body  # AST node (Dict) to be evaluated later
@@ -952,6 +1136,7 @@ class ConceptDef(ASTNode):
     """Concept definition: concept Name = {elements}
     Holds a set literal to be evaluated and installed as both runtime set and logical facts in_concept(Name, Elem).
     """
+    __slots__ = ('name', 'set_node')
     def __init__(self, name, set_node):
         self.name = name
         self.set_node = set_node  # Set AST node
@@ -961,6 +1146,7 @@ class ConceptDef(ASTNode):
 
 class ApplyActionStmt(ASTNode):
     """Apply action: apply <actor>.<action>(<target>, [action_value=...])"""
+    __slots__ = ('actor_name', 'action_name', 'target_expr', 'named_args')
     def __init__(self, actor_name, action_name, target_expr, named_args=None):
         self.actor_name = actor_name
         self.action_name = action_name
@@ -975,6 +1161,7 @@ class ApplyActionStmt(ASTNode):
 
 class AssertFact(ASTNode):
     """Assert fact statement: assert_fact: predicate(args)"""
+    __slots__ = ('predicate',)
     def __init__(self, predicate):
         self.predicate = predicate
 
@@ -985,6 +1172,7 @@ class AssertFact(ASTNode):
 
 class OnceStatement(ASTNode):
     """Once statement: once { block } - execute block with max_solutions=1"""
+    __slots__ = ('body',)
     def __init__(self, body):
         self.body = body  # Block node
 
@@ -993,6 +1181,7 @@ class OnceStatement(ASTNode):
 
 class OnceGoal(ASTNode):
     """Once goal: once goal. - single logical goal with limit 1"""
+    __slots__ = ('goal',)
     def __init__(self, goal):
         self.goal = goal  # Predicate node
 
@@ -1001,6 +1190,7 @@ class OnceGoal(ASTNode):
 
 class LimitStatement(ASTNode):
     """Limit statement: limit N { block }"""
+    __slots__ = ('limit', 'body')
     def __init__(self, limit, body):
         self.limit = limit  # int
         self.body = body  # Block node
@@ -1010,6 +1200,7 @@ class LimitStatement(ASTNode):
 
 class LimitGoal(ASTNode):
     """Limit goal: limit N goal."""
+    __slots__ = ('limit', 'goal')
     def __init__(self, limit, goal):
         self.limit = limit  # int
         self.goal = goal  # Predicate node
@@ -1022,6 +1213,7 @@ class MatchInAs(ASTNode):
     """Match statement: match pattern in text as var_name
     Syntactic sugar for: var_name = match(pattern, text)
     """
+    __slots__ = ('pattern', 'text', 'var_name')
     def __init__(self, pattern, text, var_name):
         self.pattern = pattern  # Expression (string or template)
         self.text = text  # Expression (string to match against)
@@ -1037,6 +1229,7 @@ class TemporalBlock(ASTNode):
     """Temporal block: temporal { first: action1, then: action2, lastly: action3 }
     Executes actions in sequence with optional timing constraints
     """
+    __slots__ = ('steps',)
     def __init__(self, steps):
         self.steps = steps  # List of (label, statement) tuples: [('first', stmt), ('then', stmt), ...]
 
@@ -1048,6 +1241,7 @@ class WithinBlock(ASTNode):
     """Within block: within 5.0 seconds { ... }
     Executes block with a time constraint (timeout)
     """
+    __slots__ = ('duration', 'unit', 'body')
     def __init__(self, duration, unit, body):
         self.duration = duration  # Number (float or int)
         self.unit = unit  # 'seconds', 'minutes', 'hours' (or Arabic equivalents)
@@ -1061,6 +1255,7 @@ class ScheduleBlock(ASTNode):
     """Schedule block: schedule every 2.0 seconds { ... }
     Schedules repeated execution of a block
     """
+    __slots__ = ('interval', 'unit', 'body')
     def __init__(self, interval, unit, body):
         self.interval = interval  # Number (float or int)
         self.unit = unit  # 'seconds', 'minutes', 'hours' (or Arabic equivalents)
@@ -1074,6 +1269,7 @@ class DelayStatement(ASTNode):
     """Delay statement: delay 1.5 seconds
     Pauses execution for specified duration
     """
+    __slots__ = ('duration', 'unit')
     def __init__(self, duration, unit):
         self.duration = duration  # Number (float or int)
         self.unit = unit  # 'seconds', 'minutes', 'hours' (or Arabic equivalents)
@@ -1093,6 +1289,7 @@ class WhereClause(ASTNode):
         x = [1, 2, 3, 4, 5] where item > 2
         result = compute(x) where x > 0
     """
+    __slots__ = ('expression', 'condition')
     def __init__(self, expression, condition):
         self.expression = expression  # The main expression
         self.condition = condition    # The where condition
@@ -1109,6 +1306,7 @@ class RequiresClause(ASTNode):
             requires b != 0
             { return a / b }
     """
+    __slots__ = ('condition', 'message')
     def __init__(self, condition, message=None):
         self.condition = condition  # Boolean expression
         self.message = message      # Optional error message
@@ -1126,6 +1324,7 @@ class EnsuresClause(ASTNode):
             ensures result >= 0
             { result = x ** 0.5 }
     """
+    __slots__ = ('condition', 'message')
     def __init__(self, condition, message=None):
         self.condition = condition  # Boolean expression
         self.message = message      # Optional error message
@@ -1148,6 +1347,7 @@ class InvariantClause(ASTNode):
             invariant balance >= 0
             { ... }
     """
+    __slots__ = ('condition', 'message')
     def __init__(self, condition, message=None):
         self.condition = condition  # Boolean expression
         self.message = message      # Optional error message
@@ -1174,6 +1374,7 @@ class MatchStatement(ASTNode):
             case 2: { print("two") }
             default: { print("other") }
     """
+    __slots__ = ('value', 'cases')
     def __init__(self, value, cases):
         self.value = value          # Expression to match
         self.cases = cases          # List of CaseClause nodes
@@ -1189,6 +1390,7 @@ class CaseClause(ASTNode):
         case [x, y]: { print(x + y) }
         case {"name": n} when n != "": { print(n) }
     """
+    __slots__ = ('pattern', 'body', 'guard')
     def __init__(self, pattern, body, guard=None):
         self.pattern = pattern      # Pattern to match (can be literal, list, dict, or variable)
         self.body = body            # Block to execute if matched
@@ -1205,6 +1407,7 @@ class DefaultClause(ASTNode):
     Example:
         default: { print("no match") }
     """
+    __slots__ = ('body',)
     def __init__(self, body):
         self.body = body            # Block to execute if no case matches
 
@@ -1218,6 +1421,7 @@ class DictPattern(ASTNode):
     Example:
         {"name": n, "age": a}
     """
+    __slots__ = ('keys', 'patterns')
     def __init__(self, keys, patterns):
         self.keys = keys            # List of dictionary keys
         self.patterns = patterns    # List of patterns for each key
@@ -1240,6 +1444,7 @@ class ReactiveDeclaration(ASTNode):
         reactive x = 10
         تفاعلي س = 10
     """
+    __slots__ = ('variable', 'value')
     def __init__(self, variable, value):
         self.variable = variable    # Variable name
         self.value = value          # Initial value expression
@@ -1257,6 +1462,7 @@ class WatchBlock(ASTNode):
         watch x, y: { print("x or y changed") }
         راقب س, ص: { print("س أو ص تغيرت") }
     """
+    __slots__ = ('variables', 'body')
     def __init__(self, variables, body):
         self.variables = variables  # List of variable names to watch
         self.body = body            # Block to execute on change
@@ -1275,6 +1481,7 @@ class ComputedProperty(ASTNode):
         computed sum = x + y
         محسوب مجموع = س + ص
     """
+    __slots__ = ('variable', 'expression', 'dependencies')
     def __init__(self, variable, expression, dependencies=None):
         self.variable = variable        # Property name
         self.expression = expression    # Expression to compute
@@ -1293,6 +1500,7 @@ class PipelineOp(ASTNode):
 
     Applies function to value: value |> f means f(value)
     """
+    __slots__ = ('value', 'function')
     def __init__(self, value, function):
         self.value = value          # Expression to pipe
         self.function = function    # Function to apply
@@ -1306,6 +1514,7 @@ class ComposeOp(ASTNode):
 
     Creates a new function that applies f then g: (f >> g)(x) means g(f(x))
     """
+    __slots__ = ('first', 'second')
     def __init__(self, first, second):
         self.first = first      # First function
         self.second = second    # Second function
@@ -1336,6 +1545,7 @@ class CognitiveEntity(ASTNode):
             ...
         }
     """
+    __slots__ = ('name', 'properties')
     def __init__(self, name, properties):
         self.name = name
         self.properties = properties  # Dict node with property: value pairs
@@ -1373,6 +1583,7 @@ class CognitiveEvent(ASTNode):
             ردود_فعل: [...]
         }
     """
+    __slots__ = ('name', 'config')
     def __init__(self, name, config):
         self.name = name
         self.config = config  # Dict node with event configuration
@@ -1389,6 +1600,7 @@ class ConceptualBlueprint(ASTNode):
         conceptual_blueprint <name> { ... }
         تصور_عام <name> { ... }
     """
+    __slots__ = ('name', 'config')
 
     def __init__(self, name, config):
         self.name = name
@@ -1409,6 +1621,7 @@ class TriggerEvent(ASTNode):
         أطلق <اسم_الحدث>
         أطلق <اسم_الحدث> مع {معامل: قيمة}
     """
+    __slots__ = ('event_name', 'params')
     def __init__(self, event_name, params=None):
         self.event_name = event_name
         self.params = params  # Optional dict node
@@ -1442,6 +1655,7 @@ class ConcurrentEvents(ASTNode):
             # التأثيرات المدمجة
         }
     """
+    __slots__ = ('events', 'effects')
     def __init__(self, events, effects):
         self.events = events  # List of (event_name, strength) tuples
         self.effects = effects  # Block node with combined effects
@@ -1467,6 +1681,7 @@ class LinguisticPattern(ASTNode):
             تعبير: دالة(فكرة) { ... }
         }
     """
+    __slots__ = ('name', 'config')
     def __init__(self, name, config):
         self.name = name
         self.config = config  # Dict node with pattern configuration
@@ -1502,6 +1717,7 @@ class IdeaDef(ASTNode):
             }
         }
     """
+    __slots__ = ('name', 'config')
     def __init__(self, name, config):
         self.name = name
         self.config = config  # Dict node with idea configuration
@@ -1531,6 +1747,7 @@ class SemanticMeaning(ASTNode):
             علاقة2: قيمة2
         }
     """
+    __slots__ = ('name', 'relationships')
     def __init__(self, name, relationships):
         self.name = name
         self.relationships = relationships  # Dict node with relationships
@@ -1546,6 +1763,7 @@ class SemanticQuery(ASTNode):
         query: function_name(args)
         استعلام: اسم_الدالة(معاملات)
     """
+    __slots__ = ('query_expr',)
     def __init__(self, query_expr):
         self.query_expr = query_expr  # Function call or expression
 
@@ -1579,6 +1797,7 @@ class KnowledgeInfo(ASTNode):
             }
         }
     """
+    __slots__ = ('name', 'config')
     def __init__(self, name, config):
         self.name = name
         self.config = config  # Dict node with content and context
@@ -1603,6 +1822,7 @@ class InferenceRule(ASTNode):
             إذن: {...نتيجة...}
         }
     """
+    __slots__ = ('name', 'config')
     def __init__(self, name, config):
         self.name = name
         self.config = config  # Dict node with if/then
@@ -1618,6 +1838,7 @@ class InferFrom(ASTNode):
         infer_from: "statement"
         استنتج من: "عبارة"
     """
+    __slots__ = ('statement',)
     def __init__(self, statement):
         self.statement = statement
 
@@ -1635,6 +1856,7 @@ class SemanticNetwork(ASTNode):
             "edges": [...]
         }
     """
+    __slots__ = ('name', 'config')
     def __init__(self, name, config):
         self.name = name
         self.config = config
@@ -1650,6 +1872,7 @@ class InferFromText(ASTNode):
         استدل_من: "text"
         infer_from: "text"
     """
+    __slots__ = ('text',)
     def __init__(self, text):
         self.text = text
 
@@ -1667,6 +1890,7 @@ class Contradiction(ASTNode):
         تناقض بين: [معلومة1, معلومة2]
         حل: "استراتيجية"
     """
+    __slots__ = ('items', 'resolution')
     def __init__(self, items, resolution=None):
         self.items = items  # List of information items
         self.resolution = resolution  # Resolution strategy
@@ -1693,6 +1917,7 @@ class EvolvingKnowledge(ASTNode):
             توقع_مستقبلي: {...}
         }
     """
+    __slots__ = ('name', 'config')
     def __init__(self, name, config):
         self.name = name
         self.config = config
@@ -1717,6 +1942,7 @@ class Ontology(ASTNode):
             تصنيف: {...}
         }
     """
+    __slots__ = ('name', 'config')
     def __init__(self, name, config):
         self.name = name
         self.config = config
@@ -1735,6 +1961,7 @@ class SemanticMemory(ASTNode):
         ذاكرة.احفظ({...})
         ذاكرة.استرجع(استعلام)
     """
+    __slots__ = ('operation', 'data')
     def __init__(self, operation, data):
         self.operation = operation  # "store" or "retrieve"
         self.data = data  # Data to store or query
@@ -1750,6 +1977,7 @@ class SemanticSimilarity(ASTNode):
         similarity(concept1, concept2)
         تشابه(مفهوم1, مفهوم2)
     """
+    __slots__ = ('concept1', 'concept2')
     def __init__(self, concept1, concept2):
         self.concept1 = concept1
         self.concept2 = concept2
@@ -1765,6 +1993,7 @@ class Concept(ASTNode):
         concept "<name>": {...properties...}
         مفهوم "<اسم>": {...خصائص...}
     """
+    __slots__ = ('name', 'properties')
     def __init__(self, name, properties):
         self.name = name
         self.properties = properties
@@ -1791,6 +2020,7 @@ class Narrative(ASTNode):
             بنية: "..."
         }
     """
+    __slots__ = ('name', 'config')
     def __init__(self, name, config):
         self.name = name
         self.config = config
@@ -1806,6 +2036,7 @@ class GenerateNarrative(ASTNode):
         generate_narrative: based_on("template")
         ولّد_سرد: بناءً_على("قالب")
     """
+    __slots__ = ('template',)
     def __init__(self, template):
         self.template = template
 
@@ -1820,6 +2051,7 @@ class CurrentContext(ASTNode):
         current_context: {...}
         سياق_حالي: {...}
     """
+    __slots__ = ('context_data',)
     def __init__(self, context_data):
         self.context_data = context_data
 
@@ -1836,6 +2068,7 @@ class ContextAwareBlock(ASTNode):
             ...
         }
     """
+    __slots__ = ('condition', 'body')
     def __init__(self, condition, body):
         self.condition = condition
         self.body = body
@@ -1872,6 +2105,7 @@ class Domain(ASTNode):
             "properties": ["atomic_number", "atomic_mass"]
         }
     """
+    __slots__ = ('name', 'config')
     def __init__(self, name, config):
         self.name = name
         self.config = config  # Dict node with domain configuration
@@ -1908,10 +2142,12 @@ class GenericEnvironment(ASTNode):
             "laws": ["mass_law", "energy_law"]
         }
     """
+    __slots__ = ('name', 'domain', 'config', 'env_type')
     def __init__(self, name, domain, config):
         self.name = name
         self.domain = domain
         self.config = config  # Dict node with environment configuration
+        self.env_type = None  # Optional "of_type" clause
 
     def __repr__(self):
         return f"GenericEnvironment({self.name}, domain={self.domain})"
@@ -1945,6 +2181,7 @@ class ExistentialBeing(ASTNode):
             "states": ["solid", "dissolved", "reacting"]
         }
     """
+    __slots__ = ('name', 'entity_type', 'domain', 'config')
     def __init__(self, name, entity_type, domain, config):
         self.name = name
         self.entity_type = entity_type
@@ -1977,6 +2214,7 @@ class DomainRelation(ASTNode):
             "result": "new_compound"
         }
     """
+    __slots__ = ('name', 'domain', 'config')
     def __init__(self, name, domain, config):
         self.name = name
         self.domain = domain
@@ -2008,6 +2246,7 @@ class DomainAction(ASTNode):
             "result": {"compound": "new", "energy": "released"}
         }
     """
+    __slots__ = ('name', 'domain', 'config')
     def __init__(self, name, domain, config):
         self.name = name
         self.domain = domain
@@ -2047,6 +2286,7 @@ class MetaphoricalMeaning(ASTNode):
             }
         }
     """
+    __slots__ = ('name', 'domain', 'config')
     def __init__(self, name, domain, config):
         self.name = name
         self.domain = domain
@@ -2076,6 +2316,7 @@ class DomainLaw(ASTNode):
             "exceptions": []
         }
     """
+    __slots__ = ('name', 'domain', 'config')
     def __init__(self, name, domain, config):
         self.name = name
         self.domain = domain
@@ -2105,6 +2346,7 @@ class ExistentialQuery(ASTNode):
             "conditions": {"reacts_with": "water", "activity": "high"}
         }
     """
+    __slots__ = ('config',)
     def __init__(self, config):
         self.config = config  # Dict node with query configuration
 
@@ -2118,6 +2360,7 @@ class AssertStatement(ASTNode):
     """Assert statement: assert condition, message
     تأكد الشرط، الرسالة
     """
+    __slots__ = ('condition', 'message')
     def __init__(self, condition, message=None):
         self.condition = condition
         self.message = message
@@ -2130,6 +2373,7 @@ class OptionalChain(ASTNode):
     """Optional chaining: obj?.attr or obj?.method()
     الوصول الاختياري
     """
+    __slots__ = ('object_expr', 'attribute_name')
     def __init__(self, object_expr, attribute_name):
         self.object_expr = object_expr
         self.attribute_name = attribute_name
@@ -2142,6 +2386,7 @@ class NullishCoalescing(ASTNode):
     """Nullish coalescing: value ?? default
     القيمة الافتراضية عند None
     """
+    __slots__ = ('left', 'right')
     def __init__(self, left, right):
         self.left = left
         self.right = right
@@ -2154,6 +2399,7 @@ class WalrusAssignment(ASTNode):
     """Walrus operator / Assignment expression: (x := value)
     تعبير الإسناد
     """
+    __slots__ = ('name', 'value')
     def __init__(self, name, value):
         self.name = name
         self.value = value
@@ -2166,6 +2412,7 @@ class SpreadOperator(ASTNode):
     """Spread operator: *list or **dict
     عامل النشر
     """
+    __slots__ = ('expression', 'is_dict')
     def __init__(self, expression, is_dict=False):
         self.expression = expression
         self.is_dict = is_dict  # True for **, False for *
@@ -2179,6 +2426,7 @@ class ChainedComparison(ASTNode):
     """Chained comparison: 1 < x < 10
     مقارنة متسلسلة
     """
+    __slots__ = ('operands', 'operators')
     def __init__(self, operands, operators):
         self.operands = operands  # [1, x, 10]
         self.operators = operators  # ['<', '<']
@@ -2191,6 +2439,7 @@ class NamedTupleType(ASTNode):
     """Named tuple type definition
     تعريف صف مسمى
     """
+    __slots__ = ('name', 'fields')
     def __init__(self, name, fields):
         self.name = name
         self.fields = fields  # [(field_name, type), ...]
@@ -2203,6 +2452,7 @@ class AbstractMethod(ASTNode):
     """Abstract method declaration (no body)
     دالة مجردة
     """
+    __slots__ = ('name', 'parameters', 'return_type')
     def __init__(self, name, parameters, return_type=None):
         self.name = name
         self.parameters = parameters
@@ -2216,6 +2466,7 @@ class TupleUnpacking(ASTNode):
     """Tuple/List unpacking: a, b, c = iterable
     تفكيك الصف/القائمة
     """
+    __slots__ = ('targets', 'value')
     def __init__(self, targets, value):
         self.targets = targets  # List of variable names
         self.value = value  # The iterable expression
@@ -2228,6 +2479,7 @@ class MatchStatement(ASTNode):
     """Match/Case statement (Pattern Matching)
     عبارة المطابقة
     """
+    __slots__ = ('subject', 'cases')
     def __init__(self, subject, cases):
         self.subject = subject  # Expression to match
         self.cases = cases  # List of (pattern, guard, body) tuples
@@ -2240,6 +2492,7 @@ class MatchCase(ASTNode):
     """A single case in a match statement
     حالة في عبارة المطابقة
     """
+    __slots__ = ('pattern', 'body', 'guard')
     def __init__(self, pattern, body, guard=None):
         self.pattern = pattern  # Pattern to match
         self.body = body  # Body to execute if matched
@@ -2253,6 +2506,7 @@ class EnumDef(ASTNode):
     """Enum definition
     تعريف التعداد
     """
+    __slots__ = ('name', 'members')
     def __init__(self, name, members):
         self.name = name  # Enum name
         self.members = members  # List of (name, value) tuples
@@ -2265,6 +2519,7 @@ class NamedTupleDef(ASTNode):
     """Named tuple definition
     تعريف الصف المسمى
     """
+    __slots__ = ('name', 'fields')
     def __init__(self, name, fields):
         self.name = name  # Tuple type name
         self.fields = fields  # List of field names or (name, type) tuples
@@ -2277,6 +2532,7 @@ class SliceExpression(ASTNode):
     """Slice expression: [start:stop:step]
     تعبير الشريحة
     """
+    __slots__ = ('start', 'stop', 'step')
     def __init__(self, start, stop, step=None):
         self.start = start
         self.stop = stop
@@ -2290,6 +2546,7 @@ class StarExpression(ASTNode):
     """Star expression for unpacking: *args, **kwargs
     تعبير النجمة للتفكيك
     """
+    __slots__ = ('expression', 'is_double')
     def __init__(self, expression, is_double=False):
         self.expression = expression
         self.is_double = is_double  # True for **kwargs
@@ -2303,6 +2560,7 @@ class GlobalStatement(ASTNode):
     """Global variable declaration: global x, y, z
     إعلان متغير عام
     """
+    __slots__ = ('names',)
     def __init__(self, names):
         self.names = names  # List of variable names
 
@@ -2314,6 +2572,7 @@ class NonlocalStatement(ASTNode):
     """Nonlocal variable declaration: nonlocal x, y
     إعلان متغير غير محلي
     """
+    __slots__ = ('names',)
     def __init__(self, names):
         self.names = names  # List of variable names
 
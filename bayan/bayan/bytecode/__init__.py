@@ -16,7 +16,7 @@ Components:
 - vm.py: Virtual machine
 - codegen.py: AST to bytecode compiler
 - optimizer.py: Bytecode optimizer
-- serializer.py: .byc file format
+- serializer.py: Serialized ASTs and code objects (.bayanc files)
 
 Author: Bayan Development Team
 """
@@ -4,7 +4,11 @@ Code Generator - AST to Bytecode Compiler
 
 Compiles Bayan AST nodes to bytecode instructions.
 
-This is a Proof of Concept focusing on simple expressions and arithmetic.
+generate() compiles a whole program and refuses anything it cannot
+express.  compile_function() compiles one function body for a host
+interpreter: nodes without a code generator are kept as EVAL_NODE
+instructions that the host evaluates in the function's own scope, so a
+function only stays on the tree walker when its body cannot run that way.
 """
 
 from ..ast_nodes import *
@@ -24,12 +28,35 @@ class CodeGenerator:
     - Print statements
     """
     
-    def __init__(self):
-        """Initialize code generator"""
+    # Statements that leave no value on the stack in function bodies
+    _NO_VALUE_STATEMENTS = (
+        IfStatement, WhileLoop, ForLoop, ReturnStatement,
+        BreakStatement, ContinueStatement,
+    )
+    # Statements that leave no value on the stack in programs either
+    _PROGRAM_NO_VALUE_STATEMENTS = _NO_VALUE_STATEMENTS + (
+        Assignment, PrintStatement, LogicalFact, LogicalRule,
+    )
+
+    def __init__(self, host_calls=None):
+        """Initialize code generator
+
+        Args:
+            host_calls: Function names the host interpreter implements
+                itself (builtins). When given, calls compile to CALL_NAMED
+                and are resolved by the host at run time.
+        """
         self.instructions = []
         self.constants = []
         self.names = []
         self.optimizer = BytecodeOptimizer()
+        self.host_calls = host_calls
+        # True while compiling a function body (see compile_function)
+        self._function_mode = False
+        # (continue target, break jumps, values to pop on break) per open loop
+        self._loops = []
+        # AST nodes being compiled, outermost first (see Instruction.nodes)
+        self._node_path = []
     
     def generate(self, ast, optimize=True):
         """
@@ -64,6 +91,45 @@ class CodeGenerator:
             code = self.optimizer.optimize(code)
             
         return code
+
+    def compile_function(self, func_def):
+        """
+        Compile a function body for BytecodeVM.run_function.
+
+        Parameters are bound by the host interpreter, so only the body is
+        compiled, then optimized.
+
+        Args:
+            func_def: FunctionDef node
+
+        Returns:
+            CodeObject: Compiled body, named after the function
+
+        Raises:
+            NotImplementedError: The body must run on the tree walker
+                (generators, global/nonlocal declarations, loop invariants,
+                or break/continue inside a node the host evaluates)
+        """
+        for node in iter_nodes(func_def.body):
+            if isinstance(node, (YieldExpr, GlobalStatement, NonlocalStatement)):
+                raise NotImplementedError(f"{type(node).__name__} needs the tree walker")
+
+        self.instructions = []
+        self.constants = []
+        self.names = []
+        self._loops = []
+        self._function_mode = True
+        try:
+            self._visit(func_def.body)
+        finally:
+            self._function_mode = False
+
+        return self.optimizer.optimize(CodeObject(
+            name=func_def.name,
+            instructions=self.instructions,
+            constants=self.constants,
+            names=self.names
+        ))
     
     def _visit(self, node):
         """Visit an AST node and generate code"""
@@ -73,23 +139,55 @@ class CodeGenerator:
         node_type = type(node).__name__
         method_name = f'_visit_{node_type}'
         
-        if hasattr(self, method_name):
-            getattr(self, method_name)(node)
-        else:
-            raise NotImplementedError(f"Code generation for {node_type} not implemented")
+        self._node_path.append(node)
+        try:
+            if hasattr(self, method_name):
+                getattr(self, method_name)(node)
+            elif self._function_mode:
+                self._visit_host(node)
+            else:
+                raise NotImplementedError(f"Code generation for {node_type} not implemented")
+        finally:
+            self._node_path.pop()
+
+    def _visit_host(self, node):
+        """Leave node to the host interpreter (function bodies only)"""
+        for inner in iter_nodes(node):
+            if isinstance(inner, (BreakStatement, ContinueStatement)):
+                # The host would raise its loop exceptions through the VM
+                raise NotImplementedError(f"{type(node).__name__} contains break/continue")
+        idx = self._add_constant(node)
+        instr = self._emit(Opcode.EVAL_NODE, idx, node)
+        # The host records node itself when it evaluates it
+        instr.nodes = instr.nodes[:-1]
+
+    def _statement(self, node):
+        """Compile a statement; in function bodies its value becomes the
+        frame result, like the tree walker's value of the last statement"""
+        self._visit(node)
+        if self._function_mode:
+            if not isinstance(node, self._NO_VALUE_STATEMENTS):
+                self._emit(Opcode.POP_RESULT, node=node)
+        elif self._loops and not isinstance(node, self._PROGRAM_NO_VALUE_STATEMENTS):
+            # A loop body runs many times; its values would pile up under
+            # the loop's iterator
+            self._emit(Opcode.POP, node=node)
     
     def _emit(self, opcode, arg=None, node=None):
         """Emit an instruction"""
         line_number = getattr(node, 'line', None) if node else None
-        instr = Instruction(opcode, arg, line_number=line_number)
+        instr = Instruction(opcode, arg, line_number=line_number, nodes=tuple(self._node_path))
         self.instructions.append(instr)
         return instr
     
     def _add_constant(self, value):
         """Add constant to pool and return index"""
-        if value not in self.constants:
-            self.constants.append(value)
-        return self.constants.index(value)
+        # Compare types too, so 1 and True (or 1 and 1.0) stay distinct
+        for idx, constant in enumerate(self.constants):
+            if type(constant) is type(value) and constant == value:
+                return idx
+        self.constants.append(value)
+        return len(self.constants) - 1
     
     def _add_name(self, name):
         """Add name to names list and return index"""
@@ -102,12 +200,12 @@ class CodeGenerator:
     def _visit_Program(self, node):
         """Compile program"""
         for stmt in node.statements:
-            self._visit(stmt)
+            self._statement(stmt)
 
     def _visit_Block(self, node):
         """Compile block"""
         for stmt in node.statements:
-            self._visit(stmt)
+            self._statement(stmt)
     
     def _visit_Literal(self, node):
         """Compile literal value"""
@@ -118,6 +216,10 @@ class CodeGenerator:
         self._emit(Opcode.LOAD_CONST, idx, node)
 
     def _visit_Number(self, node):
+        if self._function_mode and isinstance(node.value, str):
+            # The host converts numeric text
+            self._visit_host(node)
+            return
         idx = self._add_constant(node.value)
         self._emit(Opcode.LOAD_CONST, idx, node)
 
@@ -128,6 +230,10 @@ class CodeGenerator:
     def _visit_Boolean(self, node):
         idx = self._add_constant(node.value)
         self._emit(Opcode.LOAD_CONST, idx, node)
+
+    def _visit_NoneLiteral(self, node):
+        idx = self._add_constant(None)
+        self._emit(Opcode.LOAD_CONST, idx, node)
     
     def _visit_Identifier(self, node):
         """Compile variable load"""
@@ -137,8 +243,61 @@ class CodeGenerator:
         self._emit(Opcode.LOAD_VAR, idx, node)
 
     def _visit_Variable(self, node):
+        if self._function_mode and '.' in node.name:
+            # Dotted names have their own lookup rules in the host
+            self._visit_host(node)
+            return
         idx = self._add_name(node.name)
         self._emit(Opcode.LOAD_VAR, idx, node)
+
+    def _visit_List(self, node):
+        """Compile a list literal (spreads are left to the host)"""
+        if any(isinstance(elem, SpreadOperator) for elem in node.elements):
+            self._visit_unsupported(node)
+            return
+        for elem in node.elements:
+            self._visit(elem)
+        self._emit(Opcode.MAKE_LIST, len(node.elements), node)
+
+    def _visit_Tuple(self, node):
+        for elem in node.elements:
+            self._visit(elem)
+        self._emit(Opcode.MAKE_TUPLE, len(node.elements), node)
+
+    def _visit_SelfReference(self, node):
+        idx = self._add_name('self')
+        self._emit(Opcode.LOAD_VAR, idx, node)
+
+    def _visit_AttributeAccess(self, node):
+        """Compile obj.attr"""
+        self._visit(node.object_expr)
+        idx = self._add_name(node.attribute_name)
+        self._emit(Opcode.LOAD_ATTR, idx, node)
+
+    def _visit_AttributeAssignment(self, node):
+        """Compile obj.attr = value (leaves the value on the stack)"""
+        self._visit(node.object_expr)
+        self._visit(node.value)
+        idx = self._add_name(node.attribute_name)
+        self._emit(Opcode.STORE_ATTR, idx, node)
+
+    def _visit_MethodCall(self, node):
+        """Compile obj.method(args)"""
+        if getattr(node, 'named_arguments', None) or any(
+                isinstance(arg, SpreadOperator) for arg in node.arguments):
+            self._visit_unsupported(node)
+            return
+        self._visit(node.object_expr)
+        for arg in node.arguments:
+            self._visit(arg)
+        self._emit(Opcode.CALL_METHOD, (node.method_name, len(node.arguments)), node)
+
+    def _visit_unsupported(self, node):
+        """Host-evaluate node in function bodies, refuse it in programs"""
+        if self._function_mode:
+            self._visit_host(node)
+        else:
+            raise NotImplementedError(f"Code generation for {type(node).__name__} not implemented")
     
     def _visit_BinaryOp(self, node):
         """Compile binary operation"""
@@ -147,6 +306,11 @@ class CodeGenerator:
         
         # Compile right operand
         self._visit(node.right)
+
+        if self._function_mode or self.host_calls is not None:
+            # Host operator semantics (dunder methods on Bayan objects)
+            self._emit(Opcode.BINARY_OP, node.operator, node)
+            return
         
         # Emit operation
         op_map = {
@@ -181,6 +345,10 @@ class CodeGenerator:
         
         op = getattr(node, 'op', getattr(node, 'operator', None))
 
+        if self._function_mode or self.host_calls is not None:
+            self._emit(Opcode.UNARY_OP, op, node)
+            return
+
         if op == '-':
             self._emit(Opcode.NEG, node=node)
         elif op == 'not':
@@ -190,17 +358,29 @@ class CodeGenerator:
     
     def _visit_Assignment(self, node):
         """Compile assignment"""
+        # Target could be a string or a Variable node
+        target_name = node.name if hasattr(node, 'name') else node.target
+        if not isinstance(target_name, str) or '.' in target_name:
+            self._visit_unsupported(node)
+            return
+
         # Compile value expression
         self._visit(node.value)
-        
+
+        if self._function_mode:
+            # An assignment's value is the statement's value
+            self._emit(Opcode.DUP, node=node)
+
         # Store to variable
-        # Target could be a string or a Variable node
-        target_name = node.name if hasattr(node, 'name') else node.target
         idx = self._add_name(target_name)
         self._emit(Opcode.STORE_VAR, idx, node)
     
     def _visit_FunctionCall(self, node):
         """Compile function call"""
+        if self.host_calls is not None or self._function_mode:
+            self._visit_host_call(node)
+            return
+
         # Push arguments
         for arg in node.arguments:
             self._visit(arg)
@@ -225,9 +405,76 @@ class CodeGenerator:
         # Emit CALL
         self._emit(Opcode.CALL_FUNC, len(node.arguments), node)
 
+    def _visit_host_call(self, node):
+        """Compile a call resolved by the host interpreter at run time"""
+        arguments = node.arguments
+        logical_vars = [
+            arg.name[1:] if isinstance(arg, Variable) and arg.name.startswith('?') else None
+            for arg in arguments
+        ]
+        if any(logical_vars):
+            # name(?X, ...) is a query on the logical engine
+            for arg, var in zip(arguments, logical_vars):
+                if var is None:
+                    self._visit(arg)
+            self._emit(Opcode.CALL_PREDICATE, (node.name, tuple(logical_vars)), node)
+            return
+
+        if (not isinstance(node.name, str) or node.name in (self.host_calls or ())
+                or getattr(node, 'named_arguments', None)
+                or any(isinstance(arg, SpreadOperator) for arg in arguments)):
+            # Builtins evaluate their own arguments
+            self._visit_unsupported(node)
+            return
+
+        for arg in arguments:
+            self._visit(arg)
+        self._emit(Opcode.CALL_NAMED, (node.name, len(arguments)), node)
+
+    def _visit_ReturnStatement(self, node):
+        """Compile return (function bodies only)"""
+        if not self._function_mode:
+            raise NotImplementedError("return outside a function body")
+        if node.value is not None:
+            self._visit(node.value)
+        else:
+            self._emit(Opcode.LOAD_CONST, self._add_constant(None), node)
+        self._emit(Opcode.RETURN, node=node)
+
+    def _visit_BreakStatement(self, node):
+        if not self._loops:
+            raise NotImplementedError("break outside a compiled loop")
+        _, breaks, pops = self._loops[-1]
+        for _ in range(pops):
+            self._emit(Opcode.POP, node=node)
+        breaks.append(self._emit(Opcode.JUMP, 0, node))
+
+    def _visit_ContinueStatement(self, node):
+        if not self._loops:
+            raise NotImplementedError("continue outside a compiled loop")
+        start, _, _ = self._loops[-1]
+        self._emit(Opcode.JUMP, start, node)
+
+    def _check_invariants(self, node):
+        if node.invariants:
+            raise NotImplementedError("Loop invariants are checked by the tree walker")
+
+    def _reset_result(self, node):
+        """A loop's value is its last body value, None if it never runs"""
+        if self._function_mode:
+            self._emit(Opcode.LOAD_CONST, self._add_constant(None), node)
+            self._emit(Opcode.POP_RESULT, node=node)
+
     def _visit_PrintStatement(self, node):
+        if isinstance(node.value, list):
+            # print(a, b, ...) joins its values
+            self._visit_unsupported(node)
+            return
         self._visit(node.value)
         self._emit(Opcode.PRINT, node=node)
+        if self._function_mode:
+            # A print statement's value is None
+            self._emit(Opcode.LOAD_CONST, self._add_constant(None), node)
 
     def _visit_ExpressionStatement(self, node):
         """Compile expression statement"""
@@ -255,6 +502,10 @@ class CodeGenerator:
         else_start_index = len(self.instructions)
         if node.else_branch:
             self._visit(node.else_branch)
+        elif self._function_mode:
+            # An if without a taken branch has the value None
+            self._emit(Opcode.LOAD_CONST, self._add_constant(None), node)
+            self._emit(Opcode.POP_RESULT, node=node)
         
         end_index = len(self.instructions)
         
@@ -277,6 +528,8 @@ class CodeGenerator:
 
     def _visit_WhileLoop(self, node):
         """Compile While loop"""
+        self._check_invariants(node)
+        self._reset_result(node)
         start_index = len(self.instructions)
         
         # Condition
@@ -286,50 +539,49 @@ class CodeGenerator:
         jump_end_instr = self._emit(Opcode.JUMP_IF_FALSE, 0, node)
         
         # Body
+        breaks = []
+        self._loops.append((start_index, breaks, 0))
         self._visit(node.body)
+        self._loops.pop()
         
         # Jump back to Start
         self._emit(Opcode.JUMP, start_index, node)
         
         end_index = len(self.instructions)
         jump_end_instr.arg = end_index
+        for jump in breaks:
+            jump.arg = end_index
 
     def _visit_ForLoop(self, node):
-        """Compile For loop (simple range support)"""
-        # This is complex without proper iterator protocol support in VM.
-        # For PoC, we can support "for i in range(N)" specifically.
-        
-        # 1. Evaluate iterable
+        """Compile For loop over any iterable, with tuple unpacking"""
+        self._check_invariants(node)
+        self._reset_result(node)
+        variables = node.variable if isinstance(node.variable, list) else [node.variable]
+        if not all(isinstance(name, str) for name in variables):
+            self._visit_unsupported(node)
+            return
+
+        # iterable; GET_ITER; start: FOR_ITER end; store; body; JUMP start
         self._visit(node.iterable)
-        
-        # 2. Get Iterator (GET_ITER opcode needed? Or assume iterable is iterator?)
-        # Let's assume we have a GET_ITER opcode or similar, or just implement range logic manually.
-        # Since we don't have GET_ITER in opcodes.py yet, let's add a simple list iteration support if possible.
-        # Or just skip for now and focus on While/If.
-        # But the plan said "Implement _visit_ForLoop".
-        
-        # Let's assume the iterable is a list/range on stack.
-        # We need an index variable.
-        # This is getting complicated for a simple VM without hidden registers.
-        # We'll implement a simplified version:
-        #   iterable
-        #   GET_ITER (we need to add this opcode or simulate it)
-        #   LOOP_START:
-        #   FOR_ITER exit_label (pushes next value or jumps)
-        #   STORE var
-        #   ... body ...
-        #   JUMP LOOP_START
-        #   exit_label:
-        
-        # Since we don't have FOR_ITER/GET_ITER in opcodes.py (checked previous file view),
-        # we should stick to While loops for the demo or add them.
-        # Opcodes file showed: LOOP_START, LOOP_END, BREAK, CONTINUE.
-        # But no FOR_ITER.
-        # We can simulate for-range with while if we want, but that's AST transformation.
-        
-        # Let's emit a "NotImplemented" warning or try to support it if we add opcodes.
-        # I'll add GET_ITER and FOR_ITER to opcodes.py next.
-        pass
+        self._emit(Opcode.GET_ITER, node=node)
+        start_index = len(self.instructions)
+        for_iter = self._emit(Opcode.FOR_ITER, 0, node)
+        if isinstance(node.variable, list):
+            self._emit(Opcode.UNPACK_SEQ, len(variables), node)
+        for name in variables:
+            self._emit(Opcode.STORE_VAR, self._add_name(name), node)
+
+        # A break also drops the iterator
+        breaks = []
+        self._loops.append((start_index, breaks, 1))
+        self._visit(node.body)
+        self._loops.pop()
+        self._emit(Opcode.JUMP, start_index, node)
+
+        end_index = len(self.instructions)
+        for_iter.arg = end_index
+        for jump in breaks:
+            jump.arg = end_index
 
     # ===== Logic Programming Support =====
 
@@ -386,6 +638,9 @@ def compile_to_bytecode(ast, optimize=True):
     """
     Convenience function to compile AST to bytecode.
     
+    The debugger steps through the result, so only the optimizer passes
+    that keep each statement's own instructions run.
+
     Args:
         ast: AST node or list
         optimize: Whether to apply optimization
@@ -394,4 +649,5 @@ def compile_to_bytecode(ast, optimize=True):
         CodeObject: Compiled bytecode
     """
     generator = CodeGenerator()
+    generator.optimizer = BytecodeOptimizer(BytecodeOptimizer.DEBUG_PASSES)
     return generator.generate(ast, optimize=optimize)
@@ -16,11 +16,13 @@ class Instruction:
         opcode (Opcode): The operation code
         arg: The argument (None if opcode takes no argument)
         offset (int): Position in bytecode sequence
+        nodes (tuple): AST nodes the instruction was generated under,
+            outermost first (for Bayan stack traces)
     """
     
-    __slots__ = ('opcode', 'arg', 'offset', 'line_number')
+    __slots__ = ('opcode', 'arg', 'offset', 'line_number', 'nodes')
     
-    def __init__(self, opcode, arg=None, offset=0, line_number=None):
+    def __init__(self, opcode, arg=None, offset=0, line_number=None, nodes=()):
         """
         Initialize instruction.
         
@@ -29,6 +31,7 @@ class Instruction:
             arg: Argument value (int, str, or None)
             offset (int): Byte offset in code
             line_number (int): Source line number
+            nodes (tuple): Enclosing AST nodes, outermost first
         """
         if isinstance(opcode, int):
             self.opcode = Opcode(opcode)
@@ -38,6 +41,7 @@ class Instruction:
         self.arg = arg
         self.offset = offset
         self.line_number = line_number
+        self.nodes = nodes
     
     def __repr__(self):
         if self.arg is not None:
@@ -148,6 +152,9 @@ class CodeObject:
         self.instructions = instructions
         self.constants = constants or []
         self.names = names or []
+        # (handler, arg) arrays built by BytecodeVM on first run, keyed
+        # by whether the code runs on a fast-locals frame
+        self.decoded = {}
         
         # Calculate offsets
         offset = 0
@@ -171,5 +178,28 @@ class CodeObject:
         return "\n".join(lines)
     
     def encode(self):
-        """Encode entire code object to bytes"""
-        return b''.join(instr.encode() for instr in self.instructions)
+        """
+        Encode the code object, with its constants and names, to bytes.
+
+        Returns:
+            bytes: Data for CodeObject.decode (see serializer)
+        """
+        from .serializer import dumps
+        return dumps(self)
+
+    @staticmethod
+    def decode(data):
+        """
+        Rebuild a code object from CodeObject.encode output.
+
+        Args:
+            data (bytes): Encoded code object
+
+        Returns:
+            CodeObject: The decoded code object
+        """
+        from .serializer import loads
+        code = loads(data)
+        if not isinstance(code, CodeObject):
+            raise ValueError("Data does not hold a code object")
+        return code
@@ -25,6 +25,8 @@ class Opcode(IntEnum):
     STORE_ATTR = 0x05   # Store to attribute: arg=attr_name
     POP = 0x06          # Pop top of stack
     DUP = 0x07          # Duplicate TOS
+    POP_RESULT = 0x08   # Pop TOS into the frame's result (a body's implicit value)
+    COPY = 0x09         # Push the k-th stack item, TOS being 1: arg=k
     
     # ===== Arithmetic Operations (0x10 - 0x1F) =====
     ADD = 0x10          # TOS = TOS1 + TOS
@@ -38,6 +40,8 @@ class Opcode(IntEnum):
     NOT = 0x18          # TOS = not TOS
     AND = 0x19          # TOS = TOS1 and TOS
     OR = 0x1A           # TOS = TOS1 or TOS
+    BINARY_OP = 0x1B    # TOS = TOS1 <op> TOS with host semantics: arg=operator
+    UNARY_OP = 0x1C     # TOS = <op> TOS with host semantics: arg=operator
     
     # ===== Comparison Operations (0x20 - 0x2F) =====
     EQ = 0x20           # TOS = (TOS1 == TOS)
@@ -58,6 +62,8 @@ class Opcode(IntEnum):
     LOOP_END = 0x35     # Mark loop end
     BREAK = 0x36        # Break from loop
     CONTINUE = 0x37     # Continue loop
+    GET_ITER = 0x38     # TOS = iter(TOS)
+    FOR_ITER = 0x39     # Push next(TOS), or pop TOS and jump when exhausted: arg=target
     
     # ===== Function Operations (0x40 - 0x4F) =====
     CALL_FUNC = 0x40    # Call function: arg=nargs
@@ -68,6 +74,7 @@ class Opcode(IntEnum):
     MAKE_CLASS = 0x45   # Create class: arg=class_name
     LOAD_GLOBAL = 0x46  # Load global variable: arg=var_name
     STORE_GLOBAL = 0x47 # Store global variable: arg=var_name
+    CALL_NAMED = 0x48   # Call a host function/class by name: arg=(name, nargs)
     
     # ===== Data Structures (0x50 - 0x5F) =====
     MAKE_LIST = 0x50    # Create list from top N items: arg=count
@@ -87,6 +94,7 @@ class Opcode(IntEnum):
     CUT = 0x65          # Prolog cut operation
     MAKE_RULE = 0x66    # Create rule: arg=code_index
     CHECK_CONDITION = 0x67  # Check rule condition
+    CALL_PREDICATE = 0x68   # Query name(args) on the logical engine: arg=(name, logical vars)
     
     # ===== Special (0x70 - 0x7F) =====
     PRINT = 0x70        # Print TOS (for debugging)
@@ -94,6 +102,7 @@ class Opcode(IntEnum):
     BUILD_SLICE = 0x72  # Build slice object from TOS2:TOS1:TOS
     UNPACK_SEQ = 0x73   # Unpack sequence: arg=count
     BUILD_STRING = 0x74 # Build formatted string
+    EVAL_NODE = 0x75    # Evaluate an AST node on the host interpreter: arg=const_index
     
     # Sentinel
     MAX_OPCODE = 0x7F
@@ -108,16 +117,22 @@ OPCODES_WITH_ARGS = {
     Opcode.LOAD_CONST,
     Opcode.LOAD_VAR,
     Opcode.STORE_VAR,
+    Opcode.COPY,
     Opcode.LOAD_ATTR,
     Opcode.STORE_ATTR,
     Opcode.JUMP,
     Opcode.JUMP_IF_TRUE,
     Opcode.JUMP_IF_FALSE,
     Opcode.JUMP_IF_NONE,
+    Opcode.FOR_ITER,
+    Opcode.BINARY_OP,
+    Opcode.UNARY_OP,
     Opcode.CALL_FUNC,
     Opcode.MAKE_FUNC,
     Opcode.LOAD_FUNC,
     Opcode.CALL_METHOD,
+    Opcode.CALL_NAMED,
+    Opcode.CALL_PREDICATE,
     Opcode.MAKE_CLASS,
     Opcode.LOAD_GLOBAL,
     Opcode.STORE_GLOBAL,
@@ -128,6 +143,7 @@ OPCODES_WITH_ARGS = {
     Opcode.MAKE_RULE,
     Opcode.IMPORT,
     Opcode.UNPACK_SEQ,
+    Opcode.EVAL_NODE,
 }
 
 
@@ -148,6 +164,7 @@ OPCODE_ARG_SIZE = {
     Opcode.JUMP_IF_TRUE: 2,
     Opcode.JUMP_IF_FALSE: 2,
     Opcode.JUMP_IF_NONE: 2,
+    Opcode.FOR_ITER: 2,
     # Most others: variable length (for now, assume 0 for simple PoC)
 }
 
@@ -4,48 +4,229 @@ Bytecode Optimizer
 
 Optimizes Bayan bytecode to improve runtime performance.
 
+The instructions are split into a control flow graph of basic blocks
+while the passes run: a jump refers to its target block rather than an
+index, so passes can delete and insert instructions freely, and the
+blocks are laid out again (with jump targets recomputed) at the end.
+
 Strategies:
-1. Constant Folding: Evaluate constant expressions at compile time.
-2. Peephole Optimization: Replace inefficient instruction sequences.
+1. Copy Propagation: Load the constant or variable a variable was just
+   assigned from, instead of the variable.
+2. Constant Folding: Evaluate constant expressions at compile time.
+3. Peephole Optimization: Replace inefficient instruction sequences.
+4. Dead Store Elimination: Drop stores overwritten before they can be read.
+5. Strength Reduction: x ** 2 -> x * x.
+6. Jump Threading: Jump straight to the end of jump chains, drop jumps to
+   the next block, branches on constants and unreachable blocks.
+7. Loop-Invariant Code Motion: Evaluate the invariant parts of a while
+   condition, and load the variables the loop never assigns, once before
+   the loop; the values stay on the stack (read back with COPY) and are
+   popped on every exit.
+
+Passes 1-6 run until nothing changes, then 7 runs once; stats holds the
+instruction count before and after each pass that ran.
+
+Operators are assumed not to rebind variables: passes 1, 4 and 7 see
+through BINARY_OP, whose operator methods could in principle assign
+module variables with global.
 """
 
+import operator
+
 from .opcodes import Opcode
 from .instruction import Instruction, CodeObject
 
 
+# Opcodes whose argument is an instruction index
+_JUMP_OPCODES = frozenset((
+    Opcode.JUMP, Opcode.JUMP_IF_TRUE, Opcode.JUMP_IF_FALSE,
+    Opcode.JUMP_IF_NONE, Opcode.FOR_ITER,
+))
+
+# Opcodes after which execution never continues with the next instruction
+_NO_FALL_THROUGH = frozenset((Opcode.JUMP, Opcode.RETURN))
+
+# The arithmetic and comparison opcodes, on plain Python values
+_PLAIN_OPERATORS = {
+    Opcode.ADD: operator.add,
+    Opcode.SUB: operator.sub,
+    Opcode.MUL: operator.mul,
+    Opcode.DIV: operator.truediv,
+    Opcode.FLOOR_DIV: operator.floordiv,
+    Opcode.MOD: operator.mod,
+    Opcode.POW: operator.pow,
+    Opcode.EQ: operator.eq,
+    Opcode.NE: operator.ne,
+    Opcode.LT: operator.lt,
+    Opcode.LE: operator.le,
+    Opcode.GT: operator.gt,
+    Opcode.GE: operator.ge,
+}
+
+# BINARY_OP operators the VM applies directly to values of _NATIVE_TYPES
+_NATIVE_OPERATORS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '%': operator.mod,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '>': operator.gt,
+    '<=': operator.le,
+    '>=': operator.ge,
+}
+_NATIVE_TYPES = frozenset((int, float, str, bool))
+
+# Folded strings and integers larger than this stay as expressions
+_FOLD_SIZE_LIMIT = 4096
+
+_UNARY_OPCODES = frozenset((Opcode.NEG, Opcode.NOT, Opcode.UNARY_OP))
+
+# Opcodes that run no Bayan code and touch no variable but their own
+# argument (operators excepted, see above)
+_PURE_OPCODES = frozenset((
+    Opcode.NOP, Opcode.LOAD_CONST, Opcode.LOAD_VAR, Opcode.STORE_VAR,
+    Opcode.POP, Opcode.DUP, Opcode.COPY, Opcode.MAKE_LIST, Opcode.MAKE_TUPLE,
+    Opcode.BINARY_OP, Opcode.JUMP, Opcode.JUMP_IF_TRUE, Opcode.JUMP_IF_FALSE,
+)) | frozenset(_PLAIN_OPERATORS) | _UNARY_OPCODES
+
+# Opcodes that cannot raise (LOAD_VAR can, when the variable is unbound)
+_SAFE_OPCODES = frozenset((
+    Opcode.NOP, Opcode.LOAD_CONST, Opcode.POP, Opcode.DUP, Opcode.COPY,
+))
+
+
+class _Block:
+    """
+    A basic block: instructions run in sequence, only the last one jumps.
+
+    While the optimizer runs, a jump's arg is its target _Block.
+    """
+
+    __slots__ = ('instructions',)
+
+    def __init__(self, instructions):
+        self.instructions = instructions
+
+    @property
+    def jump(self):
+        """The jump ending this block, or None"""
+        if self.instructions and self.instructions[-1].opcode in _JUMP_OPCODES:
+            return self.instructions[-1]
+        return None
+
+    @property
+    def falls_through(self):
+        """Whether execution can continue with the next block"""
+        return not self.instructions or self.instructions[-1].opcode not in _NO_FALL_THROUGH
+
+
 class BytecodeOptimizer:
     """
     Optimizes bytecode instructions.
+
+    Args:
+        passes (iterable): Names of the passes to run (default: PASSES)
     """
-    
-    def __init__(self):
+
+    # In order; copy propagation runs first so that peephole's
+    # STORE x, LOAD x -> DUP, STORE x does not hide the copy
+    PASSES = (
+        'copy_propagation', 'constant_folding', 'peephole',
+        'dead_store_elimination', 'strength_reduction', 'jump_threading',
+        'loop_invariant_code_motion',
+    )
+
+    # What optimize() did before the control flow graph: straight-line
+    # folding and peephole rewrites
+    LEGACY_PASSES = ('constant_folding', 'peephole')
+
+    # Passes that leave every statement its own instructions, for code a
+    # debugger steps through
+    DEBUG_PASSES = ('constant_folding', 'peephole', 'strength_reduction', 'jump_threading')
+
+    # Pass name -> method; block passes take (instructions, constants)
+    # and return the new instructions of one block, graph passes take
+    # (blocks, constants) and rewrite the graph in place
+    _BLOCK_PASSES = {
+        'constant_folding': '_fold_constants',
+        'peephole': '_peephole_optimize',
+        'copy_propagation': '_propagate_copies',
+        'dead_store_elimination': '_eliminate_dead_stores',
+        'strength_reduction': '_reduce_strength',
+    }
+    _GRAPH_PASSES = {
+        'jump_threading': '_thread_jumps',
+        'loop_invariant_code_motion': '_hoist_invariants',
+    }
+
+    def __init__(self, passes=None):
+        self.passes = tuple(self.PASSES if passes is None else passes)
+        unknown = set(self.passes) - set(self.PASSES)
+        if unknown:
+            raise ValueError(f"Unknown optimizer passes: {', '.join(sorted(unknown))}")
         self.changed = False
-    
+        # (pass name, instructions before, instructions after) per pass run
+        self.stats = []
+
     def optimize(self, code_object):
         """
         Optimize a CodeObject.
         Returns a new, optimized CodeObject.
         """
-        instructions = list(code_object.instructions)
+        self.stats = []
+        blocks = _build_blocks(code_object.instructions)
+        if blocks is None:
+            # Jump targets outside the code: leave it as it is
+            return code_object
+
         constants = list(code_object.constants)
         names = list(code_object.names)
-        
+        repeated = [name for name in self.passes if name != 'loop_invariant_code_motion']
+
         # Run optimization passes until no more changes
         max_passes = 5
         for _ in range(max_passes):
             self.changed = False
-            
-            # Pass 1: Constant Folding
-            instructions = self._fold_constants(instructions, constants)
-            
-            # Pass 2: Peephole Optimization
-            instructions = self._peephole_optimize(instructions)
-            
+            for name in repeated:
+                self._run_pass(name, blocks, constants)
             if not self.changed:
                 break
-        
-        return CodeObject(code_object.name, instructions, constants, names)
-    
+
+        if 'loop_invariant_code_motion' in self.passes:
+            self.changed = False
+            self._run_pass('loop_invariant_code_motion', blocks, constants)
+            if self.changed and 'jump_threading' in self.passes:
+                self._run_pass('jump_threading', blocks, constants)
+
+        return CodeObject(code_object.name, _layout(blocks), constants, names)
+
+    def report(self):
+        """
+        The stats of the last optimize() call: the total, then one line
+        per pass run that changed the instruction count
+        """
+        if not self.stats:
+            return ''
+        lines = [f"{'total':28s} {self.stats[0][1]:6d} -> {self.stats[-1][2]:6d}"]
+        lines.extend(f"{name:28s} {before:6d} -> {after:6d}"
+                     for name, before, after in self.stats if before != after)
+        return '\n'.join(lines)
+
+    def _run_pass(self, name, blocks, constants):
+        before = _count(blocks)
+        if name in self._GRAPH_PASSES:
+            getattr(self, self._GRAPH_PASSES[name])(blocks, constants)
+        else:
+            method = getattr(self, self._BLOCK_PASSES[name])
+            for block in blocks:
+                block.instructions = method(block.instructions, constants)
+        self.stats.append((name, before, _count(blocks)))
+
+    # ===== Block passes =====
+
     def _fold_constants(self, instructions, constants):
         """
         Fold constant expressions.
@@ -53,62 +234,47 @@ class BytecodeOptimizer:
         """
         new_instrs = []
         i = 0
-        
+
         while i < len(instructions):
-            # Check for pattern: LOAD_CONST a, LOAD_CONST b, BINARY_OP
+            # Check for pattern: LOAD_CONST a, LOAD_CONST b, <operator>
             if i + 2 < len(instructions):
                 instr1 = instructions[i]
                 instr2 = instructions[i+1]
                 instr3 = instructions[i+2]
-                
-                if (instr1.opcode == Opcode.LOAD_CONST and
-                    instr2.opcode == Opcode.LOAD_CONST and
-                    instr3.opcode in (Opcode.ADD, Opcode.SUB, Opcode.MUL, Opcode.DIV, Opcode.POW)):
-                    
+
+                if instr1.opcode == Opcode.LOAD_CONST and instr2.opcode == Opcode.LOAD_CONST:
                     # Found pattern! Calculate result
                     val1 = constants[instr1.arg]
                     val2 = constants[instr2.arg]
-                    
+                    function = _PLAIN_OPERATORS.get(instr3.opcode)
+                    if (instr3.opcode == Opcode.BINARY_OP and type(val1) in _NATIVE_TYPES
+                            and type(val2) in _NATIVE_TYPES):
+                        # What the VM does for plain values
+                        function = _NATIVE_OPERATORS.get(instr3.arg)
+
                     try:
-                        result = None
-                        if instr3.opcode == Opcode.ADD:
-                            result = val1 + val2
-                        elif instr3.opcode == Opcode.SUB:
-                            result = val1 - val2
-                        elif instr3.opcode == Opcode.MUL:
-                            result = val1 * val2
-                        elif instr3.opcode == Opcode.DIV:
-                            result = val1 / val2
-                        elif instr3.opcode == Opcode.POW:
-                            result = val1 ** val2
-                        
-                        if result is not None:
-                            # Add new constant
-                            if result in constants:
-                                const_idx = constants.index(result)
-                            else:
-                                constants.append(result)
-                                const_idx = len(constants) - 1
-                            
-                            # Emit single LOAD_CONST
-                            new_instrs.append(Instruction(Opcode.LOAD_CONST, const_idx))
-                            
-                            # Skip consumed instructions
-                            i += 3
-                            self.changed = True
-                            continue
-                            
+                        result = function(val1, val2) if function is not None else None
                     except Exception:
                         # If calculation fails (e.g. div by zero), skip optimization
-                        pass
-            
+                        result = None
+
+                    if result is not None and _small_enough(result):
+                        # Emit single LOAD_CONST
+                        new_instrs.append(_like(instr3, Opcode.LOAD_CONST,
+                                                _constant_index(constants, result)))
+
+                        # Skip consumed instructions
+                        i += 3
+                        self.changed = True
+                        continue
+
             # No optimization applied, keep instruction
             new_instrs.append(instructions[i])
             i += 1
-            
+
         return new_instrs
 
-    def _peephole_optimize(self, instructions):
+    def _peephole_optimize(self, instructions, constants=None):
         """
         Apply peephole optimizations.
         Example: LOAD_CONST x, POP -> NOP (removed)
@@ -136,10 +302,12 @@ class BytecodeOptimizer:
                     self.changed = True
                     continue
 
-            # Pattern 3: Double negation NOT NOT -> Remove both
-            if instr.opcode == Opcode.NOT and i + 1 < len(instructions):
+            # Pattern 3: Double negation NOT NOT before a branch -> Remove
+            # both (elsewhere the value itself is used, not its truth)
+            if instr.opcode == Opcode.NOT and i + 2 < len(instructions):
                 next_instr = instructions[i+1]
-                if next_instr.opcode == Opcode.NOT:
+                if (next_instr.opcode == Opcode.NOT and instructions[i+2].opcode
+                        in (Opcode.JUMP_IF_TRUE, Opcode.JUMP_IF_FALSE)):
                     i += 2
                     self.changed = True
                     continue
@@ -149,53 +317,496 @@ class BytecodeOptimizer:
                 next_instr = instructions[i+1]
                 if next_instr.opcode == Opcode.LOAD_VAR and next_instr.arg == instr.arg:
                     # Replace with DUP + STORE_NAME
-                    new_instrs.append(Instruction(Opcode.DUP, None))
+                    new_instrs.append(_like(instr, Opcode.DUP))
                     new_instrs.append(instr)
                     i += 2
                     self.changed = True
                     continue
 
-            # Pattern 5: Multiply by 1 -> Remove
-            if i + 2 < len(instructions):
-                if (instr.opcode == Opcode.LOAD_CONST and
-                    instructions[i+1].opcode == Opcode.MUL):
-                    # Check if constant is 1
-                    pass  # Would need access to constants
+            # Pattern 5: DUP + POP -> Remove both
+            if instr.opcode == Opcode.DUP and i + 1 < len(instructions):
+                if instructions[i+1].opcode == Opcode.POP:
+                    i += 2
+                    self.changed = True
+                    continue
 
             new_instrs.append(instr)
             i += 1
 
         return new_instrs
 
-    def _dead_code_elimination(self, instructions):
+    def _propagate_copies(self, instructions, constants):
         """
-        Remove unreachable code after unconditional jumps.
+        Replace loads of a variable assigned earlier in the block from a
+        constant or another variable with a load of that source.
+        Example: LOAD_CONST 5, STORE_VAR x, LOAD_VAR x -> ..., LOAD_CONST 5
         """
+        # Variable -> the LOAD_CONST / LOAD_VAR its value came from
+        copies = {}
         new_instrs = []
-        i = 0
+        for instr in instructions:
+            if instr.opcode == Opcode.LOAD_VAR and instr.arg in copies:
+                source = copies[instr.arg]
+                instr = _like(instr, source.opcode, source.arg)
+                self.changed = True
+            elif instr.opcode == Opcode.STORE_VAR:
+                name = instr.arg
+                copies.pop(name, None)
+                for other in [other for other, source in copies.items()
+                              if source.opcode == Opcode.LOAD_VAR and source.arg == name]:
+                    del copies[other]
+                source = new_instrs[-1] if new_instrs else None
+                if source is not None and (source.opcode == Opcode.LOAD_CONST or (
+                        source.opcode == Opcode.LOAD_VAR and source.arg != name)):
+                    copies[name] = source
+            elif instr.opcode not in _PURE_OPCODES:
+                # Calls and host nodes can assign any variable
+                copies.clear()
+            new_instrs.append(instr)
+        return new_instrs
 
+    def _eliminate_dead_stores(self, instructions, constants):
+        """
+        Turn a store into POP when the block stores the same variable
+        again before anything can read it or raise.
+        Example: LOAD_CONST 5, STORE_VAR x, LOAD_CONST 6, STORE_VAR x
+              -> LOAD_CONST 5, POP, LOAD_CONST 6, STORE_VAR x
+        """
+        new_instrs = list(instructions)
+        # Variables stored so far in the block: loading them cannot fail
+        bound = set()
+        for i, instr in enumerate(new_instrs):
+            if instr.opcode != Opcode.STORE_VAR:
+                continue
+            bound.add(instr.arg)
+            later_bound = set(bound)
+            for later in new_instrs[i + 1:]:
+                if later.opcode == Opcode.STORE_VAR:
+                    if later.arg == instr.arg:
+                        new_instrs[i] = _like(instr, Opcode.POP)
+                        self.changed = True
+                        break
+                    later_bound.add(later.arg)
+                elif later.opcode == Opcode.LOAD_VAR:
+                    if later.arg == instr.arg or later.arg not in later_bound:
+                        break
+                elif later.opcode not in _SAFE_OPCODES:
+                    break
+        return new_instrs
+
+    def _reduce_strength(self, instructions, constants):
+        """
+        Replace operations with cheaper equivalents.
+        Example: LOAD_CONST 2, POW -> DUP, MUL
+        """
+        new_instrs = []
+        i = 0
         while i < len(instructions):
             instr = instructions[i]
+            if (instr.opcode == Opcode.LOAD_CONST and i + 1 < len(instructions)
+                    and instructions[i+1].opcode == Opcode.POW
+                    and type(constants[instr.arg]) is int and constants[instr.arg] == 2):
+                # Only the plain opcode: BINARY_OP may call __pow__
+                new_instrs.append(_like(instr, Opcode.DUP))
+                new_instrs.append(_like(instructions[i+1], Opcode.MUL))
+                i += 2
+                self.changed = True
+                continue
             new_instrs.append(instr)
+            i += 1
+        return new_instrs
 
-            # After RETURN, skip until next jump target
-            if instr.opcode == Opcode.RETURN:
-                i += 1
-                # Skip until we find a jump target or end
-                while i < len(instructions):
-                    # Check if this is a jump target
-                    is_target = False
-                    for j, check_instr in enumerate(instructions):
-                        if check_instr.opcode in (Opcode.JUMP, Opcode.JUMP_IF_FALSE, Opcode.JUMP_IF_TRUE):
-                            if check_instr.arg == i:
-                                is_target = True
-                                break
-                    if is_target:
-                        break
-                    i += 1
+    # ===== Graph passes =====
+
+    def _thread_jumps(self, blocks, constants):
+        """
+        Simplify the control flow: branches on constants become jumps or
+        disappear, jumps to a block that only jumps go to its target,
+        jumps to the next block are dropped, and blocks nothing reaches
+        are removed.
+        """
+        for block in blocks:
+            jump = block.jump
+            if (jump is not None and jump.opcode in (Opcode.JUMP_IF_TRUE, Opcode.JUMP_IF_FALSE)
+                    and len(block.instructions) > 1
+                    and block.instructions[-2].opcode == Opcode.LOAD_CONST):
+                value = constants[block.instructions[-2].arg]
+                if value is None or type(value) in _NATIVE_TYPES:
+                    taken = bool(value) == (jump.opcode == Opcode.JUMP_IF_TRUE)
+                    del block.instructions[-2:]
+                    if taken:
+                        block.instructions.append(_like(jump, Opcode.JUMP, jump.arg))
                     self.changed = True
+
+        # Where a jump to each block can go instead
+        redirect = {}
+        for i in range(len(blocks) - 2, -1, -1):
+            block = blocks[i]
+            if not block.instructions:
+                redirect[block] = redirect.get(blocks[i + 1], blocks[i + 1])
+        for block in blocks:
+            target = block.instructions[0].arg if (
+                len(block.instructions) == 1 and block.instructions[0].opcode == Opcode.JUMP) else None
+            if target is not None and block not in redirect:
+                redirect[block] = target
+
+        def final(block):
+            seen = set()
+            while block in redirect and block not in seen:
+                seen.add(block)
+                block = redirect[block]
+            return block
+
+        for block in blocks:
+            jump = block.jump
+            if jump is not None:
+                target = final(jump.arg)
+                if target is not jump.arg:
+                    jump.arg = target
+                    self.changed = True
+
+        # Unreachable blocks (the end block always stays)
+        reachable = set()
+        pending = [blocks[0]]
+        position = {block: i for i, block in enumerate(blocks)}
+        while pending:
+            block = pending.pop()
+            if block in reachable:
                 continue
+            reachable.add(block)
+            jump = block.jump
+            if jump is not None:
+                pending.append(jump.arg)
+            i = position[block]
+            if block.falls_through and i + 1 < len(blocks):
+                pending.append(blocks[i + 1])
+        end = blocks[-1]
+        kept = [block for block in blocks if block in reachable and (
+            block.instructions or block is end)]
+        if len(kept) != len(blocks):
+            if any(block.instructions for block in blocks if block not in reachable):
+                self.changed = True
+            blocks[:] = kept
 
-            i += 1
+        # Jumps to the block that follows anyway
+        for block, following in zip(blocks, blocks[1:]):
+            jump = block.jump
+            if jump is None or jump.arg is not following:
+                continue
+            if jump.opcode == Opcode.JUMP:
+                block.instructions.pop()
+            elif jump.opcode in (Opcode.JUMP_IF_TRUE, Opcode.JUMP_IF_FALSE):
+                block.instructions[-1] = _like(jump, Opcode.POP)
+            else:
+                continue
+            self.changed = True
 
-        return new_instrs
+    def _hoist_invariants(self, blocks, constants):
+        """
+        Loop-invariant code motion for while loops, innermost first.
+        """
+        done = set()
+        while True:
+            position = {block: i for i, block in enumerate(blocks)}
+            # Header -> last block of its loop (the last back edge)
+            loops = {}
+            for i, block in enumerate(blocks):
+                jump = block.jump
+                if jump is not None and position[jump.arg] <= i:
+                    loops[jump.arg] = max(loops.get(jump.arg, i), i)
+            pending = [header for header in loops if header not in done]
+            if not pending:
+                return
+            header = max(pending, key=position.get)
+            done.add(header)
+            self._hoist_loop(blocks, position[header], loops[header])
+
+    def _hoist_loop(self, blocks, first, last):
+        header = blocks[first]
+        loop = blocks[first:last + 1]
+        inside = set(loop)
+        condition = header.jump
+        if (condition is None or condition.opcode != Opcode.JUMP_IF_FALSE
+                or condition.arg in inside or blocks[last].falls_through):
+            return
+
+        # Only plain variable stores: no calls, host nodes or iterators
+        stored = set()
+        for block in loop:
+            for instr in block.instructions:
+                if instr.opcode not in _PURE_OPCODES:
+                    return
+                if instr.opcode == Opcode.STORE_VAR:
+                    stored.add(instr.arg)
+
+        # The loop is entered through its header only
+        for block in blocks:
+            jump = block.jump
+            if block not in inside and jump is not None and jump.arg in inside and jump.arg is not header:
+                return
+
+        # Invariant parts of the condition, as (start, end) spans of the
+        # header; each entry is (start, end, invariant, has operator)
+        entries = []
+        spans = []
+        for i, instr in enumerate(header.instructions[:-1]):
+            opcode = instr.opcode
+            if opcode == Opcode.LOAD_CONST:
+                entries.append((i, i, True, False))
+            elif opcode == Opcode.LOAD_VAR:
+                entries.append((i, i, instr.arg not in stored, False))
+            elif opcode in _PLAIN_OPERATORS or opcode == Opcode.BINARY_OP:
+                if len(entries) < 2:
+                    return
+                right = entries.pop()
+                left = entries.pop()
+                invariant = left[2] and right[2]
+                if not invariant:
+                    spans.extend(entry[:2] for entry in (left, right) if entry[2] and entry[3])
+                entries.append((left[0], i, invariant, True))
+            elif opcode in _UNARY_OPCODES:
+                if not entries:
+                    return
+                operand = entries.pop()
+                entries.append((operand[0], i, operand[2], True))
+            else:
+                return
+        if len(entries) != 1:
+            return
+        if entries[0][2] and entries[0][3]:
+            spans.append(entries[0][:2])
+        spans.sort()
+
+        # Variables the loop reads but never assigns: those the condition
+        # reads (it runs whenever the loop is entered) and those assigned
+        # on every path to the loop, so loading them early cannot fail
+        in_spans = set()
+        for start, end in spans:
+            in_spans.update(range(start, end + 1))
+        assigned = _assigned_on_entry(blocks)[header]
+        hoisted_names = []
+        for block in loop:
+            for i, instr in enumerate(block.instructions):
+                if (instr.opcode == Opcode.LOAD_VAR and instr.arg not in stored
+                        and instr.arg not in hoisted_names
+                        and not (block is header and i in in_spans)
+                        and (block is header or instr.arg in assigned)):
+                    hoisted_names.append(instr.arg)
+
+        count = len(spans) + len(hoisted_names)
+        if not count:
+            return
+
+        # Rewrite the loop with slot numbers in place of the hoisted
+        # values, then turn them into COPYs once the stack depths are known
+        preheader = []
+        rewritten = {}
+        for block in loop:
+            instructions = []
+            i = 0
+            while i < len(block.instructions):
+                instr = block.instructions[i]
+                span = next((span for span in spans if span[0] == i), None) if block is header else None
+                if span is not None:
+                    slot = spans.index(span)
+                    preheader.extend(_like(part, part.opcode, part.arg)
+                                     for part in block.instructions[span[0]:span[1] + 1])
+                    instructions.append((slot, block.instructions[span[1]]))
+                    i = span[1] + 1
+                    continue
+                if instr.opcode == Opcode.LOAD_VAR and instr.arg in hoisted_names:
+                    instructions.append((len(spans) + hoisted_names.index(instr.arg), instr))
+                else:
+                    instructions.append(instr)
+                i += 1
+            rewritten[block] = instructions
+        preheader.extend(_like(header.instructions[0], Opcode.LOAD_VAR, name)
+                         for name in hoisted_names)
+
+        # Stack depth above the hoisted values at the start of each block
+        position = {block: i for i, block in enumerate(blocks)}
+        depth_at = {header: 0}
+        pending = [header]
+        while pending:
+            block = pending.pop()
+            depth = depth_at[block]
+            for instr in rewritten[block]:
+                if isinstance(instr, tuple):
+                    depth += 1
+                    continue
+                depth += _stack_effect(instr)
+                if depth < 0:
+                    return
+            successors = []
+            jump = block.jump
+            if jump is not None:
+                successors.append(jump.arg)
+            if block.falls_through:
+                successors.append(blocks[position[block] + 1])
+            for successor in successors:
+                if successor not in inside:
+                    if depth != 0:
+                        return
+                elif successor is header and depth != 0:
+                    return
+                elif successor not in depth_at:
+                    depth_at[successor] = depth
+                    pending.append(successor)
+                elif depth_at[successor] != depth:
+                    return
+
+        # Commit: the hoisted values are pushed by a new block before the
+        # header and popped on the way out of the loop
+        for block in loop:
+            depth = depth_at.get(block, 0)
+            instructions = []
+            for instr in rewritten[block]:
+                if isinstance(instr, tuple):
+                    slot, origin = instr
+                    instructions.append(_like(origin, Opcode.COPY, depth + count - slot))
+                    depth += 1
+                else:
+                    instructions.append(instr)
+                    depth += _stack_effect(instr)
+            block.instructions = instructions
+
+        entry = _Block(preheader)
+        for block in blocks:
+            jump = block.jump
+            if block not in inside and jump is not None and jump.arg is header:
+                jump.arg = entry
+
+        cleanups = {}
+        for block in loop:
+            jump = block.jump
+            if jump is not None and jump.arg not in inside:
+                if jump.arg not in cleanups:
+                    cleanups[jump.arg] = _Block(
+                        [_like(jump, Opcode.POP) for _ in range(count)]
+                        + [_like(jump, Opcode.JUMP, jump.arg)])
+                jump.arg = cleanups[jump.arg]
+
+        blocks[last + 1:last + 1] = list(cleanups.values())
+        blocks.insert(first, entry)
+        self.changed = True
+
+
+def _like(instr, opcode, arg=None):
+    """A new instruction standing for instr (same line and AST nodes)"""
+    return Instruction(opcode, arg, line_number=instr.line_number, nodes=instr.nodes)
+
+
+def _constant_index(constants, value):
+    """Index of value in the constant pool, adding it when missing"""
+    for i, const in enumerate(constants):
+        # 1, 1.0 and True are equal but not interchangeable
+        if type(const) is type(value) and const == value:
+            return i
+    constants.append(value)
+    return len(constants) - 1
+
+
+def _small_enough(value):
+    if isinstance(value, (str, bytes)):
+        return len(value) <= _FOLD_SIZE_LIMIT
+    if isinstance(value, int):
+        return value.bit_length() <= _FOLD_SIZE_LIMIT
+    return True
+
+
+def _stack_effect(instr):
+    """Net stack change of a _PURE_OPCODES instruction"""
+    opcode = instr.opcode
+    if opcode in (Opcode.LOAD_CONST, Opcode.LOAD_VAR, Opcode.DUP, Opcode.COPY):
+        return 1
+    if opcode in (Opcode.MAKE_LIST, Opcode.MAKE_TUPLE):
+        return 1 - instr.arg
+    if opcode in (Opcode.NOP, Opcode.JUMP) or opcode in _UNARY_OPCODES:
+        return 0
+    # Stores, POP, binary operators and conditional jumps
+    return -1
+
+
+def _count(blocks):
+    return sum(len(block.instructions) for block in blocks)
+
+
+def _build_blocks(instructions):
+    """
+    Split instructions into basic blocks, ending with an empty block for
+    jumps to the end of the code.
+
+    Returns None when a jump target is not an instruction index.
+    """
+    count = len(instructions)
+    leaders = {0}
+    for i, instr in enumerate(instructions):
+        if instr.opcode in _JUMP_OPCODES:
+            if not isinstance(instr.arg, int) or not 0 <= instr.arg <= count:
+                return None
+            leaders.add(instr.arg)
+            leaders.add(i + 1)
+        elif instr.opcode == Opcode.RETURN:
+            leaders.add(i + 1)
+    starts = sorted(leader for leader in leaders if leader < count)
+
+    block_at = {}
+    blocks = []
+    for n, start in enumerate(starts):
+        end = starts[n + 1] if n + 1 < len(starts) else count
+        # Copies: jump args are rewritten to blocks
+        block = _Block([_like(instr, instr.opcode, instr.arg) for instr in instructions[start:end]])
+        block_at[start] = block
+        blocks.append(block)
+    end_block = _Block([])
+    block_at[count] = end_block
+    blocks.append(end_block)
+
+    for block in blocks:
+        jump = block.jump
+        if jump is not None:
+            jump.arg = block_at[jump.arg]
+    return blocks
+
+
+def _layout(blocks):
+    """Instructions of blocks in order, with jump targets as indices"""
+    start = {}
+    index = 0
+    for block in blocks:
+        start[block] = index
+        index += len(block.instructions)
+    instructions = []
+    for block in blocks:
+        for instr in block.instructions:
+            if instr.opcode in _JUMP_OPCODES:
+                instr.arg = start[instr.arg]
+            instructions.append(instr)
+    return instructions
+
+
+def _assigned_on_entry(blocks):
+    """Block -> variables stored on every path from the start to it"""
+    predecessors = {block: [] for block in blocks}
+    for i, block in enumerate(blocks):
+        jump = block.jump
+        if jump is not None:
+            predecessors[jump.arg].append(block)
+        if block.falls_through and i + 1 < len(blocks):
+            predecessors[blocks[i + 1]].append(block)
+    stores = {block: {instr.arg for instr in block.instructions if instr.opcode == Opcode.STORE_VAR}
+              for block in blocks}
+    everything = set().union(*stores.values())
+
+    assigned_in = {block: set(everything) for block in blocks}
+    assigned_in[blocks[0]] = set()
+    changed = True
+    while changed:
+        changed = False
+        for block in blocks[1:]:
+            incoming = [assigned_in[p] | stores[p] for p in predecessors[block]]
+            new = set.intersection(*incoming) if incoming else set(everything)
+            if new != assigned_in[block]:
+                assigned_in[block] = new
+                changed = True
+    return assigned_in
@@ -0,0 +1,143 @@
+"""
+Compiled Code Serialization
+============================
+
+Serializes parsed ASTs and CodeObjects to bytes and back (used for the
+.bayanc cache, see compile_cache).
+
+Values are encoded as nested tuples and written with marshal:
+- None, bool, int, float, complex, str and bytes are stored as is
+- ('l', items), ('t', items), ('d', keys, values) for lists, tuples, dicts
+- ('o', class, attribute names, values) for AST nodes and logic terms
+- ('c', name, instructions, constants, names) for CodeObjects, with
+  instructions as (opcode, arg, line_number, nodes) tuples
+- ('r', index) for an object already encoded, so shared nodes and
+  parent links come back as the same object
+
+Only classes of the modules in _MODULES are decoded, so loading a file
+cannot run arbitrary code.
+"""
+
+import marshal
+
+from .. import ast_nodes, logical_engine
+from .opcodes import Opcode
+from .instruction import Instruction, CodeObject
+
+
+# Bump when the encoding, or the fields a node class defaults, changes
+FORMAT_VERSION = 2
+
+_MODULES = {
+    'ast': ast_nodes,
+    'logic': logical_engine,
+}
+_MODULE_KEYS = {module.__name__: key for key, module in _MODULES.items()}
+
+_PLAIN_TYPES = frozenset((type(None), bool, int, float, complex, str, bytes))
+
+
+def dumps(value):
+    """
+    Serialize value (an AST, a CodeObject, or plain data holding them).
+
+    Raises:
+        TypeError: For values of any other type
+    """
+    return marshal.dumps((FORMAT_VERSION, _Encoder().encode(value)))
+
+
+def loads(data):
+    """
+    Rebuild a value serialized by dumps.
+
+    Raises:
+        ValueError: For data in another format version, or malformed data
+    """
+    version, encoded = marshal.loads(data)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported serialization format {version}")
+    return _Decoder().decode(encoded)
+
+
+class _Encoder:
+    def __init__(self):
+        # id(obj) -> memo index; objects are kept alive while encoding
+        self.memo = {}
+        self.objects = []
+
+    def encode(self, value):
+        value_type = type(value)
+        if value_type in _PLAIN_TYPES:
+            return value
+        if value_type is list:
+            return ('l', [self.encode(item) for item in value])
+        if value_type is tuple:
+            return ('t', [self.encode(item) for item in value])
+        if value_type is dict:
+            return ('d', [self.encode(key) for key in value],
+                    [self.encode(item) for item in value.values()])
+        index = self.memo.get(id(value))
+        if index is not None:
+            return ('r', index)
+        if value_type is CodeObject:
+            self._remember(value)
+            return ('c', value.name,
+                    [self._instruction(instr) for instr in value.instructions],
+                    self.encode(value.constants), self.encode(value.names))
+        module_key = _MODULE_KEYS.get(value_type.__module__)
+        if module_key is None or getattr(_MODULES[module_key], value_type.__name__, None) is not value_type:
+            raise TypeError(f"Cannot serialize {value_type.__name__} values")
+        self._remember(value)
+        state = ast_nodes.node_fields(value)
+        return ('o', (module_key, value_type.__name__), list(state),
+                [self.encode(item) for item in state.values()])
+
+    def _remember(self, value):
+        self.memo[id(value)] = len(self.objects)
+        self.objects.append(value)
+
+    def _instruction(self, instr):
+        return (int(instr.opcode), self.encode(instr.arg), instr.line_number,
+                self.encode(instr.nodes))
+
+
+class _Decoder:
+    def __init__(self):
+        self.objects = []
+
+    def decode(self, encoded):
+        if type(encoded) is not tuple:
+            return encoded
+        tag = encoded[0]
+        if tag == 'l':
+            return [self.decode(item) for item in encoded[1]]
+        if tag == 't':
+            return tuple(self.decode(item) for item in encoded[1])
+        if tag == 'd':
+            keys = [self.decode(key) for key in encoded[1]]
+            return dict(zip(keys, (self.decode(item) for item in encoded[2])))
+        if tag == 'r':
+            return self.objects[encoded[1]]
+        if tag == 'o':
+            (module_key, class_name), names, values = encoded[1:]
+            cls = getattr(_MODULES[module_key], class_name, None)
+            if not isinstance(cls, type):
+                raise ValueError(f"Unknown class {module_key}.{class_name}")
+            obj = cls.__new__(cls)
+            self.objects.append(obj)
+            for name, value in zip(names, values):
+                setattr(obj, name, self.decode(value))
+            return obj
+        if tag == 'c':
+            name, instructions, constants, names = encoded[1:]
+            code = CodeObject.__new__(CodeObject)
+            self.objects.append(code)
+            CodeObject.__init__(
+                code, name,
+                [Instruction(Opcode(opcode), self.decode(arg), line_number=line,
+                             nodes=self.decode(nodes))
+                 for opcode, arg, line, nodes in instructions],
+                self.decode(constants), self.decode(names))
+            return code
+        raise ValueError(f"Malformed serialized value: {tag!r}")
@@ -8,19 +8,77 @@ Supports:
 - Basic operations (Phase 1)
 - Control flow (Phase 2)  
 - Functions (Phase 3)
+- Function bodies of a host interpreter (run_function)
+
+Code is decoded once into an array of (handler, arg) pairs dispatched
+through a handler table, with superinstructions for common sequences and
+slot-indexed fast locals in function frames.
 """
 
+import operator
+import sys
+
 from .opcodes import Opcode
 from .instruction import Instruction, CodeObject
-from ..logical_engine import LogicalEngine
+from ..logical_engine import LogicalEngine, Predicate, Term
+from ..object_system import BayanObject
+from ..traditional_interpreter import _UNWRAPPED_ERRORS
+
+
+# BINARY_OP operators applied directly to plain Python values; anything
+# else goes through the host's operator semantics
+_NATIVE_OPERATORS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '%': operator.mod,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '>': operator.gt,
+    '<=': operator.le,
+    '>=': operator.ge,
+}
+_NATIVE_TYPES = frozenset((int, float, str, bool))
+
+# The arithmetic and comparison opcodes, on plain Python values
+_PLAIN_OPERATORS = {
+    Opcode.ADD: operator.add,
+    Opcode.SUB: operator.sub,
+    Opcode.MUL: operator.mul,
+    Opcode.DIV: operator.truediv,
+    Opcode.FLOOR_DIV: operator.floordiv,
+    Opcode.MOD: operator.mod,
+    Opcode.POW: operator.pow,
+    Opcode.EQ: operator.eq,
+    Opcode.NE: operator.ne,
+    Opcode.LT: operator.lt,
+    Opcode.LE: operator.le,
+    Opcode.GT: operator.gt,
+    Opcode.GE: operator.ge,
+}
+
+# Value of a fast local that is not bound in its frame
+_UNSET = object()
+
+# Instruction pointer past the end of any code (set by RETURN)
+_END = sys.maxsize
 
 
 class CallFrame:
     def __init__(self, code, locals_map=None, return_ip=None):
         self.code = code
-        self.locals = locals_map or {}
+        # An empty dict passed in is still the caller's scope
+        self.locals = locals_map if locals_map is not None else {}
         self.return_ip = return_ip
         self.ip = 0
+        # Value of the last statement (see Opcode.POP_RESULT)
+        self.result = None
+        self.returned = False
+        # Fast locals: values by slot, and the slot names
+        self.fast = None
+        self.fast_names = ()
 
 
 class BytecodeVM:
@@ -53,6 +111,12 @@ class BytecodeVM:
         # Call stack for function calls
         self.call_stack = []
         self.current_frame = None
+        # The current frame's fast locals
+        self.fast = None
+
+        # Interpreter that resolves calls, EVAL_NODE and operators
+        # (a TraditionalInterpreter); None for standalone bytecode
+        self.host = None
         
         self.reset()
         
@@ -68,6 +132,10 @@ class BytecodeVM:
         self.logical_engine = LogicalEngine()
         self.call_stack = []
         self.current_frame = None
+        # The current frame's fast locals
+        self.fast = None
+        # True while execute is dispatching a program
+        self._executing = False
     
     def execute(self, code_object):
         """
@@ -79,6 +147,8 @@ class BytecodeVM:
         Returns:
             Result of execution (TOS)
         """
+        if self._executing or self.call_stack:
+            return self._execute_nested(code_object)
         self.current_code = code_object
         self.running = True
         self.paused = False
@@ -87,22 +157,17 @@ class BytecodeVM:
         # For PoC, we just use global state + ip
         self.ip = 0
         
-        instructions = code_object.instructions
-        
-        while self.running and self.ip < len(instructions):
-            # Check breakpoints
-            if self.debug_mode and self.ip in self.breakpoints:
-                self.paused = True
-                return "PAUSED"
-            
-            if self.debug_mode and self.paused:
+        fused, plain, _ = self._decode(code_object, False)
+        if self.debug_mode:
+            # Breakpoints are instruction indices, so run unfused
+            if self._dispatch_debug(plain) == "PAUSED":
                 return "PAUSED"
-
-            instr = instructions[self.ip]
-            self.ip += 1
-            
-            # Execute instruction
-            self._execute_instruction(instr)
+        else:
+            self._executing = True
+            try:
+                self._dispatch(fused)
+            finally:
+                self._executing = False
         
         self.running = False
         
@@ -111,6 +176,159 @@ class BytecodeVM:
             return self.stack[-1]
         return None
 
+    def _execute_nested(self, code_object):
+        """Run a program for host code that an instruction called (exec,
+        a hybrid program), then give the caller back its state and stack"""
+        fused, _, _ = self._decode(code_object, False)
+        saved = (self.current_code, self.ip, self.current_frame, self.fast, self._executing)
+        depth = len(self.stack)
+        self.current_code = code_object
+        self.ip = 0
+        self.current_frame = self.fast = None
+        self._executing = True
+        try:
+            self._dispatch(fused)
+            return self.stack[-1] if len(self.stack) > depth else None
+        finally:
+            del self.stack[depth:]
+            self.current_code, self.ip, self.current_frame, self.fast, self._executing = saved
+
+    def run_function(self, code_object, local_env):
+        """
+        Run a function body compiled by CodeGenerator.compile_function.
+
+        Args:
+            code_object (CodeObject): Compiled body
+            local_env (dict): The host's local scope for this call; the
+                body runs on fast locals loaded from it and writes them
+                back before host code reads it and when the body ends
+
+        Returns:
+            The returned value, or the value of the last statement run
+        """
+        depth = len(self.stack)
+        try:
+            frame = self._run_frame(code_object, local_env)
+            if frame.returned:
+                return self.stack.pop()
+            return frame.result
+        finally:
+            del self.stack[depth:]
+
+    def _run_frame(self, code_object, local_env):
+        """Run code_object to its end or RETURN on a new frame over
+        local_env; returns the finished frame"""
+        fused, _, names = self._decode(code_object, True)
+        saved = (self.current_code, self.ip, self.current_frame, self.fast)
+        frame = CallFrame(code_object, locals_map=local_env)
+        frame.fast_names = names
+        get = local_env.get
+        frame.fast = self.fast = [get(name, _UNSET) for name in names]
+        self.call_stack.append(self.current_frame)
+        self.current_frame = frame
+        self.current_code = code_object
+        self.ip = 0
+        try:
+            self._dispatch(fused)
+        finally:
+            self._flush_fast(frame)
+            self.call_stack.pop()
+            self.current_code, self.ip, self.current_frame, self.fast = saved
+        return frame
+
+    def _flush_fast(self, frame):
+        """Write the frame's bound fast locals back to its locals dict"""
+        local_map = frame.locals
+        for name, value in zip(frame.fast_names, frame.fast):
+            if value is not _UNSET:
+                local_map[name] = value
+
+    def _reload_fast(self, frame):
+        """Reload the frame's fast locals after host code ran on its dict"""
+        get = frame.locals.get
+        frame.fast[:] = [get(name, _UNSET) for name in frame.fast_names]
+
+    def _decode(self, code_object, fast):
+        """The (fused, plain, fast local names) dispatch arrays of
+        code_object, built on first use"""
+        decoded = code_object.decoded.get(fast)
+        if decoded is None:
+            decoded = code_object.decoded[fast] = _decode(code_object, fast)
+        return decoded
+
+    def _dispatch(self, decoded):
+        """Run decoded entries from self.ip until the code runs off its
+        end or returns"""
+        end = len(decoded)
+        ip = self.ip
+        try:
+            while ip < end:
+                handler, arg = decoded[ip]
+                self.ip = ip + 1
+                handler(self, arg)
+                ip = self.ip
+        except _UNWRAPPED_ERRORS:
+            raise
+        except Exception as e:
+            if self.host is None:
+                raise
+            raise self._runtime_error(e)
+
+    def _dispatch_debug(self, decoded):
+        """_dispatch, pausing at breakpoints"""
+        try:
+            while self.running and self.ip < len(decoded):
+                if self.ip in self.breakpoints or self.paused:
+                    self.paused = True
+                    return "PAUSED"
+                handler, arg = decoded[self.ip]
+                self.ip += 1
+                handler(self, arg)
+        except _UNWRAPPED_ERRORS:
+            raise
+        except Exception as e:
+            if self.host is None:
+                raise
+            raise self._runtime_error(e)
+
+    def _runtime_error(self, error):
+        """error raised by the instruction before self.ip, as the host's
+        Bayan runtime error"""
+        stack = self.host._call_stack
+        depth = len(stack)
+        stack.extend(self._frames(self.current_code.instructions[self.ip - 1]))
+        try:
+            return self.host._runtime_error(error)
+        finally:
+            del stack[depth:]
+
+    def _call_host(self, function, *args):
+        """function(*args), with the running instruction's nodes on the
+        host's Bayan stack"""
+        host = self.host
+        if host is None:
+            return function(*args)
+        stack = host._call_stack
+        depth = len(stack)
+        stack.extend(self._frames(self.current_code.instructions[self.ip - 1]))
+        try:
+            return function(*args)
+        finally:
+            del stack[depth:]
+
+    def _frames(self, instr):
+        """The instruction's nodes as the host would have recorded them"""
+        if self.host._track_every_node:
+            return instr.nodes
+        expression_nodes = self.host._EXPRESSION_NODES
+        return [node for node in instr.nodes if type(node) not in expression_nodes]
+
+    def _truthy(self, value):
+        """Branch condition test, with the host's rules for Bayan objects"""
+        if type(value) is bool or self.host is None:
+            return bool(value)
+        return self.host._truthy(value)
+
     def step(self):
         """Execute single instruction (Debug Mode)"""
         if not self.running or not self.current_code:
@@ -121,9 +339,9 @@ class BytecodeVM:
             self.running = False
             return "FINISHED"
             
-        instr = instructions[self.ip]
+        handler, arg = self._decode(self.current_code, self.current_frame is not None)[1][self.ip]
         self.ip += 1
-        self._execute_instruction(instr)
+        handler(self, arg)
         
         if self.ip >= len(instructions):
             self.running = False
@@ -184,223 +402,375 @@ class BytecodeVM:
             return self.frames[-1].locals if hasattr(self.frames[-1], 'locals') else {}
         return {}
     
-    def _execute_instruction(self, instr):
-        """Execute a single instruction"""
-        opcode = instr.opcode
-        arg = instr.arg
-        
-        # ===== Stack Operations =====
-        if opcode == Opcode.NOP:
-            pass
-        
-        elif opcode == Opcode.LOAD_CONST:
-            # Push constant from constant pool
-            self.stack.append(self.current_code.constants[arg])
-        
-        elif opcode == Opcode.LOAD_VAR:
-            # Load variable (check current frame's locals first, then globals)
-            name = self.current_code.names[arg] if isinstance(arg, int) else arg
-            
-            # Check current frame's locals if we're in a function call
-            if self.current_frame and name in self.current_frame.locals:
-                self.stack.append(self.current_frame.locals[name])
-            elif name in self.globals:
-                self.stack.append(self.globals[name])
-            else:
-                raise NameError(f"Variable '{name}' not defined")
-        
-        elif opcode == Opcode.STORE_VAR:
-            # Store to variable
-            name = self.current_code.names[arg] if isinstance(arg, int) else arg
-            value = self.stack.pop()
-            
-            # Store in current frame's locals if we're in a function call
-            if self.current_frame:
-                self.current_frame.locals[name] = value
+    # ===== Instruction handlers =====
+    # Each takes the decoded argument (see _decode); names and constants
+    # are resolved when the code is decoded, not per instruction
+
+    def _op_nop(self, arg):
+        pass
+
+    def _op_push(self, value):
+        # LOAD_CONST, with the constant resolved
+        self.stack.append(value)
+
+    def _op_load_fast(self, slot):
+        value = self.fast[slot]
+        if value is _UNSET:
+            value = self._load_unbound(slot)
+        self.stack.append(value)
+
+    def _op_store_fast(self, slot):
+        self.fast[slot] = self.stack.pop()
+
+    def _op_load_name(self, name):
+        # Module level code keeps its variables in the globals
+        try:
+            self.stack.append(self.globals[name])
+        except KeyError:
+            raise self._name_error(name) from None
+
+    def _op_store_name(self, name):
+        self.globals[name] = self.stack.pop()
+
+    def _load_unbound(self, slot):
+        """A fast local that is not bound in this frame: read the global"""
+        name = self.current_frame.fast_names[slot]
+        try:
+            return self.globals[name]
+        except KeyError:
+            raise self._name_error(name) from None
+
+    def _name_error(self, name):
+        if self.host is None:
+            return NameError(f"Variable '{name}' not defined")
+        if self.current_frame is not None and self.current_frame.fast_names:
+            # The message lists the names the host can see
+            self._flush_fast(self.current_frame)
+        return NameError(self.host._undefined_name_message(name))
+
+    def _op_pop(self, arg):
+        self.stack.pop()
+
+    def _op_dup(self, arg):
+        self.stack.append(self.stack[-1])
+
+    def _op_copy(self, k):
+        self.stack.append(self.stack[-k])
+
+    def _op_apply(self, function):
+        # ADD ... GE: plain Python operators
+        b = self.stack.pop()
+        a = self.stack.pop()
+        self.stack.append(function(a, b))
+
+    def _op_neg(self, arg):
+        self.stack.append(-self.stack.pop())
+
+    def _op_not(self, arg):
+        self.stack.append(not self.stack.pop())
+
+    def _op_jump(self, target):
+        self.ip = target
+
+    def _op_jump_if_true(self, target):
+        if self._truthy(self.stack.pop()):
+            self.ip = target
+
+    def _op_jump_if_false(self, target):
+        if not self._truthy(self.stack.pop()):
+            self.ip = target
+
+    def _op_call_func(self, nargs):
+        # Stack: [..., func, arg1, arg2, ..., argN]
+        args = self._pop_args(nargs)
+        func_code = self.stack.pop()
+        if not isinstance(func_code, CodeObject):
+            raise TypeError(f"Expected CodeObject, got {type(func_code)}")
+        # Arguments are the locals arg0, arg1, ...; the return value is
+        # left on the stack
+        self._run_frame(func_code, {f'arg{i}': value for i, value in enumerate(args)})
+
+    def _op_make_list(self, count):
+        self.stack.append(self._pop_args(count))
+
+    def _op_make_tuple(self, count):
+        self.stack.append(tuple(self._pop_args(count)))
+
+    def _op_print(self, arg):
+        print(self.stack.pop())
+
+    def _op_return(self, arg):
+        # TOS is the return value; a top-level return stops execution
+        frame = self.current_frame
+        if frame is not None:
+            frame.returned = True
+        else:
+            self.running = False
+        self.ip = _END
+
+    def _op_assert_fact(self, arg):
+        # TOS is a Fact or Rule object
+        self.logical_engine.assertz(self.stack.pop())
+
+    def _op_query(self, arg):
+        # TOS is a Predicate (goal)
+        self.stack.append(self.logical_engine.query(self.stack.pop()))
+
+    def _op_call_predicate(self, arg):
+        # Stack: the non-variable arguments; arg: (name, logical var names)
+        name, logical_vars = arg
+        values = self._pop_args(sum(1 for var in logical_vars if var is None))
+        terms = []
+        for var in logical_vars:
+            if var is None:
+                terms.append(Term(str(values.pop(0)), is_variable=False))
             else:
-                # Module-level code, store in globals
-                self.globals[name] = value
-        
-        elif opcode == Opcode.POP:
-            self.stack.pop()
-        
-        elif opcode == Opcode.DUP:
-            self.stack.append(self.stack[-1])
-        
-        # ===== Arithmetic Operations =====
-        elif opcode == Opcode.ADD:
-            b = self.stack.pop()
-            a = self.stack.pop()
-            self.stack.append(a + b)
-        
-        elif opcode == Opcode.SUB:
-            b = self.stack.pop()
-            a = self.stack.pop()
-            self.stack.append(a - b)
-        
-        elif opcode == Opcode.MUL:
-            b = self.stack.pop()
-            a = self.stack.pop()
-            self.stack.append(a * b)
-        
-        elif opcode == Opcode.DIV:
-            b = self.stack.pop()
-            a = self.stack.pop()
-            self.stack.append(a / b)
-        
-        elif opcode == Opcode.FLOOR_DIV:
-            b = self.stack.pop()
-            a = self.stack.pop()
-            self.stack.append(a // b)
-        
-        elif opcode == Opcode.MOD:
-            b = self.stack.pop()
-            a = self.stack.pop()
-            self.stack.append(a % b)
-        
-        elif opcode == Opcode.POW:
-            b = self.stack.pop()
-            a = self.stack.pop()
-            self.stack.append(a ** b)
-        
-        elif opcode == Opcode.NEG:
-            a = self.stack.pop()
+                terms.append(Term(var, is_variable=True))
+        solutions = self.logical_engine.query(Predicate(name, terms))
+        self.stack.append(len(solutions) > 0)
+
+    def _op_pop_result(self, arg):
+        self.current_frame.result = self.stack.pop()
+
+    def _op_binary_op(self, op):
+        b = self.stack.pop()
+        a = self.stack.pop()
+        native = _NATIVE_OPERATORS.get(op)
+        if native is not None and type(a) in _NATIVE_TYPES and type(b) in _NATIVE_TYPES:
+            self.stack.append(native(a, b))
+        else:
+            self.stack.append(self.host._binary_op(op, a, b))
+
+    def _op_unary_op(self, op):
+        a = self.stack.pop()
+        if op == '-' and (type(a) is int or type(a) is float):
             self.stack.append(-a)
-        
-        elif opcode == Opcode.NOT:
-            a = self.stack.pop()
-            self.stack.append(not a)
-        
-        # ===== Comparison Operations =====
-        elif opcode == Opcode.EQ:
-            b = self.stack.pop()
-            a = self.stack.pop()
-            self.stack.append(a == b)
-        
-        elif opcode == Opcode.NE:
-            b = self.stack.pop()
-            a = self.stack.pop()
-            self.stack.append(a != b)
-        
-        elif opcode == Opcode.LT:
-            b = self.stack.pop()
-            a = self.stack.pop()
-            self.stack.append(a < b)
-        
-        elif opcode == Opcode.LE:
-            b = self.stack.pop()
-            a = self.stack.pop()
-            self.stack.append(a <= b)
-        
-        elif opcode == Opcode.GT:
-            b = self.stack.pop()
-            a = self.stack.pop()
-            self.stack.append(a > b)
-        
-        elif opcode == Opcode.GE:
-            b = self.stack.pop()
-            a = self.stack.pop()
-            self.stack.append(a >= b)
-        
-        # ===== Control Flow =====
-        elif opcode == Opcode.JUMP:
-            # Unconditional jump to target instruction
-            self.ip = arg
-        
-        elif opcode == Opcode.JUMP_IF_TRUE:
-            # Jump if TOS is truthy
-            condition = self.stack.pop()
-            if condition:
-                self.ip = arg
-        
-        elif opcode == Opcode.JUMP_IF_FALSE:
-            # Jump if TOS is falsy
-            condition = self.stack.pop()
-            if not condition:
-                self.ip = arg
-        
-        # ===== Function Operations =====
-        elif opcode == Opcode.CALL_FUNC:
-            # Call function with N arguments
-            # Stack: [..., func, arg1, arg2, ..., argN]
-            nargs = arg
-            
-            # Pop arguments
-            args = []
-            for _ in range(nargs):
-                args.insert(0, self.stack.pop())
-            
-            # Pop function object (code object)
-            func_code = self.stack.pop()
-            
-            if not isinstance(func_code, CodeObject):
-                raise TypeError(f"Expected CodeObject, got {type(func_code)}")
-            
-            # Save current state
-            saved_ip = self.ip
-            saved_code = self.current_code
-            saved_instructions = self.current_code.instructions if self.current_code else []
-            
-            # Create new frame
-            new_frame = CallFrame(func_code, locals_map={}, return_ip=saved_ip)
-            
-            # Set up arguments as local variables (simple approach: arg0, arg1, ...)
-            for i, arg_val in enumerate(args):
-                new_frame.locals[f'arg{i}'] = arg_val
-            
-            # Push frame to call stack
-            self.call_stack.append(self.current_frame)
-            self.current_frame = new_frame
-            
-            # Execute function
-            self.current_code = func_code
-            self.ip = 0
-            
-            # Run until RETURN
-            while self.ip < len(func_code.instructions):
-                instr = func_code.instructions[self.ip]
-                self.ip += 1
-                
-                if instr.opcode == Opcode.RETURN:
-                    # Function finished, restore state
-                    break
-                    
-                self._execute_instruction(instr)
-            
-            # Restore previous frame
-            self.current_frame = self.call_stack.pop() if self.call_stack else None
-            self.current_code = saved_code
-            self.ip = saved_ip
-        
-        # ===== Special =====
-        elif opcode == Opcode.PRINT:
-            # Print top of stack (for debugging)
-            value = self.stack.pop()
-            print(value)
-        
-        elif opcode == Opcode.RETURN:
-            # Return from function
-            # TOS should contain return value (if any)
-            # In nested calls, this will be handled by CALL_FUNC
-            # In top-level, it just stops execution
-            if not self.call_stack:
-                # Top-level return, stop execution
-                self.running = False
-                
-        # ===== Logic Programming =====
-        elif opcode == Opcode.ASSERT_FACT:
-            # Assert fact or rule: TOS is a Fact or Rule object
-            item = self.stack.pop()
-            self.logical_engine.assertz(item)
-            
-        elif opcode == Opcode.QUERY:
-            # Query: TOS is a Predicate (goal)
-            goal = self.stack.pop()
-            solutions = self.logical_engine.query(goal)
-            self.stack.append(solutions)
-        
         else:
-            raise NotImplementedError(f"Opcode {opcode} not implemented yet")
+            self.stack.append(self.host._unary_op(op, a))
+
+    def _op_get_iter(self, arg):
+        iterable = self.stack.pop()
+        if self.host is not None:
+            iterable = self.host._to_iterable(iterable)
+        self.stack.append(iter(iterable))
+
+    def _op_for_iter(self, target):
+        try:
+            self.stack.append(next(self.stack[-1]))
+        except StopIteration:
+            self.stack.pop()
+            self.ip = target
+
+    def _op_unpack_seq(self, count):
+        value = self.stack.pop()
+        try:
+            unpacked = list(value)
+        except TypeError:
+            raise TypeError(f"Cannot unpack non-iterable value: {value}")
+        if len(unpacked) != count:
+            raise ValueError(f"Cannot unpack {len(unpacked)} values into {count} variables")
+        # The first value ends up on top, for the first store
+        self.stack.extend(reversed(unpacked))
+
+    def _op_load_attr(self, name):
+        obj = self.stack.pop()
+        if isinstance(obj, BayanObject):
+            self.stack.append(obj.get_attribute(name))
+        elif isinstance(obj, dict):
+            self.stack.append(obj.get(name))
+        elif hasattr(obj, name):
+            self.stack.append(getattr(obj, name))
+        else:
+            raise AttributeError(f"Object has no attribute '{name}'")
+
+    def _op_store_attr(self, name):
+        # TOS = value, TOS1 = object; leaves the value
+        value = self.stack.pop()
+        obj = self.stack.pop()
+        if isinstance(obj, BayanObject):
+            obj.set_attribute(name, value)
+        else:
+            try:
+                setattr(obj, name, value)
+            except Exception as e:
+                raise AttributeError(f"Cannot set attribute '{name}': {e}")
+        self.stack.append(value)
+
+    def _op_call_method(self, arg):
+        # Stack: [..., obj, arg1, ..., argN]; arg: (method_name, nargs)
+        method_name, nargs = arg
+        args = self._pop_args(nargs)
+        obj = self.stack.pop()
+        if isinstance(obj, BayanObject):
+            self.stack.append(self._call_host(obj.call_method, method_name, args, {}))
+        else:
+            func = getattr(obj, method_name, None)
+            if func is None or not callable(func):
+                raise AttributeError(f"Object has no method '{method_name}'")
+            self.stack.append(self._call_host(func, *args))
+
+    def _op_call_named(self, arg):
+        # Stack: [..., arg1, ..., argN]; arg: (name, nargs, fast slot or -1)
+        name, nargs, slot = arg
+        args = self._pop_args(nargs)
+        if slot >= 0 and self.fast[slot] is not _UNSET:
+            # A local holding a callable shadows functions of that name
+            self.current_frame.locals[name] = self.fast[slot]
+        self.stack.append(self._call_host(self.host._call_named, name, args))
+
+    def _op_eval_node(self, node):
+        # The host's local_env is this frame's locals
+        frame = self.current_frame
+        if frame is not None and frame.fast_names:
+            self._flush_fast(frame)
+        self.stack.append(self._call_host(self.host.interpret, node))
+        if frame is not None:
+            if self.host.local_env is not frame.locals:
+                # The node rebound the scope (match restores a copy)
+                frame.locals = self.host.local_env
+            if frame.fast_names:
+                self._reload_fast(frame)
+
+    def _op_unimplemented(self, opcode):
+        raise NotImplementedError(f"Opcode {opcode} not implemented yet")
+
+    # ===== Superinstructions =====
+    # Fused from the instruction at self.ip - 1 and the ones after it;
+    # self.ip is advanced past each part as it completes, so an error is
+    # reported on the instruction that raised it
+
+    def _op_fast_const_op(self, arg):
+        # LOAD_VAR x, LOAD_CONST c, <op>
+        slot, const, function, op = arg
+        a = self.fast[slot]
+        if a is _UNSET:
+            a = self._load_unbound(slot)
+        self.ip += 2
+        if op is None or type(a) in _NATIVE_TYPES:
+            self.stack.append(function(a, const))
+        else:
+            self.stack.append(self.host._binary_op(op, a, const))
+
+    def _op_name_const_op(self, arg):
+        name, const, function, op = arg
+        try:
+            a = self.globals[name]
+        except KeyError:
+            raise self._name_error(name) from None
+        self.ip += 2
+        if op is None or type(a) in _NATIVE_TYPES:
+            self.stack.append(function(a, const))
+        else:
+            self.stack.append(self.host._binary_op(op, a, const))
+
+    def _op_fast_const_op_jump(self, arg):
+        # LOAD_VAR x, LOAD_CONST c, <op>, JUMP_IF_FALSE target
+        slot, const, function, op, target = arg
+        a = self.fast[slot]
+        if a is _UNSET:
+            a = self._load_unbound(slot)
+        self.ip += 2
+        if op is None or type(a) in _NATIVE_TYPES:
+            value = function(a, const)
+        else:
+            value = self.host._binary_op(op, a, const)
+        if value is True or (value is not False and self._truthy(value)):
+            self.ip += 1
+        else:
+            self.ip = target
+
+    def _op_name_const_op_jump(self, arg):
+        name, const, function, op, target = arg
+        try:
+            a = self.globals[name]
+        except KeyError:
+            raise self._name_error(name) from None
+        self.ip += 2
+        if op is None or type(a) in _NATIVE_TYPES:
+            value = function(a, const)
+        else:
+            value = self.host._binary_op(op, a, const)
+        if value is True or (value is not False and self._truthy(value)):
+            self.ip += 1
+        else:
+            self.ip = target
+
+    def _op_copy_const_op(self, arg):
+        # COPY k, LOAD_CONST c, <op>
+        k, const, function, op = arg
+        a = self.stack[-k]
+        self.ip += 2
+        if op is None or type(a) in _NATIVE_TYPES:
+            self.stack.append(function(a, const))
+        else:
+            self.stack.append(self.host._binary_op(op, a, const))
+
+    def _op_copy_const_op_jump(self, arg):
+        # COPY k, LOAD_CONST c, <op>, JUMP_IF_FALSE target
+        k, const, function, op, target = arg
+        a = self.stack[-k]
+        self.ip += 2
+        if op is None or type(a) in _NATIVE_TYPES:
+            value = function(a, const)
+        else:
+            value = self.host._binary_op(op, a, const)
+        if value is True or (value is not False and self._truthy(value)):
+            self.ip += 1
+        else:
+            self.ip = target
+
+    def _op_op_jump(self, arg):
+        # <op>, JUMP_IF_FALSE target
+        function, op, target = arg
+        b = self.stack.pop()
+        a = self.stack.pop()
+        if op is None or (type(a) in _NATIVE_TYPES and type(b) in _NATIVE_TYPES):
+            value = function(a, b)
+        else:
+            value = self.host._binary_op(op, a, b)
+        if value is True or (value is not False and self._truthy(value)):
+            self.ip += 1
+        else:
+            self.ip = target
+
+    _HANDLERS = {
+        Opcode.NOP: _op_nop,
+        Opcode.POP: _op_pop,
+        Opcode.DUP: _op_dup,
+        Opcode.COPY: _op_copy,
+        Opcode.NEG: _op_neg,
+        Opcode.NOT: _op_not,
+        Opcode.JUMP: _op_jump,
+        Opcode.JUMP_IF_TRUE: _op_jump_if_true,
+        Opcode.JUMP_IF_FALSE: _op_jump_if_false,
+        Opcode.CALL_FUNC: _op_call_func,
+        Opcode.MAKE_LIST: _op_make_list,
+        Opcode.MAKE_TUPLE: _op_make_tuple,
+        Opcode.PRINT: _op_print,
+        Opcode.RETURN: _op_return,
+        Opcode.ASSERT_FACT: _op_assert_fact,
+        Opcode.QUERY: _op_query,
+        Opcode.CALL_PREDICATE: _op_call_predicate,
+        Opcode.POP_RESULT: _op_pop_result,
+        Opcode.BINARY_OP: _op_binary_op,
+        Opcode.UNARY_OP: _op_unary_op,
+        Opcode.GET_ITER: _op_get_iter,
+        Opcode.FOR_ITER: _op_for_iter,
+        Opcode.UNPACK_SEQ: _op_unpack_seq,
+        Opcode.LOAD_ATTR: _op_load_attr,
+        Opcode.STORE_ATTR: _op_store_attr,
+        Opcode.CALL_METHOD: _op_call_method,
+        Opcode.CALL_NAMED: _op_call_named,
+        Opcode.EVAL_NODE: _op_eval_node,
+    }
+
+    def _pop_args(self, count):
+        """Pop count call arguments, first argument first"""
+        if not count:
+            return []
+        args = self.stack[-count:]
+        del self.stack[-count:]
+        return args
     
     def get_stack(self):
         """Get current stack state (for debugging)"""
@@ -409,3 +779,90 @@ class BytecodeVM:
     def get_variables(self):
         """Get all variables (for debugging)"""
         return {**self.globals, **self.locals}
+
+
+def _operator(instr):
+    """(function, host operator or None) for a fusable binary operation"""
+    if instr.opcode == Opcode.BINARY_OP:
+        function = _NATIVE_OPERATORS.get(instr.arg)
+        return (function, instr.arg) if function is not None else None
+    function = _PLAIN_OPERATORS.get(instr.opcode)
+    return (function, None) if function is not None else None
+
+
+def _decode(code_object, fast):
+    """
+    Decode code_object into dispatch arrays.
+
+    Returns (fused, plain, names): plain holds one (handler, arg) pair per
+    instruction; fused is the same array with superinstructions at the
+    start of each fusable sequence (the instructions they cover stay in
+    place, so jump targets are unchanged); names are the fast locals, in
+    slot order, when fast is set.
+    """
+    instructions = code_object.instructions
+    constants = code_object.constants
+    H = BytecodeVM
+
+    def name_of(arg):
+        return code_object.names[arg] if isinstance(arg, int) else arg
+
+    slots = {}
+    if fast:
+        for instr in instructions:
+            if instr.opcode == Opcode.LOAD_VAR or instr.opcode == Opcode.STORE_VAR:
+                slots.setdefault(name_of(instr.arg), len(slots))
+
+    plain = []
+    for instr in instructions:
+        opcode, arg = instr.opcode, instr.arg
+        if opcode == Opcode.LOAD_CONST:
+            entry = (H._op_push, constants[arg])
+        elif opcode == Opcode.LOAD_VAR:
+            name = name_of(arg)
+            entry = (H._op_load_fast, slots[name]) if fast else (H._op_load_name, name)
+        elif opcode == Opcode.STORE_VAR:
+            name = name_of(arg)
+            entry = (H._op_store_fast, slots[name]) if fast else (H._op_store_name, name)
+        elif opcode == Opcode.LOAD_ATTR or opcode == Opcode.STORE_ATTR:
+            entry = (H._HANDLERS[opcode], name_of(arg))
+        elif opcode == Opcode.EVAL_NODE:
+            entry = (H._op_eval_node, constants[arg])
+        elif opcode == Opcode.CALL_NAMED:
+            name, nargs = arg
+            entry = (H._op_call_named, (name, nargs, slots.get(name, -1)))
+        elif opcode in _PLAIN_OPERATORS:
+            entry = (H._op_apply, _PLAIN_OPERATORS[opcode])
+        elif opcode in H._HANDLERS:
+            entry = (H._HANDLERS[opcode], arg)
+        else:
+            entry = (H._op_unimplemented, opcode)
+        plain.append(entry)
+
+    fused = list(plain)
+    count = len(instructions)
+    for i, instr in enumerate(instructions):
+        if (i + 2 < count and instr.opcode in (Opcode.LOAD_VAR, Opcode.COPY)
+                and instructions[i + 1].opcode == Opcode.LOAD_CONST):
+            operation = _operator(instructions[i + 2])
+            const = plain[i + 1][1]
+            if operation is None or (operation[1] is not None and type(const) not in _NATIVE_TYPES):
+                continue
+            var = plain[i][1]
+            if i + 3 < count and instructions[i + 3].opcode == Opcode.JUMP_IF_FALSE:
+                if instr.opcode == Opcode.COPY:
+                    handler = H._op_copy_const_op_jump
+                else:
+                    handler = H._op_fast_const_op_jump if fast else H._op_name_const_op_jump
+                fused[i] = (handler, (var, const) + operation + (instructions[i + 3].arg,))
+            else:
+                if instr.opcode == Opcode.COPY:
+                    handler = H._op_copy_const_op
+                else:
+                    handler = H._op_fast_const_op if fast else H._op_name_const_op
+                fused[i] = (handler, (var, const) + operation)
+        elif i + 1 < count and instructions[i + 1].opcode == Opcode.JUMP_IF_FALSE:
+            operation = _operator(instr)
+            if operation is not None:
+                fused[i] = (H._op_op_jump, operation + (instructions[i + 1].arg,))
+    return fused, plain, list(slots)
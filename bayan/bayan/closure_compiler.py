@@ -0,0 +1,658 @@
+"""
+Closure compiler: a second execution tier for TraditionalInterpreter
+مترجم الإغلاقات: طبقة تنفيذ ثانية للمفسر التقليدي
+
+Function bodies are turned once into trees of pre-bound Python closures:
+literals are converted and folded, variable names are checked once and
+absent loop invariants are dropped, so running a body no longer
+re-dispatches and re-inspects every node.  Node types the compiler does
+not handle fall back to interpreter.interpret(), so both tiers share the
+visitor's semantics.  Enable it with interpreter.compile_functions = True.
+
+Every compiled closure takes the running frame.  Bodies run through
+_run_function_body use the interpreter's local_env dict (frame is None).
+Plain functions called with positional arguments are also compiled a
+second time against a slot layout (_Scope): parameters and assigned
+locals live in a list indexed at compile time and the parameter binding
+plan is worked out once, so a call allocates one list instead of a dict.
+A visitor fallback inside such a function sees the slots as a temporary
+local_env dict and its changes are copied back afterwards.
+"""
+
+import operator
+
+from .ast_nodes import (
+    Assignment, BinaryOp, Block, Boolean, BreakStatement, ContinueStatement,
+    ForLoop, FunctionCall, GlobalStatement, IfStatement, MethodCall, NoneLiteral,
+    NonlocalStatement, Number, Parameter, ReturnStatement, SpreadOperator,
+    String, UnaryOp, Variable, WhileLoop, iter_nodes,
+)
+from .object_system import BayanObject
+from .traditional_interpreter import (
+    ReturnValue, BreakException, ContinueException, _UNWRAPPED_ERRORS,
+)
+
+# Operators applied directly when both operands are plain Python values;
+# for these types the visitor's dunder lookups never apply
+_NATIVE_OPERATORS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '%': operator.mod,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '>': operator.gt,
+    '<=': operator.le,
+    '>=': operator.ge,
+}
+_NATIVE_TYPES = frozenset((int, float, str, bool))
+
+# Marks an expression whose value is not known at compile time
+_UNKNOWN = object()
+# Marks a slot whose local variable has not been assigned yet
+_UNSET = object()
+
+
+class _Scope:
+    """Slot layout of one function's locals, parameters first
+
+    A frame is a list with one entry per slot followed by a dict of any
+    other locals a visitor fallback created (None until there are some).
+    """
+
+    def __init__(self, names):
+        self.names = names
+        self.index = {name: i for i, name in enumerate(names)}
+        self.extras = len(names)
+
+
+class _SlotFunction:
+    """A function compiled to run on slot frames, with its binding plan"""
+
+    def __init__(self, scope, arity, defaults, body):
+        self.scope = scope
+        self.arity = arity
+        # (slot, compiled default or None, required) for each parameter
+        self.defaults = defaults
+        self.body = body
+
+    def __call__(self, args, func_name):
+        """Bind args like _call_user_function and run the body"""
+        count = len(args)
+        if count > self.arity:
+            raise RuntimeError(f"Too many positional arguments for function {func_name}")
+        frame = [_UNSET] * self.scope.extras
+        frame.append(None)
+        frame[:count] = args
+        if count < self.arity:
+            for slot, default, required in self.defaults[count:]:
+                if default is not None:
+                    frame[slot] = default(frame)
+                elif required:
+                    raise RuntimeError(f"Missing required parameter: {self.scope.names[slot]}")
+        try:
+            return self.body(frame)
+        except ReturnValue as ret:
+            return ret.value
+
+
+class ClosureCompiler:
+    """Compile function bodies into closures bound to one interpreter"""
+
+    # Node type -> compile method; other node types use the visitor
+    _STATEMENTS = {
+        Block: '_compile_block',
+        Assignment: '_compile_assignment',
+        IfStatement: '_compile_if',
+        WhileLoop: '_compile_while',
+        ForLoop: '_compile_for',
+        ReturnStatement: '_compile_return',
+        BreakStatement: '_compile_break',
+        ContinueStatement: '_compile_continue',
+    }
+    _EXPRESSIONS = {
+        Variable: '_compile_variable',
+        BinaryOp: '_compile_binary_op',
+        UnaryOp: '_compile_unary_op',
+        FunctionCall: '_compile_call',
+        MethodCall: '_compile_method_call',
+    }
+
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        # FunctionDef -> compiled body closure (local_env scope)
+        self._bodies = {}
+        # FunctionDef -> _SlotFunction, or None when it needs a dict scope
+        self._slot_functions = {}
+        # FunctionDef -> whether its body yields (a generator function)
+        self._generators = {}
+        # Slot layout of the function being compiled (None: local_env dict)
+        self._scope = None
+
+    def function_body(self, func_def):
+        """Return the compiled closure for func_def's body, compiling once"""
+        body = self._bodies.get(func_def)
+        if body is None:
+            body = self._bodies[func_def] = self.body(func_def.body)
+        return body
+
+    def slot_function(self, func_def):
+        """Return func_def compiled for slot frames, or None if it cannot be"""
+        function = self._slot_functions.get(func_def, _UNKNOWN)
+        if function is _UNKNOWN:
+            function = self._slot_functions[func_def] = self._compile_slot_function(func_def)
+        return function
+
+    def is_generator(self, func_def):
+        """Cached check for a yield anywhere in func_def's body"""
+        result = self._generators.get(func_def)
+        if result is None:
+            result = self._generators[func_def] = self.interpreter._contains_yield(func_def.body)
+        return result
+
+    # ------------------------------------------------------------------
+    # Scope resolution
+    # ------------------------------------------------------------------
+
+    def _resolve_scope(self, func_def):
+        """Slot layout for func_def, or None if its locals need a dict"""
+        names = []
+        for param in func_def.parameters:
+            if isinstance(param, Parameter):
+                if param.is_varargs or param.is_kwargs:
+                    return None
+                names.append(param.name)
+            else:
+                names.append(param)
+        if len(set(names)) != len(names):
+            return None
+        if getattr(func_def, 'requires', None) or getattr(func_def, 'ensures', None):
+            return None
+        # global/nonlocal declarations redirect assignments at run time
+        for node in iter_nodes(func_def.body):
+            if isinstance(node, (GlobalStatement, NonlocalStatement)):
+                return None
+        self._collect_locals(func_def.body, names)
+        return _Scope(names)
+
+    def _collect_locals(self, node, names):
+        """Append names assigned by compiled statements under node"""
+        node_type = type(node)
+        if node_type is Block:
+            for stmt in node.statements:
+                self._collect_locals(stmt, names)
+            return
+        if node_type is Assignment:
+            targets = [node.name]
+        elif node_type is ForLoop:
+            targets = node.variable if isinstance(node.variable, list) else [node.variable]
+            self._collect_locals(node.body, names)
+        elif node_type is WhileLoop:
+            targets = []
+            self._collect_locals(node.body, names)
+        elif node_type is IfStatement:
+            targets = []
+            self._collect_locals(node.then_branch, names)
+            if node.else_branch:
+                self._collect_locals(node.else_branch, names)
+        else:
+            return
+        for name in targets:
+            if isinstance(name, str) and '.' not in name and name not in names:
+                names.append(name)
+
+    def _compile_slot_function(self, func_def):
+        scope = self._resolve_scope(func_def)
+        if scope is None:
+            return None
+        previous, self._scope = self._scope, scope
+        try:
+            defaults = []
+            for slot, param in enumerate(func_def.parameters):
+                if isinstance(param, Parameter) and param.has_default():
+                    defaults.append((slot, self.expression(param.default_value), False))
+                else:
+                    defaults.append((slot, None, isinstance(param, Parameter)))
+            body = self.body(func_def.body)
+        finally:
+            self._scope = previous
+        return _SlotFunction(scope, len(func_def.parameters), defaults, body)
+
+    # ------------------------------------------------------------------
+    # Entry points
+    # ------------------------------------------------------------------
+
+    def body(self, node):
+        """Compile a block (or a single statement) used as a body"""
+        if type(node) is Block:
+            return self._compile_block(node)
+        return self.statement(node)
+
+    def statement(self, node):
+        """Compile a statement that records a Bayan stack frame when it runs"""
+        name = self._STATEMENTS.get(type(node)) or self._EXPRESSIONS.get(type(node))
+        if name is None:
+            # The visitor pushes its own frame and wraps errors
+            return self._fallback(node)
+        run = getattr(self, name)(node)
+        if getattr(run, 'uses_visitor', False):
+            return run
+        stack = self.interpreter._call_stack
+        runtime_error = self.interpreter._runtime_error
+
+        def statement(frame):
+            stack.append(node)
+            try:
+                return run(frame)
+            except _UNWRAPPED_ERRORS:
+                raise
+            except Exception as e:
+                raise runtime_error(e)
+            finally:
+                stack.pop()
+        return statement
+
+    def expression(self, node):
+        """Compile an expression into a closure returning its value"""
+        value = self._constant(node)
+        if value is not _UNKNOWN:
+            return lambda frame: value
+        name = self._EXPRESSIONS.get(type(node))
+        if name is None:
+            return self._fallback(node)
+        return getattr(self, name)(node)
+
+    def _fallback(self, node):
+        interpret = self.interpreter.interpret
+        if self._scope is None:
+            def visit(frame):
+                return interpret(node)
+        else:
+            with_env = self._env_runner(self._scope)
+
+            def visit(frame):
+                return with_env(frame, interpret, node)
+        visit.uses_visitor = True
+        return visit
+
+    def _env_runner(self, scope):
+        """Return with_env(frame, action, arg): run action(arg) with the
+        frame's locals exposed as the interpreter's local_env dict"""
+        interp = self.interpreter
+        names = scope.names
+        extras = scope.extras
+
+        def with_env(frame, action, arg):
+            env = dict(frame[extras]) if frame[extras] else {}
+            for name, value in zip(names, frame):
+                if value is not _UNSET:
+                    env[name] = value
+            old_env = interp.local_env
+            interp.local_env = env
+            try:
+                return action(arg)
+            finally:
+                # The visitor may have replaced the dict (match restores a copy)
+                env = interp.local_env
+                interp.local_env = old_env
+                for slot, name in enumerate(names):
+                    frame[slot] = env.get(name, _UNSET)
+                if len(env) > len(names) or any(key not in scope.index for key in env):
+                    frame[extras] = {key: value for key, value in env.items()
+                                     if key not in scope.index}
+        return with_env
+
+    # ------------------------------------------------------------------
+    # Constants
+    # ------------------------------------------------------------------
+
+    def _constant(self, node):
+        """Value of a literal or a foldable operation, else _UNKNOWN"""
+        node_type = type(node)
+        if node_type is Number:
+            return self.interpreter.visit_number(node)
+        if node_type is String or node_type is Boolean:
+            return node.value
+        if node_type is NoneLiteral:
+            return None
+        if node_type is BinaryOp and node.operator in _NATIVE_OPERATORS:
+            left = self._constant(node.left)
+            right = self._constant(node.right)
+            if type(left) in _NATIVE_TYPES and type(right) in _NATIVE_TYPES:
+                try:
+                    return _NATIVE_OPERATORS[node.operator](left, right)
+                except Exception:
+                    # Leave the error to be raised when the code runs
+                    return _UNKNOWN
+        return _UNKNOWN
+
+    # ------------------------------------------------------------------
+    # Expressions
+    # ------------------------------------------------------------------
+
+    def _compile_variable(self, node):
+        name = node.name
+        if '.' in name:
+            return self._fallback(node)
+        interp = self.interpreter
+        scope = self._scope
+
+        if scope is None:
+            def load(frame):
+                env = interp.local_env
+                if env is not None and name in env:
+                    return env[name]
+                env = interp.global_env
+                if name in env:
+                    return env[name]
+                raise NameError(interp._undefined_name_message(name))
+            return load
+
+        slot = scope.index.get(name)
+        extras = scope.extras
+        with_env = self._env_runner(scope)
+
+        def load(frame):
+            if slot is not None:
+                value = frame[slot]
+                if value is not _UNSET:
+                    return value
+            local = frame[extras]
+            if local and name in local:
+                return local[name]
+            env = interp.global_env
+            if name in env:
+                return env[name]
+            # Build the message with the frame's locals as suggestions
+            raise NameError(with_env(frame, interp._undefined_name_message, name))
+        return load
+
+    def _compile_binary_op(self, node):
+        op = node.operator
+        left = self.expression(node.left)
+        right = self.expression(node.right)
+        binary_op = self.interpreter._binary_op
+        native = _NATIVE_OPERATORS.get(op)
+        if native is None:
+            return lambda frame: binary_op(op, left(frame), right(frame))
+
+        def run(frame):
+            lhs = left(frame)
+            rhs = right(frame)
+            if type(lhs) in _NATIVE_TYPES and type(rhs) in _NATIVE_TYPES:
+                return native(lhs, rhs)
+            return binary_op(op, lhs, rhs)
+        return run
+
+    def _compile_unary_op(self, node):
+        op = node.operator
+        operand = self.expression(node.operand)
+        unary_op = self.interpreter._unary_op
+        if op == '-':
+            def negate(frame):
+                value = operand(frame)
+                if type(value) is int or type(value) is float:
+                    return -value
+                return unary_op(op, value)
+            return negate
+        if op == 'not':
+            truthy = self.interpreter._truthy
+            return lambda frame: not truthy(operand(frame))
+        return lambda frame: unary_op(op, operand(frame))
+
+    def _compile_call(self, node):
+        interp = self.interpreter
+        name = node.name
+        # Builtins, logical queries, spreads and keyword arguments keep
+        # the visitor's full argument handling
+        if (not isinstance(name, str)
+                or name in interp._INTERCEPTED_CALLS
+                or getattr(node, 'named_arguments', None)
+                or any(isinstance(arg, SpreadOperator)
+                       or (isinstance(arg, Variable) and arg.name.startswith('?'))
+                       for arg in node.arguments)):
+            return self._fallback(node)
+
+        arguments = [self.expression(arg) for arg in node.arguments]
+        visit_call = self._fallback(node)
+        call_user_function = interp._call_user_function
+        stack = interp._call_stack
+        no_named_args = {}
+        scope = self._scope
+        if scope is None:
+            def shadowed(frame):
+                local = interp.local_env
+                return name in (local if local is not None else interp.global_env) or (
+                    local is not None and name in interp.global_env)
+        else:
+            slot = scope.index.get(name)
+            extras = scope.extras
+
+            def shadowed(frame):
+                if slot is not None and frame[slot] is not _UNSET:
+                    return True
+                local = frame[extras]
+                return bool(local and name in local) or name in interp.global_env
+
+        def call(frame):
+            # Same lookup order as visit_function_call: classes and values
+            # in scope shadow user-defined functions
+            if name in interp.classes or shadowed(frame):
+                return visit_call(frame)
+            func_def = interp.functions.get(name)
+            if (func_def is None or name in interp._async_functions
+                    or self.is_generator(func_def)):
+                return visit_call(frame)
+            args = [arg(frame) for arg in arguments]
+            stack.append(node)
+            try:
+                return call_user_function(func_def, args, no_named_args, name)
+            finally:
+                stack.pop()
+        return call
+
+    def _compile_method_call(self, node):
+        if getattr(node, 'named_arguments', None):
+            return self._fallback(node)
+        target = self.expression(node.object_expr)
+        arguments = [self.expression(arg) for arg in node.arguments]
+        method_name = node.method_name
+        no_named_args = {}
+
+        def method_call(frame):
+            obj = target(frame)
+            args = [arg(frame) for arg in arguments]
+            if isinstance(obj, BayanObject):
+                return obj.call_method(method_name, args, no_named_args)
+            func = getattr(obj, method_name, None)
+            if func is None or not callable(func):
+                raise AttributeError(f"Object has no method '{method_name}'")
+            return func(*args)
+        return method_call
+
+    # ------------------------------------------------------------------
+    # Statements
+    # ------------------------------------------------------------------
+
+    def _compile_block(self, node):
+        statements = [self.statement(stmt) for stmt in node.statements]
+        if len(statements) == 1:
+            return statements[0]
+
+        def block(frame):
+            result = None
+            for statement in statements:
+                result = statement(frame)
+            return result
+        return block
+
+    def _store(self, name):
+        """Closure store(frame, value) binding a local variable"""
+        scope = self._scope
+        if scope is None:
+            env_of = self._dict_env
+            return lambda frame, value: env_of().__setitem__(name, value)
+        slot = scope.index[name]
+
+        def store(frame, value):
+            frame[slot] = value
+        return store
+
+    def _dict_env(self):
+        interp = self.interpreter
+        return interp.local_env if interp.local_env is not None else interp.global_env
+
+    def _compile_assignment(self, node):
+        name = node.name
+        if not isinstance(name, str) or '.' in name:
+            return self._fallback(node)
+        value = self.expression(node.value)
+        if self._scope is None:
+            # set_variable handles global/nonlocal names and reactive updates
+            set_variable = self.interpreter.set_variable
+
+            def assign(frame):
+                result = value(frame)
+                set_variable(name, result)
+                return result
+            return assign
+
+        slot = self._scope.index[name]
+
+        def assign(frame):
+            result = value(frame)
+            frame[slot] = result
+            return result
+        return assign
+
+    def _condition(self, node):
+        """Compile node into a closure returning its Bayan truthiness"""
+        value = self.expression(node)
+        truthy = self.interpreter._truthy
+
+        def condition(frame):
+            result = value(frame)
+            return result if type(result) is bool else truthy(result)
+        return condition
+
+    def _compile_if(self, node):
+        condition = self._condition(node.condition)
+        then_branch = self.body(node.then_branch)
+        else_branch = self.body(node.else_branch) if node.else_branch else None
+
+        def if_statement(frame):
+            if condition(frame):
+                return then_branch(frame)
+            if else_branch is not None:
+                return else_branch(frame)
+            return None
+        return if_statement
+
+    def _invariant_check(self, node):
+        """Closure checking the loop's invariants, or None when it has none"""
+        invariants = node.invariants
+        if not invariants:
+            return None
+        check = self.interpreter.visit_invariant_clause
+        if self._scope is None:
+            def check_invariants(frame):
+                for invariant in invariants:
+                    check(invariant)
+            return check_invariants
+
+        with_env = self._env_runner(self._scope)
+
+        def check_invariants(frame):
+            for invariant in invariants:
+                with_env(frame, check, invariant)
+        return check_invariants
+
+    def _compile_while(self, node):
+        condition = self._condition(node.condition)
+        body = self.body(node.body)
+        check = self._invariant_check(node)
+
+        def while_loop(frame):
+            result = None
+            while condition(frame):
+                if check is not None:
+                    check(frame)
+                try:
+                    result = body(frame)
+                except BreakException:
+                    break
+                except ContinueException:
+                    continue
+                if check is not None:
+                    check(frame)
+            return result
+        return while_loop
+
+    def _compile_for(self, node):
+        iterable = self.expression(node.iterable)
+        body = self.body(node.body)
+        check = self._invariant_check(node)
+        variable = node.variable
+        to_iterable = self.interpreter._to_iterable
+        if self._scope is None:
+            env_of = self._dict_env
+            targets = None
+        else:
+            env_of = None
+            names = variable if isinstance(variable, list) else [variable]
+            targets = [self._store(name) for name in names]
+
+        def for_loop(frame):
+            items = to_iterable(iterable(frame))
+            result = None
+            env = env_of() if env_of is not None else None
+            for value in items:
+                # Support tuple unpacking: for k, v in items
+                if isinstance(variable, list):
+                    try:
+                        unpacked = list(value)
+                        if len(unpacked) != len(variable):
+                            raise ValueError(f"Cannot unpack {len(unpacked)} values into {len(variable)} variables")
+                        if env is not None:
+                            for var_name, val in zip(variable, unpacked):
+                                env[var_name] = val
+                        else:
+                            for store, val in zip(targets, unpacked):
+                                store(frame, val)
+                    except TypeError:
+                        raise TypeError(f"Cannot unpack non-iterable value: {value}")
+                elif env is not None:
+                    env[variable] = value
+                else:
+                    targets[0](frame, value)
+                if check is not None:
+                    check(frame)
+                try:
+                    result = body(frame)
+                except BreakException:
+                    break
+                except ContinueException:
+                    continue
+                if check is not None:
+                    check(frame)
+            return result
+        return for_loop
+
+    def _compile_return(self, node):
+        value = self.expression(node.value) if node.value else None
+
+        def return_statement(frame):
+            raise ReturnValue(value(frame) if value is not None else None)
+        return return_statement
+
+    def _compile_break(self, node):
+        def break_statement(frame):
+            raise BreakException()
+        return break_statement
+
+    def _compile_continue(self, node):
+        def continue_statement(frame):
+            raise ContinueException()
+        return continue_statement
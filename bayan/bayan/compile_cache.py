@@ -0,0 +1,134 @@
+"""
+On-disk cache of parsed Bayan programs (.bayanc files)
+ذاكرة دائمة للبرامج المحللة: ملفات .bayanc
+
+Like Python's __pycache__: parse_file() keeps the AST of each source file
+in a __bayancache__ directory beside it, so running or importing an
+unchanged file skips the lexer and parser.  Entries are named
+<stem>.<key>.bayanc, where the key hashes the source text together with
+compiler_version(); editing the file or changing the front end gives a
+new key, and stale entries for the same stem are removed on write.
+
+The cache is best effort: unreadable, stale or unwritable entries are
+ignored and the source is parsed as usual.  BAYAN_CACHE_DIR puts every
+entry in one directory instead, and BAYAN_NO_CACHE turns the cache off.
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+
+from . import __version__
+from .bytecode import serializer
+from .lexer import HybridLexer
+from .parser import HybridParser
+
+
+CACHE_DIR_NAME = '__bayancache__'
+CACHE_SUFFIX = '.bayanc'
+
+# Modules whose output ends up in a cache entry
+_FRONT_END_MODULES = ('lexer.py', 'parser.py', 'ast_nodes.py', 'logical_engine.py')
+
+_compiler_version = None
+
+
+def compiler_version():
+    """Fingerprint of everything a cached AST depends on: the Bayan and
+    serializer versions, the Python version (marshal) and the front end
+    sources"""
+    global _compiler_version
+    if _compiler_version is None:
+        digest = hashlib.sha256()
+        digest.update(f"{__version__}:{serializer.FORMAT_VERSION}:{sys.version_info[:2]}".encode())
+        package_dir = os.path.dirname(os.path.abspath(__file__))
+        for module in _FRONT_END_MODULES:
+            with open(os.path.join(package_dir, module), 'rb') as f:
+                digest.update(f.read())
+        _compiler_version = digest.hexdigest()[:16]
+    return _compiler_version
+
+
+def cache_path(path, source):
+    """The cache entry for source read from path"""
+    key = hashlib.sha256(f"{compiler_version()}\0{source}".encode('utf-8')).hexdigest()[:16]
+    directory = os.environ.get('BAYAN_CACHE_DIR') or os.path.join(
+        os.path.dirname(os.path.abspath(path)), CACHE_DIR_NAME)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(directory, f"{stem}.{key}{CACHE_SUFFIX}")
+
+
+def parse_source(source, path=None):
+    """
+    Parse source, through the cache entry of path when given.
+
+    Args:
+        source (str): Bayan source text
+        path (str): File the source was read from, or None to skip the cache
+
+    Returns:
+        Program: The parsed AST
+    """
+    if path is None or os.environ.get('BAYAN_NO_CACHE'):
+        return _parse(source)
+    entry = cache_path(path, source)
+    ast = _read_entry(entry)
+    if ast is None:
+        ast = _parse(source)
+        _write_entry(entry, ast)
+    return ast
+
+
+def parse_file(path):
+    """Read and parse a Bayan file, using its cache entry when it has one"""
+    with open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    return parse_source(source, path)
+
+
+def _parse(source):
+    return HybridParser(HybridLexer(source).tokenize()).parse()
+
+
+def _read_entry(entry):
+    try:
+        with open(entry, 'rb') as f:
+            return serializer.loads(f.read())
+    except Exception:
+        # Missing, truncated or from another format version
+        return None
+
+
+def _write_entry(entry, ast):
+    try:
+        data = serializer.dumps(ast)
+    except (TypeError, ValueError, RecursionError):
+        # Values the format has no encoding for, or an AST too deep
+        return
+    directory, name = os.path.split(entry)
+    temp_path = None
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, entry)
+        temp_path = None
+        if os.path.basename(directory) == CACHE_DIR_NAME:
+            # Entries for older versions of the file; a shared
+            # BAYAN_CACHE_DIR may hold other files with the same stem
+            stem = _stem(name)
+            for other in os.listdir(directory):
+                if other != name and other.endswith(CACHE_SUFFIX) and _stem(other) == stem:
+                    os.remove(os.path.join(directory, other))
+    except OSError:
+        if temp_path is not None:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+
+def _stem(entry_name):
+    return entry_name[:-len(CACHE_SUFFIX)].rsplit('.', 1)[0]
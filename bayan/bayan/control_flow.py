@@ -0,0 +1,63 @@
+"""
+Control flow signals of the Bayan interpreters
+إشارات التحكم في التدفق لمفسرات بيان
+
+Raised by return, break, continue and yield, and caught by the function,
+loop and generator that they leave.  Kept apart from the interpreter so
+the object system can catch them without importing it.
+
+Inside the tree walker's blocks, ifs and loops, break, continue and
+return travel as Completion values instead (see Completion); the
+exceptions are only raised where a completion leaves that code.
+"""
+
+
+class ReturnValue(Exception):
+    """Exception to handle return statements"""
+    def __init__(self, value):
+        self.value = value
+
+class BreakException(Exception):
+    """Exception to handle break statements"""
+    pass
+
+class ContinueException(Exception):
+    """Exception to handle continue statements"""
+    pass
+
+class YieldValue(Exception):
+    """Exception to handle yield expressions in generators"""
+    def __init__(self, value):
+        self.value = value
+
+
+class Completion:
+    """Abrupt completion of a statement, returned instead of raised.
+
+    A block stops at the first statement that completes abruptly and
+    returns its Completion; loops consume BREAK and CONTINUE, and the
+    function call turns a return completion into the call's value.
+    إكمال مفاجئ لعبارة: توقف أو متابعة أو إرجاع
+    """
+    __slots__ = ('kind', 'value')
+
+    def __init__(self, kind, value=None):
+        self.kind = kind
+        self.value = value
+
+    def signal(self):
+        """The exception standing for this completion outside blocks"""
+        if self.kind == 'return':
+            return ReturnValue(self.value)
+        if self.kind == 'break':
+            return BreakException()
+        return ContinueException()
+
+    def __repr__(self):
+        if self.kind == 'return':
+            return f"Completion(return, {self.value!r})"
+        return f"Completion({self.kind})"
+
+
+BREAK = Completion('break')
+CONTINUE = Completion('continue')
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+خط معالجة المدونات: تحليل كل نوع كلمة مرة واحدة
+Corpus pipeline: analyse each word type once
+
+The lexicon and morphology APIs take one word per call.  Over a corpus
+that means the call overhead, normalization and cache probes are paid
+per token, although a few thousand types make up most tokens.
+CorpusPipeline reads a stream of texts in batches of tokens, keeps the
+distinct types of each batch that it has not seen before, runs every
+selected stage once over them, and fans the results back out to the
+tokens in their original order:
+
+- root:    ArabicNLPAdapter.extract_roots
+- lexicon: UnifiedLexiconSystem.lookup_many
+- energy:  WordEnergyMatrix.analyze_word
+- letters: letter_semiotics.WordAnalyzer.analyze_word
+
+Analysed types are kept in a bounded cache across batches.  With
+workers > 1, the new types of a large batch are split into chunks and
+analysed by a process pool, each process building its own analyzers.
+Every token of a type gets the same TokenAnalysis object; treat it as
+read-only.
+"""
+
+import contextlib
+import io
+import multiprocessing
+import re
+from dataclasses import dataclass
+from itertools import chain
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .arabic_adapter import ArabicNLPAdapter
+from .letter_semiotics import WordAnalysis, WordAnalyzer
+from .lookup_cache import LookupCache
+from .unified_lexicon_system import LexiconSearchResult, UnifiedLexiconSystem
+from .word_energy_matrix import WordEnergyMatrix
+
+STAGES = ('root', 'lexicon', 'energy', 'letters')
+
+# Letters, with the Arabic diacritics and dagger alif that \w leaves out
+_TOKEN = re.compile(r'(?:[^\W\d_]|[ً-ٰٟ])+')
+_ARABIC = re.compile(r'[؀-ۿ]')
+
+
+def tokenize(text: str) -> List[str]:
+    """The words of text, without digits or punctuation"""
+    return _TOKEN.findall(text)
+
+
+@dataclass
+class TokenAnalysis:
+    """تحليل نوع كلمة / Results of the selected stages for one word type"""
+    word: str
+    root: Optional[str] = None
+    lexicon: Optional[LexiconSearchResult] = None
+    energy: Optional[Dict] = None
+    letters: Optional[WordAnalysis] = None
+
+
+class _Analyzers:
+    """The analysis objects of one process, sharing one Arabic adapter"""
+
+    def __init__(self, stages: Sequence[str], lang: Optional[str],
+                 arramooz_db_path: Optional[str], preload: bool):
+        self.stages = stages
+        self.lang = lang
+        self.adapter = ArabicNLPAdapter()
+        self.lexicon = None
+        if 'lexicon' in stages:
+            self.lexicon = UnifiedLexiconSystem(arramooz_db_path, preload=preload)
+            self.lexicon.initialize()
+        self.energy = WordEnergyMatrix(self.adapter) if 'energy' in stages else None
+        self.letters = WordAnalyzer(arabic_adapter=self.adapter) if 'letters' in stages else None
+
+    def analyze(self, words: List[str]) -> List[TokenAnalysis]:
+        results = [TokenAnalysis(word) for word in words]
+        if 'root' in self.stages:
+            for result, root in zip(results, self.adapter.extract_roots(words)):
+                result.root = root
+        if self.lexicon is not None:
+            for result, entry in zip(results, self.lexicon.lookup_many(words)):
+                result.lexicon = entry
+        if self.energy is not None:
+            for result in results:
+                result.energy = self.energy.analyze_word(result.word, self._lang(result.word))
+        if self.letters is not None:
+            for result in results:
+                result.letters = self.letters.analyze_word(result.word)
+        return results
+
+    def _lang(self, word: str) -> str:
+        if self.lang:
+            return self.lang
+        return 'ar' if _ARABIC.search(word) else 'en'
+
+    def close(self):
+        if self.lexicon is not None:
+            self.lexicon.close()
+
+
+_worker: Optional[_Analyzers] = None
+
+
+def _init_worker(config):
+    global _worker
+    # Keep the start-up banners of every worker out of the output
+    with contextlib.redirect_stdout(io.StringIO()):
+        _worker = _Analyzers(*config)
+
+
+def _analyze_chunk(words: List[str]) -> List[TokenAnalysis]:
+    return _worker.analyze(words)
+
+
+class CorpusPipeline:
+    """
+    خط معالجة دفعي للمدونات
+    Batch lexicon and morphology pipeline over a stream of texts
+    """
+
+    def __init__(self, stages: Sequence[str] = STAGES, lang: Optional[str] = None,
+                 arramooz_db_path: Optional[str] = None, preload: bool = False,
+                 tokenizer: Callable[[str], List[str]] = tokenize,
+                 batch_tokens: int = 50000, workers: int = 0, chunk_size: int = 2000,
+                 cache_size: int = 100000):
+        """
+        Args:
+            stages: المراحل المطلوبة من STAGES
+            lang: لغة تحليل الطاقة ('ar' أو 'en'؛ None: حسب حروف الكلمة)
+            arramooz_db_path: مسار قاعدة بيانات Arramooz
+            preload: استخدام معجم Arramooz المترجم
+            tokenizer: دالة تقسيم النص إلى كلمات
+            batch_tokens: عدد الكلمات في كل دفعة
+            workers: عدد العمليات (0 أو 1: في العملية نفسها)
+            chunk_size: عدد الأنواع في كل جزء يرسل إلى عملية
+            cache_size: أقصى عدد للأنواع المحللة المحفوظة بين الدفعات
+        """
+        unknown = [stage for stage in stages if stage not in STAGES]
+        if unknown:
+            raise ValueError(f"Unknown pipeline stages {unknown}; expected some of {STAGES}")
+        self.stages = tuple(stages)
+        self.lang = lang
+        self.arramooz_db_path = arramooz_db_path
+        self.preload = preload
+        self.tokenizer = tokenizer
+        self.batch_tokens = batch_tokens
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.cache = LookupCache('pipeline.types', cache_size, cache_negative=False)
+        self.tokens = 0
+        self.analysed = 0
+        self._analyzers: Optional[_Analyzers] = None
+        self._pool = None
+
+    def process(self, texts: Iterable[str]) -> Iterator[List[TokenAnalysis]]:
+        """
+        معالجة سلسلة نصوص
+        Yield the analyses of the tokens of each text, in order.  Texts are
+        read lazily, batch_tokens tokens at a time.
+        """
+        batch: List[List[str]] = []
+        count = 0
+        for text in texts:
+            tokens = self.tokenizer(text)
+            batch.append(tokens)
+            count += len(tokens)
+            if count >= self.batch_tokens:
+                yield from self._fan_out(batch)
+                batch, count = [], 0
+        if batch:
+            yield from self._fan_out(batch)
+
+    def analyze_words(self, words: Iterable[str]) -> List[TokenAnalysis]:
+        """
+        تحليل مجموعة كلمات
+        Analyse a batch of tokens; each type not analysed before goes
+        through the stages once
+        """
+        words = list(words)
+        results: Dict[str, TokenAnalysis] = {}
+        new = []
+        for word in dict.fromkeys(words):
+            found, analysis = self.cache.lookup(word)
+            if found:
+                results[word] = analysis
+            else:
+                new.append(word)
+        for word, analysis in zip(new, self._analyze_types(new)):
+            results[word] = analysis
+            self.cache.put(word, analysis)
+        self.tokens += len(words)
+        self.analysed += len(new)
+        return [results[word] for word in words]
+
+    def get_statistics(self) -> Dict:
+        """Tokens seen, types analysed and the type cache statistics"""
+        return {'tokens': self.tokens, 'types_analysed': self.analysed, 'cache': self.cache.stats()}
+
+    def _fan_out(self, batch: List[List[str]]) -> Iterator[List[TokenAnalysis]]:
+        analyses = self.analyze_words(chain.from_iterable(batch))
+        start = 0
+        for tokens in batch:
+            yield analyses[start:start + len(tokens)]
+            start += len(tokens)
+
+    def _config(self):
+        return self.stages, self.lang, self.arramooz_db_path, self.preload
+
+    def _analyze_types(self, words: List[str]) -> List[TokenAnalysis]:
+        if not words:
+            return []
+        if self.workers > 1 and len(words) > self.chunk_size:
+            if self._pool is None:
+                self._pool = multiprocessing.Pool(self.workers, _init_worker, (self._config(),))
+            chunks = [words[i:i + self.chunk_size] for i in range(0, len(words), self.chunk_size)]
+            return list(chain.from_iterable(self._pool.map(_analyze_chunk, chunks)))
+        if self._analyzers is None:
+            self._analyzers = _Analyzers(*self._config())
+        return self._analyzers.analyze(words)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        if self._analyzers is not None:
+            self._analyzers.close()
+            self._analyzers = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
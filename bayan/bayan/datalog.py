@@ -0,0 +1,502 @@
+"""
+Bottom-up Datalog evaluation for the logical engine
+تقييم داتالوغ من الأسفل إلى الأعلى للمحرك المنطقي
+
+The function-free part of a knowledge base (ground facts and rules whose
+bodies are plain predicates, not/1 and comparisons) is materialized with
+semi-naive evaluation, stratum by stratum, so that queries become hash
+lookups. The model is kept up to date incrementally: asserted facts are
+propagated semi-naively and retracted facts are removed with DRed
+(delete and re-derive). Changes that cannot be maintained incrementally
+mark the model stale and it is recomputed on the next query.
+"""
+
+from .logical_engine import Term, Predicate, Fact, Rule, Substitution
+
+# Kinds of body goals in a compiled Datalog rule
+_POS, _NEG, _CMP = 0, 1, 2
+
+# Built-in predicates handled by the top-down engine itself
+_BUILTINS = {
+    'not', 'findall', 'bagof', 'setof', 'maybe', 'likely', 'prob_ge', 'probability',
+}
+
+
+def _is_constant(arg):
+    if not isinstance(arg, Term) or arg.is_variable:
+        return False
+    try:
+        hash(arg.value)
+    except TypeError:
+        return False
+    return True
+
+
+def _is_plain_atom(goal):
+    """A user predicate whose arguments are all variables or hashable constants"""
+    return (
+        isinstance(goal, Predicate)
+        and not goal.name.startswith('_')
+        and goal.name not in _BUILTINS
+        and all(_is_constant(arg) or (isinstance(arg, Term) and arg.is_variable) for arg in goal.args)
+    )
+
+
+def _ground_tuple(predicate):
+    """Return the argument values of a ground, function-free predicate or None"""
+    if not all(_is_constant(arg) for arg in predicate.args):
+        return None
+    return tuple(arg.value for arg in predicate.args)
+
+
+class Relation:
+    """The tuples of one predicate with hash indexes on argument positions.
+
+    Rows map to the best probability derived for them and keep their
+    discovery order. Indexes are built lazily per combination of bound
+    positions and maintained on insertion.
+    علاقة مفهرسة لمسند واحد
+    """
+
+    def __init__(self):
+        self.rows = {}  # {value_tuple: probability}
+        self._indexes = {}  # {positions: {key_tuple: [value_tuple]}}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def add(self, row, probability):
+        """Add a row or raise its probability; return True if it changed"""
+        old = self.rows.get(row)
+        if old is not None:
+            if probability <= old:
+                return False
+            self.rows[row] = probability
+            return True
+        self.rows[row] = probability
+        for positions, index in self._indexes.items():
+            index.setdefault(tuple(row[p] for p in positions), []).append(row)
+        return True
+
+    def discard(self, row):
+        if self.rows.pop(row, None) is not None:
+            self._indexes.clear()
+
+    def lookup(self, positions, key):
+        """Return the rows whose values at positions equal key"""
+        if not positions:
+            return list(self.rows)
+        index = self._indexes.get(positions)
+        if index is None:
+            index = {}
+            for row in self.rows:
+                index.setdefault(tuple(row[p] for p in positions), []).append(row)
+            self._indexes[positions] = index
+        return index.get(key, ())
+
+
+class _BodyGoal:
+    """One body goal with its binding pattern fixed at compile time"""
+
+    def __init__(self, kind, goal, bound_vars):
+        self.kind = kind
+        self.goal = goal
+        self.key = None
+        self.positions = ()  # Argument positions known before the lookup
+        self.sources = ()  # For each position: ('c', value) or ('v', var_name)
+        self.outputs = ()  # (position, var_name) bound by this goal
+        self.checks = ()  # (position, var_name) repeated within this goal
+        self.firsts = {}
+        if kind == _CMP:
+            return
+
+        atom = goal if kind == _POS else goal.args[0]
+        self.key = (atom.name, len(atom.args))
+        positions, sources, outputs, checks = [], [], [], []
+        seen = {}
+        for pos, arg in enumerate(atom.args):
+            if not arg.is_variable:
+                positions.append(pos)
+                sources.append(('c', arg.value))
+            elif arg.value in bound_vars:
+                positions.append(pos)
+                sources.append(('v', arg.value))
+            elif arg.value in seen:
+                checks.append((pos, arg.value))
+            else:
+                seen[arg.value] = pos
+                outputs.append((pos, arg.value))
+        self.positions = tuple(positions)
+        self.sources = tuple(sources)
+        self.outputs = tuple(outputs)
+        self.checks = tuple(checks)
+        self.firsts = seen  # {var_name: first position}
+        if kind == _POS:
+            # Variables first seen under not/1 stay existential
+            bound_vars.update(seen)
+
+    def lookup_key(self, bindings):
+        return tuple(bindings[src] if kind == 'v' else src for kind, src in self.sources)
+
+
+class DatalogRule:
+    """A range-restricted rule compiled for bottom-up evaluation"""
+
+    def __init__(self, rule):
+        self.rule = rule
+        self.head_key = (rule.head.name, len(rule.head.args))
+        bound_vars = {}
+        self.body = []
+        for goal in rule.body:
+            if _is_plain_atom(goal):
+                self.body.append(_BodyGoal(_POS, goal, bound_vars))
+            elif (isinstance(goal, Predicate) and goal.name == 'not' and len(goal.args) == 1
+                    and _is_plain_atom(goal.args[0])):
+                self.body.append(_BodyGoal(_NEG, goal, bound_vars))
+            else:
+                self.body.append(_BodyGoal(_CMP, goal, bound_vars))
+        self.head = tuple(
+            ('v', arg.value) if arg.is_variable else ('c', arg.value) for arg in rule.head.args
+        )
+        self.positive = [goal.key for goal in self.body if goal.kind == _POS]
+        self.negative = [goal.key for goal in self.body if goal.kind == _NEG]
+        self.safe = all(src in bound_vars for kind, src in self.head if kind == 'v')
+
+    @staticmethod
+    def compile(rule):
+        """Return a DatalogRule, or None if the rule is not function-free Datalog"""
+        if not _is_plain_atom(rule.head):
+            return None
+        for goal in rule.body:
+            if _is_plain_atom(goal):
+                continue
+            if isinstance(goal, Predicate):
+                if goal.name == 'not' and len(goal.args) == 1 and _is_plain_atom(goal.args[0]):
+                    continue
+                if goal.name.startswith('_compare_'):
+                    continue
+            return None
+        compiled = DatalogRule(rule)
+        return compiled if compiled.safe else None
+
+    def head_row(self, bindings):
+        return tuple(bindings[src] if kind == 'v' else src for kind, src in self.head)
+
+
+class DatalogModel:
+    """The materialized model of the Datalog part of a knowledge base.
+    النموذج المحسوب لجزء داتالوغ من قاعدة المعرفة
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.relations = {}  # {(name, arity): Relation}
+        self.rules = []  # DatalogRule for every materialized rule
+        self.stale = False
+        self.excluded = set()  # Predicates left to top-down resolution
+        self._negated = set()  # Predicates whose changes need recomputation
+        self._pending_insert = {}  # {(name, arity): {row: probability}}
+        self._pending_delete = {}  # {(name, arity): set(rows)}
+        self._build()
+
+    # ----- Full evaluation -----
+
+    def _build(self):
+        kb = self.engine.knowledge_base
+        facts, rules, excluded = {}, {}, set()
+        for items in kb.values():
+            for item in items:
+                if isinstance(item, Fact):
+                    key = (item.predicate.name, len(item.predicate.args))
+                    row = _ground_tuple(item.predicate)
+                    if row is None:
+                        excluded.add(key)
+                        continue
+                    rows = facts.setdefault(key, {})
+                    rows[row] = max(rows.get(row, 0.0), item.probability)
+                elif isinstance(item, Rule):
+                    key = (item.head.name, len(item.head.args))
+                    compiled = DatalogRule.compile(item)
+                    if compiled is None:
+                        excluded.add(key)
+                    else:
+                        rules.setdefault(key, []).append(compiled)
+
+        deps = {}
+        for key, key_rules in rules.items():
+            deps[key] = {dep for r in key_rules for dep in r.positive + r.negative}
+
+        # A predicate is materialized only if everything it depends on is
+        changed = True
+        while changed:
+            changed = False
+            for key in list(rules):
+                if key in excluded:
+                    del rules[key]
+                    changed = True
+                elif deps[key] & excluded:
+                    excluded.add(key)
+                    del rules[key]
+                    changed = True
+
+        strata = self._stratify(rules, deps, excluded)
+        self.excluded = excluded
+
+        for key, rows in facts.items():
+            if key in excluded:
+                continue
+            relation = self.relations.setdefault(key, Relation())
+            for row, probability in rows.items():
+                relation.add(row, probability)
+        for key in rules:
+            self.relations.setdefault(key, Relation())
+            for dep in deps[key]:
+                self.relations.setdefault(dep, Relation())
+
+        for stratum in strata:
+            stratum_rules = [r for key in stratum for r in rules[key]]
+            self.rules.extend(stratum_rules)
+            self._evaluate_stratum(stratum_rules, stratum)
+
+        for r in self.rules:
+            self._negated.update(r.negative)
+        # Every predicate a negated one depends on is also sensitive
+        changed = True
+        while changed:
+            changed = False
+            for r in self.rules:
+                if r.head_key in self._negated:
+                    for dep in r.positive + r.negative:
+                        if dep not in self._negated:
+                            self._negated.add(dep)
+                            changed = True
+
+    def _stratify(self, rules, deps, excluded):
+        """Order the rule predicates into strata (SCCs in dependency order).
+
+        SCCs that contain a negative edge cannot be stratified; they and
+        everything depending on them are left to top-down resolution.
+        """
+        index, low, on_stack, stack, sccs = {}, {}, set(), [], []
+        counter = [0]
+
+        def visit(key):
+            index[key] = low[key] = counter[0]
+            counter[0] += 1
+            stack.append(key)
+            on_stack.add(key)
+            for dep in deps.get(key, ()):
+                if dep not in rules:
+                    continue
+                if dep not in index:
+                    visit(dep)
+                    low[key] = min(low[key], low[dep])
+                elif dep in on_stack:
+                    low[key] = min(low[key], index[dep])
+            if low[key] == index[key]:
+                scc = set()
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    scc.add(member)
+                    if member == key:
+                        break
+                sccs.append(scc)
+
+        for key in list(rules):
+            if key not in index:
+                visit(key)
+
+        # Tarjan emits SCCs with dependencies first
+        strata = []
+        for scc in sccs:
+            negative_cycle = any(dep in scc for key in scc for r in rules[key] for dep in r.negative)
+            if negative_cycle or any(dep in excluded for key in scc for dep in deps[key]):
+                excluded.update(scc)
+                for key in scc:
+                    del rules[key]
+                continue
+            strata.append(scc)
+        return strata
+
+    def _evaluate_stratum(self, stratum_rules, stratum):
+        """Compute a stratum's fixpoint: one naive round, then semi-naive"""
+        delta = {}
+        for r in stratum_rules:
+            for bindings, probability in self._join(r, None, None):
+                row = r.head_row(bindings)
+                if self.relations[r.head_key].add(row, probability):
+                    delta.setdefault(r.head_key, {})[row] = self.relations[r.head_key].rows[row]
+        recursive = [r for r in stratum_rules if any(key in stratum for key in r.positive)]
+        self._propagate(recursive, delta)
+
+    def _propagate(self, rules, delta):
+        """Semi-naive iteration: only join against rows that changed last round"""
+        while delta:
+            new_delta = {}
+            for r in rules:
+                for i, goal in enumerate(r.body):
+                    if goal.kind != _POS or goal.key not in delta:
+                        continue
+                    for bindings, probability in self._join(r, i, delta[goal.key]):
+                        row = r.head_row(bindings)
+                        relation = self.relations[r.head_key]
+                        if relation.add(row, probability):
+                            new_delta.setdefault(r.head_key, {})[row] = relation.rows[row]
+            delta = new_delta
+
+    def _join(self, rule, delta_pos, delta_rows):
+        """Yield (bindings, probability) for the rule body using hash lookups.
+
+        When delta_pos is given, the goal at that position only ranges over
+        delta_rows; every other goal ranges over its full relation.
+        """
+        body = rule.body
+        engine = self.engine
+        delta_index = None
+        if delta_pos is not None:
+            # Hash the delta on the positions bound when its goal is reached
+            positions = body[delta_pos].positions
+            delta_index = {}
+            for row in delta_rows:
+                delta_index.setdefault(tuple(row[p] for p in positions), []).append(row)
+
+        def solve(i, bindings, probability):
+            if i == len(body):
+                yield bindings, probability
+                return
+            goal = body[i]
+            if goal.kind == _CMP:
+                sub = Substitution({name: Term(value) for name, value in bindings.items()})
+                if engine._evaluate_comparison(goal.goal, sub) is not None:
+                    yield from solve(i + 1, bindings, probability)
+                return
+
+            key = goal.lookup_key(bindings)
+            if goal.kind == _NEG:
+                relation = self.relations.get(goal.key)
+                for row in (relation.lookup(goal.positions, key) if relation else ()):
+                    if all(row[pos] == row[goal.firsts[var]] for pos, var in goal.checks):
+                        return
+                yield from solve(i + 1, bindings, probability)
+                return
+
+            relation = self.relations[goal.key]
+            if i == delta_pos:
+                rows = delta_index.get(key, ())
+            else:
+                rows = relation.lookup(goal.positions, key)
+            for row in rows:
+                extended = dict(bindings)
+                for pos, var in goal.outputs:
+                    extended[var] = row[pos]
+                if any(row[pos] != extended[var] for pos, var in goal.checks):
+                    continue
+                row_probability = relation.rows.get(row)
+                if row_probability is None:
+                    row_probability = delta_rows[row]
+                yield from solve(i + 1, extended, probability * row_probability)
+
+        return solve(0, {}, 1.0)
+
+    # ----- Incremental maintenance -----
+
+    def insert(self, fact):
+        """Queue an asserted fact for propagation"""
+        key = (fact.predicate.name, len(fact.predicate.args))
+        row = _ground_tuple(fact.predicate)
+        if row is None or key in self._negated or key in self.excluded:
+            self.stale = True
+            return
+        if self._pending_delete:
+            self.flush()
+        self._pending_insert.setdefault(key, {})[row] = max(
+            self._pending_insert.get(key, {}).get(row, 0.0), fact.probability)
+
+    def delete(self, fact):
+        """Queue a retracted fact for DRed maintenance"""
+        key = (fact.predicate.name, len(fact.predicate.args))
+        row = _ground_tuple(fact.predicate)
+        if row is None or key in self._negated or key in self.excluded:
+            self.stale = True
+            return
+        if self._pending_insert:
+            self.flush()
+        self._pending_delete.setdefault(key, set()).add(row)
+
+    def flush(self):
+        """Apply queued insertions and deletions to the model"""
+        if self._pending_insert:
+            delta = {}
+            for key, rows in self._pending_insert.items():
+                relation = self.relations.setdefault(key, Relation())
+                for row, probability in rows.items():
+                    if relation.add(row, probability):
+                        delta.setdefault(key, {})[row] = relation.rows[row]
+            self._pending_insert = {}
+            self._propagate(self.rules, delta)
+        if self._pending_delete:
+            deleted, self._pending_delete = self._pending_delete, {}
+            self._delete_rederive(deleted)
+
+    def _delete_rederive(self, deleted):
+        """DRed: over-delete every consequence, then re-derive survivors"""
+        # 1. Over-delete: everything with a derivation through a deleted row
+        removed = {}
+        delta = {}
+        for key, rows in deleted.items():
+            relation = self.relations[key]
+            for row in rows:
+                if row in relation.rows:
+                    delta.setdefault(key, {})[row] = relation.rows[row]
+        while delta:
+            for key, rows in delta.items():
+                removed.setdefault(key, {}).update(rows)
+            new_delta = {}
+            for r in self.rules:
+                for i, goal in enumerate(r.body):
+                    if goal.kind != _POS or goal.key not in delta:
+                        continue
+                    for bindings, _ in self._join(r, i, delta[goal.key]):
+                        row = r.head_row(bindings)
+                        relation = self.relations[r.head_key]
+                        if row in relation.rows and row not in removed.get(r.head_key, ()):
+                            new_delta.setdefault(r.head_key, {})[row] = relation.rows[row]
+            delta = new_delta
+        for key, rows in removed.items():
+            relation = self.relations[key]
+            for row in rows:
+                relation.discard(row)
+
+        # 2. Re-derive: restore rows still backed by a fact or a surviving derivation
+        restored = {}
+        for key, rows in removed.items():
+            for row in rows:
+                probability = self._fact_probability(key, row)
+                if probability is not None:
+                    restored.setdefault(key, {})[row] = probability
+        for r in self.rules:
+            if r.head_key not in removed:
+                continue
+            for bindings, probability in self._join(r, None, None):
+                row = r.head_row(bindings)
+                if row in removed[r.head_key]:
+                    best = restored.setdefault(r.head_key, {})
+                    best[row] = max(best.get(row, 0.0), probability)
+        delta = {}
+        for key, rows in restored.items():
+            relation = self.relations[key]
+            for row, probability in rows.items():
+                if relation.add(row, probability):
+                    delta.setdefault(key, {})[row] = relation.rows[row]
+        self._propagate(self.rules, delta)
+
+    def _fact_probability(self, key, row):
+        """Best probability of the facts in the knowledge base for a row, or None"""
+        goal = Predicate(key[0], [Term(value) for value in row])
+        best = None
+        for item in self.engine._candidate_clauses(goal):
+            if isinstance(item, Fact) and len(item.predicate.args) == key[1] \
+                    and _ground_tuple(item.predicate) == row:
+                best = max(best or 0.0, item.probability)
+        return best
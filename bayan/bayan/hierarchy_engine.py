@@ -115,6 +115,9 @@ class HierarchyEngine:
             ]
         )
         self.logic_engine.add_rule(r2)
+        # Memoize ancestor/3 so deep or cyclic hierarchies are not re-derived
+        # for every property lookup
+        self.logic_engine.table("ancestor", 3)
 
         # 2. Property Inheritance Rules
         # rule: property(?tree, ?child, ?k, ?v) :- ancestor(?tree, ?parent, ?child), property(?tree, ?parent, ?k, ?v).
@@ -23,6 +23,8 @@ class HybridInterpreter:
 
     def __init__(self, use_bytecode=False):
         self.traditional = TraditionalInterpreter()
+        # Node type -> bound visitor (None: delegate), see interpret_traditional
+        self._visitors = {}
         self.logical = LogicalEngine()
         self.arabic_adapter = ArabicNLPAdapter()
         self.shared_env = {}
@@ -77,11 +79,16 @@ class HybridInterpreter:
         self.code_generator = None
         if self.use_bytecode:
             self.bytecode_vm = BytecodeVM()
-            self.code_generator = CodeGenerator()
+            self.code_generator = CodeGenerator(
+                host_calls=TraditionalInterpreter._INTERCEPTED_CALLS)
             # Share globals between VM and traditional interpreter
             self.bytecode_vm.globals = self.traditional.global_env
             # Share logical engine
             self.bytecode_vm.logical_engine = self.logical
+            # Calls, builtins and unsupported nodes go back to the interpreter,
+            # which in turn runs compiled function bodies on the VM
+            self.bytecode_vm.host = self.traditional
+            self.traditional.bytecode_vm = self.bytecode_vm
 
         # Action-centric helper API (no grammar changes needed)
         def _perform_api(action_name, participants, states=None, properties=None, action_value=1.0):
@@ -539,6 +546,11 @@ class HybridInterpreter:
         - Phrase statements
         - Import statements
         - Class definitions (complex OOP)
+
+        This only decides whether the whole program runs on the VM.
+        Function and method bodies are compiled one by one when called
+        (TraditionalInterpreter._function_code), so they run on the VM
+        inside programs that fail this check too.
         """
         # Types that require traditional interpretation
         non_bytecode_types = (
@@ -572,51 +584,52 @@ class HybridInterpreter:
         try:
             # Compile to bytecode
             code_obj = self.code_generator.generate(node, optimize=True)
-            # Execute on VM
-            result = self.bytecode_vm.execute(code_obj)
-            # Sync globals back to traditional interpreter
-            self.traditional.global_env.update(self.bytecode_vm.globals)
-            return result
-        except Exception as e:
-            # Fall back to traditional interpretation on any error
-            # This ensures compatibility with all Bayan features
+        except Exception:
+            # Nothing has run yet, so the tree walker can take the program
             return self.interpret_traditional(node)
+        # Execute on VM. Errors propagate: rerunning a partly executed
+        # program would repeat its side effects.
+        result = self.bytecode_vm.execute(code_obj)
+        # Sync globals back to traditional interpreter
+        self.traditional.global_env.update(self.bytecode_vm.globals)
+        return result
+
+    # Node class -> visitor method name, tested in order; anything else is
+    # delegated to the traditional interpreter
+    _NODE_VISITORS = (
+        (Program, 'visit_program'),
+        (HybridBlock, 'visit_hybrid_block'),
+        (LogicalFact, 'visit_logical_fact'),
+        (LogicalRule, 'visit_logical_rule'),
+        (LogicalQuery, 'visit_logical_query'),
+        (LogicalIfStatement, 'visit_logical_if_statement'),
+        (QueryExpression, 'visit_query_expression'),
+        (PhraseStatement, 'visit_phrase_statement'),
+        (CauseEffectStatement, 'visit_cause_effect_statement'),
+        (RelationStatement, 'visit_relation_statement'),
+        (EntityDef, 'visit_entity_def'),
+        (ConceptDef, 'visit_concept_def'),
+        (ApplyActionStmt, 'visit_apply_action_stmt'),
+        (ImportStatement, 'visit_import_statement'),
+        (FromImportStatement, 'visit_from_import_statement'),
+    )
 
     def interpret_traditional(self, node):
         """Traditional AST interpretation (original behavior)."""
-        if isinstance(node, Program):
-            return self.visit_program(node)
-        elif isinstance(node, HybridBlock):
-            return self.visit_hybrid_block(node)
-        elif isinstance(node, LogicalFact):
-            return self.visit_logical_fact(node)
-        elif isinstance(node, LogicalRule):
-            return self.visit_logical_rule(node)
-        elif isinstance(node, LogicalQuery):
-            return self.visit_logical_query(node)
-        elif isinstance(node, LogicalIfStatement):
-            return self.visit_logical_if_statement(node)
-        elif isinstance(node, QueryExpression):
-            return self.visit_query_expression(node)
-        elif isinstance(node, PhraseStatement):
-            return self.visit_phrase_statement(node)
-        elif isinstance(node, CauseEffectStatement):
-            return self.visit_cause_effect_statement(node)
-        elif isinstance(node, RelationStatement):
-            return self.visit_relation_statement(node)
-        elif isinstance(node, EntityDef):
-            return self.visit_entity_def(node)
-        elif isinstance(node, ConceptDef):
-            return self.visit_concept_def(node)
-        elif isinstance(node, ApplyActionStmt):
-            return self.visit_apply_action_stmt(node)
-        elif isinstance(node, ImportStatement):
-            return self.visit_import_statement(node)
-        elif isinstance(node, FromImportStatement):
-            return self.visit_from_import_statement(node)
-        else:
+        node_type = type(node)
+        try:
+            visitor = self._visitors[node_type]
+        except KeyError:
+            visitor = None
+            for node_class, name in self._NODE_VISITORS:
+                if issubclass(node_type, node_class):
+                    visitor = getattr(self, name)
+                    break
+            self._visitors[node_type] = visitor
+        if visitor is None:
             # Delegate to traditional interpreter
             return self.traditional.interpret(node)
+        return visitor(node)
 
     def interpret(self, node):
         """Interpret an AST node.
@@ -723,15 +736,9 @@ class HybridInterpreter:
         if not path:
             return None
         # Lazy imports to avoid cycles
-        from .lexer import HybridLexer
-        from .parser import HybridParser
+        from .compile_cache import parse_file
         from .hybrid_interpreter import HybridInterpreter
-        with open(path, 'r', encoding='utf-8') as f:
-            code = f.read()
-        lexer = HybridLexer(code)
-        tokens = lexer.tokenize()
-        parser = HybridParser(tokens)
-        ast = parser.parse()
+        ast = parse_file(path)
         mod_interp = HybridInterpreter()
         mod_interp.interpret(ast)
         proxy = self._BayanModuleProxy(mod_interp)
@@ -991,9 +998,14 @@ class HybridInterpreter:
         """Visit a logical if statement"""
         # Try to solve the condition as a logical query
         if isinstance(node.condition, LogicalQuery):
-            solutions = self.logical.query(node.condition.goal)
+            # Only existence matters here, so stop at the first solution
+            solutions = self.logical.iter_query(node.condition.goal)
+            try:
+                solved = next(solutions, None) is not None
+            finally:
+                solutions.close()
 
-            if solutions:
+            if solved:
                 # If solutions found, execute then branch
                 return self.interpret(node.then_branch)
             elif node.else_branch:
@@ -10,6 +10,8 @@ from .balagha_engine import BalaghaEngine
 from .hierarchy_engine import HierarchyEngine
 from .neural.neural_engine import NeuralEngine
 from .neural.tensor_bridge import TensorBridge
+from .neural.fact_index import FactIndex, find_fact_index
+from .neural.vector_index import create_index, load_index
 import copy
 
 class DeductionResult:
@@ -203,14 +205,22 @@ class IstinbatEngine:
 
     # --- Neural API ---
         
-    def neural_search(self, query: str, top_k: int = 3):
+    def neural_search(self, query: str, top_k: int = 3, predicates: Optional[List[str]] = None):
         """
         Search the active world's knowledge base using semantic similarity.
         This allows finding facts that mean the same thing but use different words.
+        Uses the world's fact index when build_fact_index() gave it one;
+        predicates restricts the results to those predicate names.
         """
+        fact_index = find_fact_index(self.logical_engine)
+        if fact_index is not None:
+            return fact_index.search(query, top_k, predicates)
+
         # Collect all facts from the active logical engine
         all_facts = []
-        for facts_list in self.logical_engine.knowledge_base.values():
+        for name, facts_list in self.logical_engine.knowledge_base.items():
+            if predicates is not None and name not in predicates:
+                continue
             for item in facts_list:
                 # IMPORTANT: Filter only Facts, ignore Rules
                 if isinstance(item, Fact):
@@ -218,6 +228,22 @@ class IstinbatEngine:
             
         return self.tensor_bridge.find_similar_facts(query, all_facts, top_k)
 
+    def build_fact_index(self, kind: str = 'ivf', path: Optional[str] = None, **options) -> FactIndex:
+        """
+        Give the active world a vector index over its facts, kept up to date
+        as facts are asserted and retracted.
+
+        Args:
+            kind (str): 'ivf' (approximate) or 'exact'
+            path (str): An index saved with FactIndex.save() to start from
+            **options: Index options, e.g. nprobe for 'ivf'
+        """
+        fact_index = find_fact_index(self.logical_engine)
+        if fact_index is not None:
+            fact_index.close()
+        index = load_index(path) if path else create_index(kind, **options)
+        return FactIndex(self.logical_engine, self.tensor_bridge, index)
+
     def process(self, text: str, dialect: Optional[str] = None) -> Optional[DeductionResult]:
         """
         Main entry point: Text -> Deep Deduction.
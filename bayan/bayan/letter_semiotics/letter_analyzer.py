@@ -117,12 +117,12 @@ class LetterAnalyzer:
 class WordAnalyzer:
     """محلل الكلمات الموحد - يدمج مع Camel Tools"""
 
-    def __init__(self, use_camel: bool = True):
+    def __init__(self, use_camel: bool = True, arabic_adapter=None):
         self.letter_analyzer = LetterAnalyzer()
-        self.arabic_adapter = None
+        self.arabic_adapter = arabic_adapter
 
         # محاولة تحميل Camel Tools
-        if use_camel:
+        if use_camel and arabic_adapter is None:
             try:
                 from ..arabic_adapter import ArabicNLPAdapter
                 self.arabic_adapter = ArabicNLPAdapter()
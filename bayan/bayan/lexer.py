@@ -3,7 +3,9 @@ Hybrid Lexer for Bayan Language
 محلل معجمي هجين للغة بيان
 """
 
+import bisect
 import re
+import sys
 from enum import Enum, auto
 
 class TokenType(Enum):
@@ -325,17 +327,81 @@ class TokenType(Enum):
 
 class Token:
     """Represents a token"""
-    def __init__(self, type_, value, line, column):
+    __slots__ = ('type', 'value', 'line', 'column', 'offset')
+
+    def __init__(self, type_, value, line, column, offset=None):
         self.type = type_
         self.value = value
         self.line = line
         self.column = column
+        self.offset = offset  # Index of the first character in the source
 
     def __repr__(self):
         return f"Token({self.type.name}, {repr(self.value)}, {self.line}:{self.column})"
 
+class TokenStream:
+    """A token sequence filled lazily from a token iterator.
+
+    Supports the indexing the parser does; tokens are pulled from the
+    source only when an index past the buffered ones is requested.
+    len() has to drain the source, so use has(index) for bounds checks.
+    تسلسل رموز يُملأ عند الحاجة
+    """
+
+    def __init__(self, source):
+        self._source = iter(source)
+        self._buffer = []
+        self._exhausted = False
+
+    def _fill(self, index):
+        buffer = self._buffer
+        while not self._exhausted and len(buffer) <= index:
+            try:
+                buffer.append(next(self._source))
+            except StopIteration:
+                self._exhausted = True
+
+    def _drain(self):
+        self._buffer.extend(self._source)
+        self._exhausted = True
+
+    def has(self, index):
+        """Return True if a token exists at index"""
+        self._fill(index)
+        return index < len(self._buffer)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            if index.stop is None or index.stop < 0 or (index.start or 0) < 0:
+                self._drain()
+            else:
+                self._fill(index.stop - 1)
+        elif index < 0:
+            self._drain()
+        else:
+            self._fill(index)
+        return self._buffer[index]
+
+    def __len__(self):
+        self._drain()
+        return len(self._buffer)
+
+    def __bool__(self):
+        return self.has(0)
+
+    def __iter__(self):
+        index = 0
+        while self.has(index):
+            yield self._buffer[index]
+            index += 1
+
 class HybridLexer:
-    """Hybrid lexer for Bayan language"""
+    """Hybrid lexer for Bayan language.
+
+    With intern=True identifier names are interned, so the many tokens
+    and nodes naming the same identifier share one string (worth it for
+    large generated fact files).
+    """
 
     KEYWORDS = {
         # Function definition (تعريف الدالة)
@@ -907,63 +973,216 @@ class HybridLexer:
         'أكد': TokenType.ASSERT,
     }
 
-    def __init__(self, code):
+    # Token patterns in priority order. They are joined into one master
+    # regex; Python tries alternatives left to right, so the first pattern
+    # that matches wins exactly as if they were tried one after another.
+    # A kind of None means identifier-or-keyword, a string names the
+    # scanner method for tokens that need more than a regex.
+    TOKEN_PATTERNS = [
+        (r'\?-', TokenType.QUERY),  # Query operator (?-)
+        # Logical variable (?X, ?name)
+        (r'\?[a-zA-Z_\u0600-\u06FF][a-zA-Z0-9_\u0600-\u06FF]*', TokenType.VARIABLE),
+        # Strings (f-strings first, then triple-quoted, then regular)
+        (r'f(?=["\'])', '_match_fstring'),
+        (r'(?="""|\'\'\')', '_match_triple_string'),
+        (r'"[^"]*"', TokenType.STRING),
+        (r"'[^']*'", TokenType.STRING),
+        (r'\d+(?:\.\d+)?', TokenType.NUMBER),
+        # Identifiers and keywords
+        (r'[a-zA-Z_\u0600-\u06FF][a-zA-Z0-9_\u0600-\u06FF]*', None),
+        # Operators and symbols
+        (r'←|:-', TokenType.IMPLIES),
+        (r'∈', TokenType.IN),  # Membership symbol
+        # Pipeline and composition operators (before other operators)
+        (r'\|>', TokenType.PIPELINE),
+        (r'>>', TokenType.COMPOSE),
+        # Approximate equality operators first to avoid splitting '~='
+        (r'~=|≈', TokenType.OPERATOR),
+        # Arrow operator -> (must be before - operator to avoid splitting)
+        (r'->', TokenType.ARROW),
+        # Prolog-style negation as failure \+ (must be before other backslash operators)
+        (r'\\[+]', TokenType.NOT),
+        # Prolog-style not-equal \= (must be before other operators)
+        (r'\\=', TokenType.OPERATOR),
+        (r'==|!=|<=|>=|<|>', TokenType.OPERATOR),
+        (r':=', TokenType.WALRUS),  # Walrus operator (assignment expression)
+        (r'\?\?', TokenType.NULLISH),  # Nullish coalescing operator
+        (r'\?\.', TokenType.QUESTION_DOT),  # Optional chaining (must be before DOT)
+        (r'\*\*', TokenType.STAR_STAR),  # Match ** before * to avoid splitting it
+        (r'[+\-*/%]', TokenType.OPERATOR),
+        (r'=', TokenType.ASSIGN),
+        (r'~', TokenType.TILDE),  # Tilde alone (sampling)
+        (r'\.', TokenType.DOT),
+        (r',', TokenType.COMMA),
+        (r';', TokenType.SEMICOLON),
+        (r':', TokenType.COLON),
+        (r'\(', TokenType.LPAREN),
+        (r'\)', TokenType.RPAREN),
+        (r'\{', TokenType.LBRACE),
+        (r'\}', TokenType.RBRACE),
+        (r'\[', TokenType.LBRACKET),
+        (r'\]', TokenType.RBRACKET),
+        (r'\|', TokenType.PIPE),
+        # Prolog-style term comparison operators @<, @>, @=<, @>=
+        (r'@=<|@>=|@<|@>', TokenType.OPERATOR),
+        (r'@', TokenType.AT),
+        (r'!', TokenType.CUT),
+        (r'\?', TokenType.QUESTION),
+    ]
+
+    # Each pattern is exactly one capturing group, so match.lastindex
+    # identifies the alternative that matched
+    _MASTER_PATTERN = re.compile('|'.join('(%s)' % pattern for pattern, _ in TOKEN_PATTERNS))
+    _TOKEN_KINDS = tuple(kind for _, kind in TOKEN_PATTERNS)
+    _SPACES = re.compile(r'[ \t\r]+')
+
+    def __init__(self, code, intern=False):
         self.code = code
         self.position = 0
         self.line = 1
         self.column = 1
         self.tokens = []
+        self.intern = intern
 
     def tokenize(self):
         """Tokenize the code"""
-        while self.position < len(self.code):
+        self.tokens.extend(self.iter_tokens())
+        return self.tokens
+
+    def iter_tokens(self):
+        """Yield tokens one at a time, ending with EOF.
+
+        Nothing is scanned ahead of the consumer, so a parser can pull
+        tokens as it needs them (see TokenStream).
+        توليد الرموز واحداً تلو الآخر
+        """
+        length = len(self.code)
+        while self.position < length:
             self._skip_whitespace_and_comments()
 
-            if self.position >= len(self.code):
+            if self.position >= length:
                 break
 
-            if not self._match_token():
+            token = self._match_token()
+            if token is None:
                 char = self.code[self.position]
                 raise SyntaxError(f"Unknown character '{char}' at {self.line}:{self.column}")
+            yield token
 
-        self.tokens.append(Token(TokenType.EOF, '', self.line, self.column))
-        return self.tokens
+        yield Token(TokenType.EOF, '', self.line, self.column, self.position)
+
+    @staticmethod
+    def edit_range(old_code, new_code):
+        """Return (start, old_end, new_end) of the region that differs"""
+        limit = min(len(old_code), len(new_code))
+        start = 0
+        while start < limit and old_code[start] == new_code[start]:
+            start += 1
+        old_end, new_end = len(old_code), len(new_code)
+        while old_end > start and new_end > start and old_code[old_end - 1] == new_code[new_end - 1]:
+            old_end -= 1
+            new_end -= 1
+        return start, old_end, new_end
+
+    def relex(self, previous_tokens, start, old_end, new_end):
+        """Re-tokenize after an edit, reusing the tokens outside it.
+
+        self.code is the edited source, in which self.code[start:new_end]
+        replaced old_source[start:old_end]; previous_tokens is the result
+        of tokenize() or relex() on the old source. Scanning restarts a
+        couple of tokens before the edit, so lookahead into the edited
+        text is re-evaluated, and stops at the first token after the edit
+        that lines up with an old token; the old tail is then spliced in
+        with shifted positions. The result equals tokenize() on the new
+        source.
+        إعادة التحليل المعجمي للمنطقة المعدلة فقط
+        """
+        if not previous_tokens or any(token.offset is None for token in previous_tokens):
+            return self.tokenize()
+
+        # Restart two tokens before the first one reaching the edit, since
+        # the scanner looks at most two characters past the end of a token.
+        # Token ends increase along the stream and EOF always reaches it.
+        first = bisect.bisect_left(previous_tokens, start, key=lambda token: token.offset + len(token.value))
+        restart = max(min(first, len(previous_tokens) - 1) - 2, 0)
+
+        tokens = list(previous_tokens[:restart])
+        if restart:
+            resume = previous_tokens[restart]
+            self.position, self.line, self.column = resume.offset, resume.line, resume.column
+        else:
+            self.position, self.line, self.column = 0, 1, 1
+
+        delta = new_end - old_end
+        old_index = restart
+        old_count = len(previous_tokens)
+        for token in self.iter_tokens():
+            if token.offset >= new_end:
+                # Look for an old token starting at the same place in the unchanged tail
+                old_offset = token.offset - delta
+                while old_index < old_count and previous_tokens[old_index].offset < old_offset:
+                    old_index += 1
+                if old_index < old_count:
+                    old = previous_tokens[old_index]
+                    if old.offset == old_offset and old.type == token.type and old.value == token.value:
+                        tokens.extend(self._shift_tokens(previous_tokens, old_index, token, delta))
+                        break
+            tokens.append(token)
+
+        self.tokens = tokens
+        return tokens
+
+    @staticmethod
+    def _shift_tokens(previous_tokens, index, anchor, delta):
+        """Return previous_tokens[index:] moved to line up with anchor"""
+        old = previous_tokens[index]
+        line_delta = anchor.line - old.line
+        column_delta = anchor.column - old.column
+        if not (delta or line_delta or column_delta):
+            return previous_tokens[index:]
+        shifted = []
+        for token in previous_tokens[index:]:
+            # Columns only move on the anchor's line; later lines restart at 1
+            column = token.column + column_delta if token.line == old.line else token.column
+            shifted.append(Token(token.type, token.value, token.line + line_delta, column, token.offset + delta))
+        return shifted
 
     def _skip_whitespace_and_comments(self):
         """Skip whitespace and comments"""
-        while self.position < len(self.code):
+        code = self.code
+        length = len(code)
+        while self.position < length:
+            ch = code[self.position]
             # Skip whitespace
-            if self.code[self.position] in ' \t\r':
-                self.position += 1
-                self.column += 1
+            if ch in ' \t\r':
+                end = self._SPACES.match(code, self.position).end()
+                self.column += end - self.position
+                self.position = end
             # Handle newlines
-            elif self.code[self.position] == '\n':
+            elif ch == '\n':
                 self.position += 1
                 self.line += 1
                 self.column = 1
             # Handle single-line comments (# or //)
-            elif self.code[self.position] == '#':
-                while self.position < len(self.code) and self.code[self.position] != '\n':
-                    self.position += 1
-            elif self.code[self.position:self.position + 2] == '//':
-                while self.position < len(self.code) and self.code[self.position] != '\n':
-                    self.position += 1
+            elif ch == '#' or code.startswith('//', self.position):
+                end = code.find('\n', self.position)
+                self.position = length if end == -1 else end
             # Handle multi-line comments /* ... */
-            elif self.code[self.position:self.position + 2] == '/*':
-                self.position += 2
-                self.column += 2
-                while self.position < len(self.code) - 1:
-                    if self.code[self.position:self.position + 2] == '*/':
-                        self.position += 2
-                        self.column += 2
-                        break
-                    elif self.code[self.position] == '\n':
-                        self.position += 1
-                        self.line += 1
-                        self.column = 1
-                    else:
-                        self.position += 1
-                        self.column += 1
+            elif code.startswith('/*', self.position):
+                start = self.position + 2
+                end = code.find('*/', start)
+                # An unterminated comment stops before the last character
+                stop = end if end != -1 else max(start, length - 1)
+                newlines = code.count('\n', start, stop)
+                if newlines:
+                    self.line += newlines
+                    self.column = stop - code.rfind('\n', start, stop)
+                else:
+                    self.column += 2 + stop - start
+                self.position = stop
+                if end != -1:
+                    self.position += 2
+                    self.column += 2
             else:
                 break
 
@@ -975,14 +1194,14 @@ class HybridLexer:
         """
         # Check for f" or f'
         if self.position + 1 >= len(self.code):
-            return False
+            return None
 
         if self.code[self.position] != 'f':
-            return False
+            return None
 
         next_char = self.code[self.position + 1]
         if next_char not in '"\'':
-            return False
+            return None
 
         start_pos = self.position
         start_line = self.line
@@ -1005,8 +1224,7 @@ class HybridLexer:
                 self.position += 1
                 self.column += 1
                 lexeme = self.code[start_pos:self.position]
-                self.tokens.append(Token(TokenType.FSTRING, lexeme, start_line, start_col))
-                return True
+                return Token(TokenType.FSTRING, lexeme, start_line, start_col, start_pos)
             elif ch == '\n':
                 raise SyntaxError(f"Unterminated f-string at {start_line}:{start_col}")
             else:
@@ -1022,7 +1240,7 @@ class HybridLexer:
         elif self.code.startswith("'''", self.position):
             quote = "'''"
         else:
-            return False
+            return None
         start_pos = self.position
         start_line = self.line
         start_col = self.column
@@ -1035,8 +1253,7 @@ class HybridLexer:
                 self.position += 3
                 self.column += 3
                 lexeme = self.code[start_pos:self.position]
-                self.tokens.append(Token(TokenType.STRING, lexeme, start_line, start_col))
-                return True
+                return Token(TokenType.STRING, lexeme, start_line, start_col, start_pos)
             ch = self.code[self.position]
             if ch == '\n':
                 self.position += 1
@@ -1048,142 +1265,21 @@ class HybridLexer:
         raise SyntaxError(f"Unterminated triple-quoted string at {start_line}:{start_col}")
 
     def _match_token(self):
-        """Try to match a token at current position"""
-        # Query operator (?-)
-        if self._match_pattern(r'\?-', TokenType.QUERY):
-            return True
-
-        # Logical variable (?X, ?name)
-        if self._match_pattern(r'\?[a-zA-Z_\u0600-\u06FF][a-zA-Z0-9_\u0600-\u06FF]*', TokenType.VARIABLE):
-            return True
-
-        # Strings (f-strings first, then triple-quoted, then regular)
-        if self._match_fstring():
-            return True
-        if self._match_triple_string():
-            return True
-        if self._match_pattern(r'"[^"]*"', TokenType.STRING) or self._match_pattern(r"'[^']*'", TokenType.STRING):
-            return True
-
-        # Numbers
-        if self._match_pattern(r'\d+(\.\d+)?', TokenType.NUMBER):
-            return True
-
-        # Identifiers and keywords
-        if self._match_pattern(r'[a-zA-Z_\u0600-\u06FF][a-zA-Z0-9_\u0600-\u06FF]*'):
-            return True
-
-        # Operators and symbols
-        if self._match_pattern(r'←|:-', TokenType.IMPLIES):
-            return True
-        # Membership symbol ∈
-        if self._match_pattern(r'∈', TokenType.IN):
-            return True
-        # Pipeline and composition operators (before other operators)
-        if self._match_pattern(r'\|>', TokenType.PIPELINE):
-            return True
-        if self._match_pattern(r'>>', TokenType.COMPOSE):
-            return True
-        # Approximate equality operators first to avoid splitting '~='
-        if self._match_pattern(r'~=|≈', TokenType.OPERATOR):
-            return True
-        # Arrow operator -> (must be before - operator to avoid splitting)
-        if self._match_pattern(r'->', TokenType.ARROW):
-            return True
-        # Prolog-style negation as failure \+ (must be before other backslash operators)
-        if self._match_pattern(r'\\[+]', TokenType.NOT):
-            return True
-        # Prolog-style not-equal \= (must be before other operators)
-        if self._match_pattern(r'\\=', TokenType.OPERATOR):
-            return True
-        if self._match_pattern(r'==|!=|<=|>=|<|>', TokenType.OPERATOR):
-            return True
-        # Walrus operator := (assignment expression)
-        if self._match_pattern(r':=', TokenType.WALRUS):
-            return True
-        # Nullish coalescing operator ??
-        if self._match_pattern(r'\?\?', TokenType.NULLISH):
-            return True
-        # Optional chaining ?. (must be before DOT)
-        if self._match_pattern(r'\?\.', TokenType.QUESTION_DOT):
-            return True
-        # Match ** before * to avoid splitting it
-        if self._match_pattern(r'\*\*', TokenType.STAR_STAR):
-            return True
-        if self._match_pattern(r'[+\-*/%]', TokenType.OPERATOR):
-            return True
-        if self._match_pattern(r'=', TokenType.ASSIGN):
-            return True
-        # Tilde alone (sampling)
-        if self._match_pattern(r'~', TokenType.TILDE):
-            return True
-        if self._match_pattern(r'\.', TokenType.DOT):
-            return True
-        if self._match_pattern(r',', TokenType.COMMA):
-            return True
-        if self._match_pattern(r';', TokenType.SEMICOLON):
-            return True
-        if self._match_pattern(r':', TokenType.COLON):
-            return True
-        if self._match_pattern(r'\(', TokenType.LPAREN):
-            return True
-        if self._match_pattern(r'\)', TokenType.RPAREN):
-            return True
-        if self._match_pattern(r'\{', TokenType.LBRACE):
-            return True
-        if self._match_pattern(r'\}', TokenType.RBRACE):
-            return True
-        if self._match_pattern(r'\[', TokenType.LBRACKET):
-            return True
-        if self._match_pattern(r'\]', TokenType.RBRACKET):
-            return True
-        if self._match_pattern(r'\|', TokenType.PIPE):
-            return True
-        # Prolog-style term comparison operators @<, @>, @=<, @>=
-        if self._match_pattern(r'@=<|@>=|@<|@>', TokenType.OPERATOR):
-            return True
-        if self._match_pattern(r'@', TokenType.AT):
-            return True
-        if self._match_pattern(r'!', TokenType.CUT):
-            return True
-        if self._match_pattern(r'\?', TokenType.QUESTION):
-            return True
-
-        return False
-
-    def _match_pattern(self, pattern, token_type=None):
-        """Try to match a regex pattern"""
-        regex = re.compile(pattern)
-        match = regex.match(self.code, self.position)
-
-        if match:
-            value = match.group(0)
-            self.position = match.end()
-
-            # Determine token type if not provided
-            if token_type is None:
-                if value.startswith('?'):
-                    token_type = TokenType.VARIABLE
-                elif value in self.KEYWORDS:
-                    token_type = self.KEYWORDS[value]
-                elif value[0] in '"\'':
-                    token_type = TokenType.STRING
-                elif value[0].isdigit():
-                    token_type = TokenType.NUMBER
-                else:
-                    token_type = TokenType.IDENTIFIER
-
-            self._add_token(token_type, value)
-            self.column += len(value)
-            return True
-
-        return False
-
-    def _add_token(self, token_type, value=None):
-        """Add a token to the list"""
-        if value is None:
-            value = self.code[self.position:self.position + 1]
+        """Scan the token at the current position; return it or None"""
+        match = self._MASTER_PATTERN.match(self.code, self.position)
+        if match is None:
+            return None
 
-        token = Token(token_type, value, self.line, self.column)
-        self.tokens.append(token)
+        kind = self._TOKEN_KINDS[match.lastindex - 1]
+        if isinstance(kind, str):
+            return getattr(self, kind)()
 
+        value = match.group()
+        if kind is None:
+            kind = self.KEYWORDS.get(value, TokenType.IDENTIFIER)
+            if self.intern and kind is TokenType.IDENTIFIER:
+                value = sys.intern(value)
+        token = Token(kind, value, self.line, self.column, self.position)
+        self.position = match.end()
+        self.column += len(value)
+        return token
@@ -3,8 +3,12 @@ Logical Engine for Bayan Language
 محرك منطقي للغة بيان
 """
 
+import itertools
+
 class Term:
     """Represents a logical term (constant, variable, or compound)"""
+    __slots__ = ('value', 'is_variable')
+
     def __init__(self, value, is_variable=False):
         self.value = value
         self.is_variable = is_variable
@@ -24,6 +28,8 @@ class Term:
 
 class Predicate:
     """Represents a logical predicate"""
+    __slots__ = ('name', 'args')
+
     def __init__(self, name, args):
         self.name = name
         self.args = args  # List of Term objects
@@ -82,6 +88,126 @@ class Rule:
         body_str = ", ".join(str(p) for p in self.body)
         return f"{self.head} :- {body_str}."
 
+# Kinds of entries in a compiled clause template
+_CONST, _SLOT, _PRED = 0, 1, 2
+
+
+class CompiledRule:
+    """A rule precompiled into numbered variable slots.
+
+    Each distinct variable of the rule gets a slot number once. Renaming the
+    rule apart for a new proof step then only allocates one fresh Term per
+    slot and fills the template, instead of re-walking the rule.
+    قاعدة مُجمَّعة مسبقاً بخانات مرقّمة للمتغيرات
+    """
+
+    def __init__(self, rule):
+        self.head = rule.head
+        self.body = rule.body
+        self.var_names = []  # slot -> original variable name
+        slots = {}
+
+        def compile_term(term):
+            if isinstance(term, Term) and term.is_variable:
+                slot = slots.get(term.value)
+                if slot is None:
+                    slot = slots[term.value] = len(self.var_names)
+                    self.var_names.append(term.value)
+                return (_SLOT, slot)
+            if isinstance(term, Predicate):
+                return (_PRED, (term.name, [compile_term(arg) for arg in term.args]))
+            return (_CONST, term)
+
+        self.head_template = compile_term(rule.head)
+        self.body_template = [compile_term(goal) for goal in rule.body]
+
+    def matches(self, rule):
+        """Check the template was compiled from the rule's current head/body"""
+        return self.head is rule.head and self.body is rule.body
+
+    def instantiate(self, frame_id):
+        """Return (head, body, fresh_vars) with variables renamed for frame_id"""
+        fresh = [Term(f"{name}#{frame_id}", is_variable=True) for name in self.var_names]
+
+        def build(entry):
+            kind, payload = entry
+            if kind == _SLOT:
+                return fresh[payload]
+            if kind == _PRED:
+                name, args = payload
+                return Predicate(name, [build(arg) for arg in args])
+            return payload
+
+        return build(self.head_template), [build(goal) for goal in self.body_template], fresh
+
+
+# Head-matching operations, one per argument of a compiled clause head
+_GET_CONST, _UNIFY_ARG = 0, 1
+
+
+class HeadMatcher:
+    """A clause head compiled into specialized matching closures.
+
+    Constant arguments become direct value comparisons (a WAM-style
+    get_constant); every other argument falls back to the generic unifier.
+    `prefilter(goal_args)` only reads the goal and rejects clauses whose
+    constants clash with bound goal arguments, without copying the
+    substitution. `match(goal_args, substitution, engine)` performs the full
+    head unification on a copy and returns it, or None.
+    رأس جملة مُجمَّع إلى دوال مطابقة متخصصة
+    """
+
+    def __init__(self, head):
+        self.head = head
+        args = list(head.args)
+        arity = len(args)
+        consts = tuple(
+            (i, arg.value) for i, arg in enumerate(args)
+            if type(arg) is Term and not arg.is_variable
+        )
+        ops = tuple(
+            (_GET_CONST, i, arg) if type(arg) is Term and not arg.is_variable else (_UNIFY_ARG, i, arg)
+            for i, arg in enumerate(args)
+        )
+
+        def prefilter(goal_args):
+            if len(goal_args) != arity:
+                return False
+            for i, value in consts:
+                arg = goal_args[i]
+                if type(arg) is Term:
+                    if not arg.is_variable and arg.value != value:
+                        return False
+                elif type(arg) is Predicate:
+                    return False
+            return True
+
+        def match(goal_args, substitution, engine):
+            if not prefilter(goal_args):
+                return None
+            sub = substitution.copy()
+            for op, i, term in ops:
+                arg = goal_args[i]
+                if op == _GET_CONST and type(arg) is Term:
+                    if not arg.is_variable:
+                        continue  # Already compared by prefilter
+                    bound = engine._deref(arg, sub)
+                    if type(bound) is Term and bound.is_variable:
+                        sub.bind(bound.value, term)
+                        continue
+                sub = engine._unify(arg, term, sub)
+                if sub is None:
+                    return None
+            return sub
+
+        self.prefilter = prefilter
+        self.match = match
+
+    def matches(self, head):
+        """Check the closures were compiled from this head"""
+        return self.head is head
+
+
 class Substitution:
     """Represents variable substitutions with an accumulated probability."""
     def __init__(self, bindings=None, probability=1.0):
@@ -106,6 +232,79 @@ class Substitution:
     def __repr__(self):
         return f"Substitution({self.bindings})"
 
+_MISSING = object()  # No value, as opposed to the value None
+
+def _single(substitution):
+    """Iterator over one solution, or over none when substitution is None"""
+    return iter(() if substitution is None else (substitution,))
+
+
+class PersistentSubstitution(Substitution):
+    """Substitution with O(1) copies, usable wherever Substitution is.
+
+    New bindings go into a private layer. copy() freezes that layer and
+    shares it, together with the older frozen layers, between the original
+    and the copy, so extending a substitution or abandoning it on
+    backtracking never copies existing bindings. Lookups search the layers
+    newest first; long chains are merged back into one layer.
+    Reading `bindings` flattens the layers into a plain dict.
+    استبدال بنسخ ثابت الكلفة عبر طبقات مشتركة
+    """
+
+    max_layers = 16  # Merge the frozen chain once it gets this long
+
+    def __init__(self, bindings=None, probability=1.0, layers=()):
+        self._local = bindings if bindings is not None else {}
+        self._layers = layers  # Frozen dicts shared with copies, newest first
+        try:
+            self.probability = float(probability)
+        except Exception:
+            self.probability = 1.0
+
+    @property
+    def bindings(self):
+        if self._layers:
+            merged = {}
+            for layer in reversed(self._layers):
+                merged.update(layer)
+            merged.update(self._local)
+            self._local = merged
+            self._layers = ()
+        return self._local
+
+    @bindings.setter
+    def bindings(self, value):
+        self._local = value
+        self._layers = ()
+
+    def bind(self, var_name, value):
+        """Bind a variable to a value"""
+        self._local[var_name] = value
+
+    def lookup(self, var_name):
+        """Look up a variable"""
+        value = self._local.get(var_name, _MISSING)
+        if value is not _MISSING:
+            return value
+        for layer in self._layers:
+            value = layer.get(var_name, _MISSING)
+            if value is not _MISSING:
+                return value
+        return None
+
+    def copy(self):
+        """Create a copy of this substitution in O(1)"""
+        if self._local:
+            layers = (self._local,) + self._layers
+            if len(layers) > self.max_layers:
+                merged = {}
+                for layer in reversed(layers):
+                    merged.update(layer)
+                layers = (merged,)
+            self._layers = layers
+            self._local = {}
+        return PersistentSubstitution({}, self.probability, self._layers)
+
 class ProofNode:
     """Represents a node in the proof tree"""
     def __init__(self, goal, rule=None, children=None, substitution=None):
@@ -125,15 +324,242 @@ class ProofNode:
             'substitution': str(self.substitution)
         }
 
+# Marker for clause arguments that cannot be used as an index key
+# (variables, compound terms, lists, unhashable values)
+_UNINDEXED = object()
+
+
+def _index_key(arg):
+    """Return the index key for a clause/goal argument, or _UNINDEXED"""
+    if isinstance(arg, Term):
+        if arg.is_variable:
+            return _UNINDEXED
+        value = arg.value
+    elif isinstance(arg, (str, int, float)):
+        value = arg
+    else:
+        return _UNINDEXED
+    try:
+        hash(value)
+    except TypeError:
+        return _UNINDEXED
+    return value
+
+
+def _clause_head(clause):
+    """Return the head predicate of a Fact or Rule"""
+    if isinstance(clause, Fact):
+        return clause.predicate
+    if isinstance(clause, Rule):
+        return clause.head
+    return None
+
+
+class ClauseIndex:
+    """Argument index over the clauses of one predicate.
+
+    Argument positions are indexed on demand, the first time a goal arrives
+    with that position bound. Each position maps a constant to the clauses
+    that could match it. Clauses whose argument is a variable (or is not
+    indexable) are kept in every bucket, so each candidate list preserves
+    the original clause order.
+    فهرس وسائط الجمل لتسريع البحث في قاعدة المعرفة
+    """
+
+    def __init__(self, clauses):
+        self.clauses = clauses  # The live list stored in knowledge_base
+        self.size = len(clauses)
+        self.positions = {}  # {arg_pos: (buckets, wildcards)}
+
+    def is_current(self, clauses):
+        """Check the index still describes the given clause list"""
+        return clauses is self.clauses and len(clauses) == self.size
+
+    def candidates(self, pos, key):
+        """Return the clauses (in order) that may unify with key at pos"""
+        entry = self.positions.get(pos)
+        if entry is None:
+            entry = self._build(pos)
+        buckets, wildcards = entry
+        return buckets.get(key, wildcards)
+
+    def append(self, clause):
+        """Record a clause added at the end of the predicate"""
+        self.size += 1
+        for pos, (buckets, wildcards) in self.positions.items():
+            key = self._key_at(clause, pos)
+            if key is _UNINDEXED:
+                wildcards.append(clause)
+                for bucket in buckets.values():
+                    bucket.append(clause)
+            else:
+                bucket = buckets.get(key)
+                if bucket is None:
+                    bucket = buckets[key] = list(wildcards)
+                bucket.append(clause)
+
+    def prepend(self, clause):
+        """Record a clause added at the beginning of the predicate"""
+        self.size += 1
+        for pos, (buckets, wildcards) in self.positions.items():
+            key = self._key_at(clause, pos)
+            if key is _UNINDEXED:
+                wildcards.insert(0, clause)
+                for bucket in buckets.values():
+                    bucket.insert(0, clause)
+            else:
+                bucket = buckets.get(key)
+                if bucket is None:
+                    buckets[key] = [clause] + wildcards
+                else:
+                    bucket.insert(0, clause)
+
+    def remove(self, clause):
+        """Record the removal of a clause"""
+        self.size -= 1
+        for pos, (buckets, wildcards) in self.positions.items():
+            key = self._key_at(clause, pos)
+            if key is _UNINDEXED:
+                self._remove_identity(wildcards, clause)
+                for bucket in buckets.values():
+                    self._remove_identity(bucket, clause)
+            elif key in buckets:
+                self._remove_identity(buckets[key], clause)
+
+    def _build(self, pos):
+        buckets = {}
+        wildcards = []
+        for clause in self.clauses:
+            key = self._key_at(clause, pos)
+            if key is _UNINDEXED:
+                wildcards.append(clause)
+                for bucket in buckets.values():
+                    bucket.append(clause)
+            else:
+                bucket = buckets.get(key)
+                if bucket is None:
+                    bucket = buckets[key] = list(wildcards)
+                bucket.append(clause)
+        entry = (buckets, wildcards)
+        self.positions[pos] = entry
+        return entry
+
+    @staticmethod
+    def _key_at(clause, pos):
+        head = _clause_head(clause)
+        if head is None or pos >= len(head.args):
+            return _UNINDEXED
+        return _index_key(head.args[pos])
+
+    @staticmethod
+    def _remove_identity(clauses, clause):
+        for i, item in enumerate(clauses):
+            if item is clause:
+                del clauses[i]
+                return
+
+
+def _variant_key(term, var_numbers=None):
+    """Return a hashable key that is equal for variant terms.
+
+    Two terms are variants when they are equal up to a consistent renaming
+    of variables, e.g. path(a, ?X) and path(a, ?Y).
+    """
+    if var_numbers is None:
+        var_numbers = {}
+    if isinstance(term, Term):
+        if term.is_variable:
+            return ('$VAR', var_numbers.setdefault(term.value, len(var_numbers)))
+        term = term.value
+    if isinstance(term, Predicate):
+        return ('$PRED', term.name, tuple(_variant_key(arg, var_numbers) for arg in term.args))
+    if isinstance(term, list):
+        return ('$LIST', tuple(_variant_key(item, var_numbers) for item in term))
+    try:
+        hash(term)
+    except TypeError:
+        return ('$REPR', repr(term))
+    return term
+
+
+def _is_ground(term):
+    """Check that a term contains no variables"""
+    if isinstance(term, Term):
+        return not term.is_variable
+    if isinstance(term, Predicate):
+        return all(_is_ground(arg) for arg in term.args)
+    if isinstance(term, list):
+        return all(_is_ground(item) for item in term)
+    return True
+
+
+class AnswerTable:
+    """Answers collected for one tabled call variant.
+
+    Answers are kept in discovery order with the highest probability seen
+    for each. A table is complete once its fixpoint has been reached.
+    جدول الإجابات المحفوظة لاستدعاء مجدول
+    """
+
+    def __init__(self):
+        self.answers = []  # [answer_predicate, probability, is_ground]
+        self.keys = {}  # {variant_key: position in answers}
+        self.complete = False
+
+    def add(self, answer, probability):
+        """Add an answer; return True if it was not already in the table"""
+        key = _variant_key(answer)
+        pos = self.keys.get(key)
+        if pos is not None:
+            if probability > self.answers[pos][1]:
+                self.answers[pos][1] = probability
+            return False
+        self.keys[key] = len(self.answers)
+        self.answers.append([answer, probability, _is_ground(answer)])
+        return True
+
+
+class _TableFrame:
+    """A tabled call whose fixpoint is still being computed"""
+
+    def __init__(self, table, position):
+        self.table = table
+        self.position = position  # Index in the tabling stack
+        self.low = position  # Lowest stack position this call depends on
+        self.members = []  # Tables in the same SCC waiting for completion
+
+
 class LogicalEngine:
     """The logical inference engine"""
-    
+
     def __init__(self):
         self.knowledge_base = {}  # {predicate_name: [facts/rules]}
         self.call_stack = []
         self.max_depth = 1000
         self.trace = []  # List of strings describing inference steps
         self.function_evaluator = None  # Callback for evaluating external functions
+        self._frame_counter = itertools.count(1)  # Fresh ids for renaming rules apart
+        # Class used for fresh substitutions; PersistentSubstitution is a
+        # drop-in alternative with O(1) copies
+        self.substitution_class = Substitution
+        # Opt-in clause compiler: match clause heads with specialized closures
+        self.compile_clauses = False
+        # Argument indexes per predicate, built lazily for large predicates
+        self._clause_indexes = {}  # {predicate_name: ClauseIndex}
+        self.index_threshold = 8  # Minimum clause count before indexing
+        # Tabling (memoized answers with fixpoint completion)
+        self.tabled = set()  # {(predicate_name, arity)}
+        self._tables = {}  # {(predicate_name, arity): {variant_key: AnswerTable}}
+        self._table_stack = []  # _TableFrame for each call being completed
+        self._active_tables = {}  # {(pred_key, variant_key): _TableFrame}
+        self._table_changes = 0  # Bumped whenever any table gains an answer
+        self._table_deps = None  # Cached {pred_key: predicates it depends on}
+        # Bottom-up evaluation: 'topdown' (SLD resolution) or 'datalog'
+        self.mode = 'topdown'
+        self._datalog = None  # DatalogModel while mode == 'datalog'
+        # Callables listener(clause, added) told of every assert and retract,
+        # e.g. a neural FactIndex keeping its vectors in step
+        self.listeners = []
 
     def check_contradictions(self):
         """Check for logical contradictions in the knowledge base.
@@ -246,7 +672,7 @@ class LogicalEngine:
     def solve_with_proof(self, goal, substitution=None):
         """Solve a goal and return ProofNodes"""
         if substitution is None:
-            substitution = Substitution()
+            substitution = self.substitution_class()
         
         return self._solve_goal_proof(goal, substitution)
 
@@ -324,6 +750,11 @@ class LogicalEngine:
         if pred_name not in self.knowledge_base:
             self.knowledge_base[pred_name] = []
         self.knowledge_base[pred_name].append(fact)
+        self._index_appended(pred_name, fact)
+        if self.compile_clauses:
+            self._head_matcher(fact)
+        self._update_model(fact)
+        self._invalidate_tables(pred_name)
     
     def add_rule(self, rule):
         """Add a rule to the knowledge base"""
@@ -331,6 +762,11 @@ class LogicalEngine:
         if pred_name not in self.knowledge_base:
             self.knowledge_base[pred_name] = []
         self.knowledge_base[pred_name].append(rule)
+        self._index_appended(pred_name, rule)
+        if self.compile_clauses:
+            self._head_matcher(rule)
+        self._update_model(rule)
+        self._invalidate_tables(pred_name, rules_changed=True)
 
     def assertz(self, fact_or_rule):
         """Add a fact or rule at the end of the knowledge base (Prolog assertz)"""
@@ -345,16 +781,20 @@ class LogicalEngine:
         """Add a fact or rule at the beginning of the knowledge base (Prolog asserta)"""
         if isinstance(fact_or_rule, Fact):
             pred_name = fact_or_rule.predicate.name
-            if pred_name not in self.knowledge_base:
-                self.knowledge_base[pred_name] = []
-            self.knowledge_base[pred_name].insert(0, fact_or_rule)
         elif isinstance(fact_or_rule, Rule):
             pred_name = fact_or_rule.head.name
-            if pred_name not in self.knowledge_base:
-                self.knowledge_base[pred_name] = []
-            self.knowledge_base[pred_name].insert(0, fact_or_rule)
         else:
             raise TypeError("asserta requires a Fact or Rule")
+        if pred_name not in self.knowledge_base:
+            self.knowledge_base[pred_name] = []
+        self.knowledge_base[pred_name].insert(0, fact_or_rule)
+        index = self._current_index(pred_name, added=1)
+        if index is not None:
+            index.prepend(fact_or_rule)
+        if self.compile_clauses:
+            self._head_matcher(fact_or_rule)
+        self._invalidate_tables(pred_name, rules_changed=isinstance(fact_or_rule, Rule))
+        self._update_model(fact_or_rule)
 
     def retract(self, predicate):
         """Remove the first matching fact or rule from the knowledge base (Prolog retract)"""
@@ -363,15 +803,22 @@ class LogicalEngine:
             return False
 
         # Find and remove first matching fact/rule
-        for i, item in enumerate(self.knowledge_base[pred_name]):
-            if isinstance(item, Fact):
-                if self._unify(item.predicate, predicate, Substitution()) is not None:
-                    self.knowledge_base[pred_name].pop(i)
-                    return True
-            elif isinstance(item, Rule):
-                if self._unify(item.head, predicate, Substitution()) is not None:
-                    self.knowledge_base[pred_name].pop(i)
-                    return True
+        clauses = self.knowledge_base[pred_name]
+        for item in self._candidate_clauses(predicate):
+            head = _clause_head(item)
+            if head is None:
+                continue
+            if self._unify(head, predicate, self.substitution_class()) is not None:
+                for i, clause in enumerate(clauses):
+                    if clause is item:
+                        del clauses[i]
+                        break
+                index = self._current_index(pred_name, added=-1)
+                if index is not None:
+                    index.remove(item)
+                self._invalidate_tables(pred_name, rules_changed=isinstance(item, Rule))
+                self._update_model(item, added=False)
+                return True
         return False
 
     def retractall(self, predicate):
@@ -383,61 +830,330 @@ class LogicalEngine:
         # Find and remove all matching facts/rules
         count = 0
         items_to_keep = []
+        removed = []
         for item in self.knowledge_base[pred_name]:
             if isinstance(item, Fact):
-                if self._unify(item.predicate, predicate, Substitution()) is None:
+                if self._unify(item.predicate, predicate, self.substitution_class()) is None:
                     items_to_keep.append(item)
                 else:
                     count += 1
+                    removed.append(item)
             elif isinstance(item, Rule):
-                if self._unify(item.head, predicate, Substitution()) is None:
+                if self._unify(item.head, predicate, self.substitution_class()) is None:
                     items_to_keep.append(item)
                 else:
                     count += 1
+                    removed.append(item)
 
         self.knowledge_base[pred_name] = items_to_keep
+        self._clause_indexes.pop(pred_name, None)
+        if count:
+            self._invalidate_tables(pred_name, rules_changed=True)
+        for item in removed:
+            self._update_model(item, added=False)
         return count
 
+    def _current_index(self, pred_name, added=0):
+        """Return the clause index for pred_name if it is still in sync.
+
+        `added` is the change in clause count the caller has just made;
+        an index that does not account for exactly that change is dropped
+        and rebuilt lazily on the next indexed lookup.
+        """
+        index = self._clause_indexes.get(pred_name)
+        if index is None:
+            return None
+        clauses = self.knowledge_base.get(pred_name)
+        if clauses is index.clauses and len(clauses) == index.size + added:
+            return index
+        del self._clause_indexes[pred_name]
+        return None
+
+    def _index_appended(self, pred_name, clause):
+        index = self._current_index(pred_name, added=1)
+        if index is not None:
+            index.append(clause)
+
+    def _candidate_clauses(self, goal):
+        """Return the clauses of goal's predicate that may unify with it.
+
+        Small predicates are scanned directly. For larger ones, every bound
+        argument position is looked up in the clause index and the most
+        selective candidate list wins. Clause order is preserved.
+        """
+        clauses = self.knowledge_base.get(goal.name)
+        if not clauses or len(clauses) < self.index_threshold:
+            return clauses or []
+
+        bound = []
+        for pos, arg in enumerate(goal.args):
+            key = _index_key(arg)
+            if key is not _UNINDEXED:
+                bound.append((pos, key))
+        if not bound:
+            return clauses
+
+        index = self._clause_indexes.get(goal.name)
+        if index is None or not index.is_current(clauses):
+            index = ClauseIndex(clauses)
+            self._clause_indexes[goal.name] = index
+
+        best = clauses
+        for pos, key in bound:
+            candidates = index.candidates(pos, key)
+            if len(candidates) < len(best):
+                best = candidates
+                if not best:
+                    break
+        return best
+
+    def table(self, pred_name, arity):
+        """Enable tabling for pred_name/arity (Prolog ':- table pred/N.').
+
+        Calls to a tabled predicate are memoized per call variant and their
+        answers are completed to a fixpoint, so left-recursive and cyclic
+        definitions terminate and repeated subgoals are computed once.
+        تفعيل الجدولة (حفظ الإجابات) لمسند
+        """
+        pred_key = (pred_name, int(arity))
+        self.tabled.add(pred_key)
+        self._tables.pop(pred_key, None)
+        self._table_deps = None
+
+    def abolish_all_tables(self):
+        """Discard every memoized answer table"""
+        self._tables.clear()
+
+    def _tabled_dependencies(self):
+        """Return {pred_key: names of predicates it depends on, transitively}"""
+        if self._table_deps is not None:
+            return self._table_deps
+
+        def body_predicates(goals, found):
+            for goal in goals:
+                if isinstance(goal, Predicate):
+                    found.add(goal.name)
+                    body_predicates(goal.args, found)
+                elif isinstance(goal, list):
+                    body_predicates(goal, found)
+                elif isinstance(goal, Term) and isinstance(goal.value, Predicate):
+                    body_predicates([goal.value], found)
+
+        deps = {}
+        for pred_key in self.tabled:
+            seen = set()
+            pending = [pred_key[0]]
+            while pending:
+                name = pending.pop()
+                if name in seen:
+                    continue
+                seen.add(name)
+                called = set()
+                for item in self.knowledge_base.get(name, ()):
+                    if isinstance(item, Rule):
+                        body_predicates(item.body, called)
+                pending.extend(called - seen)
+            deps[pred_key] = seen
+        self._table_deps = deps
+        return deps
+
+    def _invalidate_tables(self, pred_name, rules_changed=False):
+        """Drop answer tables that depend on pred_name"""
+        if rules_changed:
+            self._table_deps = None
+        if not self._tables:
+            return
+        deps = self._tabled_dependencies()
+        for pred_key in list(self._tables):
+            if pred_name in deps.get(pred_key, ()):
+                del self._tables[pred_key]
+
+    def materialize(self):
+        """Compute the bottom-up model of the Datalog part of the knowledge base.
+
+        Ground facts and rules built from plain predicates, not/1 and
+        comparisons are evaluated semi-naively, stratum by stratum, and the
+        engine switches to mode 'datalog': queries on materialized
+        predicates become hash lookups, everything else still uses SLD
+        resolution. Asserted and retracted facts are maintained
+        incrementally; rule changes recompute the model on the next query.
+        Returns {(predicate_name, arity): number of rows}.
+        حساب النموذج الكامل لجزء داتالوغ من قاعدة المعرفة
+        """
+        from .datalog import DatalogModel
+
+        self.mode = 'datalog'
+        self._datalog = DatalogModel(self)
+        return {key: len(relation) for key, relation in self._datalog.relations.items()}
+
+    def _update_model(self, clause, added=True):
+        """Keep the listeners and the materialized Datalog model in step with a knowledge-base change"""
+        for listener in self.listeners:
+            listener(clause, added)
+        model = self._datalog
+        if model is None:
+            return
+        if self.mode != 'datalog':
+            self._datalog = None
+        elif isinstance(clause, Rule):
+            model.stale = True
+        elif added:
+            model.insert(clause)
+        else:
+            model.delete(clause)
+
+    def _materialized_relation(self, goal):
+        """Return the up-to-date Relation answering goal, or None for top-down goals"""
+        model = self._datalog
+        if model is None or model.stale:
+            self.materialize()
+            model = self._datalog
+        else:
+            model.flush()
+        pred_key = (goal.name, len(goal.args))
+        if pred_key in model.excluded:
+            return None
+        return model.relations.get(pred_key)
+
+    def _iter_relation(self, goal, relation, substitution):
+        """Answer an instantiated goal from a materialized relation"""
+        positions, key = [], []
+        for pos, arg in enumerate(goal.args):
+            if isinstance(arg, Term) and not arg.is_variable:
+                try:
+                    hash(arg.value)
+                except TypeError:
+                    continue
+                positions.append(pos)
+                key.append(arg.value)
+
+        for row in list(relation.lookup(tuple(positions), tuple(key))):
+            probability = relation.rows.get(row)
+            if probability is None:
+                continue  # Retracted while this call was iterating
+            answer = Predicate(goal.name, [Term(value) for value in row])
+            new_sub = self._unify(goal, answer, substitution.copy())
+            if new_sub is not None:
+                new_sub.probability = float(getattr(substitution, 'probability', 1.0)) * probability
+                yield new_sub
+
+    def _iter_tabled(self, goal, substitution):
+        """Answer a call to a tabled predicate from its answer table"""
+        pred_key = (goal.name, len(goal.args))
+        variant = _variant_key(goal)
+        tables = self._tables.setdefault(pred_key, {})
+        table = tables.get(variant)
+
+        if table is None or not table.complete:
+            frame = self._active_tables.get((pred_key, variant))
+            if frame is not None:
+                # Recursive call to a variant that is still being completed:
+                # consume the answers found so far and record the dependency.
+                top = self._table_stack[-1]
+                top.low = min(top.low, frame.position)
+                table = frame.table
+            else:
+                table = self._complete_table(goal, pred_key, variant, tables)
+
+        for answer, probability, ground in list(table.answers):
+            if not ground:
+                answer = self._rename_variables(Rule(answer, [])).head
+            new_sub = self._unify(goal, answer, substitution.copy())
+            if new_sub is not None:
+                new_sub.probability = float(getattr(substitution, 'probability', 1.0)) * probability
+                yield new_sub
+
+    def _complete_table(self, goal, pred_key, variant, tables):
+        """Evaluate a tabled call until no table in its SCC gains answers"""
+        table = tables.get(variant)
+        if table is None:
+            table = tables[variant] = AnswerTable()
+
+        frame = _TableFrame(table, len(self._table_stack))
+        self._table_stack.append(frame)
+        self._active_tables[(pred_key, variant)] = frame
+        try:
+            while True:
+                changes_before = self._table_changes
+                for sol in self._iter_clauses(goal, self.substitution_class()):
+                    answer = self._apply_substitution(goal, sol)
+                    if table.add(answer, float(getattr(sol, 'probability', 1.0))):
+                        self._table_changes += 1
+                if self._table_changes == changes_before:
+                    break
+        finally:
+            self._table_stack.pop()
+            del self._active_tables[(pred_key, variant)]
+
+        if frame.low == frame.position:
+            # SCC leader: every table evaluated under it is now complete
+            table.complete = True
+            for member in frame.members:
+                member.complete = True
+        else:
+            # Depends on a call still in progress; the leader completes it
+            parent = self._table_stack[-1]
+            parent.low = min(parent.low, frame.low)
+            parent.members.append(table)
+            parent.members.extend(frame.members)
+        return table
+
     def query(self, goal, substitution=None):
         """Execute a query and return all solutions"""
+        return list(self.iter_query(goal, substitution))
+
+    def iter_query(self, goal, substitution=None):
+        """Execute a query lazily, yielding solutions one at a time.
+
+        Solutions are produced on demand, so callers that only need the
+        first N answers (once, limit, collect ... limit) stop the search
+        as soon as they stop iterating.
+        تنفيذ استعلام بشكل كسول: تُولَّد الحلول عند الطلب
+        """
         if substitution is None:
-            substitution = Substitution()
-        
+            substitution = self.substitution_class()
+
         if len(self.call_stack) > self.max_depth:
             raise RuntimeError("Maximum recursion depth exceeded")
-        
+
         self.call_stack.append(goal)
         self._log_trace(f"Goal: {goal}", depth=len(self.call_stack)-1)
+        solved = False
         try:
-            solutions = self._solve_goal(goal, substitution)
-            if solutions:
-                self._log_trace(f"✓ Solved: {goal}", depth=len(self.call_stack)-1)
-            else:
+            for solution in self._iter_goal(goal, substitution):
+                if not solved:
+                    solved = True
+                    self._log_trace(f"✓ Solved: {goal}", depth=len(self.call_stack)-1)
+                yield solution
+            if not solved:
                 self._log_trace(f"✗ Failed: {goal}", depth=len(self.call_stack)-1)
         finally:
             self.call_stack.pop()
-        
-        return solutions
-    
+
     def _solve_goal(self, goal, substitution):
-        """Solve a single goal (predicate, IsExpression, or comparison)"""
+        """Solve a single goal and return all solutions as a list"""
+        return list(self._iter_goal(goal, substitution))
+
+    def _iter_goal(self, goal, substitution):
+        """Solve a single goal (predicate, IsExpression, or comparison), returning
+        an iterator over its solutions.
+
+        This is a plain function rather than a generator: it picks the
+        iterator that solves the goal and returns it, so dispatching a goal
+        adds no frame to the chain of suspended generators. Together with
+        the flat rule and body solvers below, each resolution level costs
+        two generator frames, which keeps deep untabled recursion within
+        Python's recursion limit.
+        """
         from .ast_nodes import IsExpression
 
-        solutions = []
-
         # Handle IsExpression: ?X is 5 + 3
         if isinstance(goal, IsExpression):
-            result = self._evaluate_is_expression(goal, substitution)
-            if result is not None:
-                solutions.append(result)
-            return solutions
+            return _single(self._evaluate_is_expression(goal, substitution))
 
         # Handle comparison predicates: _compare_>, _compare_<, etc.
         if isinstance(goal, Predicate) and goal.name.startswith('_compare_'):
-            result = self._evaluate_comparison(goal, substitution)
-            if result is not None:
-                solutions.append(result)
-            return solutions
+            return _single(self._evaluate_comparison(goal, substitution))
 
         # Handle unification predicate: _unify(X, Y) - Prolog-style X = Y
         if isinstance(goal, Predicate) and goal.name == '_unify':
@@ -448,10 +1164,8 @@ class LogicalEngine:
                 left_val = self._apply_substitution(left, substitution)
                 right_val = self._apply_substitution(right, substitution)
                 # Try to unify
-                new_sub = self._unify(left_val, right_val, substitution)
-                if new_sub is not None:
-                    solutions.append(new_sub)
-            return solutions
+                return _single(self._unify(left_val, right_val, substitution))
+            return _single(None)
 
         # Handle built-in predicates
         if isinstance(goal, Predicate):
@@ -496,117 +1210,147 @@ class LogicalEngine:
                     thr_eval = self._evaluate_arithmetic(goal.args[0], substitution)
                     if thr_eval is not None:
                         thr = float(thr_eval)
-                return [substitution] if getattr(substitution, 'probability', 1.0) >= thr else []
+                if getattr(substitution, 'probability', 1.0) >= thr:
+                    return _single(substitution)
+                return _single(None)
 
             if goal.name == 'prob_ge' and len(goal.args) == 1:
                 thr_eval = self._evaluate_arithmetic(goal.args[0], substitution)
                 if thr_eval is None:
-                    return []
+                    return _single(None)
                 thr = float(thr_eval)
-                return [substitution] if getattr(substitution, 'probability', 1.0) >= thr else []
+                if getattr(substitution, 'probability', 1.0) >= thr:
+                    return _single(substitution)
+                return _single(None)
 
             if goal.name == 'probability' and len(goal.args) == 1:
                 p = float(getattr(substitution, 'probability', 1.0))
-                new_sub = self._unify(goal.args[0], p, substitution.copy())
-                return [new_sub] if new_sub is not None else []
+                return _single(self._unify(goal.args[0], p, substitution.copy()))
 
         # Apply current substitution to the goal
         goal = self._apply_substitution(goal, substitution)
 
-        pred_name = goal.name
-        if pred_name not in self.knowledge_base:
-            return solutions
+        if self.mode == 'datalog':
+            relation = self._materialized_relation(goal)
+            if relation is not None:
+                return self._iter_relation(goal, relation, substitution)
 
-        # Try to unify with facts and rules
-        for item in self.knowledge_base[pred_name]:
+        if self.tabled and (goal.name, len(goal.args)) in self.tabled:
+            return self._iter_tabled(goal, substitution)
+
+        return self._iter_clauses(goal, substitution)
+
+    def _iter_clauses(self, goal, substitution):
+        """Resolve an instantiated goal against the knowledge base clauses"""
+        # Try to unify with facts and rules. The candidate list is
+        # snapshotted so that assert/retract while a caller is still
+        # iterating does not change the clauses this call sees (logical
+        # update view).
+        compiled = self.compile_clauses
+        for item in tuple(self._candidate_clauses(goal)):
             if isinstance(item, Fact):
                 # Try to unify with the fact
-                new_sub = self._unify(goal, item.predicate, substitution.copy())
+                if compiled:
+                    new_sub = self._head_matcher(item).match(goal.args, substitution, self)
+                else:
+                    new_sub = self._unify(goal, item.predicate, substitution.copy())
                 if new_sub is not None:
                     # Propagate and aggregate probability multiplicatively
                     try:
                         new_sub.probability = float(getattr(substitution, 'probability', 1.0)) * float(getattr(item, 'probability', 1.0))
                     except Exception:
                         new_sub.probability = getattr(substitution, 'probability', 1.0)
-                    solutions.append(new_sub)
+                    yield new_sub
 
             elif isinstance(item, Rule):
                 # Try to prove the rule
-                rule_solutions = self._prove_rule(item, goal, substitution)
-                solutions.extend(rule_solutions)
+                yield from self._iter_rule(item, goal, substitution)
 
-        return solutions
-    
     def _prove_rule(self, rule, goal, substitution):
-        """Prove a rule"""
-        solutions = []
+        """Prove a rule and return all solutions as a list"""
+        return list(self._iter_rule(rule, goal, substitution))
+
+    def _iter_rule(self, rule, goal, substitution):
+        """Prove a rule, returning an iterator over its solutions.
+
+        The head is unified here and the body solver maps the renamed
+        variables back, so the rule itself adds no generator frame.
+        """
+        # Reject heads with clashing constants before renaming the rule
+        if self.compile_clauses and not self._head_matcher(rule).prefilter(goal.args):
+            return _single(None)
 
         # Rename variables in the rule to avoid conflicts
-        renamed_rule = self._rename_variables(rule)
-        var_mapping = self.var_mapping.copy()  # Save the mapping
+        renamed_rule, var_mapping = self._instantiate_rule(rule)
 
-        # Unify the goal with the rule head
-        head_sub = self._unify(goal, renamed_rule.head, substitution)
+        # Unify the goal with the rule head. Work on a copy: the caller's
+        # substitution is still needed for the remaining clauses.
+        head_sub = self._unify(goal, renamed_rule.head, substitution.copy())
         if head_sub is None:
-            return solutions
-            
+            return _single(None)
+
         self._log_trace(f"Applying rule: {rule}", depth=len(self.call_stack))
 
         # Prove the body
-        body_solutions = self._prove_body(renamed_rule.body, head_sub)
+        return self._iter_body(renamed_rule.body, head_sub, var_mapping)
 
-        # Map renamed variables back to original variables
-        for sol in body_solutions:
-            for renamed_var, original_var in var_mapping.items():
-                if renamed_var in sol.bindings:
-                    sol.bindings[original_var] = sol.bindings[renamed_var]
-            solutions.append(sol)
-
-        return solutions
-    
     def _prove_body(self, body, substitution):
-        """Prove a list of goals (conjunction) with cut support"""
-        from .ast_nodes import Cut
-
-        if not body:
-            return [substitution]
+        """Prove a list of goals (conjunction) and return all solutions as a list"""
+        return list(self._iter_body(body, substitution))
 
-        solutions = []
-        first_goal = body[0]
-        rest_goals = body[1:]
+    def _iter_body(self, body, substitution, var_mapping=None):
+        """Prove a list of goals (conjunction) with cut support, yielding solutions
 
-        # Handle cut operator
-        if isinstance(first_goal, Cut):
-            # Cut prevents backtracking
-            # Execute remaining goals without allowing backtracking
-            if rest_goals:
-                rest_solutions = self._prove_body(rest_goals, substitution)
-                # Return only the first solution (or all solutions from remaining goals)
-                # but prevent backtracking to alternative clauses
-                return rest_solutions
-            else:
-                return [substitution]
-
-        # Solve the first goal
-        first_solutions = self._solve_goal(first_goal, substitution)
-
-        # Check if there's a cut in the remaining goals
-        has_cut = any(isinstance(g, Cut) for g in rest_goals)
-
-        # For each solution, solve the rest
-        for sol in first_solutions:
-            if rest_goals:
-                rest_solutions = self._prove_body(rest_goals, sol)
-                solutions.extend(rest_solutions)
+        The goals are solved with an explicit stack holding one solution
+        iterator per goal, so a conjunction costs one generator frame
+        however long it is. var_mapping, from a renamed rule, maps the
+        renamed variables back to the original ones in every solution.
+        """
+        from .ast_nodes import Cut
 
-                # If we found a cut in the remaining goals, stop backtracking
-                if has_cut and rest_solutions:
-                    break
-            else:
-                solutions.append(sol)
+        # A goal before a cut stops backtracking once the goals after it
+        # have produced a solution from its current answer
+        last_cut = -1
+        for position, goal in enumerate(body):
+            if isinstance(goal, Cut):
+                last_cut = position
+        last = len(body) - 1
+
+        stack = [_single(substitution)]  # stack[i] solves body[i - 1]
+        produced = [False]
+        while stack:
+            position = len(stack) - 1
+            if produced[position] and position <= last_cut:
+                stack.pop()
+                produced.pop()
+                continue
+            sol = next(stack[-1], _MISSING)
+            if sol is _MISSING:
+                stack.pop()
+                produced.pop()
+                continue
+            produced[position] = False
+
+            if position <= last:
+                goal = body[position]
+                if isinstance(goal, Cut):
+                    # Cut prevents backtracking into the goals before it
+                    stack.append(_single(sol))
+                else:
+                    stack.append(iter(self._iter_goal(goal, sol)))
+                produced.append(False)
+                continue
+
+            for i in range(len(produced)):
+                produced[i] = True
+            if var_mapping:
+                # Map renamed variables back to original variables
+                for renamed_var, original_var in var_mapping.items():
+                    value = sol.lookup(renamed_var)
+                    if value is not None:
+                        sol.bind(original_var, value)
+            yield sol
 
-        return solutions
-    
     def _unify(self, term1, term2, substitution):
         """Unify two terms with support for list patterns [H|T]"""
         # Apply substitution
@@ -773,24 +1517,33 @@ class LogicalEngine:
     
     def _rename_variables(self, rule):
         """Rename variables in a rule to avoid conflicts"""
-        import time
-        suffix = str(int(time.time() * 1000000) % 1000000)
-        self.var_mapping = {}  # Store mapping from renamed to original
-
-        def rename_term(term):
-            if isinstance(term, Term) and term.is_variable:
-                renamed = f"{term.value}_{suffix}"
-                self.var_mapping[renamed] = term.value  # Store mapping
-                return Term(renamed, is_variable=True)
-            elif isinstance(term, Predicate):
-                new_args = [rename_term(arg) for arg in term.args]
-                return Predicate(term.name, new_args)
-            return term
+        renamed_rule, _ = self._instantiate_rule(rule)
+        return renamed_rule
 
-        new_head = rename_term(rule.head)
-        new_body = [rename_term(goal) for goal in rule.body]
+    def _instantiate_rule(self, rule):
+        """Rename a rule apart using a fresh frame id.
 
-        return Rule(new_head, new_body)
+        Returns the renamed rule and a {renamed_name: original_name} mapping.
+        The compiled template is cached on the rule, so each rule is walked
+        only once no matter how often it is applied.
+        """
+        compiled = getattr(rule, '_compiled', None)
+        if compiled is None or not compiled.matches(rule):
+            compiled = CompiledRule(rule)
+            rule._compiled = compiled
+
+        head, body, fresh = compiled.instantiate(next(self._frame_counter))
+        var_mapping = {term.value: name for term, name in zip(fresh, compiled.var_names)}
+        return Rule(head, body), var_mapping
+
+    def _head_matcher(self, clause):
+        """Return the compiled HeadMatcher for a fact or rule, building it once"""
+        head = _clause_head(clause)
+        matcher = getattr(clause, '_matcher', None)
+        if matcher is None or not matcher.matches(head):
+            matcher = HeadMatcher(head)
+            clause._matcher = matcher
+        return matcher
 
     def _evaluate_is_expression(self, is_expr, substitution):
         """Evaluate an 'is' expression: ?X is 5 + 3"""
@@ -1054,66 +1807,62 @@ class LogicalEngine:
         """Handle not/1: not(?Goal) - negation as failure
 
         Succeeds if Goal fails, fails if Goal succeeds.
+        Only the first solution of Goal is searched for.
 
         Example: not(parent(john, mary))
         """
         goal = not_pred.args[0]
 
         # Try to solve the goal
-        solutions = self._solve_goal(goal, substitution)
+        solutions = self._iter_goal(goal, substitution)
+        try:
+            found = next(solutions, None) is not None
+        finally:
+            # Built-ins answer with plain iterators, which have no close()
+            close = getattr(solutions, 'close', None)
+            if close is not None:
+                close()
 
         # Negation as failure: succeed if no solutions found
-        if len(solutions) == 0:
-            return [substitution]
-        return []
+        if not found:
+            yield substitution
+
+    def _iter_conjunction(self, goals, substitution):
+        """Solve a flat list of goals left to right, yielding solutions"""
+        if not goals:
+            yield substitution
+            return
+        for sub in self._iter_goal(goals[0], substitution):
+            yield from self._iter_conjunction(goals[1:], sub)
+
+    def _iter_branch(self, goals, substitution):
+        """Solve a branch that is either a goal list or a single goal"""
+        if isinstance(goals, list):
+            return self._iter_conjunction(goals, substitution)
+        return self._iter_goal(goals, substitution)
 
     def _handle_and(self, goals, substitution):
         """Handle conjunction: execute all goals in sequence.
 
         goals is a list of goal lists (each from parse_logical_body).
         """
-        current_subs = [substitution]
+        flat_goals = []
         for goal_list in goals:
             if isinstance(goal_list, list):
                 # It's a list of goals from parse_logical_body
-                for goal in goal_list:
-                    next_subs = []
-                    for sub in current_subs:
-                        next_subs.extend(self._solve_goal(goal, sub))
-                    current_subs = next_subs
-                    if not current_subs:
-                        return []
+                flat_goals.extend(goal_list)
             else:
                 # It's a single goal
-                next_subs = []
-                for sub in current_subs:
-                    next_subs.extend(self._solve_goal(goal_list, sub))
-                current_subs = next_subs
-                if not current_subs:
-                    return []
-        return current_subs
+                flat_goals.append(goal_list)
+        return self._iter_conjunction(flat_goals, substitution)
 
     def _handle_or(self, branches, substitution):
         """Handle disjunction: execute any branch.
 
         branches is a list of goal lists.
         """
-        all_solutions = []
         for branch in branches:
-            if isinstance(branch, list):
-                # Execute all goals in the branch
-                branch_subs = [substitution]
-                for goal in branch:
-                    next_subs = []
-                    for sub in branch_subs:
-                        next_subs.extend(self._solve_goal(goal, sub))
-                    branch_subs = next_subs
-                    if not branch_subs:
-                        break
-                all_solutions.extend(branch_subs)
-            else:
-                all_solutions.extend(self._solve_goal(branch, substitution))
-        return all_solutions
+            yield from self._iter_branch(branch, substitution)
 
     def _handle_if_then_else(self, cond_goals, then_goals, else_goals, substitution):
         """Handle if-then-else: (cond -> then ; else)
@@ -1122,51 +1871,17 @@ class LogicalEngine:
         If cond fails, execute else goals.
         """
         # Try condition
-        cond_subs = [substitution]
-        if isinstance(cond_goals, list):
-            for goal in cond_goals:
-                next_subs = []
-                for sub in cond_subs:
-                    next_subs.extend(self._solve_goal(goal, sub))
-                cond_subs = next_subs
-                if not cond_subs:
-                    break
-        else:
-            cond_subs = self._solve_goal(cond_goals, substitution)
+        cond_subs = self._iter_branch(cond_goals, substitution)
+        first_cond = next(cond_subs, None)
 
-        if cond_subs:
-            # Condition succeeded, execute then branch
-            all_solutions = []
+        if first_cond is not None:
+            # Condition succeeded, execute then branch for each condition solution
+            yield from self._iter_branch(then_goals, first_cond)
             for cond_sub in cond_subs:
-                then_subs = [cond_sub]
-                if isinstance(then_goals, list):
-                    for goal in then_goals:
-                        next_subs = []
-                        for sub in then_subs:
-                            next_subs.extend(self._solve_goal(goal, sub))
-                        then_subs = next_subs
-                        if not then_subs:
-                            break
-                else:
-                    then_subs = self._solve_goal(then_goals, cond_sub)
-                all_solutions.extend(then_subs)
-            return all_solutions
-        else:
+                yield from self._iter_branch(then_goals, cond_sub)
+        elif else_goals:
             # Condition failed, execute else branch
-            if not else_goals:
-                return []
-            else_subs = [substitution]
-            if isinstance(else_goals, list):
-                for goal in else_goals:
-                    next_subs = []
-                    for sub in else_subs:
-                        next_subs.extend(self._solve_goal(goal, sub))
-                    else_subs = next_subs
-                    if not else_subs:
-                        break
-            else:
-                else_subs = self._solve_goal(else_goals, substitution)
-            return else_subs
+            yield from self._iter_branch(else_goals, substitution)
 
     def export_proof_graph(self, proofs):
         """Export proof tree as D3 graph"""
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+ذاكرة مؤقتة محدودة للبحث المعجمي
+Bounded lookup cache shared by the lexicon layers
+
+LookupCache is an LRU map with a maximum size, an optional time to live,
+and negative caching: a lookup that found nothing is stored as None, so
+an unknown word costs one real search until it expires or is evicted.
+Each cache counts its hits, misses, negative hits, evictions and
+expirations, and every live cache is listed by cache_statistics() under
+its layer name; the counts of caches sharing a name (one per adapter
+instance, say) are added together.
+
+It supports the dict operations the layers used on their plain dict
+caches (in, [], len, clear), so existing callers keep working.
+"""
+
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+_caches = weakref.WeakSet()
+
+
+@dataclass
+class CacheStats:
+    """إحصائيات ذاكرة مؤقتة / Statistics of one cache"""
+    name: str
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    negative_hits: int
+    evictions: int
+    expirations: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class LookupCache:
+    """
+    ذاكرة مؤقتة LRU محدودة مع تخزين النتائج السلبية ومدة صلاحية
+    Bounded LRU cache with negative caching, TTL and hit/miss counters
+    """
+
+    def __init__(self, name: str, maxsize: int = 10000, ttl: Optional[float] = None,
+                 cache_negative: bool = True, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            name: اسم الطبقة في الإحصائيات
+            maxsize: أقصى عدد للمدخلات
+            ttl: مدة صلاحية المدخل بالثواني (None: بلا انتهاء)
+            cache_negative: تخزين نتائج البحث الفارغة (None)
+            clock: مصدر الوقت
+        """
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.cache_negative = cache_negative
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self.reset_stats()
+        _caches.add(self)
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        """
+        (found, value): found is False on a miss; a cached negative result
+        is (True, None).  Counts a hit or a miss.
+        """
+        entry = self._live_entry(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        value = entry[0]
+        if value is None:
+            self.negative_hits += 1
+        return True, value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store value (None records a negative result)"""
+        if self.maxsize <= 0 or (value is None and not self.cache_negative):
+            return
+        expires = self._clock() + self.ttl if self.ttl is not None else None
+        self._entries[key] = (value, expires)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        found, value = self.lookup(key)
+        if not found:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        return CacheStats(self.name, len(self._entries), self.maxsize, self.hits, self.misses,
+                          self.negative_hits, self.evictions, self.expirations)
+
+    def _live_entry(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires = entry[1]
+        if expires is not None and self._clock() >= expires:
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    # Dict-style access, without touching the counters
+
+    def __contains__(self, key) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and (entry[1] is None or self._clock() < entry[1])
+
+    def __getitem__(self, key):
+        entry = self._live_entry(key)
+        if entry is None:
+            raise KeyError(key)
+        return entry[0]
+
+    def __setitem__(self, key, value) -> None:
+        self.put(key, value)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self):
+        return f"LookupCache({self.name!r}, size={len(self._entries)}, maxsize={self.maxsize})"
+
+
+def cache_statistics() -> List[CacheStats]:
+    """إحصائيات كل الذاكرات المؤقتة الحية / Statistics of every live cache,
+    one entry per layer name, sorted by name"""
+    layers: Dict[str, CacheStats] = {}
+    for cache in list(_caches):
+        stats = cache.stats()
+        total = layers.get(stats.name)
+        if total is None:
+            layers[stats.name] = stats
+        else:
+            for field in fields(CacheStats)[1:]:
+                setattr(total, field.name, getattr(total, field.name) + getattr(stats, field.name))
+    return [layers[name] for name in sorted(layers)]
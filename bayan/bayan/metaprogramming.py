@@ -19,6 +19,8 @@ import textwrap
 from typing import Any, Dict, List, Optional, Callable, Union
 from dataclasses import dataclass
 
+from .ast_nodes import node_fields
+
 
 @dataclass
 class CompiledCode:
@@ -320,8 +322,9 @@ class MetaprogrammingEngine:
             if hasattr(obj, '__name__'):
                 result['name'] = obj.__name__
 
-        if hasattr(obj, '__dict__'):
-            result['attributes'] = list(obj.__dict__.keys())
+        fields = node_fields(obj)
+        if fields is not None:
+            result['attributes'] = list(fields)
 
         if hasattr(obj, '__doc__') and obj.__doc__:
             result['doc'] = obj.__doc__
@@ -0,0 +1,177 @@
+"""
+Embedding store for the Neural Engine
+مخزن المتجهات للمحرك العصبي
+
+Embeddings are keyed by a hash of the model name and the text, so a text
+is embedded once however many times it is searched for.  Recent vectors
+stay in an in-memory LRU.  With a directory, every vector is also
+appended to an on-disk float32 matrix (<model>.f32, one row per text,
+read through numpy.memmap) whose row keys are listed one per line in
+<model>.keys; a later process reuses those rows without running the
+model again.
+
+The disk side is best effort like compile_cache: a directory that cannot
+be written leaves the store in memory only.
+"""
+
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def text_key(model_name: str, text: str) -> str:
+    """Content hash of a text embedded by model_name"""
+    return hashlib.sha1(f"{model_name}\0{text}".encode('utf-8')).hexdigest()
+
+
+class EmbeddingStore:
+    """
+    Content-hash keyed cache of float32 embedding vectors.
+    ذاكرة متجهات مفهرسة ببصمة النص
+    """
+
+    def __init__(self, model_name: str = "", directory: Optional[str] = None, capacity: int = 4096):
+        self.model_name = model_name
+        self.capacity = capacity
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        self._matrix_path = None
+        self._keys_path = None
+        self._rows: Dict[str, int] = {}
+        self._dim: Optional[int] = None
+        self._matrix: Optional[np.memmap] = None
+        if directory is not None:
+            stem = hashlib.sha1(model_name.encode('utf-8')).hexdigest()[:16]
+            self._matrix_path = os.path.join(directory, f"{stem}.f32")
+            self._keys_path = os.path.join(directory, f"{stem}.keys")
+            self._load_index(directory)
+
+    @property
+    def dim(self) -> Optional[int]:
+        return self._dim
+
+    def key(self, text: str) -> str:
+        return text_key(self.model_name, text)
+
+    def get_many(self, texts: Sequence[str]) -> Tuple[Optional[np.ndarray], List[int]]:
+        """
+        Look up the embeddings of texts.
+
+        Returns:
+            (matrix, missing): a float32 matrix with one row per text, or
+            None when the dimension is not known yet, and the indices of
+            the texts that were not found (their rows are left as zeros)
+        """
+        keys = [self.key(text) for text in texts]
+        if self._dim is None:
+            self.misses += len(keys)
+            return None, list(range(len(keys)))
+
+        matrix = np.zeros((len(keys), self._dim), dtype=np.float32)
+        missing = []
+        disk_index = []
+        disk_rows = []
+        for i, key in enumerate(keys):
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                matrix[i] = vector
+                continue
+            row = self._rows.get(key)
+            if row is not None:
+                disk_index.append(i)
+                disk_rows.append(row)
+            else:
+                missing.append(i)
+
+        if disk_rows:
+            # One gather from the mapped file for every row found on disk
+            matrix[disk_index] = self._mapped()[disk_rows]
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+        return matrix, missing
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        matrix, missing = self.get_many([text])
+        if matrix is None or missing:
+            return None
+        return matrix[0]
+
+    def put_many(self, texts: Sequence[str], vectors: np.ndarray):
+        """Store one vector per text (vectors is a 2-D array)"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self._dim is None:
+            self._dim = vectors.shape[1]
+        elif vectors.shape[1] != self._dim:
+            raise ValueError(f"Embedding store holds {self._dim}-d vectors, got {vectors.shape[1]}-d")
+
+        new_rows = {}
+        for text, vector in zip(texts, vectors):
+            key = self.key(text)
+            self._remember(key, vector)
+            if self._keys_path is not None and key not in self._rows:
+                new_rows[key] = vector
+        if new_rows:
+            self._append(list(new_rows), np.stack(list(new_rows.values())))
+
+    def clear_memory(self):
+        """Drop the in-memory vectors; rows on disk are kept"""
+        self._memory.clear()
+
+    def _remember(self, key, vector):
+        self._memory[key] = vector.copy()
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.capacity:
+            self._memory.popitem(last=False)
+
+    def _mapped(self) -> np.memmap:
+        if self._matrix is None or self._matrix.shape[0] < len(self._rows):
+            self._matrix = np.memmap(self._matrix_path, dtype=np.float32, mode='r',
+                                     shape=(len(self._rows), self._dim))
+        return self._matrix
+
+    def _load_index(self, directory):
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError:
+            self._keys_path = None
+            return
+        try:
+            with open(self._keys_path, 'r', encoding='ascii') as f:
+                keys = f.read().split()
+            size = os.path.getsize(self._matrix_path)
+        except OSError:
+            self._reset_files()
+            return
+        if not keys or size % (4 * len(keys)):
+            # Empty, or rows and keys out of step after an interrupted write
+            self._reset_files()
+            return
+        self._dim = size // (4 * len(keys))
+        self._rows = {key: row for row, key in enumerate(keys)}
+
+    def _append(self, keys, vectors):
+        try:
+            # Rows first: a key is only listed once its row is complete
+            with open(self._matrix_path, 'ab') as f:
+                f.write(vectors.tobytes())
+            with open(self._keys_path, 'a', encoding='ascii') as f:
+                f.write(''.join(key + '\n' for key in keys))
+        except OSError:
+            self._keys_path = None
+            return
+        start = len(self._rows)
+        for offset, key in enumerate(keys):
+            self._rows[key] = start + offset
+
+    def _reset_files(self):
+        for path in (self._matrix_path, self._keys_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,134 @@
+"""
+Fact index: a vector index kept in step with a LogicalEngine
+فهرس الحقائق المتزامن مع المحرك المنطقي
+
+A FactIndex embeds the facts of a LogicalEngine, keyed by their text
+(TensorBridge.fact_to_text) and labelled with their predicate name, and
+registers itself in the engine's listeners so asserted and retracted
+facts are added to and removed from the index as they happen.  New facts
+are queued and embedded in batches at the next search.
+
+Facts with the same text share one vector.  A saved index can be handed
+back to a new FactIndex, which only embeds the facts the file lacks and
+drops the vectors of facts that are gone.
+"""
+
+import copy
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..logical_engine import Fact, LogicalEngine
+from .tensor_bridge import TensorBridge
+from .vector_index import VectorIndex, create_index
+
+
+class FactIndex:
+    """
+    Semantic search over the facts of one LogicalEngine.
+    البحث الدلالي في حقائق محرك منطقي
+    """
+
+    def __init__(self, engine: LogicalEngine, bridge: TensorBridge, index: Optional[VectorIndex] = None):
+        self.engine = engine
+        self.bridge = bridge
+        self.index = index if index is not None else create_index('ivf')
+        self._facts: Dict[str, List[Fact]] = {}  # text -> facts with that text
+        self._pending: Dict[str, str] = {}  # text -> predicate name, waiting to be embedded
+
+        for facts_list in engine.knowledge_base.values():
+            for item in facts_list:
+                if isinstance(item, Fact):
+                    self._track(item)
+        for text in [text for text in self.index.keys() if text not in self._facts]:
+            self.index.remove(text)
+        engine.listeners.append(self._on_change)
+
+    def __len__(self):
+        return len(self._facts)
+
+    def close(self):
+        """Stop following the engine"""
+        if self._on_change in self.engine.listeners:
+            self.engine.listeners.remove(self._on_change)
+
+    def search(self, query_text: str, top_k: int = 3,
+               predicates: Optional[Iterable[str]] = None) -> List[Any]:
+        """
+        Facts most similar to query_text, as (Fact, score, text), best first.
+
+        Args:
+            query_text (str): Text to search for
+            top_k (int): Number of results
+            predicates: Only return facts of these predicate names
+        """
+        if not self.bridge.neural.initialized or not self.flush():
+            return []
+        query_vec = self.bridge.neural.embed(query_text)
+        if query_vec is None:
+            return []
+        labels = None if predicates is None else list(predicates)
+        return [(self._facts[text][0], score, text)
+                for text, score in self.index.search(query_vec, top_k, labels)]
+
+    def flush(self) -> bool:
+        """Embed the queued facts; False if the model could not embed them"""
+        if not self._pending:
+            return True
+        texts = list(self._pending)
+        vectors = self.bridge.neural.embed_texts(texts)
+        if vectors is None:
+            return False
+        self.index.add(texts, vectors, [self._pending[text] for text in texts])
+        self._pending.clear()
+        return True
+
+    def save(self, path: str):
+        """Write the vectors to path; see VectorIndex.save()"""
+        self.flush()
+        self.index.save(path)
+
+    def _track(self, fact):
+        text = self.bridge.fact_to_text(fact)
+        facts = self._facts.setdefault(text, [])
+        facts.append(fact)
+        if len(facts) == 1 and text not in self.index:
+            self._pending[text] = fact.predicate.name
+
+    def _on_change(self, clause, added):
+        if not isinstance(clause, Fact):
+            return
+        if added:
+            self._track(clause)
+            return
+        text = self.bridge.fact_to_text(clause)
+        facts = self._facts.get(text)
+        if not facts:
+            return
+        for i, fact in enumerate(facts):
+            if fact is clause:
+                del facts[i]
+                break
+        if not facts:
+            del self._facts[text]
+            self._pending.pop(text, None)
+            self.index.remove(text)
+
+    def __deepcopy__(self, memo):
+        # A copied world gets its own index over its own facts; the model
+        # and its embedding store are shared
+        clone = FactIndex.__new__(FactIndex)
+        memo[id(self)] = clone
+        clone.engine = copy.deepcopy(self.engine, memo)
+        clone.bridge = self.bridge
+        clone.index = copy.deepcopy(self.index, memo)
+        clone._facts = copy.deepcopy(self._facts, memo)
+        clone._pending = dict(self._pending)
+        return clone
+
+
+def find_fact_index(engine: LogicalEngine) -> Optional[FactIndex]:
+    """The FactIndex following engine, if any"""
+    for listener in engine.listeners:
+        owner = getattr(listener, '__self__', None)
+        if isinstance(owner, FactIndex):
+            return owner
+    return None
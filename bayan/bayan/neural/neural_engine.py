@@ -7,6 +7,10 @@ import sys
 import logging
 from typing import List, Dict, Any, Optional
 
+import numpy as np
+
+from .embedding_store import EmbeddingStore
+
 try:
     import torch
     import torch.nn.functional as F
@@ -20,23 +24,33 @@ class NeuralEngine:
     """
     Manages Neural Network operations (Embeddings, Similarity, Neural Search).
     Uses lightweight models to keep performance reasonable.
+
+    Embeddings go through an EmbeddingStore, so each distinct text runs
+    through the model once; pass cache_dir (or call use_cache_dir) to
+    keep them on disk between runs.
     """
     _instance = None
     
-    def __new__(cls, model_name: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"):
+    def __new__(cls, model_name: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
+                cache_dir: Optional[str] = None):
         if cls._instance is None:
             cls._instance = super(NeuralEngine, cls).__new__(cls)
             cls._instance.initialized = False
         return cls._instance
 
-    def __init__(self, model_name: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"):
+    def __init__(self, model_name: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
+                 cache_dir: Optional[str] = None):
         if self.initialized:
+            if cache_dir is not None:
+                self.use_cache_dir(cache_dir)
             return
             
         self.model_name = model_name
         self.tokenizer = None
         self.model = None
         self.device = "cpu"
+        self.batch_size = 64
+        self.store = EmbeddingStore(model_name, cache_dir)
         
         if TRANSFORMERS_AVAILABLE:
             self.device = "cuda" if torch.cuda.is_available() else "cpu"
@@ -56,48 +70,53 @@ class NeuralEngine:
             logging.error(f"Failed to load neural model: {e}")
             self.model = None
 
+    def use_cache_dir(self, cache_dir: str):
+        """Keep embeddings in cache_dir so later runs reuse them."""
+        self.store = EmbeddingStore(self.model_name, cache_dir, self.store.capacity)
+
     def embed(self, text: str) -> Optional[Any]:
-        """Generate embedding vector for text."""
-        if not TRANSFORMERS_AVAILABLE or self.model is None:
+        """Embedding vector for text, from the store when it has one."""
+        vectors = self.embed_texts([text])
+        if vectors is None:
             return None
+        return vectors[0]
 
-        try:
-            inputs = self.tokenizer(text, return_tensors="pt", padding=True, truncation=True, max_length=128)
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
-            
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                # Mean Pooling - Take attention mask into account for correct averaging
-                attention_mask = inputs['attention_mask']
-                token_embeddings = outputs.last_hidden_state
-                
-                input_mask_expanded = attention_mask.unsqueeze(-1).expand(token_embeddings.size()).float()
-                sum_embeddings = torch.sum(token_embeddings * input_mask_expanded, 1)
-                sum_mask = torch.clamp(input_mask_expanded.sum(1), min=1e-9)
-                embeddings = sum_embeddings / sum_mask
-                
-                # Normalize embeddings
-                embeddings = F.normalize(embeddings, p=2, dim=1)
-                
-            return embeddings[0].cpu().numpy()
-        except Exception as e:
-            logging.error(f"Embedding failed: {e}")
-            return None
+    def embed_texts(self, texts: List[str]) -> Optional[np.ndarray]:
+        """
+        Embeddings of texts as a float32 matrix, one normalized row per text.
+        Only texts missing from the store are run through the model, in
+        batches of batch_size.
+        """
+        matrix, missing = self.store.get_many(texts)
+        if not missing:
+            return matrix
+
+        # Each distinct missing text once, with the rows it fills
+        pending: Dict[str, List[int]] = {}
+        for i in missing:
+            pending.setdefault(texts[i], []).append(i)
+        pending_texts = list(pending)
+        for start in range(0, len(pending_texts), self.batch_size):
+            chunk = pending_texts[start:start + self.batch_size]
+            vectors = self.batch_embed(chunk)
+            if vectors is None:
+                return None
+            vectors = np.asarray(vectors, dtype=np.float32)
+            self.store.put_many(chunk, vectors)
+            if matrix is None:
+                matrix = np.zeros((len(texts), vectors.shape[1]), dtype=np.float32)
+            for text, vector in zip(chunk, vectors):
+                matrix[pending[text]] = vector
+        return matrix
 
     def compute_similarity(self, text1: str, text2: str) -> float:
         """Compute cosine similarity between two texts."""
-        vec1 = self.embed(text1)
-        vec2 = self.embed(text2)
-        
-        if vec1 is None or vec2 is None:
+        vectors = self.embed_texts([text1, text2])
+        if vectors is None:
             return 0.0
-            
+
         # Vectors are already normalized, so dot product is cosine similarity
-        if TRANSFORMERS_AVAILABLE:
-            t1 = torch.tensor(vec1)
-            t2 = torch.tensor(vec2)
-            return torch.dot(t1, t2).item()
-        return 0.0
+        return float(np.dot(vectors[0], vectors[1]))
 
     def batch_embed(self, texts: List[str]) -> Optional[Any]:
         """Generate embeddings for a batch of texts."""
@@ -3,6 +3,9 @@ Tensor Bridge for Bayan
 جسر التواصل بين المنطق والأعصاب
 """
 from typing import Any, List
+
+import numpy as np
+
 from ..logical_engine import Fact
 from .neural_engine import NeuralEngine
 
@@ -12,6 +15,9 @@ class TensorBridge:
     """
     def __init__(self, neural_engine: NeuralEngine):
         self.neural = neural_engine
+        # Texts and embedding matrix of the last fact list searched
+        self._fact_texts = None
+        self._fact_matrix = None
 
     def fact_to_text(self, fact: Fact) -> str:
         """Convert a logical Fact into a natural language sentence."""
@@ -41,19 +47,33 @@ class TensorBridge:
         Semantic Search: Find facts semantically similar to the query text.
         Structure: List of (Fact, score)
         """
-        if not self.neural.initialized:
+        if not self.neural.initialized or top_k <= 0:
             return []
 
         query_vec = self.neural.embed(query_text)
-        if query_vec is None:
+        if query_vec is None or not facts:
             return []
 
-        results = []
-        for fact in facts:
-            fact_text = self.fact_to_text(fact)
-            score = self.neural.compute_similarity(query_text, fact_text)
-            results.append((fact, score, fact_text))
+        texts = [self.fact_to_text(fact) for fact in facts]
+        matrix = self.fact_matrix(texts)
+        if matrix is None:
+            return []
+
+        # Rows are normalized, so one matrix-vector product gives every cosine
+        scores = matrix @ query_vec
+        if top_k < len(scores):
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            best = np.arange(len(scores))
+        # Stable order: ties keep the order the facts came in
+        best = sorted(best.tolist(), key=lambda i: (-scores[i], i))
+        return [(facts[i], float(scores[i]), texts[i]) for i in best]
 
-        # Sort by score descending
-        results.sort(key=lambda x: x[1], reverse=True)
-        return results[:top_k]
+    def fact_matrix(self, texts: List[str]):
+        """Embedding matrix of fact texts, reused while the facts are unchanged."""
+        if self._fact_texts != texts:
+            matrix = self.neural.embed_texts(texts)
+            if matrix is None:
+                return None
+            self._fact_texts, self._fact_matrix = texts, matrix
+        return self._fact_matrix
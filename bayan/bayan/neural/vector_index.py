@@ -0,0 +1,414 @@
+"""
+Vector indexes for semantic search over fact embeddings
+فهارس المتجهات للبحث الدلالي في الحقائق
+
+Every index maps string keys to unit-length float32 vectors, each with a
+label (the predicate name for facts), and answers top-k inner product
+queries, optionally restricted to some labels.
+
+- ExactIndex scores every vector with one matrix-vector product.
+- IVFIndex (inverted file) clusters the vectors around k-means centroids
+  and only scores the nprobe lists whose centroids are closest to the
+  query.  Until it holds train_threshold vectors it is a single exact
+  list; it retrains as it grows, each time it has doubled.
+
+Vectors live in growable numpy blocks, so add and remove are amortized
+O(1) (a removed row is replaced by the last row of its list, and its row
+id is reused by a later add).
+save() writes an .npz file that load_index() reads back.
+"""
+
+import os
+import tempfile
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class _Bucket:
+    """A growable block of vectors with their row ids and label codes"""
+
+    __slots__ = ('vectors', 'ids', 'labels', 'size')
+
+    def __init__(self, dim: int, capacity: int = 16):
+        self.vectors = np.empty((capacity, dim), dtype=np.float32)
+        self.ids = np.empty(capacity, dtype=np.int64)
+        self.labels = np.empty(capacity, dtype=np.int32)
+        self.size = 0
+
+    def append(self, vectors, ids, labels):
+        count = len(ids)
+        needed = self.size + count
+        if needed > len(self.ids):
+            capacity = max(needed, 2 * len(self.ids))
+            for name in self.__slots__[:3]:
+                old = getattr(self, name)
+                grown = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+                grown[:self.size] = old[:self.size]
+                setattr(self, name, grown)
+        end = self.size + count
+        self.vectors[self.size:end] = vectors
+        self.ids[self.size:end] = ids
+        self.labels[self.size:end] = labels
+        self.size = end
+
+    def remove_at(self, pos):
+        """Remove row pos; return the id of the row moved into its place, or None"""
+        last = self.size - 1
+        moved = None
+        if pos != last:
+            self.vectors[pos] = self.vectors[last]
+            self.ids[pos] = self.ids[last]
+            self.labels[pos] = self.labels[last]
+            moved = int(self.ids[pos])
+        self.size = last
+        return moved
+
+    def scores(self, query, label_codes=None):
+        """(scores, ids) of the rows, restricted to label_codes when given"""
+        scores = self.vectors[:self.size] @ query
+        ids = self.ids[:self.size]
+        if label_codes is not None:
+            keep = np.isin(self.labels[:self.size], label_codes)
+            scores, ids = scores[keep], ids[keep]
+        return scores, ids
+
+
+class VectorIndex:
+    """
+    Base class: key bookkeeping, labels, top-k selection and save/load.
+    Subclasses decide which bucket a vector goes to and which buckets a
+    query scans.
+    الفهرس الأساسي للمتجهات
+    """
+
+    kind = None
+
+    def __init__(self, dim: Optional[int] = None):
+        self.dim = dim
+        self._buckets: List[_Bucket] = []
+        self._keys: List[Optional[str]] = []  # row id -> key (None once removed)
+        self._free: List[int] = []  # Removed row ids, reused by add
+        self._rows: Dict[str, int] = {}  # key -> row id
+        self._where: Dict[int, Tuple[int, int]] = {}  # row id -> (bucket, position)
+        self._label_names: List[str] = []
+        self._label_codes: Dict[str, int] = {}
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    def keys(self) -> List[str]:
+        return list(self._rows)
+
+    def add(self, keys: Sequence[str], vectors, labels: Sequence[str]):
+        """Add (or replace) one vector per key; for a key given more than
+        once, the last vector wins"""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(keys), -1)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Index holds {self.dim}-d vectors, got {vectors.shape[1]}-d")
+        last = {key: i for i, key in enumerate(keys)}
+        if len(last) < len(keys):
+            chosen = sorted(last.values())
+            keys = [keys[i] for i in chosen]
+            vectors = vectors[chosen]
+            labels = [labels[i] for i in chosen]
+        for key in keys:
+            if key in self._rows:
+                self.remove(key)
+
+        # Row ids of removed vectors first, so _keys does not grow with churn
+        reused = min(len(keys), len(self._free))
+        rows = self._free[len(self._free) - reused:]
+        del self._free[len(self._free) - reused:]
+        rows.extend(range(len(self._keys), len(self._keys) + len(keys) - reused))
+        self._keys.extend([None] * (len(keys) - reused))
+        for key, row in zip(keys, rows):
+            self._keys[row] = key
+            self._rows[key] = row
+        codes = np.array([self._label_code(label) for label in labels], dtype=np.int32)
+        self._place(vectors, np.array(rows, dtype=np.int64), codes)
+
+    def remove(self, key: str) -> bool:
+        row = self._rows.pop(key, None)
+        if row is None:
+            return False
+        self._keys[row] = None
+        self._free.append(row)
+        bucket_no, pos = self._where.pop(row)
+        moved = self._buckets[bucket_no].remove_at(pos)
+        if moved is not None:
+            self._where[moved] = (bucket_no, pos)
+        return True
+
+    def search(self, query, top_k: int = 10, labels: Optional[Iterable[str]] = None) -> List[Tuple[str, float]]:
+        """
+        The top_k keys by inner product with query, best first.
+
+        Args:
+            query: Query vector
+            top_k (int): Number of results
+            labels: Only return vectors with one of these labels
+        """
+        if top_k <= 0 or not self._rows:
+            return []
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        codes = None
+        if labels is not None:
+            codes = np.array([self._label_codes[name] for name in labels
+                              if name in self._label_codes], dtype=np.int32)
+            if not len(codes):
+                return []
+
+        all_scores, all_ids = [], []
+        found = 0
+        for rank, bucket_no in enumerate(self._buckets_to_scan(query)):
+            scores, ids = self._buckets[bucket_no].scores(query, codes)
+            if len(ids):
+                all_scores.append(scores)
+                all_ids.append(ids)
+                found += len(ids)
+            if found >= top_k and self._enough_scanned(rank):
+                break
+        if not found:
+            return []
+        scores = np.concatenate(all_scores)
+        ids = np.concatenate(all_ids)
+        if top_k < len(scores):
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            best = np.arange(len(scores))
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return [(self._keys[ids[i]], float(scores[i])) for i in best.tolist()]
+
+    def save(self, path: str):
+        """Write the index to path (.npz), replacing it atomically"""
+        filled = [(bucket_no, bucket) for bucket_no, bucket in enumerate(self._buckets) if bucket.size]
+        vectors, ids, labels = self._all_rows()
+        buckets = np.repeat(np.array([no for no, _ in filled], dtype=np.int32),
+                            [bucket.size for _, bucket in filled])
+        # Keys as one NUL-separated UTF-8 blob rather than a fixed-width string array
+        keys = '\0'.join(self._keys[row] for row in ids.tolist()).encode('utf-8')
+        arrays = dict(kind=np.array(self.kind), dim=np.array(self.dim or 0),
+                      keys=np.frombuffer(keys, dtype=np.uint8), count=np.array(len(ids)),
+                      vectors=vectors, labels=labels, buckets=buckets,
+                      label_names=np.array(self._label_names, dtype=str))
+        arrays.update(self._state())
+
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def _label_code(self, label):
+        code = self._label_codes.get(label)
+        if code is None:
+            code = self._label_codes[label] = len(self._label_names)
+            self._label_names.append(label)
+        return code
+
+    def _bucket(self, bucket_no):
+        while len(self._buckets) <= bucket_no:
+            self._buckets.append(_Bucket(self.dim))
+        return self._buckets[bucket_no]
+
+    def _append_rows(self, bucket_no, vectors, ids, codes):
+        bucket = self._bucket(bucket_no)
+        start = bucket.size
+        bucket.append(vectors, ids, codes)
+        for offset, row in enumerate(ids.tolist()):
+            self._where[row] = (bucket_no, start + offset)
+
+    def _all_rows(self):
+        """(vectors, ids, codes) of every stored vector, bucket by bucket"""
+        parts = [b for b in self._buckets if b.size]
+        if not parts:
+            return (np.empty((0, self.dim or 0), dtype=np.float32), np.empty(0, dtype=np.int64),
+                    np.empty(0, dtype=np.int32))
+        return (np.concatenate([b.vectors[:b.size] for b in parts]),
+                np.concatenate([b.ids[:b.size] for b in parts]),
+                np.concatenate([b.labels[:b.size] for b in parts]))
+
+    def _restore(self, data):
+        self.dim = int(data['dim']) or None
+        self._label_names = data['label_names'].tolist()
+        self._label_codes = {name: code for code, name in enumerate(self._label_names)}
+        keys = data['keys'].tobytes().decode('utf-8').split('\0') if int(data['count']) else []
+        self._keys = list(keys)
+        self._free = []
+        self._rows = {key: row for row, key in enumerate(keys)}
+        ids = np.arange(len(keys), dtype=np.int64)
+        buckets = data['buckets']
+        for bucket_no in np.unique(buckets).tolist():
+            chosen = buckets == bucket_no
+            self._append_rows(bucket_no, data['vectors'][chosen], ids[chosen], data['labels'][chosen])
+
+    # Subclass hooks
+
+    def _place(self, vectors, ids, codes):
+        raise NotImplementedError
+
+    def _buckets_to_scan(self, query):
+        raise NotImplementedError
+
+    def _enough_scanned(self, scanned):
+        """Whether a query that has top_k results may stop after scanned + 1 buckets"""
+        return False
+
+    def _state(self):
+        return {}
+
+
+class ExactIndex(VectorIndex):
+    """
+    Brute force baseline: every query scores every vector.
+    الفهرس الدقيق
+    """
+
+    kind = 'exact'
+
+    def _place(self, vectors, ids, codes):
+        self._append_rows(0, vectors, ids, codes)
+
+    def _buckets_to_scan(self, query):
+        return range(len(self._buckets))
+
+
+class IVFIndex(VectorIndex):
+    """
+    Inverted file index: k-means lists, nprobe of them scanned per query.
+    With a label filter, further lists are scanned until top_k matches
+    are found.
+    فهرس الملفات المقلوبة
+    """
+
+    kind = 'ivf'
+
+    def __init__(self, dim: Optional[int] = None, nlist: Optional[int] = None, nprobe: int = 16,
+                 train_threshold: int = 4096, seed: int = 0):
+        super().__init__(dim)
+        self.nlist = nlist  # None: about sqrt(size) lists at each training
+        self.nprobe = nprobe
+        self.train_threshold = train_threshold
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None
+        self._next_train = train_threshold
+
+    @property
+    def is_trained(self):
+        return self.centroids is not None
+
+    def train(self, iterations: int = 10, sample_size: Optional[int] = None):
+        """Cluster the stored vectors and redistribute them into lists"""
+        vectors, ids, codes = self._all_rows()
+        if not len(ids):
+            return
+        rng = np.random.default_rng(self.seed)
+        nlist = min(self.nlist or max(1, int(np.sqrt(len(ids)))), len(ids))
+        sample_size = sample_size or 32 * nlist
+        sample = vectors if len(ids) <= sample_size else vectors[rng.choice(len(ids), sample_size, replace=False)]
+        self.centroids = _spherical_kmeans(sample, nlist, iterations, rng)
+
+        self._buckets = []
+        self._where = {}
+        assignment = self._assign(vectors)
+        order = np.argsort(assignment, kind='stable')
+        bounds = np.searchsorted(assignment[order], np.arange(nlist + 1))
+        for bucket_no in range(nlist):
+            chosen = order[bounds[bucket_no]:bounds[bucket_no + 1]]
+            self._bucket(bucket_no)
+            if len(chosen):
+                self._append_rows(bucket_no, vectors[chosen], ids[chosen], codes[chosen])
+        self._next_train = 2 * len(ids)
+
+    def _place(self, vectors, ids, codes):
+        if self.centroids is None:
+            self._append_rows(0, vectors, ids, codes)
+        else:
+            assignment = self._assign(vectors)
+            for bucket_no in np.unique(assignment).tolist():
+                chosen = assignment == bucket_no
+                self._append_rows(bucket_no, vectors[chosen], ids[chosen], codes[chosen])
+        if len(self) >= self._next_train:
+            self.train()
+
+    def _assign(self, vectors, chunk=65536):
+        assignment = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), chunk):
+            block = vectors[start:start + chunk]
+            assignment[start:start + chunk] = np.argmax(block @ self.centroids.T, axis=1)
+        return assignment
+
+    def _buckets_to_scan(self, query):
+        if self.centroids is None:
+            return range(len(self._buckets))
+        return np.argsort(-(self.centroids @ query)).tolist()
+
+    def _enough_scanned(self, scanned):
+        return scanned + 1 >= self.nprobe
+
+    def _state(self):
+        return dict(nprobe=np.array(self.nprobe), nlist=np.array(self.nlist or 0),
+                    train_threshold=np.array(self.train_threshold),
+                    next_train=np.array(self._next_train), seed=np.array(self.seed),
+                    centroids=self.centroids if self.centroids is not None
+                    else np.empty((0, 0), dtype=np.float32))
+
+    def _restore(self, data):
+        self.nprobe = int(data['nprobe'])
+        self.nlist = int(data['nlist']) or None
+        self.train_threshold = int(data['train_threshold'])
+        self._next_train = int(data['next_train'])
+        self.seed = int(data['seed'])
+        centroids = data['centroids']
+        self.centroids = centroids if centroids.size else None
+        super()._restore(data)
+        if self.centroids is not None:
+            for bucket_no in range(len(self.centroids)):
+                self._bucket(bucket_no)
+
+
+def _spherical_kmeans(vectors, k, iterations, rng):
+    """k unit-length centroids maximizing the inner product with vectors"""
+    centroids = vectors[rng.choice(len(vectors), k, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        counts = np.bincount(assignment, minlength=k)
+        empty = counts == 0
+        if empty.any():
+            # Reseed empty lists with random vectors
+            sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = sums / np.maximum(norms, 1e-12)
+    return centroids.astype(np.float32)
+
+
+INDEX_TYPES = {cls.kind: cls for cls in (ExactIndex, IVFIndex)}
+
+
+def create_index(kind: str = 'ivf', dim: Optional[int] = None, **options) -> VectorIndex:
+    """Create an empty index of the given kind ('exact' or 'ivf')"""
+    try:
+        cls = INDEX_TYPES[kind]
+    except KeyError:
+        raise ValueError(f"Unknown vector index kind: {kind!r}") from None
+    return cls(dim, **options)
+
+
+def load_index(path: str) -> VectorIndex:
+    """Read an index written by VectorIndex.save()"""
+    with np.load(path, allow_pickle=False) as data:
+        index = create_index(str(data['kind']))
+        index._restore({name: data[name] for name in data.files})
+    return index
@@ -1,20 +1,69 @@
 """
 Object System for Bayan Language
 نظام الكائنات للغة بيان
+
+ClassSystem caches each class's MRO and method lookups, together with
+the method's MethodSignature, so a method call does not walk the class
+hierarchy or re-scan the parameter list; register_class drops the
+caches, since a new class can change existing MROs.
 """
 
+from .ast_nodes import FunctionDef, Parameter
+from .control_flow import ReturnValue
+
+
+class MethodSignature:
+    """
+    A method's parameters, split once for all its calls
+    توقيع الدالة: معاملاتها مقسمة مرة واحدة لكل الاستدعاءات
+
+    Attributes:
+        positional (tuple): Positional parameter names, without self
+        varargs (str): The *args parameter, or None
+        kwargs (str): The **kwargs parameter, or None
+        defaults (dict): Positional parameter name -> default value node
+    """
+
+    __slots__ = ('positional', 'varargs', 'kwargs', 'defaults')
+
+    def __init__(self, func_def):
+        positional = []
+        self.varargs = None
+        self.kwargs = None
+        self.defaults = {}
+        for param in func_def.parameters:
+            if isinstance(param, Parameter):
+                if param.name == 'self':
+                    continue
+                if param.is_kwargs:
+                    self.kwargs = param.name
+                elif param.is_varargs:
+                    self.varargs = param.name
+                else:
+                    positional.append(param.name)
+                    if param.has_default():
+                        self.defaults[param.name] = param.default_value
+            else:
+                # Legacy format: parameter is just a string
+                if param == 'self':
+                    continue
+                positional.append(param)
+        self.positional = tuple(positional)
+
+
 class BayanObject:
     """Represents a Bayan object instance"""
 
+    # name -> property descriptor, once one is registered
+    _properties = None
+
     def __init__(self, class_def, interpreter, arguments=None):
         """Initialize a Bayan object"""
         self.class_def = class_def
         self.interpreter = interpreter
         self.attributes = {}
-        # Local methods for this class only
-        self.methods = {}
 
-        # Extract methods from class definition
+        # Local methods for this class only
         self._extract_methods()
 
         # Call constructor if exists
@@ -22,78 +71,45 @@ class BayanObject:
             self._call_constructor(arguments)
 
     def _extract_methods(self):
-        """Extract methods from class definition"""
-        if self.class_def.body:
-            for stmt in self.class_def.body.statements:
-                from .ast_nodes import FunctionDef
-                if isinstance(stmt, FunctionDef):
-                    self.methods[stmt.name] = stmt
+        """Methods defined by the object's own class (shared by its instances)"""
+        self.methods = self.interpreter.class_system.local_methods(self.class_def)
 
     def _call_constructor(self, arguments, named_arguments=None):
         """Call the constructor (__init__) with support for default parameters, *args, and **kwargs"""
+        interpreter = self.interpreter
         # Resolve via MRO (so parent's __init__ can be called via super)
-        owner, constructor = self.interpreter.class_system.resolve_method(self.class_def.name, '__init__')
+        owner, constructor, signature = interpreter.class_system.resolve_call(self.class_def.name, '__init__')
         if constructor:
             # Create new environment with self, and push owner on stack
-            old_env = self.interpreter.local_env
-            self.interpreter.local_env = {'self': self}
-            if not hasattr(self.interpreter, '_owner_stack'):
-                self.interpreter._owner_stack = []
-            self.interpreter._owner_stack.append(owner)
+            old_env = interpreter.local_env
+            env = interpreter.local_env = {'self': self}
+            interpreter._owner_stack.append(owner)
             try:
-                # Bind arguments to parameters with support for defaults
-                from .ast_nodes import Parameter
-
-                # Collect parameters (excluding 'self')
-                regular_params = []
-                varargs_param = None
-                kwargs_param = None
-
-                for param in constructor.parameters:
-                    if isinstance(param, Parameter):
-                        if param.name == 'self':
-                            continue
-                        if param.is_varargs:
-                            varargs_param = param.name
-                        elif param.is_kwargs:
-                            kwargs_param = param.name
-                        else:
-                            regular_params.append(param)
-                    else:
-                        # Legacy format: parameter is just a string
-                        if param == 'self':
-                            continue
-                        regular_params.append(param)
-
-                # Bind regular positional arguments
-                arg_index = 0
-                for param in regular_params:
-                    param_name = param.name if isinstance(param, Parameter) else param
-                    if arg_index < len(arguments):
-                        self.interpreter.local_env[param_name] = arguments[arg_index]
-                        arg_index += 1
-                    elif isinstance(param, Parameter) and param.has_default():
-                        self.interpreter.local_env[param_name] = self.interpreter.interpret(param.default_value)
+                # Bind regular positional arguments, then defaults
+                for i, name in enumerate(signature.positional):
+                    if i < len(arguments):
+                        env[name] = arguments[i]
+                    elif name in signature.defaults:
+                        env[name] = interpreter.interpret(signature.defaults[name])
 
                 # Bind extra positional arguments to *args
-                if varargs_param:
-                    extra_args = arguments[arg_index:]
-                    self.interpreter.local_env[varargs_param] = tuple(extra_args)
+                if signature.varargs:
+                    env[signature.varargs] = tuple(arguments[len(signature.positional):])
 
                 # Bind **kwargs
-                if kwargs_param:
-                    self.interpreter.local_env[kwargs_param] = named_arguments or {}
+                if signature.kwargs:
+                    env[signature.kwargs] = named_arguments or {}
 
                 # Execute constructor body
-                self.interpreter.interpret(constructor.body)
+                interpreter.interpret(constructor.body)
             finally:
-                self.interpreter._owner_stack.pop()
-                self.interpreter.local_env = old_env
+                interpreter._owner_stack.pop()
+                interpreter.local_env = old_env
 
     def get_attribute(self, name):
         """Get an attribute value, checking for property descriptors"""
         # Check if it's a property (getter)
-        if hasattr(self, '_properties') and name in self._properties:
+        if self._properties is not None and name in self._properties:
             prop = self._properties[name]
             if prop.fget:
                 # Call the getter method
@@ -106,7 +122,7 @@ class BayanObject:
     def set_attribute(self, name, value):
         """Set an attribute value, checking for property descriptors"""
         # Check if it's a property (setter)
-        if hasattr(self, '_properties') and name in self._properties:
+        if self._properties is not None and name in self._properties:
             prop = self._properties[name]
             if prop.fset:
                 # Call the setter method
@@ -118,109 +134,60 @@ class BayanObject:
 
     def register_property(self, name, descriptor):
         """Register a property descriptor"""
-        if not hasattr(self, '_properties'):
+        if self._properties is None:
             self._properties = {}
         self._properties[name] = descriptor
 
     def call_method(self, method_name, arguments, named_arguments=None):
         """Call a method on this object using class MRO with support for named arguments"""
-        if named_arguments is None:
-            named_arguments = {}
-
+        interpreter = self.interpreter
         # Find method via class system MRO
-        owner, method = self.interpreter.class_system.resolve_method(self.class_def.name, method_name)
+        owner, method, signature = interpreter.class_system.resolve_call(self.class_def.name, method_name)
         if not method:
             raise AttributeError(f"Method '{method_name}' not found")
 
         # Create new environment with self and push owner
-        old_env = self.interpreter.local_env
-        self.interpreter.local_env = {'self': self}
-        if not hasattr(self.interpreter, '_owner_stack'):
-            self.interpreter._owner_stack = []
-        self.interpreter._owner_stack.append(owner)
+        old_env = interpreter.local_env
+        env = interpreter.local_env = {'self': self}
+        interpreter._owner_stack.append(owner)
 
         try:
-            # Bind arguments to parameters with support for defaults, named arguments, *args, and **kwargs
-            from .ast_nodes import Parameter
-
-            # Collect parameter names but skip implicit 'self'
-            param_names = []
-            varargs_param = None
-            kwargs_param = None
-
-            for param in method.parameters:
-                if isinstance(param, Parameter):
-                    if param.name == 'self':
-                        continue
-                    if param.is_kwargs:
-                        kwargs_param = param.name
-                    elif param.is_varargs:
-                        varargs_param = param.name
+            # Bind positional arguments (excluding 'self'); extra ones go to *args
+            positional = signature.positional
+            if len(arguments) > len(positional) and not signature.varargs:
+                raise RuntimeError(f"Too many positional arguments for method {method_name}")
+            env.update(zip(positional, arguments))
+            if signature.varargs:
+                env[signature.varargs] = list(arguments[len(positional):])
+
+            # Bind named arguments; extra ones go to **kwargs
+            if named_arguments:
+                for name, value in named_arguments.items():
+                    if name in positional:
+                        env[name] = value
+                    elif signature.kwargs:
+                        env.setdefault(signature.kwargs, {})[name] = value
                     else:
-                        param_names.append(param.name)
-                else:
-                    # Legacy format: parameter is just a string
-                    if param == 'self':
-                        continue
-                    param_names.append(param)
-
-            # Bind positional arguments (excluding 'self')
-            positional_count = 0
-            for i, arg in enumerate(arguments):
-                if i < len(param_names):
-                    self.interpreter.local_env[param_names[i]] = arg
-                    positional_count += 1
-                elif varargs_param:
-                    # Extra positional arguments go to *args
-                    if varargs_param not in self.interpreter.local_env:
-                        self.interpreter.local_env[varargs_param] = []
-                    self.interpreter.local_env[varargs_param].append(arg)
-                else:
-                    raise RuntimeError(f"Too many positional arguments for method {method_name}")
-
-            # Initialize *args if it exists and wasn't populated
-            if varargs_param and varargs_param not in self.interpreter.local_env:
-                self.interpreter.local_env[varargs_param] = []
-
-            # Bind named arguments
-            for name, value in named_arguments.items():
-                if name in param_names:
-                    self.interpreter.local_env[name] = value
-                elif kwargs_param:
-                    # Extra named arguments go to **kwargs
-                    if kwargs_param not in self.interpreter.local_env:
-                        self.interpreter.local_env[kwargs_param] = {}
-                    self.interpreter.local_env[kwargs_param][name] = value
-                else:
-                    raise RuntimeError(f"Unexpected keyword argument: {name}")
-
-            # Initialize **kwargs if it exists and wasn't populated
-            if kwargs_param and kwargs_param not in self.interpreter.local_env:
-                self.interpreter.local_env[kwargs_param] = {}
+                        raise RuntimeError(f"Unexpected keyword argument: {name}")
+            if signature.kwargs and signature.kwargs not in env:
+                env[signature.kwargs] = {}
 
-            # Bind default values for missing parameters (excluding 'self')
-            for param in method.parameters:
-                if isinstance(param, Parameter):
-                    if not param.is_varargs and not param.is_kwargs:
-                        if param.name != 'self' and param.name not in self.interpreter.local_env and param.has_default():
-                            self.interpreter.local_env[param.name] = self.interpreter.interpret(param.default_value)
+            # Bind default values for missing parameters
+            for name, default in signature.defaults.items():
+                if name not in env:
+                    env[name] = interpreter.interpret(default)
 
             # Execute method body
-            result = self.interpreter.interpret(method.body)
-            return result
-        except Exception as e:
-            # Handle ReturnValue exception
-            if e.__class__.__name__ == 'ReturnValue':
-                return e.value
-            raise
+            return interpreter._run_function_body(method)
+        except ReturnValue as ret:
+            return ret.value
         finally:
-            self.interpreter._owner_stack.pop()
-            self.interpreter.local_env = old_env
+            interpreter._owner_stack.pop()
+            interpreter.local_env = old_env
 
     def has_method(self, method_name):
         """Check if object has a method via MRO"""
-        owner, method = self.interpreter.class_system.resolve_method(self.class_def.name, method_name)
-        return method is not None
+        return self.interpreter.class_system.resolve_call(self.class_def.name, method_name)[1] is not None
 
     def __repr__(self):
         return f"<{self.class_def.name} object>"
@@ -237,11 +204,17 @@ class ClassSystem:
         self.inheritance_map = {}
         # class_name -> {method_name: FunctionDef}
         self.methods_map = {}
+        # Lookup caches, dropped by register_class:
+        # class_name -> MRO tuple
+        self._mro_cache = {}
+        # (class_name, method_name, start_after) -> (owner, FunctionDef, MethodSignature)
+        self._call_cache = {}
+        # FunctionDef -> MethodSignature (kept: a definition does not change)
+        self._signatures = {}
 
     def _extract_methods_from_class(self, class_def):
         methods = {}
         if class_def.body:
-            from .ast_nodes import FunctionDef
             for stmt in class_def.body.statements:
                 if isinstance(stmt, FunctionDef):
                     methods[stmt.name] = stmt
@@ -249,6 +222,7 @@ class ClassSystem:
 
     def register_class(self, class_def):
         """Register a class definition"""
+        self.invalidate_caches()
         self.classes[class_def.name] = class_def
         # Methods cache
         self.methods_map[class_def.name] = self._extract_methods_from_class(class_def)
@@ -261,6 +235,17 @@ class ClassSystem:
             bases = [class_def.base_class]
         self.inheritance_map[class_def.name] = bases
 
+    def invalidate_caches(self):
+        """Forget cached MROs and method lookups (after a class changes)"""
+        self._mro_cache.clear()
+        self._call_cache.clear()
+
+    def local_methods(self, class_def):
+        """{method_name: FunctionDef} defined by class_def itself"""
+        if self.classes.get(class_def.name) is class_def:
+            return self.methods_map[class_def.name]
+        return self._extract_methods_from_class(class_def)
+
     def create_object(self, class_name, arguments=None, named_arguments=None):
         """Create an object instance"""
         if class_name not in self.classes:
@@ -295,7 +280,15 @@ class ClassSystem:
 
     def get_mro(self, class_name):
         """Compute C3 linearization (MRO) for a class by name."""
-        # Cache simple MRO if needed (omitted for brevity); compute on demand
+        return list(self._mro(class_name))
+
+    def _mro(self, class_name):
+        mro = self._mro_cache.get(class_name)
+        if mro is None:
+            mro = self._mro_cache[class_name] = tuple(self._compute_mro(class_name))
+        return mro
+
+    def _compute_mro(self, class_name):
         bases = self.inheritance_map.get(class_name, [])
         if not bases:
             return [class_name]
@@ -318,7 +311,7 @@ class ClassSystem:
                         seqs.remove(s)
             return result
 
-        parent_mros = [self.get_mro(b) for b in bases]
+        parent_mros = [self._mro(b) for b in bases]
         return [class_name] + merge(parent_mros + [bases])
 
     def resolve_method(self, class_name, method_name, start_after=None):
@@ -326,12 +319,32 @@ class ClassSystem:
         If start_after is provided, search strictly after that class in MRO.
         Returns (owner_class_name, FunctionDef) or (None, None).
         """
-        mro = self.get_mro(class_name)
+        return self.resolve_call(class_name, method_name, start_after)[:2]
+
+    def resolve_call(self, class_name, method_name, start_after=None):
+        """resolve_method, with the method's MethodSignature (or None)
+        as a third item; cached until the next register_class"""
+        key = (class_name, method_name, start_after)
+        found = self._call_cache.get(key)
+        if found is None:
+            found = self._call_cache[key] = self._resolve(class_name, method_name, start_after)
+        return found
+
+    def signature(self, func_def):
+        """The MethodSignature of func_def"""
+        signature = self._signatures.get(func_def)
+        if signature is None:
+            signature = self._signatures[func_def] = MethodSignature(func_def)
+        return signature
+
+    def _resolve(self, class_name, method_name, start_after):
+        mro = self._mro(class_name)
         start_index = 0
         if start_after is not None and start_after in mro:
             start_index = mro.index(start_after) + 1
         for cname in mro[start_index:]:
             methods = self.methods_map.get(cname, {})
             if method_name in methods:
-                return cname, methods[method_name]
-        return None, None
+                method = methods[method_name]
+                return cname, method, self.signature(method)
+        return None, None, None
@@ -3,31 +3,56 @@ Hybrid Parser for Bayan Language
 محلل نحوي هجين للغة بيان
 """
 
-from .lexer import TokenType
+from .lexer import TokenType, TokenStream
 from .ast_nodes import *
 from .logical_engine import Term, Predicate, Fact, Rule
 
 class HybridParser:
-    """Hybrid parser for Bayan language"""
-
-    def __init__(self, tokens, filename=None):
+    """Hybrid parser for Bayan language.
+
+    With share_literals=True equal literals (numbers, strings, booleans,
+    None, and logic terms) are parsed into one shared node each instead
+    of a node per occurrence. Shared expression literals carry no source
+    position; use it for large generated files, not code under debugging.
+    """
+
+    def __init__(self, tokens, filename=None, share_literals=False):
+        # A token list, or any iterable (e.g. HybridLexer.iter_tokens())
+        # which is then pulled from lazily
+        if not isinstance(tokens, (list, tuple)):
+            tokens = TokenStream(tokens)
         self.tokens = tokens
         self.position = 0
         self.current_token = self.tokens[0] if tokens else None
         self.filename = filename
+        # LPAREN position -> (matching RPAREN position, top-level operator seen)
+        self._paren_spans = {}
+        # (class, value type, value...) -> shared literal node, or None
+        self._literals = {} if share_literals else None
+
+    def _has_token(self, pos):
+        """Check that a token exists at pos without draining a token stream"""
+        tokens = self.tokens
+        if isinstance(tokens, TokenStream):
+            return tokens.has(pos)
+        return pos < len(tokens)
 
     def advance(self):
         """Move to the next token"""
         self.position += 1
-        if self.position < len(self.tokens):
-            self.current_token = self.tokens[self.position]
+        tokens = self.tokens
+        if type(tokens) is list:
+            # Fast path for the common fully-tokenized input
+            self.current_token = tokens[self.position] if self.position < len(tokens) else None
+        elif self._has_token(self.position):
+            self.current_token = tokens[self.position]
         else:
             self.current_token = None
 
     def peek(self, lookahead=1):
         """Look ahead at the next token"""
         pos = self.position + lookahead
-        if pos < len(self.tokens):
+        if self._has_token(pos):
             return self.tokens[pos]
         return None
 
@@ -128,7 +153,7 @@ class HybridParser:
     def peek_ahead(self, offset=1):
         """Peek ahead at token at position + offset"""
         peek_pos = self.position + offset
-        if peek_pos < len(self.tokens):
+        if self._has_token(peek_pos):
             return self.tokens[peek_pos]
         return None
 
@@ -216,6 +241,30 @@ class HybridParser:
             node.with_pos(getattr(tok, 'line', None), getattr(tok, 'column', None), getattr(self, 'filename', None))
         return node
 
+    def _literal(self, cls, tok, *args):
+        """Return cls(*args) positioned at tok, or the shared node for it
+        when literals are shared"""
+        literals = self._literals
+        if literals is None:
+            return self._with_pos(cls(*args), tok)
+        # The value's type is part of the key so 1, 1.0 and True stay apart
+        key = (cls, *args, *map(type, args))
+        node = literals.get(key)
+        if node is None:
+            node = literals[key] = cls(*args)
+        return node
+
+    def _term(self, value, is_variable=False):
+        """Return a logic Term, shared between equal terms when literals are shared"""
+        literals = self._literals
+        if literals is None:
+            return Term(value, is_variable)
+        key = (Term, value, is_variable, type(value))
+        term = literals.get(key)
+        if term is None:
+            term = literals[key] = Term(value, is_variable)
+        return term
+
     # ============ Type System Parsing (تحليل نظام الأنواع) ============
 
     def _is_type_token(self):
@@ -382,6 +431,8 @@ class HybridParser:
             return self.parse_fact()
         elif self.match(TokenType.RULE):
             return self.parse_rule()
+        elif self.match(TokenType.IMPLIES):
+            return self.parse_table_directive()
         elif self.match(TokenType.IMPORT):
             return self.parse_import_statement()
         elif self.match(TokenType.FROM):
@@ -509,7 +560,7 @@ class HybridParser:
                 found_in = False
                 temp_pos = self.position
 
-                while temp_pos < len(self.tokens):
+                while self._has_token(temp_pos):
                     tok = self.tokens[temp_pos]
                     if tok.type in (TokenType.LPAREN, TokenType.LBRACKET, TokenType.LBRACE):
                         depth += 1
@@ -528,7 +579,7 @@ class HybridParser:
 
                 # Reset position
                 self.position = saved_pos
-                self.current_token = self.tokens[self.position] if self.position < len(self.tokens) else None
+                self.current_token = self.tokens[self.position] if self._has_token(self.position) else None
 
                 if found_colon:
                     # This is 'match value: { case ... }' - new pattern matching
@@ -574,6 +625,8 @@ class HybridParser:
         while self.current_token and self.current_token.type != TokenType.RBRACE:
             if self.match(TokenType.QUERY):
                 logical_stmts.append(self.parse_query())
+            elif self.match(TokenType.IMPLIES):
+                logical_stmts.append(self.parse_table_directive())
             elif self.match(TokenType.RULE):
                 logical_stmts.append(self.parse_rule())
             elif self.match(TokenType.FACT):
@@ -610,6 +663,8 @@ class HybridParser:
         while self.current_token and self.current_token.type != TokenType.RBRACE:
             if self.match(TokenType.QUERY):
                 logical_stmts.append(self.parse_query())
+            elif self.match(TokenType.IMPLIES):
+                logical_stmts.append(self.parse_table_directive())
             elif self.match(TokenType.RULE):
                 logical_stmts.append(self.parse_rule())
             elif self.match(TokenType.FACT):
@@ -684,97 +739,87 @@ class HybridParser:
         text = f"{a} {b}"
         return PhraseStatement(text, relation)
 
+    # Token types that can never name a predicate in a fact or rule head
+    _NON_PREDICATE_TYPES = frozenset((
+        TokenType.LPAREN, TokenType.RPAREN, TokenType.LBRACE,
+        TokenType.RBRACE, TokenType.LBRACKET, TokenType.RBRACKET,
+        TokenType.COMMA, TokenType.DOT, TokenType.COLON,
+        TokenType.SEMICOLON, TokenType.OPERATOR, TokenType.ASSIGN,
+        TokenType.NUMBER, TokenType.STRING, TokenType.EOF,
+    ))
+
+    def _paren_span(self, open_pos):
+        """Return (close_pos, has_operator) for the LPAREN at open_pos
+
+        close_pos is the position of the matching RPAREN (None when the
+        parentheses never balance) and has_operator tells whether an
+        OPERATOR appears at the top level of the enclosed arguments.
+        Every parenthesis met on the way is recorded too, so each token
+        is scanned at most once per parser however many statements probe
+        it.  يحسب مدى الأقواس مرة واحدة لكل رمز
+        """
+        spans = self._paren_spans
+        span = spans.get(open_pos)
+        if span is not None:
+            return span
+
+        tokens = self.tokens
+        has_token = self._has_token
+        # Stack of [open position, has_operator] for parentheses still open
+        stack = [[open_pos, False]]
+        pos = open_pos + 1
+        while stack and has_token(pos):
+            token_type = tokens[pos].type
+            if token_type == TokenType.LPAREN:
+                known = spans.get(pos)
+                if known is not None and known[0] is not None:
+                    # Already scanned: jump straight past the nested group
+                    pos = known[0] + 1
+                    continue
+                stack.append([pos, False])
+            elif token_type == TokenType.RPAREN:
+                opened, has_operator = stack.pop()
+                spans[opened] = (pos, has_operator)
+            elif token_type == TokenType.OPERATOR:
+                stack[-1][1] = True
+            pos += 1
+
+        # Whatever is still open runs off the end of the tokens
+        for opened, has_operator in stack:
+            spans[opened] = (None, has_operator)
+        return spans[open_pos]
+
+    def _predicate_close(self):
+        """Return the _paren_span of a 'name(' at the current token, or None"""
+        token = self.current_token
+        if not token or token.type in self._NON_PREDICATE_TYPES:
+            return None
+        following = self.peek(1)
+        if not following or following.type != TokenType.LPAREN:
+            return None
+        return self._paren_span(self.position + 1)
+
     def is_logical_fact(self):
         """Check if the current token is a logical fact (identifier/keyword followed by parentheses and dot)
 
         A logical fact is like: predicate(arg1, arg2, ...).
         It should NOT contain operators like +, -, *, / in arguments (those are function calls).
         """
-        if not self.current_token:
-            return False
-
-        # Allow any token that has a value (identifier or keyword) as predicate name
-        # Skip tokens that are operators or punctuation
-        if self.current_token.type in (TokenType.LPAREN, TokenType.RPAREN, TokenType.LBRACE,
-                                       TokenType.RBRACE, TokenType.LBRACKET, TokenType.RBRACKET,
-                                       TokenType.COMMA, TokenType.DOT, TokenType.COLON,
-                                       TokenType.SEMICOLON, TokenType.OPERATOR, TokenType.ASSIGN,
-                                       TokenType.NUMBER, TokenType.STRING, TokenType.EOF):
+        span = self._predicate_close()
+        if span is None or span[0] is None:
             return False
-
-        # Look ahead to see if it's followed by ( and eventually )
-        saved_pos = self.position
-        try:
-            self.advance()  # Skip identifier/keyword
-            if self.current_token and self.current_token.type == TokenType.LPAREN:
-                # Count parentheses to find the matching closing paren
-                # Also check for operators which would indicate a function call, not a logical fact
-                paren_count = 1
-                has_operator = False
-                self.advance()
-                while self.current_token and paren_count > 0:
-                    if self.current_token.type == TokenType.LPAREN:
-                        paren_count += 1
-                    elif self.current_token.type == TokenType.RPAREN:
-                        paren_count -= 1
-                    elif self.current_token.type == TokenType.OPERATOR and paren_count == 1:
-                        # Found operator at top level of arguments - this is a function call
-                        has_operator = True
-                    self.advance()
-
-                # Check if followed by DOT and has no operators
-                result = (self.current_token and self.current_token.type == TokenType.DOT
-                          and not has_operator)
-                self.position = saved_pos
-                self.current_token = self.tokens[self.position] if self.position < len(self.tokens) else None
-                return result
-        except:
-            pass
-
-        self.position = saved_pos
-        self.current_token = self.tokens[self.position] if self.position < len(self.tokens) else None
-        return False
+        close_pos, has_operator = span
+        after = self.peek(close_pos + 1 - self.position)
+        return bool(after and after.type == TokenType.DOT and not has_operator)
 
     def is_logical_rule(self):
         """Check if the current token is a logical rule (predicate followed by :- and dot)"""
-        if not self.current_token:
+        span = self._predicate_close()
+        if span is None or span[0] is None:
             return False
-
-        # Allow any token that has a value (identifier or keyword) as predicate name
-        # Skip tokens that are operators or punctuation
-        if self.current_token.type in (TokenType.LPAREN, TokenType.RPAREN, TokenType.LBRACE,
-                                       TokenType.RBRACE, TokenType.LBRACKET, TokenType.RBRACKET,
-                                       TokenType.COMMA, TokenType.DOT, TokenType.COLON,
-                                       TokenType.SEMICOLON, TokenType.OPERATOR, TokenType.ASSIGN,
-                                       TokenType.NUMBER, TokenType.STRING, TokenType.EOF):
-            return False
-
-        # Look ahead to see if it's followed by ( and eventually :- and )
-        saved_pos = self.position
-        try:
-            self.advance()  # Skip identifier
-            if self.current_token and self.current_token.type == TokenType.LPAREN:
-                # Count parentheses to find the matching closing paren
-                paren_count = 1
-                self.advance()
-                while self.current_token and paren_count > 0:
-                    if self.current_token.type == TokenType.LPAREN:
-                        paren_count += 1
-                    elif self.current_token.type == TokenType.RPAREN:
-                        paren_count -= 1
-                    self.advance()
-
-                # Check if followed by IMPLIES (:-) or ARROW (←)
-                result = self.current_token and self.current_token.type in (TokenType.IMPLIES, TokenType.ARROW)
-                self.position = saved_pos
-                self.current_token = self.tokens[self.position] if self.position < len(self.tokens) else None
-                return result
-        except:
-            pass
-
-        self.position = saved_pos
-        self.current_token = self.tokens[self.position] if self.position < len(self.tokens) else None
-        return False
+        after = self.peek(span[0] + 1 - self.position)
+        # Followed by IMPLIES (:-) or ARROW (←)
+        return bool(after and after.type in (TokenType.IMPLIES, TokenType.ARROW))
 
     def _parse_function_colon_syntax(self):
         """Parse 'function: name(args) { body }' syntax (alternative function definition)"""
@@ -943,7 +988,7 @@ class HybridParser:
                 next_tok = self.current_token
                 if next_tok:
                     self.position += 1
-                    self.current_token = self.tokens[self.position] if self.position < len(self.tokens) else None
+                    self.current_token = self.tokens[self.position] if self._has_token(self.position) else None
                     name = name + '.' + next_tok.value
 
         args = []
@@ -1779,7 +1824,7 @@ class HybridParser:
             if next_tok and next_tok.type == TokenType.COLON:
                 # Look ahead to see if this is a type annotation
                 pos = self.position + 2
-                if pos < len(self.tokens):
+                if self._has_token(pos):
                     after_colon = self.tokens[pos]
                     if self._is_type_token_at(after_colon) or (after_colon.type == TokenType.IDENTIFIER and after_colon.value[0].isupper()):
                         # This is a typed variable declaration
@@ -1824,11 +1869,11 @@ class HybridParser:
                     else:
                         # Not tuple unpacking, restore position
                         self.position = saved_pos
-                        self.current_token = self.tokens[self.position] if self.position < len(self.tokens) else None
+                        self.current_token = self.tokens[self.position] if self._has_token(self.position) else None
                 except:
                     # Restore position on any error
                     self.position = saved_pos
-                    self.current_token = self.tokens[self.position] if self.position < len(self.tokens) else None
+                    self.current_token = self.tokens[self.position] if self._has_token(self.position) else None
 
         expr = self.parse_expression()
 
@@ -2128,7 +2173,7 @@ class HybridParser:
         elif self.match(TokenType.NUMBER):
             tok = self.eat(TokenType.NUMBER)
             value = tok.value
-            return self._with_pos(Number(float(value) if '.' in value else int(value)), tok)
+            return self._literal(Number, tok, float(value) if '.' in value else int(value))
 
         elif self.match(TokenType.STRING):
             tok = self.eat(TokenType.STRING)
@@ -2139,7 +2184,7 @@ class HybridParser:
             else:
                 inner = value[1:-1]
             inner = self._unescape_string(inner)
-            return self._with_pos(String(inner), tok)
+            return self._literal(String, tok, inner)
 
         elif self.match(TokenType.FSTRING):
             tok = self.eat(TokenType.FSTRING)
@@ -2157,16 +2202,16 @@ class HybridParser:
 
         elif self.match(TokenType.TRUE):
             tok = self.eat(TokenType.TRUE)
-            return self._with_pos(Boolean(True), tok)
+            return self._literal(Boolean, tok, True)
 
         elif self.match(TokenType.FALSE):
             tok = self.eat(TokenType.FALSE)
-            return self._with_pos(Boolean(False), tok)
+            return self._literal(Boolean, tok, False)
 
         elif self.match(TokenType.NONE):
             tok = self.eat(TokenType.NONE)
             # Treat None as a true literal, not as a variable name
-            return self._with_pos(NoneLiteral(), tok)
+            return self._literal(NoneLiteral, tok)
 
         elif self.match(TokenType.VARIABLE):
             # Logical variable
@@ -2440,7 +2485,7 @@ class HybridParser:
                 else:
                     # Restore position and continue normal parsing
                     self.position = saved_pos
-                    self.current_token = self.tokens[self.position] if self.position < len(self.tokens) else None
+                    self.current_token = self.tokens[self.position] if self._has_token(self.position) else None
 
             # Parse first expression
             first_expr = self.parse_expression()
@@ -3046,6 +3091,39 @@ class HybridParser:
 
         return LogicalFact(pred_or_sugar, probability=prob_expr)
 
+    def parse_table_directive(self):
+        """Parse a tabling directive: :- table ancestor/2, path/2.
+        Arabic form: :- جدولة سلف/2."""
+        start_tok = self.current_token
+        self.eat(TokenType.IMPLIES)
+        if not (self.current_token and self.current_token.type == TokenType.IDENTIFIER
+                and self.current_token.value in ('table', 'جدولة')):
+            raise SyntaxError(f"Expected 'table' after ':-', got {self.current_token}")
+        self.advance()
+
+        predicates = []
+        while True:
+            name_tok = self.current_token
+            if not name_tok or name_tok.type in (TokenType.DOT, TokenType.EOF):
+                raise SyntaxError(f"Expected predicate name in table directive, got {name_tok}")
+            self.advance()
+            if not (self.current_token and self.current_token.type == TokenType.OPERATOR
+                    and self.current_token.value == '/'):
+                raise SyntaxError(f"Expected '/' after '{name_tok.value}' in table directive")
+            self.advance()
+            arity_tok = self.current_token
+            if not arity_tok or arity_tok.type != TokenType.NUMBER:
+                raise SyntaxError(f"Expected arity after '{name_tok.value}/', got {arity_tok}")
+            self.advance()
+            predicates.append((name_tok.value, int(arity_tok.value)))
+            if self.match(TokenType.COMMA):
+                self.eat(TokenType.COMMA)
+                continue
+            break
+
+        self.eat(TokenType.DOT)
+        return self._with_pos(TableDirective(predicates), start_tok)
+
     def parse_rule(self):
         """Parse a logical rule.
         Supports rule: head :- body. syntax.
@@ -3503,7 +3581,7 @@ class HybridParser:
         """Parse a logical term (including list patterns and expressions)"""
         if self.match(TokenType.VARIABLE):
             var_name = self.eat(TokenType.VARIABLE).value[1:]  # Remove ?
-            return Term(var_name, is_variable=True)
+            return self._term(var_name, is_variable=True)
 
         elif self.match(TokenType.STRING):
             raw = self.eat(TokenType.STRING).value
@@ -3512,18 +3590,18 @@ class HybridParser:
             else:
                 value = raw[1:-1]
             value = self._unescape_string(value)
-            return Term(value, is_variable=False)
+            return self._term(value)
 
         elif self.match(TokenType.NUMBER):
             value = self.eat(TokenType.NUMBER).value
-            return Term(value, is_variable=False)
+            return self._term(value)
 
         elif self.match(TokenType.OPERATOR) and self.current_token.value == '-':
             # Handle unary minus for negative numbers: -5
             self.eat(TokenType.OPERATOR)
             if self.match(TokenType.NUMBER):
                 value = '-' + self.eat(TokenType.NUMBER).value
-                return Term(value, is_variable=False)
+                return self._term(value)
             else:
                 raise SyntaxError(f"Expected number after unary minus, got {self.current_token}")
 
@@ -3541,20 +3619,20 @@ class HybridParser:
             if self.match(TokenType.LBRACKET):
                 # This is a subscript expression like rec[0]
                 self.position = saved_pos
-                self.current_token = self.tokens[self.position] if self.position < len(self.tokens) else None
+                self.current_token = self.tokens[self.position] if self._has_token(self.position) else None
                 expr = self.parse_expression()
                 # Wrap expression in a special term that will be evaluated at runtime
                 return ExpressionTerm(expr)
             elif self.match(TokenType.LPAREN):
                 # This is a predicate call like recommended_food(UserId, Food, _)
                 self.position = saved_pos
-                self.current_token = self.tokens[self.position] if self.position < len(self.tokens) else None
+                self.current_token = self.tokens[self.position] if self._has_token(self.position) else None
                 return self.parse_logical_predicate()
             else:
                 # Simple identifier - treat as variable if capitalized (Prolog convention)
                 if id_tok.value[0].isupper():
-                    return Term(id_tok.value, is_variable=True)
-                return Term(id_tok.value, is_variable=False)
+                    return self._term(id_tok.value, is_variable=True)
+                return self._term(id_tok.value)
 
         elif self.match(TokenType.LBRACKET):
             # Parse list or list pattern
@@ -3831,7 +3909,7 @@ class HybridParser:
                 if op in ['>', '<', '>=', '<=', '=<', '==', '!=', '=:=', '=\\=', '@<', '@>', '@=<', '@>=']:
                     # Restore and parse as comparison
                     self.position = saved_pos
-                    self.current_token = self.tokens[self.position] if self.position < len(self.tokens) else None
+                    self.current_token = self.tokens[self.position] if self._has_token(self.position) else None
                     left = self.parse_logical_term()
                     op_tok = self.eat(TokenType.OPERATOR)
                     right = self.parse_additive()
@@ -3840,12 +3918,12 @@ class HybridParser:
                 else:
                     # Not a comparison, restore and parse as predicate
                     self.position = saved_pos
-                    self.current_token = self.tokens[self.position] if self.position < len(self.tokens) else None
+                    self.current_token = self.tokens[self.position] if self._has_token(self.position) else None
                     return self.parse_logical_predicate()
             else:
                 # Not an 'is' expression or comparison, restore position and parse as predicate
                 self.position = saved_pos
-                self.current_token = self.tokens[self.position] if self.position < len(self.tokens) else None
+                self.current_token = self.tokens[self.position] if self._has_token(self.position) else None
                 return self.parse_logical_predicate()
 
         # Check for comparison expressions: ?X > 5, ?Y < 10, etc.
@@ -3889,12 +3967,12 @@ class HybridParser:
                     else:
                         # Not a comparison, restore and parse as predicate
                         self.position = saved_pos
-                        self.current_token = self.tokens[self.position] if self.position < len(self.tokens) else None
+                        self.current_token = self.tokens[self.position] if self._has_token(self.position) else None
                         return self.parse_logical_predicate()
                 else:
                     # Restore and try to parse as predicate
                     self.position = saved_pos
-                    self.current_token = self.tokens[self.position] if self.position < len(self.tokens) else None
+                    self.current_token = self.tokens[self.position] if self._has_token(self.position) else None
                     # Try to parse as comparison
                     left = self.parse_logical_term()
 
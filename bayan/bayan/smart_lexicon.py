@@ -9,11 +9,15 @@ import re
 import ast
 from typing import Dict, List, Any, Optional
 from bayan.bayan.word_energy_matrix import WordEnergyMatrix
+from bayan.bayan.lookup_cache import LookupCache
 
 class SmartLexicon:
-    def __init__(self, lexicon_path: str = "ai/lexicon.bayan"):
+    def __init__(self, lexicon_path: str = "ai/lexicon.bayan",
+                 cache_size: int = 10000, cache_ttl: Optional[float] = None):
         self.wem = WordEnergyMatrix()
         self.lexicon_data = self._load_lexicon_file(lexicon_path)
+        # Enriched entries (and unknown concept/language pairs)
+        self.cache = LookupCache('smart_lexicon.entries', cache_size, cache_ttl)
         
     def _load_lexicon_file(self, path: str) -> Dict:
         """
@@ -68,7 +72,13 @@ class SmartLexicon:
     def enrich_entry(self, concept_key: str, lang: str) -> Optional[Dict]:
         """
         Returns the lexicon entry enriched with WEM analysis.
+        Entries are cached: every call for a concept and language returns
+        the same dict, so treat it as read-only (copy it to change it).
         """
+        return self.cache.get_or_compute((concept_key, lang),
+                                         lambda: self._enrich_entry(concept_key, lang))
+
+    def _enrich_entry(self, concept_key: str, lang: str) -> Optional[Dict]:
         if concept_key not in self.lexicon_data:
             return None
             
@@ -122,3 +132,7 @@ class SmartLexicon:
 
     def get_all_concepts(self) -> List[str]:
         return list(self.lexicon_data.keys())
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Concept count and enrichment cache statistics."""
+        return {'concepts': len(self.lexicon_data), 'cache': self.cache.stats()}
@@ -7,30 +7,15 @@ import random
 import re
 import asyncio
 import inspect
+import itertools
 import json
 import math
 
 from .ast_nodes import *
 from .object_system import ClassSystem, BayanObject
 from .import_system import ImportSystem
-
-class ReturnValue(Exception):
-    """Exception to handle return statements"""
-    def __init__(self, value):
-        self.value = value
-
-class BreakException(Exception):
-    """Exception to handle break statements"""
-    pass
-
-class ContinueException(Exception):
-    """Exception to handle continue statements"""
-    pass
-
-class YieldValue(Exception):
-    """Exception to handle yield expressions in generators"""
-    def __init__(self, value):
-        self.value = value
+from .control_flow import (ReturnValue, BreakException, ContinueException, YieldValue,
+                           Completion, BREAK, CONTINUE)
 
 class BayanRuntimeError(Exception):
     """Runtime error that carries a Bayan stack trace"""
@@ -41,6 +26,10 @@ class BayanException(Exception):
     def __init__(self, value=None):
         self.value = value
 
+# Exceptions that pass through interpret() without a Bayan stack trace
+_UNWRAPPED_ERRORS = (ReturnValue, BreakException, ContinueException, YieldValue,
+                     BayanException, BayanRuntimeError, ContractError)
+
 
 
 class TraditionalInterpreter:
@@ -116,8 +105,29 @@ class TraditionalInterpreter:
         self.logical_engine.function_evaluator = self._evaluate_function_for_logic
         # Track current owner class for super() resolution in MRO
         self._owner_stack = []
-        # Bayan runtime call stack of (node_type, line, column, filename)
+        # Bayan runtime call stack of the nodes being evaluated
         self._call_stack = []
+        # Push a frame for every node ('node') or only for statements and
+        # calls ('statement'); see set_position_tracking()
+        self._track_every_node = True
+        # Node type -> bound visitor, filled lazily from _NODE_VISITORS
+        self._visitors = {}
+        # Statement type -> runner that returns break, continue and return
+        # as a Completion instead of raising (see _run_statement)
+        self._runners = {
+            Block: self._run_block,
+            IfStatement: self._run_if,
+            ForLoop: self._run_for,
+            WhileLoop: self._run_while,
+            BreakStatement: self._run_break,
+            ContinueStatement: self._run_continue,
+            ReturnStatement: self._run_return,
+        }
+        # Run function bodies as compiled closures (see closure_compiler.py)
+        self.compile_functions = False
+        self._closure_compiler = None
+        # BytecodeVM running compiled function bodies (set by HybridInterpreter)
+        self.bytecode_vm = None
         # Optional source buffer for code-frame rendering
         self._source_lines = None
         self._source_filename = None
@@ -247,20 +257,9 @@ class TraditionalInterpreter:
             if not found_path:
                 raise FileNotFoundError(f"File '{filename}' not found")
                 
-            # Read and execute
-            with open(found_path, 'r', encoding='utf-8') as f:
-                code = f.read()
-            
-            # We need to parse and interpret this code
-            # Since we are in TraditionalInterpreter, we don't have direct access to HybridParser
-            # But we can import it dynamically
-            from .lexer import HybridLexer
-            from .parser import HybridParser
-            
-            lexer = HybridLexer(code)
-            tokens = lexer.tokenize()
-            parser = HybridParser(tokens)
-            ast = parser.parse()
+            # Parse (through the .bayanc cache) and execute
+            from .compile_cache import parse_file
+            ast = parse_file(found_path)
             
             # Execute in current environment
             self.interpret(ast)
@@ -1440,38 +1439,61 @@ class TraditionalInterpreter:
                 raise TypeError("Object is not iterable")
         return obj
 
+    def set_position_tracking(self, mode: str):
+        """Choose how much position information the Bayan stack records.
+        - 'node': a frame for every node evaluated (default, most detailed)
+        - 'statement': frames only for statements and calls; errors inside
+          an expression are reported at the enclosing statement or call
+        """
+        if mode not in ('node', 'statement'):
+            raise ValueError(f"Unknown position tracking mode: {mode}")
+        self._track_every_node = mode == 'node'
+
     def interpret(self, node):
         """Interpret an AST node with Bayan stack tracking"""
-        # Push current frame (node type + optional position)
-        self._call_stack.append((type(node).__name__, getattr(node, 'line', None), getattr(node, 'column', None), getattr(node, 'filename', None)))
+        node_type = type(node)
+        visitor = self._visitors.get(node_type)
+        if not self._track_every_node and node_type in self._EXPRESSION_NODES:
+            return (visitor or self._resolve_visitor(node_type))(node)
+        # Push the node itself; its position is only read if an error is reported
+        self._call_stack.append(node)
         try:
-            return self._interpret_core(node)
+            if visitor is None:
+                visitor = self._resolve_visitor(node_type)
+            return visitor(node)
         except Exception as e:
             # Control-flow exceptions should not be wrapped
-            if isinstance(e, (ReturnValue, BreakException, ContinueException, YieldValue, BayanException, BayanRuntimeError, ContractError)):
+            if isinstance(e, _UNWRAPPED_ERRORS):
                 raise
-            frames = list(self._call_stack)
-            trace = " -> ".join(
-                (f"{name}@{fn}:{ln}:{col}" if fn else f"{name}@{ln}:{col}") if ln is not None else name
-                for (name, ln, col, fn) in frames
-            )
-            # Try to add a code-frame for the most recent frame with position
-            code_frame = ""
-            try:
-                for (name, ln, col, fn) in reversed(frames):
-                    if ln is not None and col is not None:
-                        # Only render frame if we have a matching source buffer
-                        if self._source_lines is not None and (self._source_filename == fn or self._source_filename is None):
-                            code_frame = self._build_code_frame(fn, int(ln), int(col))
-                        break
-            except Exception:
-                # Never fail error reporting
-                code_frame = ""
-            raise BayanRuntimeError(f"{e.__class__.__name__}: {e}\nBayan stack: {trace}{code_frame}")
+            raise self._runtime_error(e)
         finally:
             self._call_stack.pop()
 
 
+    def _runtime_error(self, e):
+        """Build a BayanRuntimeError for e from the current Bayan stack"""
+        frames = [
+            (type(n).__name__, getattr(n, 'line', None), getattr(n, 'column', None), getattr(n, 'filename', None))
+            for n in self._call_stack
+        ]
+        trace = " -> ".join(
+            (f"{name}@{fn}:{ln}:{col}" if fn else f"{name}@{ln}:{col}") if ln is not None else name
+            for (name, ln, col, fn) in frames
+        )
+        # Try to add a code-frame for the most recent frame with position
+        code_frame = ""
+        try:
+            for (name, ln, col, fn) in reversed(frames):
+                if ln is not None and col is not None:
+                    # Only render frame if we have a matching source buffer
+                    if self._source_lines is not None and (self._source_filename == fn or self._source_filename is None):
+                        code_frame = self._build_code_frame(fn, int(ln), int(col))
+                    break
+        except Exception:
+            # Never fail error reporting
+            code_frame = ""
+        return BayanRuntimeError(f"{e.__class__.__name__}: {e}\nBayan stack: {trace}{code_frame}")
+
     def _style(self, text: str, *kinds: str) -> str:
         if not self._err_color:
             return text
@@ -1540,281 +1562,265 @@ class TraditionalInterpreter:
                 lines_out.append(' ' * (1 + pad + 3) + caret_indent + caret)
         return '\n'.join(lines_out)
 
-    def _interpret_core(self, node):
-        """Core interpret dispatch without stack handling"""
-        if isinstance(node, Program):
-            return self.visit_program(node)
-        elif isinstance(node, Block):
-            return self.visit_block(node)
-        elif isinstance(node, Assignment):
-            return self.visit_assignment(node)
-        elif isinstance(node, BinaryOp):
-            return self.visit_binary_op(node)
-        elif isinstance(node, UnaryOp):
-            return self.visit_unary_op(node)
-        elif isinstance(node, Number):
-            val = node.value
-            # Convert string to int/float if needed
-            if isinstance(val, str):
-                try:
-                    if '.' in val:
-                        return float(val)
-                    else:
-                        return int(val)
-                except ValueError:
-                    return val
-            return val
-        elif isinstance(node, String):
-            return node.value
-        elif isinstance(node, FString):
-            return self.visit_fstring(node)
-        elif isinstance(node, Boolean):
-            return node.value
-        elif isinstance(node, NoneLiteral):
-            # Bayan None literal maps directly to Python None
-            return None
-        elif isinstance(node, TernaryOp):
-            return self.visit_ternary_op(node)
-
-        elif isinstance(node, CollectExpr):
-            return self.visit_collect_expr(node)
-        elif isinstance(node, TopkExpr):
-            return self.visit_topk_expr(node)
-        elif isinstance(node, ArgmaxExpr):
-            return self.visit_argmax_expr(node)
-        elif isinstance(node, ChooseExpr):
-            return self.visit_choose_expr(node)
-        elif isinstance(node, SampleAssign):
-            return self.visit_sample_assign(node)
-        elif isinstance(node, Variable):
-            return self.visit_variable(node)
-        elif isinstance(node, List):
-            return self.visit_list(node)
-        elif isinstance(node, ListComprehension):
-            return self.visit_list_comprehension(node)
-        elif isinstance(node, DictComprehension):
-            return self.visit_dict_comprehension(node)
-        elif isinstance(node, SetComprehension):
-            return self.visit_set_comprehension(node)
-        elif isinstance(node, Dict):
-            return self.visit_dict(node)
-        elif isinstance(node, Tuple):
-            return self.visit_tuple(node)
-        elif isinstance(node, Set):
-            return self.visit_set(node)
-        elif isinstance(node, FunctionCall):
-            return self.visit_function_call(node)
-        elif isinstance(node, FunctionDef):
-            return self.visit_function_def(node)
-        elif isinstance(node, ClassDef):
-            return self.visit_class_def(node)
-        elif isinstance(node, IfStatement):
-            return self.visit_if_statement(node)
-        elif isinstance(node, ForLoop):
-            return self.visit_for_loop(node)
-        elif isinstance(node, WhileLoop):
-            return self.visit_while_loop(node)
-        elif isinstance(node, ReturnStatement):
-            return self.visit_return_statement(node)
-        elif isinstance(node, BreakStatement):
-            raise BreakException()
-        elif isinstance(node, ContinueStatement):
-            raise ContinueException()
-        elif isinstance(node, PrintStatement):
-            return self.visit_print_statement(node)
-        elif isinstance(node, SimilarityDecl):
-            return self.visit_similarity_decl(node)
-        elif isinstance(node, AttributeAccess):
-            return self.visit_attribute_access(node)
-        elif isinstance(node, SubscriptAccess):
-            return self.visit_subscript_access(node)
-        elif isinstance(node, AttributeAssignment):
-            return self.visit_attribute_assignment(node)
-        elif isinstance(node, SubscriptAssignment):
-            return self.visit_subscript_assignment(node)
-        elif isinstance(node, MethodCall):
-            return self.visit_method_call(node)
-        elif isinstance(node, SelfReference):
-            return self.visit_self_reference(node)
-        elif isinstance(node, SuperCall):
-            return self.visit_super_call(node)
-        elif isinstance(node, ImportStatement):
-            return self.visit_import_statement(node)
-        elif isinstance(node, FromImportStatement):
-            return self.visit_from_import_statement(node)
-        elif isinstance(node, RaiseStatement):
-            return self.visit_raise_statement(node)
-        elif isinstance(node, TryExceptFinally):
-            return self.visit_try_except_finally(node)
-        elif isinstance(node, AsyncFunctionDef):
-            return self.visit_async_function_def(node)
-        elif isinstance(node, AwaitExpr):
-            return self.visit_await_expr(node)
-        elif isinstance(node, YieldExpr):
-            return self.visit_yield_expr(node)
-        elif isinstance(node, WithStatement):
-            return self.visit_with_statement(node)
-        elif isinstance(node, OnceStatement):
-            return self.visit_once_statement(node)
-        elif isinstance(node, OnceGoal):
-            return self.visit_once_goal(node)
-        elif isinstance(node, LimitStatement):
-            return self.visit_limit_statement(node)
-        elif isinstance(node, LimitGoal):
-            return self.visit_limit_goal(node)
-        elif isinstance(node, MatchInAs):
-            return self.visit_match_in_as(node)
-        elif isinstance(node, MatchStatement):
-            return self.visit_match_statement(node)
-        elif isinstance(node, TemporalBlock):
-            return self.visit_temporal_block(node)
-        elif isinstance(node, WithinBlock):
-            return self.visit_within_block(node)
-        elif isinstance(node, ScheduleBlock):
-            return self.visit_schedule_block(node)
-        elif isinstance(node, ReactiveDeclaration):
-            return self.visit_reactive_declaration(node)
-        elif isinstance(node, WatchBlock):
-            return self.visit_watch_block(node)
-        elif isinstance(node, ComputedProperty):
-            return self.visit_computed_property(node)
-        elif isinstance(node, DelayStatement):
-            return self.visit_delay_statement(node)
-        elif isinstance(node, WhereClause):
-            return self.visit_where_clause(node)
-        elif isinstance(node, RequiresClause):
-            return self.visit_requires_clause(node)
-        elif isinstance(node, EnsuresClause):
-            return self.visit_ensures_clause(node)
-        elif isinstance(node, InvariantClause):
-            return self.visit_invariant_clause(node)
-        elif isinstance(node, PipelineOp):
-            return self.visit_pipeline_op(node)
-        elif isinstance(node, ComposeOp):
-            return self.visit_compose_op(node)
-        elif isinstance(node, EntityDef):
-            return self.visit_entity_def(node)
-        elif isinstance(node, CognitiveEntity):
-            return self.visit_cognitive_entity(node)
-        elif isinstance(node, CognitiveEvent):
-            return self.visit_cognitive_event(node)
-        elif isinstance(node, TriggerEvent):
-            return self.visit_trigger_event(node)
-        elif isinstance(node, ConcurrentEvents):
-            return self.visit_concurrent_events(node)
-        elif isinstance(node, LinguisticPattern):
-            return self.visit_linguistic_pattern(node)
-        elif isinstance(node, IdeaDef):
-            return self.visit_idea_def(node)
-        elif isinstance(node, ConceptualBlueprint):
-            return self.visit_conceptual_blueprint(node)
+    # Node class -> visitor method name, in the order the old isinstance
+    # chain tested them: the first entry a node is an instance of wins
+    _NODE_VISITORS = (
+        (Program, 'visit_program'),
+        (Block, 'visit_block'),
+        (Assignment, 'visit_assignment'),
+        (BinaryOp, 'visit_binary_op'),
+        (UnaryOp, 'visit_unary_op'),
+        (Number, 'visit_number'),
+        (String, 'visit_string'),
+        (FString, 'visit_fstring'),
+        (Boolean, 'visit_boolean'),
+        (NoneLiteral, 'visit_none_literal'),
+        (TernaryOp, 'visit_ternary_op'),
+        (CollectExpr, 'visit_collect_expr'),
+        (TopkExpr, 'visit_topk_expr'),
+        (ArgmaxExpr, 'visit_argmax_expr'),
+        (ChooseExpr, 'visit_choose_expr'),
+        (SampleAssign, 'visit_sample_assign'),
+        (Variable, 'visit_variable'),
+        (List, 'visit_list'),
+        (ListComprehension, 'visit_list_comprehension'),
+        (DictComprehension, 'visit_dict_comprehension'),
+        (SetComprehension, 'visit_set_comprehension'),
+        (Dict, 'visit_dict'),
+        (Tuple, 'visit_tuple'),
+        (Set, 'visit_set'),
+        (FunctionCall, 'visit_function_call'),
+        (FunctionDef, 'visit_function_def'),
+        (ClassDef, 'visit_class_def'),
+        (IfStatement, 'visit_if_statement'),
+        (ForLoop, 'visit_for_loop'),
+        (WhileLoop, 'visit_while_loop'),
+        (ReturnStatement, 'visit_return_statement'),
+        (BreakStatement, 'visit_break_statement'),
+        (ContinueStatement, 'visit_continue_statement'),
+        (PrintStatement, 'visit_print_statement'),
+        (SimilarityDecl, 'visit_similarity_decl'),
+        (AttributeAccess, 'visit_attribute_access'),
+        (SubscriptAccess, 'visit_subscript_access'),
+        (AttributeAssignment, 'visit_attribute_assignment'),
+        (SubscriptAssignment, 'visit_subscript_assignment'),
+        (MethodCall, 'visit_method_call'),
+        (SelfReference, 'visit_self_reference'),
+        (SuperCall, 'visit_super_call'),
+        (ImportStatement, 'visit_import_statement'),
+        (FromImportStatement, 'visit_from_import_statement'),
+        (RaiseStatement, 'visit_raise_statement'),
+        (TryExceptFinally, 'visit_try_except_finally'),
+        (AsyncFunctionDef, 'visit_async_function_def'),
+        (AwaitExpr, 'visit_await_expr'),
+        (YieldExpr, 'visit_yield_expr'),
+        (WithStatement, 'visit_with_statement'),
+        (OnceStatement, 'visit_once_statement'),
+        (OnceGoal, 'visit_once_goal'),
+        (LimitStatement, 'visit_limit_statement'),
+        (LimitGoal, 'visit_limit_goal'),
+        (MatchInAs, 'visit_match_in_as'),
+        (MatchStatement, 'visit_match_statement'),
+        (TemporalBlock, 'visit_temporal_block'),
+        (WithinBlock, 'visit_within_block'),
+        (ScheduleBlock, 'visit_schedule_block'),
+        (ReactiveDeclaration, 'visit_reactive_declaration'),
+        (WatchBlock, 'visit_watch_block'),
+        (ComputedProperty, 'visit_computed_property'),
+        (DelayStatement, 'visit_delay_statement'),
+        (WhereClause, 'visit_where_clause'),
+        (RequiresClause, 'visit_requires_clause'),
+        (EnsuresClause, 'visit_ensures_clause'),
+        (InvariantClause, 'visit_invariant_clause'),
+        (PipelineOp, 'visit_pipeline_op'),
+        (ComposeOp, 'visit_compose_op'),
+        (EntityDef, 'visit_entity_def'),
+        (CognitiveEntity, 'visit_cognitive_entity'),
+        (CognitiveEvent, 'visit_cognitive_event'),
+        (TriggerEvent, 'visit_trigger_event'),
+        (ConcurrentEvents, 'visit_concurrent_events'),
+        (LinguisticPattern, 'visit_linguistic_pattern'),
+        (IdeaDef, 'visit_idea_def'),
+        (ConceptualBlueprint, 'visit_conceptual_blueprint'),
         # Semantic Programming & Knowledge Management
-        elif isinstance(node, SemanticMeaning):
-            return self.visit_semantic_meaning(node)
-        elif isinstance(node, SemanticQuery):
-            return self.visit_semantic_query(node)
-        elif isinstance(node, KnowledgeInfo):
-            return self.visit_knowledge_info(node)
-        elif isinstance(node, InferenceRule):
-            return self.visit_inference_rule(node)
-        elif isinstance(node, InferFrom):
-            return self.visit_infer_from(node)
-        elif isinstance(node, Contradiction):
-            return self.visit_contradiction(node)
-        elif isinstance(node, EvolvingKnowledge):
-            return self.visit_evolving_knowledge(node)
-        elif isinstance(node, Ontology):
-            return self.visit_ontology(node)
-        elif isinstance(node, SemanticMemory):
-            return self.visit_semantic_memory(node)
-        elif isinstance(node, SemanticSimilarity):
-            return self.visit_semantic_similarity(node)
-        elif isinstance(node, Concept):
-            return self.visit_concept(node)
-        elif isinstance(node, Narrative):
-            return self.visit_narrative(node)
-        elif isinstance(node, GenerateNarrative):
-            return self.visit_generate_narrative(node)
-        elif isinstance(node, CurrentContext):
-            return self.visit_current_context(node)
+        (SemanticMeaning, 'visit_semantic_meaning'),
+        (SemanticQuery, 'visit_semantic_query'),
+        (KnowledgeInfo, 'visit_knowledge_info'),
+        (InferenceRule, 'visit_inference_rule'),
+        (InferFrom, 'visit_infer_from'),
+        (Contradiction, 'visit_contradiction'),
+        (EvolvingKnowledge, 'visit_evolving_knowledge'),
+        (Ontology, 'visit_ontology'),
+        (SemanticMemory, 'visit_semantic_memory'),
+        (SemanticSimilarity, 'visit_semantic_similarity'),
+        (Concept, 'visit_concept'),
+        (Narrative, 'visit_narrative'),
+        (GenerateNarrative, 'visit_generate_narrative'),
+        (CurrentContext, 'visit_current_context'),
         # Existential Model
-        elif isinstance(node, Domain):
-            return self.visit_domain(node)
-        elif isinstance(node, GenericEnvironment):
-            return self.visit_generic_environment(node)
-        elif isinstance(node, ExistentialBeing):
-            return self.visit_existential_being(node)
-        elif isinstance(node, DomainRelation):
-            return self.visit_domain_relation(node)
-        elif isinstance(node, DomainAction):
-            return self.visit_domain_action(node)
-        elif isinstance(node, MetaphoricalMeaning):
-            return self.visit_metaphorical_meaning(node)
-        elif isinstance(node, DomainLaw):
-            return self.visit_domain_law(node)
-        elif isinstance(node, ExistentialQuery):
-            return self.visit_existential_query(node)
+        (Domain, 'visit_domain'),
+        (GenericEnvironment, 'visit_generic_environment'),
+        (ExistentialBeing, 'visit_existential_being'),
+        (DomainRelation, 'visit_domain_relation'),
+        (DomainAction, 'visit_domain_action'),
+        (MetaphoricalMeaning, 'visit_metaphorical_meaning'),
+        (DomainLaw, 'visit_domain_law'),
+        (ExistentialQuery, 'visit_existential_query'),
         # Semantic Programming nodes
-        elif isinstance(node, SemanticNetwork):
-            return self.visit_semantic_network(node)
-        elif isinstance(node, InferFromText):
-            return self.visit_infer_from_text(node)
+        (SemanticNetwork, 'visit_semantic_network'),
+        (InferFromText, 'visit_infer_from_text'),
         # Logical programming nodes
-        elif isinstance(node, LogicalFact):
-            return self.visit_logical_fact(node)
-        elif isinstance(node, LogicalRule):
-            return self.visit_logical_rule(node)
-        elif isinstance(node, LogicalQuery):
-            return self.visit_logical_query(node)
-        elif isinstance(node, QueryExpression):
-            return self.visit_query_expression(node)
-        elif isinstance(node, LambdaExpression):
-            return self.visit_lambda_expression(node)
+        (LogicalFact, 'visit_logical_fact'),
+        (LogicalRule, 'visit_logical_rule'),
+        (LogicalQuery, 'visit_logical_query'),
+        (TableDirective, 'visit_table_directive'),
+        (QueryExpression, 'visit_query_expression'),
+        (LambdaExpression, 'visit_lambda_expression'),
         # Type system nodes
-        elif isinstance(node, TypedVariable):
-            return self.visit_typed_variable(node)
-        elif isinstance(node, EnumDef):
-            return self.visit_enum_def(node)
-        elif isinstance(node, InterfaceDef):
-            return self.visit_interface_def(node)
+        (TypedVariable, 'visit_typed_variable'),
+        (EnumDef, 'visit_enum_def'),
+        (InterfaceDef, 'visit_interface_def'),
         # Advanced language features
-        elif isinstance(node, AssertStatement):
-            return self.visit_assert_statement(node)
-        elif isinstance(node, OptionalChain):
-            return self.visit_optional_chain(node)
-        elif isinstance(node, NullishCoalescing):
-            return self.visit_nullish_coalescing(node)
-        elif isinstance(node, WalrusAssignment):
-            return self.visit_walrus_assignment(node)
-        elif isinstance(node, SpreadOperator):
-            return self.visit_spread_operator(node)
-        elif isinstance(node, ChainedComparison):
-            return self.visit_chained_comparison(node)
-        elif isinstance(node, TupleUnpacking):
-            return self.visit_tuple_unpacking(node)
-        elif isinstance(node, MatchStatement):
-            return self.visit_match_statement(node)
-        elif isinstance(node, EnumDef):
-            return self.visit_enum_def(node)
-        elif isinstance(node, GlobalStatement):
-            return self.visit_global_statement(node)
-        elif isinstance(node, NonlocalStatement):
-            return self.visit_nonlocal_statement(node)
-        else:
-            raise RuntimeError(f"Unknown node type: {type(node)}")
+        (AssertStatement, 'visit_assert_statement'),
+        (OptionalChain, 'visit_optional_chain'),
+        (NullishCoalescing, 'visit_nullish_coalescing'),
+        (WalrusAssignment, 'visit_walrus_assignment'),
+        (SpreadOperator, 'visit_spread_operator'),
+        (ChainedComparison, 'visit_chained_comparison'),
+        (TupleUnpacking, 'visit_tuple_unpacking'),
+        (GlobalStatement, 'visit_global_statement'),
+        (NonlocalStatement, 'visit_nonlocal_statement'),
+    )
+
+    # Pure expression nodes that get no stack frame when position tracking
+    # is set to 'statement'
+    _EXPRESSION_NODES = frozenset((
+        Number, String, FString, Boolean, NoneLiteral, Variable, BinaryOp,
+        UnaryOp, TernaryOp, List, Dict, Tuple, Set, ListComprehension,
+        DictComprehension, SetComprehension, AttributeAccess, SubscriptAccess,
+        SelfReference, LambdaExpression, OptionalChain, NullishCoalescing,
+        ChainedComparison, SpreadOperator,
+    ))
+
+    def _resolve_visitor(self, node_type):
+        """Find and cache the bound visitor for node_type"""
+        for node_class, name in self._NODE_VISITORS:
+            if issubclass(node_type, node_class):
+                visitor = getattr(self, name)
+                self._visitors[node_type] = visitor
+                return visitor
+        raise RuntimeError(f"Unknown node type: {node_type}")
+
+    def _interpret_core(self, node):
+        """Core interpret dispatch without stack handling"""
+        visitor = self._visitors.get(type(node))
+        if visitor is None:
+            visitor = self._resolve_visitor(type(node))
+        return visitor(node)
+
+    def visit_number(self, node):
+        """Visit a number literal"""
+        val = node.value
+        # Convert string to int/float if needed
+        if isinstance(val, str):
+            try:
+                if '.' in val:
+                    return float(val)
+                else:
+                    return int(val)
+            except ValueError:
+                return val
+        return val
+
+    def visit_string(self, node):
+        """Visit a string literal"""
+        return node.value
+
+    def visit_boolean(self, node):
+        """Visit a boolean literal"""
+        return node.value
+
+    def visit_none_literal(self, node):
+        """Visit a None literal"""
+        # Bayan None literal maps directly to Python None
+        return None
+
+    def visit_break_statement(self, node):
+        """Visit a break statement"""
+        raise BreakException()
+
+    def visit_continue_statement(self, node):
+        """Visit a continue statement"""
+        raise ContinueException()
 
     def visit_program(self, node):
         """Visit a program node"""
-        result = None
-        for statement in node.statements:
-            result = self.interpret(statement)
-        return result
+        return self._raise_completion(self._run_statements(node.statements))
 
     def visit_block(self, node):
         """Visit a block node"""
+        return self._raise_completion(self._run_block(node))
+
+    # ---- Completion protocol ----
+    # Blocks, ifs and loops pass break, continue and return around as
+    # Completion values, which costs far less than raising. The visit_*
+    # methods are the boundary: a completion leaving them is raised as
+    # the matching control flow exception, so callers outside the
+    # protocol (other statements, the closure compiler, generators) see
+    # the exceptions as before, and loops still catch those.
+
+    def _run_statement(self, node):
+        """interpret() for a statement inside a block, loop or function
+        body: break, continue and return come back as a Completion"""
+        runner = self._runners.get(type(node))
+        if runner is None:
+            return self.interpret(node)
+        self._call_stack.append(node)
+        try:
+            return runner(node)
+        except Exception as e:
+            if isinstance(e, _UNWRAPPED_ERRORS):
+                raise
+            raise self._runtime_error(e)
+        finally:
+            self._call_stack.pop()
+
+    def _run_statements(self, statements):
+        """Run statements in order; return the first Completion, or else
+        the value of the last statement"""
         result = None
-        for statement in node.statements:
-            result = self.interpret(statement)
+        runners = self._runners
+        interpret = self.interpret
+        for statement in statements:
+            if type(statement) in runners:
+                result = self._run_statement(statement)
+                if type(result) is Completion:
+                    break
+            else:
+                # Other statements raise their control flow, never return it
+                result = interpret(statement)
+        return result
+
+    def _run_block(self, node):
+        return self._run_statements(node.statements)
+
+    def _run_break(self, node):
+        return BREAK
+
+    def _run_continue(self, node):
+        return CONTINUE
+
+    def _run_return(self, node):
+        value = None
+        if node.value:
+            value = self.interpret(node.value)
+        return Completion('return', value)
+
+    @staticmethod
+    def _raise_completion(result):
+        """Return result, raising it as an exception if it is a Completion"""
+        if type(result) is Completion:
+            raise result.signal()
         return result
 
     def visit_assignment(self, node):
@@ -1891,7 +1897,10 @@ class TraditionalInterpreter:
         """Visit a binary operation node"""
         left = self.interpret(node.left)
         right = self.interpret(node.right)
+        return self._binary_op(node.operator, left, right)
 
+    def _binary_op(self, operator, left, right):
+        """Apply a binary operator to evaluated operands"""
         # Helper to try dunder methods on BayanObject
         def _try_dunder(l, r, name, rname=None):
             if isinstance(l, BayanObject) and l.has_method(name):
@@ -1900,35 +1909,35 @@ class TraditionalInterpreter:
                 return r.call_method(rname, [l])
             return None
 
-        if node.operator == '+':
+        if operator == '+':
             res = _try_dunder(left, right, '__add__', '__radd__')
             return res if res is not None else (left + right)
-        elif node.operator == '-':
+        elif operator == '-':
             res = _try_dunder(left, right, '__sub__', '__rsub__')
             return res if res is not None else (left - right)
-        elif node.operator == '*':
+        elif operator == '*':
             res = _try_dunder(left, right, '__mul__', '__rmul__')
             return res if res is not None else (left * right)
-        elif node.operator == '/':
+        elif operator == '/':
             res = _try_dunder(left, right, '__truediv__', '__rtruediv__')
             return res if res is not None else (left / right)
-        elif node.operator == '%':
+        elif operator == '%':
             res = _try_dunder(left, right, '__mod__', '__rmod__')
             return res if res is not None else (left % right)
-        elif node.operator == '==':
+        elif operator == '==':
             res = _try_dunder(left, right, '__eq__')
             return res if res is not None else (left == right)
-        elif node.operator == '!=':
+        elif operator == '!=':
             res = _try_dunder(left, right, '__ne__')
             if res is not None:
                 return res
             # Fallback: negate __eq__ if provided
             eq_res = _try_dunder(left, right, '__eq__')
             return (not eq_res) if eq_res is not None else (left != right)
-        elif node.operator == '<':
+        elif operator == '<':
             res = _try_dunder(left, right, '__lt__')
             return res if res is not None else (left < right)
-        elif node.operator == '>':
+        elif operator == '>':
             res = _try_dunder(left, right, '__gt__')
             if res is not None:
                 return res
@@ -1936,7 +1945,7 @@ class TraditionalInterpreter:
             if isinstance(right, BayanObject) and right.has_method('__lt__'):
                 return right.call_method('__lt__', [left])
             return left > right
-        elif node.operator == '<=':
+        elif operator == '<=':
             res = _try_dunder(left, right, '__le__')
             if res is not None:
                 return res
@@ -1948,7 +1957,7 @@ class TraditionalInterpreter:
             if lt_res is not None:
                 return lt_res or (left == right)
             return left <= right
-        elif node.operator == '>=':
+        elif operator == '>=':
             res = _try_dunder(left, right, '__ge__')
             if res is not None:
                 return res
@@ -1962,36 +1971,39 @@ class TraditionalInterpreter:
             if gt_res is not None:
                 return gt_res or (left == right)
             return left >= right
-        elif node.operator in ('~=','≈'):
+        elif operator in ('~=','≈'):
             approx = self.global_env.get('approx_eq')
             if not callable(approx):
                 raise RuntimeError("approx_eq runtime is not available")
             return approx(left, right)
-        elif node.operator == 'in':
+        elif operator == 'in':
             # membership: left in right
             if isinstance(right, BayanObject) and right.has_method('__contains__'):
                 return right.call_method('__contains__', [left])
             return left in right
-        elif node.operator == 'and':
+        elif operator == 'and':
             # Preserve Python-like value return while using Bayan truthiness
             return right if self._truthy(left) else left
-        elif node.operator == 'or':
+        elif operator == 'or':
             return left if self._truthy(left) else right
         else:
-            raise RuntimeError(f"Unknown operator: {node.operator}")
+            raise RuntimeError(f"Unknown operator: {operator}")
 
     def visit_unary_op(self, node):
         """Visit a unary operation node"""
         operand = self.interpret(node.operand)
+        return self._unary_op(node.operator, operand)
 
-        if node.operator == '-':
+    def _unary_op(self, operator, operand):
+        """Apply a unary operator to an evaluated operand"""
+        if operator == '-':
             if isinstance(operand, BayanObject) and operand.has_method('__neg__'):
                 return operand.call_method('__neg__', [])
             return -operand
-        elif node.operator == 'not':
+        elif operator == 'not':
             return not self._truthy(operand)
         else:
-            raise RuntimeError(f"Unknown unary operator: {node.operator}")
+            raise RuntimeError(f"Unknown unary operator: {operator}")
 
     def visit_variable(self, node):
         """Visit a variable node"""
@@ -2233,6 +2245,17 @@ class TraditionalInterpreter:
 
         return args, named_args
 
+    # Names visit_function_call handles itself before looking at classes,
+    # values in scope and user-defined functions
+    _INTERCEPTED_CALLS = frozenset((
+        'من_يدرس', 'who_studies', 'ما_هو', 'what_is', 'تشابه', 'similarity',
+        'بناءً_على', 'based_on', 'len', 'range', 'str', 'repr', 'isinstance',
+        'type', 'callable', 'hasattr', 'getattr', 'setattr', 'bool', 'int',
+        'float', 'list', 'dict', 'sum', 'min', 'max', 'sorted', 'enumerate',
+        'zip', 'map', 'filter', 'all', 'any', 'abs', 'round', 'pow',
+        'reversed', 'assertz', 'asserta', 'retract', 'retractall',
+    ))
+
     def visit_function_call(self, node):
         """Visit a function call node"""
         # Check if this is a logical predicate call (contains logical variables)
@@ -2534,170 +2557,212 @@ class TraditionalInterpreter:
             elif node.name == 'retractall':
                 return self.logical_engine.retractall(arg)
 
-        # Check if this is a class (object instantiation)
-        if node.name in self.classes:
-            class_def = self.classes[node.name]
+        # Classes, decorated functions, user-defined functions and other
+        # callables, resolved once the arguments are evaluated
+        args, named_args = self._evaluate_arguments(
+            node.arguments,
+            node.named_arguments if hasattr(node, 'named_arguments') else None
+        )
+        kind, target = self._resolve_callable(node.name)
+        return self._invoke_callable(kind, target, node.name, args, named_args)
+
+    def _call_user_function(self, func_def, args, named_args, func_name):
+        """Bind arguments in a fresh local scope and run a user-defined function"""
+        if (self.compile_functions and not named_args and not self._reactive_vars
+                and not getattr(self, '_global_vars', None)
+                and not getattr(self, '_nonlocal_vars', None)):
+            # Positional call of a plain function: run it on a slot frame
+            slot_function = self._closures().slot_function(func_def)
+            if slot_function is not None:
+                return slot_function(args, func_name)
 
-            # Check if class is abstract - cannot instantiate abstract classes
-            if hasattr(class_def, '_is_abstract') and class_def._is_abstract:
-                raise TypeError(f"Cannot instantiate abstract class '{node.name}'")
+        # Create new local environment
+        old_local_env = self.local_env
+        self.local_env = {}
 
-            # Check for unimplemented abstract methods from parent classes
-            abstract_methods = self._get_unimplemented_abstract_methods(class_def)
-            if abstract_methods:
-                methods_str = ', '.join(abstract_methods)
-                raise TypeError(f"Cannot instantiate class '{node.name}' with abstract methods: {methods_str}")
+        # Bind parameters with support for defaults, named arguments, *args, and **kwargs
+        param_names = []
+        varargs_param = None
+        kwargs_param = None
 
-            args = [self.interpret(arg) for arg in node.arguments]
-            # Handle named arguments
-            named_args = {}
-            if hasattr(node, 'named_arguments') and node.named_arguments:
-                for name, value in node.named_arguments.items():
-                    named_args[name] = self.interpret(value)
-            return self.class_system.create_object(node.name, args, named_args)
-
-        # Check if function is decorated (stored in environment)
-        env = self.local_env if self.local_env is not None else self.global_env
-        # Fallback to global_env when symbol not found in local env (mirrors variable lookup behavior)
-        if node.name in env or (self.local_env is not None and node.name in self.global_env):
-            target = env[node.name] if node.name in env else self.global_env[node.name]
-            # Check if it's a decorated function (callable)
-            if callable(target) and not isinstance(target, type):
-                # Use _evaluate_arguments for spread support
-                args, kwargs = self._evaluate_arguments(
-                    node.arguments,
-                    node.named_arguments if hasattr(node, 'named_arguments') else None
-                )
-                if isinstance(target, BayanObject) and target.has_method('__call__'):
-                    # For Bayan objects, pass positional only
-                    return target.call_method('__call__', args)
-                return target(*args, **kwargs)
-
-        # User-defined functions
-        if node.name in self.functions:
-            func_def = self.functions[node.name]
-            # Use _evaluate_arguments for spread support
-            args, named_args = self._evaluate_arguments(
-                node.arguments,
-                node.named_arguments if hasattr(node, 'named_arguments') else None
-            )
-
-            # Check if function is async - return a coroutine
-            if node.name in self._async_functions:
-                return self.BayanCoroutine(self, func_def, args, named_args)
-
-            # Check if function contains yield (is a generator)
-            if self._contains_yield(func_def.body):
-                # Return a generator
-                return self._create_generator(func_def, args, named_args)
-
-            # Create new local environment
-            old_local_env = self.local_env
-            self.local_env = {}
+        for param in func_def.parameters:
+            if isinstance(param, Parameter):
+                if param.is_kwargs:
+                    kwargs_param = param.name
+                elif param.is_varargs:
+                    varargs_param = param.name
+                else:
+                    param_names.append(param.name)
+            else:
+                # Legacy format: parameter is just a string
+                param_names.append(param)
 
-            # Bind parameters with support for defaults, named arguments, *args, and **kwargs
-            param_names = []
-            varargs_param = None
-            kwargs_param = None
+        # Bind positional arguments
+        positional_count = 0
+        for i, arg in enumerate(args):
+            if i < len(param_names):
+                self.local_env[param_names[i]] = arg
+                positional_count += 1
+            elif varargs_param:
+                # Extra positional arguments go to *args
+                if varargs_param not in self.local_env:
+                    self.local_env[varargs_param] = []
+                self.local_env[varargs_param].append(arg)
+            else:
+                raise RuntimeError(f"Too many positional arguments for function {func_name}")
 
-            for param in func_def.parameters:
-                if isinstance(param, Parameter):
-                    if param.is_kwargs:
-                        kwargs_param = param.name
-                    elif param.is_varargs:
-                        varargs_param = param.name
-                    else:
-                        param_names.append(param.name)
-                else:
-                    # Legacy format: parameter is just a string
-                    param_names.append(param)
+        # Initialize *args if it exists and wasn't populated
+        if varargs_param and varargs_param not in self.local_env:
+            self.local_env[varargs_param] = []
 
-            # Bind positional arguments
-            positional_count = 0
-            for i, arg in enumerate(args):
-                if i < len(param_names):
-                    self.local_env[param_names[i]] = arg
-                    positional_count += 1
-                elif varargs_param:
-                    # Extra positional arguments go to *args
-                    if varargs_param not in self.local_env:
-                        self.local_env[varargs_param] = []
-                    self.local_env[varargs_param].append(arg)
-                else:
-                    raise RuntimeError(f"Too many positional arguments for function {node.name}")
+        # Bind named arguments
+        for name, value in named_args.items():
+            if name in param_names:
+                self.local_env[name] = value
+            elif kwargs_param:
+                # Extra named arguments go to **kwargs
+                if kwargs_param not in self.local_env:
+                    self.local_env[kwargs_param] = {}
+                self.local_env[kwargs_param][name] = value
+            else:
+                raise RuntimeError(f"Unexpected keyword argument: {name}")
 
-            # Initialize *args if it exists and wasn't populated
-            if varargs_param and varargs_param not in self.local_env:
-                self.local_env[varargs_param] = []
+        # Initialize **kwargs if it exists and wasn't populated
+        if kwargs_param and kwargs_param not in self.local_env:
+            self.local_env[kwargs_param] = {}
 
-            # Bind named arguments
-            for name, value in named_args.items():
-                if name in param_names:
-                    self.local_env[name] = value
-                elif kwargs_param:
-                    # Extra named arguments go to **kwargs
-                    if kwargs_param not in self.local_env:
-                        self.local_env[kwargs_param] = {}
-                    self.local_env[kwargs_param][name] = value
-                else:
-                    raise RuntimeError(f"Unexpected keyword argument: {name}")
+        # Bind default values for missing parameters
+        for param in func_def.parameters:
+            if isinstance(param, Parameter):
+                if not param.is_varargs and not param.is_kwargs:
+                    if param.name not in self.local_env and param.has_default():
+                        self.local_env[param.name] = self.interpret(param.default_value)
+                    elif param.name not in self.local_env:
+                        raise RuntimeError(f"Missing required parameter: {param.name}")
 
-            # Initialize **kwargs if it exists and wasn't populated
-            if kwargs_param and kwargs_param not in self.local_env:
-                self.local_env[kwargs_param] = {}
+        try:
+            # Check requires clauses (preconditions)
+            if hasattr(func_def, 'requires') and func_def.requires:
+                for requires_clause in func_def.requires:
+                    self.visit_requires_clause(requires_clause)
 
-            # Bind default values for missing parameters
-            for param in func_def.parameters:
-                if isinstance(param, Parameter):
-                    if not param.is_varargs and not param.is_kwargs:
-                        if param.name not in self.local_env and param.has_default():
-                            self.local_env[param.name] = self.interpret(param.default_value)
-                        elif param.name not in self.local_env:
-                            raise RuntimeError(f"Missing required parameter: {param.name}")
+            # Execute function body
+            result = self._run_function_body(func_def)
 
-            try:
-                # Check requires clauses (preconditions)
-                if hasattr(func_def, 'requires') and func_def.requires:
-                    for requires_clause in func_def.requires:
-                        self.visit_requires_clause(requires_clause)
-
-                # Execute function body
-                result = self.interpret(func_def.body)
-
-                # Check ensures clauses (postconditions)
-                if hasattr(func_def, 'ensures') and func_def.ensures:
-                    # Make result available as 'result' variable for ensures clauses
-                    self.local_env['result'] = result
-                    for ensures_clause in func_def.ensures:
-                        self.visit_ensures_clause(ensures_clause)
-            except ReturnValue as ret:
-                result = ret.value
-
-                # Check ensures clauses for early returns
-                if hasattr(func_def, 'ensures') and func_def.ensures:
-                    self.local_env['result'] = result
-                    for ensures_clause in func_def.ensures:
-                        self.visit_ensures_clause(ensures_clause)
-            finally:
-                self.local_env = old_local_env
+            # Check ensures clauses (postconditions)
+            if hasattr(func_def, 'ensures') and func_def.ensures:
+                # Make result available as 'result' variable for ensures clauses
+                self.local_env['result'] = result
+                for ensures_clause in func_def.ensures:
+                    self.visit_ensures_clause(ensures_clause)
+        except ReturnValue as ret:
+            result = ret.value
 
+            # Check ensures clauses for early returns
+            if hasattr(func_def, 'ensures') and func_def.ensures:
+                self.local_env['result'] = result
+                for ensures_clause in func_def.ensures:
+                    self.visit_ensures_clause(ensures_clause)
+        finally:
+            self.local_env = old_local_env
+
+        return result
+
+    def _run_function_body(self, func_def):
+        """Run a function body, on the bytecode VM or through its compiled
+        closure when enabled"""
+        if (self.bytecode_vm is not None and not self._reactive_vars
+                and not getattr(self, '_global_vars', None)
+                and not getattr(self, '_nonlocal_vars', None)):
+            code = self._function_code(func_def)
+            if code:
+                return self.bytecode_vm.run_function(code, self.local_env)
+        if not self.compile_functions:
+            result = self._run_statement(func_def.body)
+            if type(result) is Completion:
+                if result.kind != 'return':
+                    # break or continue outside a loop
+                    raise result.signal()
+                return result.value
             return result
+        return self._closures().function_body(func_def)(None)
+
+    def _function_code(self, func_def):
+        """func_def's compiled CodeObject, or False if it needs the tree walker"""
+        code = getattr(func_def, 'code_object', None)
+        if code is None:
+            from .bytecode.codegen import CodeGenerator
+            try:
+                code = CodeGenerator(host_calls=self._INTERCEPTED_CALLS).compile_function(func_def)
+            except NotImplementedError:
+                code = False
+            func_def.code_object = code
+        return code
+
+    def _call_named(self, name, args):
+        """Call name with evaluated positional arguments (used by
+        BytecodeVM's CALL_NAMED)"""
+        kind, target = self._resolve_callable(name)
+        return self._invoke_callable(kind, target, name, args, {})
+
+    def _resolve_callable(self, name):
+        """What a call to name runs, as (kind, target): ('class', class
+        name), ('function', function definition) or ('value', callable).
+        The lookup order shared by visit_function_call and _call_named."""
+        if name in self.classes:
+            class_def = self.classes[name]
+            # Check if class is abstract - cannot instantiate abstract classes
+            if hasattr(class_def, '_is_abstract') and class_def._is_abstract:
+                raise TypeError(f"Cannot instantiate abstract class '{name}'")
+            # Check for unimplemented abstract methods from parent classes
+            abstract_methods = self._get_unimplemented_abstract_methods(class_def)
+            if abstract_methods:
+                methods_str = ', '.join(abstract_methods)
+                raise TypeError(f"Cannot instantiate class '{name}' with abstract methods: {methods_str}")
+            return 'class', name
+
+        # Decorated functions are stored in the environment; fall back to
+        # global_env when not found in the local one, like variable lookup
+        env = self.local_env if self.local_env is not None else self.global_env
+        found = name in env or (self.local_env is not None and name in self.global_env)
+        if found:
+            target = env[name] if name in env else self.global_env[name]
+            if callable(target) and not isinstance(target, type):
+                return 'value', target
+
+        if name in self.functions:
+            return 'function', self.functions[name]
 
         # Python/global environment callable or BayanObject __call__
-        if node.name in env or (self.local_env is not None and node.name in self.global_env):
-            target = env[node.name] if node.name in env else self.global_env[node.name]
-            args = [self.interpret(arg) for arg in node.arguments]
-            if isinstance(target, BayanObject) and target.has_method('__call__'):
-                return target.call_method('__call__', args)
-            if callable(target):
-                # Support named arguments for Python callables as well
-                kwargs = {}
-                if hasattr(node, 'named_arguments') and node.named_arguments:
-                    for name, value in node.named_arguments.items():
-                        kwargs[name] = self.interpret(value)
-                return target(*args, **kwargs)
-
-        raise NameError(f"Undefined function or class: {node.name}")
+        if found and (callable(target) or
+                      (isinstance(target, BayanObject) and target.has_method('__call__'))):
+            return 'value', target
+
+        raise NameError(f"Undefined function or class: {name}")
+
+    def _invoke_callable(self, kind, target, name, args, named_args):
+        """Call what _resolve_callable returned with evaluated arguments"""
+        if kind == 'function':
+            # Async functions return a coroutine, functions with yield a generator
+            if name in self._async_functions:
+                return self.BayanCoroutine(self, target, args, named_args)
+            if self._contains_yield(target.body):
+                return self._create_generator(target, args, named_args)
+            return self._call_user_function(target, args, named_args, name)
+        if kind == 'class':
+            return self.class_system.create_object(target, args, named_args)
+        if isinstance(target, BayanObject) and target.has_method('__call__'):
+            # For Bayan objects, pass positional only
+            return target.call_method('__call__', args)
+        return target(*args, **named_args)
+
+    def _closures(self):
+        """The interpreter's ClosureCompiler, created on first use"""
+        compiler = self._closure_compiler
+        if compiler is None:
+            from .closure_compiler import ClosureCompiler
+            compiler = self._closure_compiler = ClosureCompiler(self)
+        return compiler
 
     def _contains_yield(self, node):
         """Check if node contains yield expression"""
@@ -2705,10 +2770,11 @@ class TraditionalInterpreter:
             return True
         if isinstance(node, list):
             return any(self._contains_yield(n) for n in node)
-        if hasattr(node, '__dict__'):
+        fields = node_fields(node)
+        if fields is not None:
             # Avoid infinite recursion on the node itself or parent links if any
             # Just check children
-            for key, value in node.__dict__.items():
+            for key, value in fields.items():
                 if key == 'parent': continue
                 if isinstance(value, (list, tuple)):
                     if any(self._contains_yield(x) for x in value): return True
@@ -2928,7 +2994,7 @@ class TraditionalInterpreter:
                     self.visit_requires_clause(requires_clause)
 
             # Execute function body
-            result = self.interpret(func_def.body)
+            result = self._run_function_body(func_def)
 
             # Check ensures clauses (postconditions)
             if hasattr(func_def, 'ensures') and func_def.ensures:
@@ -3056,19 +3122,26 @@ class TraditionalInterpreter:
 
     def visit_if_statement(self, node):
         """Visit an if statement node"""
+        return self._raise_completion(self._run_if(node))
+
+    def _run_if(self, node):
         condition = self.interpret(node.condition)
 
         if self._truthy(condition):
-            return self.interpret(node.then_branch)
+            return self._run_statement(node.then_branch)
         elif node.else_branch:
-            return self.interpret(node.else_branch)
+            return self._run_statement(node.else_branch)
 
         return None
 
     def visit_for_loop(self, node):
         """Visit a for loop node (with optional invariants)"""
+        return self._raise_completion(self._run_for(node))
+
+    def _run_for(self, node):
         iterable = self._to_iterable(self.interpret(node.iterable))
         result = None
+        run = self._run_statement
 
         env = self.local_env if self.local_env is not None else self.global_env
 
@@ -3088,56 +3161,64 @@ class TraditionalInterpreter:
                 env[node.variable] = value
 
             # Check invariants at start of each iteration
-            if hasattr(node, 'invariants') and node.invariants:
+            if node.invariants:
                 for invariant in node.invariants:
                     self.visit_invariant_clause(invariant)
-            elif hasattr(node, 'invariant') and node.invariant:
-                # Backward compatibility
-                self.visit_invariant_clause(node.invariant)
 
             try:
-                result = self.interpret(node.body)
+                outcome = run(node.body)
             except BreakException:
                 break
             except ContinueException:
                 continue
+            if type(outcome) is Completion:
+                if outcome is BREAK:
+                    break
+                if outcome is CONTINUE:
+                    continue
+                # A return leaves the loop too
+                return outcome
+            result = outcome
 
             # Check invariants at end of each iteration
-            if hasattr(node, 'invariants') and node.invariants:
+            if node.invariants:
                 for invariant in node.invariants:
                     self.visit_invariant_clause(invariant)
-            elif hasattr(node, 'invariant') and node.invariant:
-                # Backward compatibility
-                self.visit_invariant_clause(node.invariant)
 
         return result
 
     def visit_while_loop(self, node):
         """Visit a while loop node (with optional invariants)"""
+        return self._raise_completion(self._run_while(node))
+
+    def _run_while(self, node):
         result = None
+        run = self._run_statement
         while self._truthy(self.interpret(node.condition)):
             # Check invariants at start of each iteration
-            if hasattr(node, 'invariants') and node.invariants:
+            if node.invariants:
                 for invariant in node.invariants:
                     self.visit_invariant_clause(invariant)
-            elif hasattr(node, 'invariant') and node.invariant:
-                # Backward compatibility
-                self.visit_invariant_clause(node.invariant)
 
             try:
-                result = self.interpret(node.body)
+                outcome = run(node.body)
             except BreakException:
                 break
             except ContinueException:
                 continue
+            if type(outcome) is Completion:
+                if outcome is BREAK:
+                    break
+                if outcome is CONTINUE:
+                    continue
+                # A return leaves the loop too
+                return outcome
+            result = outcome
 
             # Check invariants at end of each iteration
-            if hasattr(node, 'invariants') and node.invariants:
+            if node.invariants:
                 for invariant in node.invariants:
                     self.visit_invariant_clause(invariant)
-            elif hasattr(node, 'invariant') and node.invariant:
-                # Backward compatibility
-                self.visit_invariant_clause(node.invariant)
         return result
 
     def visit_return_statement(self, node):
@@ -3325,36 +3406,40 @@ class TraditionalInterpreter:
             resolved = term_or_val
         return getattr(resolved, 'value', resolved)
 
-    def _query_solutions(self, goal, max_solutions=None):
+    def _iter_solutions(self, goal):
         if self.logical_engine is None:
             raise RuntimeError("collect/topk/argmax require a logical engine (use inside hybrid)")
-        solutions = self.logical_engine.query(goal)
-        if max_solutions is not None:
-            # Limit the number of solutions
-            limited = []
-            for i, sol in enumerate(solutions):
-                if i >= max_solutions:
-                    break
-                limited.append(sol)
-            return limited
-        return solutions
+        return self.logical_engine.iter_query(goal)
+
+    def _query_solutions(self, goal, max_solutions=None):
+        solutions = self._iter_solutions(goal)
+        try:
+            if max_solutions is not None:
+                # Stop the search after the first max_solutions answers
+                return list(itertools.islice(solutions, max(0, int(max_solutions))))
+            return list(solutions)
+        finally:
+            solutions.close()
 
     def visit_collect_expr(self, node):
-        sols = self._query_solutions(node.goal)
+        sols = self._iter_solutions(node.goal)
         out = []
         seen = set()
-        for subst in sols:
-            if hasattr(subst, 'bindings'):
-                val = subst.bindings.get(node.var_name)
-                final = self._deref_value(val, subst)
-                if node.unique:
-                    key = str(final)
-                    if key in seen:
-                        continue
-                    seen.add(key)
-                out.append(final)
-            if node.limit is not None and len(out) >= node.limit:
-                break
+        try:
+            for subst in sols:
+                if hasattr(subst, 'bindings'):
+                    val = subst.bindings.get(node.var_name)
+                    final = self._deref_value(val, subst)
+                    if node.unique:
+                        key = str(final)
+                        if key in seen:
+                            continue
+                        seen.add(key)
+                    out.append(final)
+                if node.limit is not None and len(out) >= node.limit:
+                    break
+        finally:
+            sols.close()
         return out
 
     def visit_topk_expr(self, node):
@@ -5817,6 +5902,14 @@ class TraditionalInterpreter:
         self.logical_engine.add_rule(rule)
         return None
     
+    def visit_table_directive(self, node):
+        """Visit a tabling directive (:- table pred/N.)"""
+        if not self.logical_engine:
+            return None
+        for name, arity in node.predicates:
+            self.logical_engine.table(name, arity)
+        return None
+
     def visit_logical_query(self, node):
         """Visit a logical query"""
         if not self.logical_engine:
@@ -6087,8 +6180,8 @@ class TraditionalInterpreter:
             if bindings is not None:
                 # Pattern matched! Check guard if present
                 if case.guard is not None:
-                    # Create temporary scope with bindings
-                    old_env = self.local_env.copy() if self.local_env else {}
+                    # Create temporary scope with bindings; None at module level
+                    old_env = self.local_env.copy() if self.local_env is not None else None
                     for name, value in bindings.items():
                         self.set_variable(name, value)
 
@@ -6272,6 +6365,9 @@ class GeneratorInterpreter(TraditionalInterpreter):
         self._metaphorical_meanings = parent_interpreter._metaphorical_meanings
         self._domain_laws = parent_interpreter._domain_laws
         self._rng = parent_interpreter._rng
+        # Visitors with the traditional, non-yielding semantics, used while
+        # an ordinary function called from the generator runs
+        self._plain_visitors = {}
         
     def execute_generator(self, func_def, args, closure=None):
         """Execute the generator function body"""
@@ -6316,6 +6412,8 @@ class GeneratorInterpreter(TraditionalInterpreter):
         Returns a generator for control flow nodes.
         Returns a value for expression nodes.
         """
+        if self._visitors is self._plain_visitors:
+            return TraditionalInterpreter.interpret(self, node)
         if isinstance(node, (Block, IfStatement, ForLoop, WhileLoop, TryExceptFinally, WithStatement, YieldExpr, Assignment)):
             # These methods are overridden to be generators (or return generators)
             if isinstance(node, Block):
@@ -6348,6 +6446,36 @@ class GeneratorInterpreter(TraditionalInterpreter):
             # This falls back to TraditionalInterpreter.interpret which returns a value
             return super().interpret(node)
 
+    def _resolve_visitor(self, node_type):
+        """Fill the active visitor table; the plain table holds the
+        TraditionalInterpreter methods, bypassing the generator overrides"""
+        if self._visitors is not self._plain_visitors:
+            return super()._resolve_visitor(node_type)
+        for node_class, name in self._NODE_VISITORS:
+            if issubclass(node_type, node_class):
+                visitor = getattr(TraditionalInterpreter, name).__get__(self)
+                self._visitors[node_type] = visitor
+                return visitor
+        raise RuntimeError(f"Unknown node type: {node_type}")
+
+    def _run_function_body(self, func_def):
+        """Run an ordinary function called from the generator body.
+
+        The generator visitors turn blocks, loops, try and assignments into
+        generators, which only run when the generator body iterates them.
+        A plain function body interpreted with them would build those
+        generators and drop them, skipping its statements.  So for the
+        length of the call the visitor table is swapped for the plain one,
+        and interpret() dispatches like TraditionalInterpreter; the
+        generator table is put back when the call returns or raises.
+        """
+        generator_visitors = self._visitors
+        self._visitors = self._plain_visitors
+        try:
+            return super()._run_function_body(func_def)
+        finally:
+            self._visitors = generator_visitors
+
     def visit_block(self, node):
         for statement in node.statements:
             result = self.interpret(statement)
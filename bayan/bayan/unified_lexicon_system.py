@@ -16,12 +16,13 @@ Original source: TypeScript in /vocabulary/unifiedLexiconSystem.ts
 """
 
 from enum import Enum
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
 from dataclasses import dataclass
 
 from .foundation_vocabulary import FoundationWord, FoundationWordType, FoundationCategory
 from .complete_vocabulary import CompleteFoundationVocabulary
 from .arramooz_adapter import ArramoozAdapter
+from .lookup_cache import CacheStats, LookupCache
 
 
 class PriorityLevel(Enum):
@@ -47,12 +48,19 @@ class LexiconStatistics:
     """إحصائيات النظام المعجمي / Lexicon system statistics"""
     
     def __init__(self, foundation_words: int, arramooz_words: int, 
-                 total_words: int, cache_size: int, cache_hit_rate: float):
+                 total_words: int, cache_size: int, cache_hit_rate: float,
+                 cache_hits: int = 0, cache_misses: int = 0, negative_hits: int = 0,
+                 cache_layers: Optional[List[CacheStats]] = None):
         self.foundation_words = foundation_words
         self.arramooz_words = arramooz_words
         self.total_words = total_words
         self.cache_size = cache_size
         self.cache_hit_rate = cache_hit_rate
+        self.cache_hits = cache_hits
+        self.cache_misses = cache_misses
+        self.negative_hits = negative_hits
+        # إحصائيات كل طبقة / Per-layer cache statistics
+        self.cache_layers = cache_layers or []
 
 
 class UnifiedLexiconSystem:
@@ -61,19 +69,28 @@ class UnifiedLexiconSystem:
     Unified Lexicon System
     """
     
-    def __init__(self, arramooz_db_path: Optional[str] = None):
+    def __init__(self, arramooz_db_path: Optional[str] = None,
+                 cache_size: int = 10000, cache_ttl: Optional[float] = None,
+                 preload: bool = False):
         self.foundation_vocab = CompleteFoundationVocabulary()
-        self.arramooz_adapter = ArramoozAdapter(arramooz_db_path)
+        self.arramooz_adapter = ArramoozAdapter(arramooz_db_path, preload=preload,
+                                                cache_size=cache_size, cache_ttl=cache_ttl)
         
-        # التخزين المؤقت متعدد المستويات
-        self.cache: Dict[str, LexiconSearchResult] = {}
-        self.root_cache: Dict[str, List[FoundationWord]] = {}
-        
-        # إحصائيات
-        self.cache_hits = 0
-        self.cache_misses = 0
+        # التخزين المؤقت متعدد المستويات (محدود، ويحفظ الكلمات غير الموجودة أيضاً)
+        self.cache = LookupCache('lexicon.words', cache_size, cache_ttl)
+        self.root_cache = LookupCache('lexicon.roots', cache_size, cache_ttl)
         
         self.is_initialized = False
+
+    @property
+    def cache_hits(self) -> int:
+        """عدد الإصابات / Word cache hits"""
+        return self.cache.hits
+
+    @property
+    def cache_misses(self) -> int:
+        """عدد الإخفاقات / Word cache misses"""
+        return self.cache.misses
     
     def initialize(self) -> bool:
         """
@@ -113,11 +130,9 @@ class UnifiedLexiconSystem:
         normalized = self._normalize_word(word)
         
         # 1. البحث في الذاكرة المؤقتة
-        if normalized in self.cache:
-            self.cache_hits += 1
-            return self.cache[normalized]
-        
-        self.cache_misses += 1
+        found, cached = self.cache.lookup(normalized)
+        if found:
+            return cached
         
         # 2. البحث في الكلمات الأساسية (أولوية عالية)
         foundation_word = self.foundation_vocab.get_word(normalized)
@@ -128,7 +143,7 @@ class UnifiedLexiconSystem:
                 priority=PriorityLevel.HIGH,
                 confidence=1.0
             )
-            self.cache[normalized] = result
+            self.cache.put(normalized, result)
             return result
         
         # 3. البحث في قاموس Arramooz (أولوية متوسطة)
@@ -141,12 +156,55 @@ class UnifiedLexiconSystem:
                     priority=PriorityLevel.MEDIUM,
                     confidence=0.8
                 )
-                self.cache[normalized] = result
+                self.cache.put(normalized, result)
                 return result
         
-        # 4. لم يتم العثور على الكلمة
+        # 4. لم يتم العثور على الكلمة (تخزين النتيجة السلبية)
+        self.cache.put(normalized, None)
         return None
     
+    def lookup_many(self, words: Iterable[str]) -> List[Optional[LexiconSearchResult]]:
+        """
+        البحث عن مجموعة كلمات دفعة واحدة
+        Look up a batch of words, in order; each distinct word probes the
+        cache once and the words no cache or foundation word covers go to
+        Arramooz in one batch
+        """
+        if not self.is_initialized:
+            raise RuntimeError('النظام غير مهيأ. استخدم initialize() أولاً.')
+        
+        normalized = [self._normalize_word(word) for word in words]
+        results: Dict[str, Optional[LexiconSearchResult]] = {}
+        computed = []
+        for key in dict.fromkeys(normalized):
+            found, cached = self.cache.lookup(key)
+            if found:
+                results[key] = cached
+                continue
+            computed.append(key)
+            foundation_word = self.foundation_vocab.get_word(key)
+            results[key] = LexiconSearchResult(
+                word=foundation_word,
+                source='foundation',
+                priority=PriorityLevel.HIGH,
+                confidence=1.0
+            ) if foundation_word else None
+        
+        missing = [key for key in computed if results[key] is None]
+        if missing and self.arramooz_adapter.is_loaded:
+            for key, arramooz_word in zip(missing, self.arramooz_adapter.lookup_many(missing)):
+                if arramooz_word:
+                    results[key] = LexiconSearchResult(
+                        word=arramooz_word,
+                        source='arramooz',
+                        priority=PriorityLevel.MEDIUM,
+                        confidence=0.8
+                    )
+        
+        for key in computed:
+            self.cache.put(key, results[key])
+        return [results[key] for key in normalized]
+    
     def search_by_root(self, root: str) -> List[FoundationWord]:
         """
         البحث بالجذر
@@ -156,8 +214,9 @@ class UnifiedLexiconSystem:
             raise RuntimeError('النظام غير مهيأ. استخدم initialize() أولاً.')
         
         # البحث في الذاكرة المؤقتة
-        if root in self.root_cache:
-            return self.root_cache[root]
+        found, cached = self.root_cache.lookup(root)
+        if found:
+            return cached
         
         results = []
         
@@ -173,7 +232,7 @@ class UnifiedLexiconSystem:
             results.extend(arramooz_words)
         
         # حفظ في الذاكرة المؤقتة
-        self.root_cache[root] = results
+        self.root_cache.put(root, results)
         
         return results
     
@@ -243,10 +302,9 @@ class UnifiedLexiconSystem:
     
     def clear_cache(self) -> None:
         """مسح الذاكرة المؤقتة / Clear cache"""
-        self.cache.clear()
-        self.root_cache.clear()
-        self.cache_hits = 0
-        self.cache_misses = 0
+        for cache in (self.cache, self.root_cache):
+            cache.clear()
+            cache.reset_stats()
     
     def get_statistics(self) -> LexiconStatistics:
         """الحصول على إحصائيات / Get statistics"""
@@ -266,7 +324,12 @@ class UnifiedLexiconSystem:
             arramooz_words=arramooz_count,
             total_words=foundation_words + arramooz_count,
             cache_size=len(self.cache),
-            cache_hit_rate=cache_hit_rate
+            cache_hit_rate=cache_hit_rate,
+            cache_hits=self.cache_hits,
+            cache_misses=self.cache_misses,
+            negative_hits=self.cache.negative_hits,
+            cache_layers=[self.cache.stats(), self.root_cache.stats()]
+            + self.arramooz_adapter.cache_statistics()
         )
     
     def close(self) -> None:
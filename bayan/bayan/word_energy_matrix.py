@@ -34,10 +34,11 @@ class WordEnergyMatrix:
     Now enhanced with Camel Tools integration for accurate root extraction.
     """
     
-    def __init__(self):
+    def __init__(self, arabic_adapter: Optional[ArabicNLPAdapter] = None):
         self.letter_db = LetterSemanticsDatabase()
         self.enhanced_semantics = EnhancedLetterSemantics(self.letter_db)
-        self.arabic_adapter = ArabicNLPAdapter()  # For accurate root extraction
+        # For accurate root extraction; may be shared with other analyzers
+        self.arabic_adapter = arabic_adapter or ArabicNLPAdapter()
         self.en_db = self._init_english_db()
         self.ar_db = self._init_arabic_db()
 
@@ -15,13 +15,16 @@ if parent_dir not in sys.path:
 # Try different import paths
 try:
     from bayan.bayan import run_code, HybridLexer, HybridParser, HybridInterpreter
+    from bayan.bayan.compile_cache import parse_file
 except ImportError:
     try:
         from bayan import run_code, HybridLexer, HybridParser, HybridInterpreter
+        from bayan.compile_cache import parse_file
     except ImportError:
         from bayan.lexer import HybridLexer
         from bayan.parser import HybridParser
         from bayan.hybrid_interpreter import HybridInterpreter
+        from bayan.compile_cache import parse_file
 
         def run_code(code):
             """Run Bayan code and return result"""
@@ -51,10 +54,9 @@ def main():
 def run_file(file_path):
     """Run a Bayan file"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            code = f.read()
-        
-        result = run_code(code)
+        # Unchanged files are loaded from their .bayanc cache entry
+        ast = parse_file(file_path)
+        result = HybridInterpreter().interpret(ast)
         if result is not None:
             print(result)
     
@@ -26,6 +26,7 @@ from extensions.dialogue_system import IntelligentDialogueSystem
 from extensions.bayan_baserah_bridge import BayanBaserahBridge
 from extensions.visual_semantic_engine import VisualSemanticEngine
 from bayan.bayan.linguistic_equation import KnowledgeBase, LinguisticEquationParser
+from bayan.bayan.lookup_cache import cache_statistics
 
 class BayanCLI(cmd.Cmd):
     """واجهة سطر أوامر تفاعلية لبيان"""
@@ -251,6 +252,15 @@ class BayanCLI(cmd.Cmd):
         print(f"   ├─ عدد المعادلات المحفوظة: {len(self.kb.equations)}")
         print(f"   ├─ عدد الجمل المحللة: {len(self.history)}")
         print(f"   └─ آخر جملة: {self.history[-1] if self.history else 'لا توجد'}")
+
+        layers = cache_statistics()
+        if layers:
+            print("\n💾 الذاكرة المؤقتة للمعجم:")
+            for i, stats in enumerate(layers):
+                branch = "└─" if i == len(layers) - 1 else "├─"
+                print(f"   {branch} {stats.name}: {stats.size}/{stats.maxsize} مدخل، "
+                      f"إصابات {stats.hits} (سلبية {stats.negative_hits})، إخفاقات {stats.misses}، "
+                      f"معدل الإصابة {stats.hit_rate:.0%}، مطرود {stats.evictions}")
         print()
     
     def do_history(self, line):
@@ -3,7 +3,9 @@
 Bytecode Optimization Benchmark
 ================================
 
-Compare optimized vs unoptimized bytecode performance.
+Compare optimized vs unoptimized bytecode performance, and the optimizer
+pipeline against its legacy passes (constant folding and peephole, which
+is all optimize=True ran before the control flow graph) on Bayan programs.
 """
 
 import sys
@@ -16,6 +18,9 @@ from bayan.bayan.bytecode.instruction import Instruction, CodeObject
 from bayan.bayan.bytecode.vm import BytecodeVM
 from bayan.bayan.bytecode.opcodes import Opcode
 from bayan.bayan.bytecode.optimizer import BytecodeOptimizer
+from bayan.bayan.lexer import HybridLexer
+from bayan.bayan.parser import HybridParser
+from bayan.bayan.hybrid_interpreter import HybridInterpreter
 
 
 def benchmark_optimization(iterations=10000):
@@ -87,5 +92,100 @@ def benchmark_optimization(iterations=10000):
         
     return speedup
 
+
+# Program -> (source, variables it computes)
+PIPELINE_PROGRAMS = {
+    'loop': ("""
+n = 20000
+scale = 3
+total = 0
+i = 0
+while i < n * 2:
+{
+    total = total + i * scale
+    x = 5
+    x = 6
+    i = i + 1
+}
+""", ('total', 'i', 'x')),
+    'branches': ("""
+limit = 5000
+evens = 0
+odds = 0
+j = 0
+while j < limit:
+{
+    if j % 2 == 0:
+    {
+        evens = evens + j * j
+    }
+    else:
+    {
+        odds = odds + 1
+    }
+    j = j + 1
+}
+""", ('evens', 'odds', 'j')),
+}
+
+
+def _module_code(source, passes):
+    """Module bytecode of source as the hybrid interpreter compiles it"""
+    interp = HybridInterpreter(use_bytecode=True)
+    ast = HybridParser(HybridLexer(source).tokenize()).parse()
+    code = interp.code_generator.generate(ast, optimize=False)
+    optimizer = None
+    if passes is not None:
+        optimizer = BytecodeOptimizer(passes)
+        code = optimizer.optimize(code)
+    return interp, code, optimizer
+
+
+def benchmark_pipeline(repeats=5):
+    """
+    Instruction counts and run times of each program unoptimized, with
+    the legacy passes and with the full pipeline.
+
+    Returns:
+        dict: program -> {variant: (instructions, seconds)}
+    """
+    print("=" * 60)
+    print("OPTIMIZER PIPELINE BENCHMARK")
+    print("=" * 60)
+    variants = (
+        ('unoptimized', None),
+        ('legacy', BytecodeOptimizer.LEGACY_PASSES),
+        ('pipeline', BytecodeOptimizer.PASSES),
+    )
+    results = {}
+    for name, (source, outputs) in PIPELINE_PROGRAMS.items():
+        results[name] = {}
+        expected = None
+        print(f"\n{name}:")
+        for variant, passes in variants:
+            interp, code, optimizer = _module_code(source, passes)
+            vm = interp.bytecode_vm
+            best = None
+            for _ in range(repeats):
+                vm.reset()
+                vm.globals = interp.traditional.global_env
+                start = time.perf_counter()
+                vm.execute(code)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            state = {key: vm.globals[key] for key in outputs}
+            if expected is None:
+                expected = state
+            elif state != expected:
+                raise AssertionError(f"{name}: {variant} computed {state}, expected {expected}")
+            results[name][variant] = (len(code.instructions), best)
+            print(f"  {variant:12s} {len(code.instructions):4d} instructions  {best*1000:8.2f}ms")
+            if variant == 'pipeline':
+                print('    ' + optimizer.report().replace('\n', '\n    '))
+    print("=" * 60)
+    return results
+
+
 if __name__ == "__main__":
     benchmark_optimization()
+    benchmark_pipeline()
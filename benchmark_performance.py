@@ -4,11 +4,20 @@ Bytecode vs AST Performance Benchmark
 ======================================
 
 Compare bytecode execution against AST interpretation to measure actual speedup.
+
+Usage:
+    python benchmark_performance.py
+    python benchmark_performance.py --gate --min-speedup 1.5
+
+With --gate only the Bayan program comparison runs, and the exit status is
+1 when the bytecode tier is less than --min-speedup times faster than the
+tree walker (or gives different results).
 """
 
 import sys
 import os
 import time
+import argparse
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
@@ -76,7 +85,7 @@ def benchmark_loop_bytecode(iterations=1000):
             Instruction(Opcode.LOAD_VAR, 0),      # 4
             Instruction(Opcode.LOAD_CONST, 1),
             Instruction(Opcode.LT),
-            Instruction(Opcode.JUMP_IF_FALSE, 16),
+            Instruction(Opcode.JUMP_IF_FALSE, 17),
             
             # sum = sum + i
             Instruction(Opcode.LOAD_VAR, 1),      # 8
@@ -209,6 +218,107 @@ def benchmark_logic_bytecode(iterations=1000):
     return end - start
 
 
+# Function-heavy Bayan program run by both tiers of HybridInterpreter
+TREE_WALKER_PROGRAM = """
+def fib(n):
+{
+    if n < 2:
+    {
+        return n
+    }
+    return fib(n - 1) + fib(n - 2)
+}
+def scan(limit):
+{
+    total = 0
+    i = 0
+    while i < limit:
+    {
+        total = total + i * 2 % 7
+        i = i + 1
+    }
+    for k in range(100):
+    {
+        total = total - k
+    }
+    return total
+}
+class Counter:
+{
+    def __init__(self):
+    {
+        self.count = 0
+    }
+    def bump(self, by):
+    {
+        self.count = self.count + by
+        return self.count
+    }
+}
+def count_up(times):
+{
+    c = Counter()
+    for i in range(times):
+    {
+        c.bump(i % 3)
+    }
+    return c.count
+}
+result = [fib(FIB_N), scan(SCAN_N), count_up(COUNT_N)]
+"""
+
+
+def benchmark_tree_walker(use_bytecode, fib_n=16, scan_n=10000, count_n=1000, repeats=3):
+    """Best time of running TREE_WALKER_PROGRAM on one tier; returns
+    (seconds, result)"""
+    from bayan.bayan.lexer import HybridLexer
+    from bayan.bayan.parser import HybridParser
+    from bayan.bayan.hybrid_interpreter import HybridInterpreter
+
+    code = (TREE_WALKER_PROGRAM.replace('FIB_N', str(fib_n))
+            .replace('SCAN_N', str(scan_n)).replace('COUNT_N', str(count_n)))
+    ast = HybridParser(HybridLexer(code).tokenize()).parse()
+    best = None
+    result = None
+    for _ in range(repeats):
+        interpreter = HybridInterpreter(use_bytecode=use_bytecode)
+        start = time.perf_counter()
+        interpreter.interpret(ast)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        result = interpreter.traditional.global_env['result']
+    return best, result
+
+
+def tree_walker_gate(min_speedup=1.0, **sizes):
+    """
+    Regression gate: the bytecode tier must give the tree walker's results
+    at least min_speedup times faster.
+
+    Returns:
+        (passed, walker_seconds, bytecode_seconds)
+    """
+    walker_time, walker_result = benchmark_tree_walker(False, **sizes)
+    bytecode_time, bytecode_result = benchmark_tree_walker(True, **sizes)
+    passed = (bytecode_result == walker_result
+              and walker_time >= bytecode_time * min_speedup)
+    return passed, walker_time, bytecode_time
+
+
+def run_gate(min_speedup):
+    """Print the gate's timings; returns the exit status"""
+    passed, walker_time, bytecode_time = tree_walker_gate(min_speedup)
+    speedup = walker_time / bytecode_time if bytecode_time > 0 else 0
+    print(f"\nBayan program: tree walker {walker_time*1000:.2f}ms, "
+          f"bytecode {bytecode_time*1000:.2f}ms, speedup {speedup:.2f}x "
+          f"(minimum {min_speedup:.2f}x)")
+    if passed:
+        print("✅ GATE PASSED")
+        return 0
+    print("❌ GATE FAILED: bytecode regressed against the tree walker")
+    return 1
+
+
 def print_results(name, bytecode_time, python_time=None):
     """Print benchmark results"""
     print(f"\n{name}")
@@ -226,7 +336,16 @@ def print_results(name, bytecode_time, python_time=None):
             print(" ⚠️ SLOWER")
 
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the Bayan bytecode VM')
+    parser.add_argument('--gate', action='store_true',
+                        help='Only compare against the tree walker; exit 1 on regression')
+    parser.add_argument('--min-speedup', type=float, default=1.0,
+                        help='Minimum bytecode speedup over the tree walker (default: 1.0)')
+    args = parser.parse_args(argv)
+    if args.gate:
+        return run_gate(args.min_speedup)
+
     print("=" * 60)
     print("BYTECODE vs AST PERFORMANCE BENCHMARK")
     print("=" * 60)
@@ -291,12 +410,10 @@ def main():
     
     print("=" * 60)
     
-    print("\nNote: This compares bytecode VM against pure Python,")
-    print("not against full Bayan AST interpretation.")
-    print("Real Bayan (with AST) would be even slower,")
-    print("so actual speedup is likely higher!\n")
+    print("\nNote: The benchmarks above compare the bytecode VM against pure")
+    print("Python; the Bayan program below runs on both interpreter tiers.")
     
-    return 0
+    return run_gate(args.min_speedup)
 
 
 if __name__ == "__main__":
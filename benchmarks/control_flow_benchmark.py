@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Control flow benchmark
+قياس سرعة التحكم في التدفق
+
+Runs a loop-heavy Bayan program on the tree walker: a loop that skips
+most iterations with continue, nested loops left with break, and a
+function that returns early from inside a loop.
+
+Usage:
+    python benchmarks/control_flow_benchmark.py
+    python benchmarks/control_flow_benchmark.py --iterations 5 --size 50000
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# Add Bayan to path
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from bayan.bayan.hybrid_interpreter import HybridInterpreter
+from bayan.bayan.lexer import HybridLexer
+from bayan.bayan.parser import HybridParser
+
+
+PROGRAM = """
+def first_multiple(limit, step):
+{
+    k = 1
+    while k < limit:
+    {
+        if k % step == 0:
+        {
+            return k
+        }
+        k = k + 1
+    }
+    return 0
+}
+odd = 0
+i = 0
+while i < SIZE:
+{
+    i = i + 1
+    if i % 2 == 0:
+    {
+        continue
+    }
+    odd = odd + 1
+}
+pairs = 0
+for a in range(OUTER):
+{
+    for b in range(100):
+    {
+        if b > a % 7:
+        {
+            break
+        }
+        pairs = pairs + 1
+    }
+}
+found = 0
+for c in range(CALLS):
+{
+    found = found + first_multiple(50, c % 9 + 2)
+}
+total = [odd, pairs, found]
+"""
+
+
+def run(size):
+    """Run the program once; return (seconds, total)"""
+    source = (PROGRAM.replace('SIZE', str(size)).replace('OUTER', str(size // 100))
+              .replace('CALLS', str(size // 20)))
+    ast = HybridParser(HybridLexer(source).tokenize()).parse()
+    interpreter = HybridInterpreter()
+    start = time.perf_counter()
+    interpreter.interpret(ast)
+    elapsed = time.perf_counter() - start
+    return elapsed, interpreter.traditional.global_env['total']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark break, continue and return on the tree walker')
+    parser.add_argument('--size', type=int, default=20000, help='Iterations of the continue loop')
+    parser.add_argument('--iterations', type=int, default=3, help='Number of timed runs (best is reported)')
+    args = parser.parse_args()
+
+    best = None
+    for _ in range(args.iterations):
+        seconds, total = run(args.size)
+        best = seconds if best is None else min(best, seconds)
+
+    print(f"Result:    {total}")
+    print(f"Best time: {best:.4f}s over {args.iterations} runs")
+
+
+if __name__ == '__main__':
+    main()
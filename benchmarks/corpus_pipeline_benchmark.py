@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Corpus pipeline benchmark
+قياس سرعة خط معالجة المدونات
+
+Generates a corpus whose word frequencies follow Zipf's law, then
+reports tokens per second for the word-at-a-time APIs and for
+CorpusPipeline, in process and with worker processes.
+
+Usage:
+    python benchmarks/corpus_pipeline_benchmark.py
+    python benchmarks/corpus_pipeline_benchmark.py --tokens 1000000 --workers 4
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+# Add Bayan to path
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from bayan.bayan.corpus_pipeline import STAGES, CorpusPipeline, _Analyzers
+
+LETTERS = 'ابتثجحخدذرزسشصضطظعغفقكلمنهوي'
+
+
+def make_corpus(tokens, vocabulary, words_per_text, exponent, seed):
+    """Texts of Arabic-letter words drawn with Zipfian frequencies"""
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(3, 8, size=vocabulary)
+    words = [''.join(rng.choice(list(LETTERS), size=n)) for n in lengths]
+    ranks = np.arange(1, vocabulary + 1)
+    weights = ranks ** -exponent
+    drawn = rng.choice(vocabulary, size=tokens, p=weights / weights.sum())
+    return [' '.join(words[i] for i in drawn[start:start + words_per_text])
+            for start in range(0, tokens, words_per_text)]
+
+
+def word_at_a_time(texts, stages, db_path):
+    """The per-token loop the pipeline replaces"""
+    analyzers = _Analyzers(stages, None, db_path, False)
+    for text in texts:
+        for word in text.split():
+            if 'root' in stages:
+                analyzers.adapter.extract_root(word)
+            if analyzers.lexicon is not None:
+                analyzers.lexicon.lookup(word)
+            if analyzers.energy is not None:
+                analyzers.energy.analyze_word(word, 'ar')
+            if analyzers.letters is not None:
+                analyzers.letters.analyze_word(word)
+    analyzers.close()
+
+
+def run_pipeline(texts, stages, db_path, workers):
+    with CorpusPipeline(stages, arramooz_db_path=db_path, workers=workers) as pipeline:
+        for _ in pipeline.process(texts):
+            pass
+        return pipeline.get_statistics()
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the batch corpus pipeline')
+    parser.add_argument('--tokens', type=int, default=200000, help='Corpus size in tokens')
+    parser.add_argument('--vocabulary', type=int, default=50000, help='Distinct words to draw from')
+    parser.add_argument('--exponent', type=float, default=1.1, help='Zipf exponent')
+    parser.add_argument('--words-per-text', type=int, default=20, help='Tokens per text')
+    parser.add_argument('--stages', default=','.join(STAGES), help='Comma-separated stages')
+    parser.add_argument('--workers', type=int, default=4, help='Worker processes for the pooled run')
+    parser.add_argument('--db', default=None, help='Arramooz database (default: search the usual paths)')
+    parser.add_argument('--skip-baseline', action='store_true', help='Do not time the word-at-a-time loop')
+    args = parser.parse_args()
+
+    stages = tuple(stage for stage in args.stages.split(',') if stage)
+    texts = make_corpus(args.tokens, args.vocabulary, args.words_per_text, args.exponent, seed=0)
+    print(f"Corpus:         {args.tokens} tokens in {len(texts)} texts, stages {', '.join(stages)}")
+
+    if not args.skip_baseline:
+        _, elapsed = timed(word_at_a_time, texts, stages, args.db)
+        print(f"Word at a time: {args.tokens / elapsed:,.0f} tokens/s ({elapsed:.2f}s)")
+    stats, elapsed = timed(run_pipeline, texts, stages, args.db, 0)
+    print(f"Pipeline:       {args.tokens / elapsed:,.0f} tokens/s ({elapsed:.2f}s), "
+          f"{stats['types_analysed']} types analysed")
+    if args.workers > 1:
+        _, elapsed = timed(run_pipeline, texts, stages, args.db, args.workers)
+        print(f"Pipeline x{args.workers}:    {args.tokens / elapsed:,.0f} tokens/s ({elapsed:.2f}s)")
+
+
+if __name__ == '__main__':
+    main()
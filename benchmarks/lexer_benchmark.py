@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Lexer throughput benchmark
+قياس سرعة المحلل المعجمي
+
+Tokenizes every .bayan file under examples/ and ai/nlp/ and reports
+tokens and kilobytes per second.
+
+Usage:
+    python benchmarks/lexer_benchmark.py
+    python benchmarks/lexer_benchmark.py --iterations 10
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# Add Bayan to path
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from bayan.bayan.lexer import HybridLexer
+
+
+def load_corpus():
+    """Return [(path, source)] for the benchmark corpus"""
+    paths = sorted(PROJECT_ROOT.glob('examples/**/*.bayan')) + sorted(PROJECT_ROOT.glob('ai/nlp/*.bayan'))
+    corpus = []
+    for path in paths:
+        corpus.append((path, path.read_text(encoding='utf-8')))
+    return corpus
+
+
+def benchmark(corpus, iterations):
+    """Tokenize the corpus `iterations` times; return (best_seconds, tokens, skipped)"""
+    best = None
+    tokens = 0
+    skipped = []
+    for _ in range(iterations):
+        tokens = 0
+        start = time.perf_counter()
+        for path, code in corpus:
+            try:
+                tokens += len(HybridLexer(code).tokenize())
+            except SyntaxError:
+                if path not in skipped:
+                    skipped.append(path)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, tokens, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HybridLexer on the example corpus')
+    parser.add_argument('--iterations', type=int, default=5, help='Number of timed runs (best is reported)')
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    size_kb = sum(len(code.encode('utf-8')) for _, code in corpus) / 1024
+    seconds, tokens, skipped = benchmark(corpus, args.iterations)
+
+    print(f"Files:      {len(corpus)} ({size_kb:.1f} KB)")
+    print(f"Tokens:     {tokens}")
+    print(f"Best time:  {seconds:.4f}s over {args.iterations} runs")
+    print(f"Throughput: {tokens / seconds:,.0f} tokens/s, {size_kb / seconds:,.0f} KB/s")
+    if skipped:
+        print(f"Skipped (lexer errors): {len(skipped)} files")
+
+
+if __name__ == '__main__':
+    main()
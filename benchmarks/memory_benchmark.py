@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Front end memory benchmark
+قياس استهلاك الذاكرة عند تحليل ملفات الحقائق
+
+Generates a fact file like the ones our knowledge tools write (facts
+with atom, string and number arguments, plus a few rules) and reports
+the peak memory of lexing and parsing it, and the memory the finished
+AST keeps, as measured by tracemalloc.
+
+Usage:
+    python benchmarks/memory_benchmark.py
+    python benchmarks/memory_benchmark.py --facts 200000 --compact
+"""
+
+import gc
+import sys
+import time
+import argparse
+import tracemalloc
+from pathlib import Path
+
+# Add Bayan to path
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from bayan.bayan.lexer import HybridLexer
+from bayan.bayan.parser import HybridParser
+
+RELATIONS = ('parent', 'knows', 'located_in', 'part_of')
+
+
+def fact_source(count):
+    """Return a Bayan source with `count` facts and a few rules"""
+    lines = []
+    for i in range(count):
+        kind = i % 4
+        if kind == 0:
+            lines.append(f'{RELATIONS[i % 3]}(entity_{i % 5000}, entity_{(i * 7) % 5000}).')
+        elif kind == 1:
+            lines.append(f'name(entity_{i % 5000}, "الاسم {i % 300}").')
+        elif kind == 2:
+            lines.append(f'age(entity_{i % 5000}, {i % 90}).')
+        else:
+            lines.append(f'{RELATIONS[3]}("منطقة {i % 50}", region_{i % 20}).')
+    lines.append('ancestor(?x, ?y) :- parent(?x, ?y).')
+    lines.append('ancestor(?x, ?z) :- parent(?x, ?y), ancestor(?y, ?z).')
+    return '\n'.join(lines) + '\n'
+
+
+def _parse(source, compact):
+    if compact:
+        return HybridParser(HybridLexer(source, intern=True).tokenize(), share_literals=True).parse()
+    return HybridParser(HybridLexer(source).tokenize()).parse()
+
+
+def measure(source, compact=False):
+    """Return (seconds, peak_bytes, retained_bytes, statements).
+
+    The parse is timed on its own first, since tracing every allocation
+    slows it down many times over.
+    """
+    start = time.perf_counter()
+    statements = len(_parse(source, compact).statements)
+    elapsed = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    ast = _parse(source, compact)
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del ast
+    return elapsed, peak, retained, statements
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure front end memory on a generated fact file')
+    parser.add_argument('--facts', type=int, default=50000, help='Number of facts to generate')
+    parser.add_argument('--compact', action='store_true',
+                        help='Intern identifiers and share literal nodes while parsing')
+    args = parser.parse_args()
+
+    source = fact_source(args.facts)
+    seconds, peak, retained, statements = measure(source, args.compact)
+
+    mb = 1024 * 1024
+    print(f"Source:     {len(source.encode('utf-8')) / mb:.1f} MB, {statements} statements")
+    print(f"Parse time: {seconds:.2f}s")
+    print(f"Peak:       {peak / mb:.1f} MB")
+    print(f"AST:        {retained / mb:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Method call benchmark
+قياس سرعة استدعاء الدوال في الكائنات
+
+Runs a method-heavy Bayan program: constructor calls, methods inherited
+through a three level hierarchy, default and named arguments, and
+attribute reads and writes.  (bayan/oop_benchmarks.bayan uses class
+syntax the parser does not accept.)
+
+Usage:
+    python benchmarks/oop_benchmark.py
+    python benchmarks/oop_benchmark.py --calls 20000 --iterations 5
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# Add Bayan to path
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from bayan.bayan.hybrid_interpreter import HybridInterpreter
+from bayan.bayan.lexer import HybridLexer
+from bayan.bayan.parser import HybridParser
+
+
+PROGRAM = """
+class Shape:
+{
+    def __init__(name):
+    {
+        self.name = name
+        self.hits = 0
+    }
+    def touch():
+    {
+        self.hits = self.hits + 1
+        return self.hits
+    }
+    def scaled(value, factor=2):
+    {
+        return value * factor
+    }
+}
+class Rectangle(Shape):
+{
+    def __init__(w, h):
+    {
+        super(__init__, "rect")
+        self.w = w
+        self.h = h
+    }
+    def area():
+    {
+        return self.w * self.h
+    }
+}
+class Square(Rectangle):
+{
+    def __init__(side):
+    {
+        super(__init__, side, side)
+    }
+}
+total = 0
+shapes = [Square(2), Rectangle(2, 3), Square(5)]
+i = 0
+while i < CALLS:
+{
+    s = shapes[i % 3]
+    total = total + s.area() + s.scaled(i, factor=3) + s.touch()
+    i = i + 1
+}
+objects = 0
+while objects < CALLS / 10:
+{
+    Square(objects)
+    objects = objects + 1
+}
+"""
+
+
+def run(calls):
+    """Run the program once; return (seconds, total)"""
+    source = PROGRAM.replace('CALLS', str(calls))
+    ast = HybridParser(HybridLexer(source).tokenize()).parse()
+    interpreter = HybridInterpreter()
+    start = time.perf_counter()
+    interpreter.interpret(ast)
+    elapsed = time.perf_counter() - start
+    return elapsed, interpreter.traditional.global_env['total']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Bayan method calls')
+    parser.add_argument('--calls', type=int, default=10000, help='Loop iterations (3 method calls each)')
+    parser.add_argument('--iterations', type=int, default=3, help='Number of timed runs (best is reported)')
+    args = parser.parse_args()
+
+    best = None
+    for _ in range(args.iterations):
+        seconds, total = run(args.calls)
+        best = seconds if best is None else min(best, seconds)
+
+    calls = args.calls * 3 + args.calls // 10
+    print(f"Method calls: {calls} (total {total})")
+    print(f"Best time:    {best:.4f}s over {args.iterations} runs")
+    print(f"Throughput:   {calls / best:,.0f} calls/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Vector index benchmark
+قياس سرعة فهارس المتجهات
+
+Fills an exact and an IVF index with clustered unit vectors standing in
+for fact embeddings, then reports the build time, the query latency and
+the IVF recall@k against the exact results.
+
+Usage:
+    python benchmarks/vector_index_benchmark.py
+    python benchmarks/vector_index_benchmark.py --size 1000000 --nprobe 16
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+# Add Bayan to path
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from bayan.bayan.neural.vector_index import create_index
+
+PREDICATES = ('knows', 'located_in', 'part_of', 'name', 'age')
+
+
+def make_vectors(count, dim, seed):
+    """Unit vectors around count // 50 random centers"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(1, count // 50), dim)).astype(np.float32)
+    vectors = centers[rng.integers(len(centers), size=count)]
+    vectors += 0.5 * rng.standard_normal((count, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def build(kind, vectors, keys, labels, batch, **options):
+    index = create_index(kind, vectors.shape[1], **options)
+    start = time.perf_counter()
+    for i in range(0, len(keys), batch):
+        index.add(keys[i:i + batch], vectors[i:i + batch], labels[i:i + batch])
+    return index, time.perf_counter() - start
+
+
+def query_times(index, queries, top_k, labels=None):
+    """Return (results, per-query milliseconds)"""
+    results, times = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append([key for key, _ in index.search(query, top_k, labels)])
+        times.append((time.perf_counter() - start) * 1000)
+    return results, np.array(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark exact and IVF vector indexes')
+    parser.add_argument('--size', type=int, default=200000, help='Number of indexed vectors')
+    parser.add_argument('--dim', type=int, default=384, help='Vector dimension')
+    parser.add_argument('--queries', type=int, default=200, help='Number of timed queries')
+    parser.add_argument('--top-k', type=int, default=10, help='Results per query')
+    parser.add_argument('--nprobe', type=int, default=16, help='IVF lists scanned per query')
+    parser.add_argument('--batch', type=int, default=10000, help='Vectors per add() call')
+    args = parser.parse_args()
+
+    vectors = make_vectors(args.size, args.dim, seed=0)
+    keys = [f"fact {i}" for i in range(args.size)]
+    labels = [PREDICATES[i % len(PREDICATES)] for i in range(args.size)]
+    queries = make_vectors(args.queries, args.dim, seed=1)
+    # Queries near stored vectors, as real lookups are
+    queries = vectors[np.random.default_rng(2).integers(args.size, size=args.queries)] + 0.3 * queries
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    exact, exact_build = build('exact', vectors, keys, labels, args.batch)
+    ivf, ivf_build = build('ivf', vectors, keys, labels, args.batch, nprobe=args.nprobe)
+    expected, exact_ms = query_times(exact, queries, args.top_k)
+    found, ivf_ms = query_times(ivf, queries, args.top_k)
+    _, filtered_ms = query_times(ivf, queries, args.top_k, labels=['age'])
+    recall = np.mean([len(set(a) & set(b)) / args.top_k for a, b in zip(expected, found)])
+
+    print(f"Vectors:        {args.size} x {args.dim}, {len(ivf.centroids)} IVF lists, nprobe {args.nprobe}")
+    print(f"Build:          exact {exact_build:.2f}s, ivf {ivf_build:.2f}s")
+    print(f"Exact query:    median {np.median(exact_ms):.2f} ms, p95 {np.percentile(exact_ms, 95):.2f} ms")
+    print(f"IVF query:      median {np.median(ivf_ms):.2f} ms, p95 {np.percentile(ivf_ms, 95):.2f} ms")
+    print(f"IVF + filter:   median {np.median(filtered_ms):.2f} ms, p95 {np.percentile(filtered_ms, 95):.2f} ms")
+    print(f"IVF recall@{args.top_k}:  {recall:.3f}")
+
+
+if __name__ == '__main__':
+    main()
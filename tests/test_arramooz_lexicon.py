@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the compiled, memory-mapped Arramooz lexicon
+اختبارات معجم Arramooz المترجم
+"""
+
+import os
+import sqlite3
+
+import pytest
+
+from bayan.bayan.arramooz_adapter import ArramoozAdapter
+from bayan.bayan.arramooz_lexicon import CompiledLexicon, compile_lexicon, default_lexicon_path
+
+NOUNS = [
+    # unvocalized, normalized, stamped, root, wordtype, category, definition, feminin, masculin, single, broken_plural, wazn, number
+    ('مدرسة', 'مدرسة', 'مدرس', 'درس', 'اسم مكان', '', 'مكان الدراسة', None, None, None, 'مدارس', 'مفعلة', 1),
+    ('دارس', 'دارس', 'دارس', 'درس', 'اسم فاعل', '', None, 'دارسة', None, None, 'دارسون', 'فاعل', 2),
+    ('كتاب', 'كتاب', 'كتب', 'كتب', 'اسم', 'حالة', 'ما يكتب فيه', None, None, None, 'كتب', 'فعال', 3),
+    ('', 'فارغ', 'فارغ', 'فرغ', 'اسم', '', None, None, None, None, None, None, 4),
+    ('جميل', 'جميل', 'جمل', 'جمل', 'صفة مشبهة', '', 'حسن', 'جميلة', None, None, None, 'فعيل', 5),
+    ('مدرس', 'مدرس', 'مدرس', 'درس', 'اسم فاعل', '', 'المعلم', 'مدرسة', None, None, None, 'مفعل', 6),
+]
+
+VERBS = [
+    # unvocalized, normalized, stamped, root, future_type
+    ('درس', 'درس', 'درس', 'درس', 'ضمة'),
+    ('كتب', 'كتب', 'كتب', 'كتب', 'ضمة'),
+    ('يدرس', 'يدرس', 'يدرس', 'درس', None),
+    ('فرغ', 'فارغ', 'فرغ', 'فرغ', 'فتحة'),
+]
+
+WORDS = ['مدرسة', 'المدرسة', 'مدرس', 'دارس', 'كتاب', 'كتب', 'الكتاب', 'جميل', 'يدرس', 'درس',
+         'فارغ', 'فرغ', 'غائب', 'ال', '']
+
+
+def _make_db(path, nouns=NOUNS, verbs=VERBS):
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE nouns (unvocalized TEXT, normalized TEXT, stamped TEXT, root TEXT, '
+                 'wordtype TEXT, category TEXT, definition TEXT, feminin TEXT, masculin TEXT, '
+                 'single TEXT, broken_plural TEXT, wazn TEXT, number INTEGER)')
+    conn.execute('CREATE TABLE verbs (unvocalized TEXT, normalized TEXT, stamped TEXT, root TEXT, '
+                 'future_type TEXT)')
+    conn.executemany('INSERT INTO nouns VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)', nouns)
+    conn.executemany('INSERT INTO verbs VALUES (?,?,?,?,?)', verbs)
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return _make_db(tmp_path / 'arramooz_dictionary.db')
+
+
+def _adapters(db_path):
+    plain = ArramoozAdapter(db_path)
+    preloaded = ArramoozAdapter(db_path, preload=True)
+    assert plain.load_database() and preloaded.load_database()
+    return plain, preloaded
+
+
+def test_preloaded_results_match_sqlite(db_path):
+    plain, preloaded = _adapters(db_path)
+    assert preloaded.conn is None and preloaded.lexicon is not None
+    assert os.path.exists(default_lexicon_path(db_path))
+
+    for word in WORDS:
+        assert preloaded.search_word(word) == plain.search_word(word), word
+    for root in ('درس', 'كتب', 'فرغ', 'جمل', 'غائب'):
+        for limit in (1, 2, 20, -1):
+            assert preloaded.search_by_root(root, limit) == plain.search_by_root(root, limit), (root, limit)
+    assert preloaded.get_statistics() == plain.get_statistics() == {'nouns': 6, 'verbs': 4, 'total': 10}
+
+    batch = WORDS * 3
+    assert preloaded.lookup_many(batch) == plain.lookup_many(batch) == [plain.search_word(w) for w in batch]
+    plain.close()
+    preloaded.close()
+    assert not preloaded.is_loaded and preloaded.lexicon is None
+
+
+def test_rows_round_trip(db_path, tmp_path):
+    lexicon = CompiledLexicon(compile_lexicon(db_path, str(tmp_path / 'words.bylex')))
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    expected = dict(conn.execute('SELECT * FROM nouns WHERE rowid = 2').fetchone())
+    conn.close()
+
+    noun, verb = lexicon.word_rows('دارس')
+    assert noun == expected and verb is None
+    assert isinstance(noun['number'], int) and noun['definition'] is None
+    # 'مدرس' is the stamped form of row 1 before it is the unvocalized form of row 6
+    assert lexicon.word_rows('مدرس')[0]['unvocalized'] == 'مدرسة'
+    assert [row['unvocalized'] for row in lexicon.root_rows('درس', 'verbs')] == ['درس', 'يدرس']
+    assert lexicon.word_rows('غائب') == (None, None)
+    lexicon.close()
+
+
+def test_stale_or_broken_lexicon_is_rebuilt(db_path):
+    _, preloaded = _adapters(db_path)
+    preloaded.close()
+
+    # A changed database gives a new lexicon
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO verbs VALUES ('سافر', 'سافر', 'سافر', 'سفر', 'كسرة')")
+    conn.commit()
+    conn.close()
+    stat = os.stat(db_path)
+    os.utime(db_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    adapter = ArramoozAdapter(db_path, preload=True)
+    assert adapter.load_database()
+    assert adapter.search_word('سافر').root_word == 'سفر'
+    adapter.close()
+
+    with open(default_lexicon_path(db_path), 'wb') as f:
+        f.write(b'BYLX broken')
+    adapter = ArramoozAdapter(db_path, preload=True)
+    assert adapter.load_database() and adapter.lexicon is not None
+    assert adapter.search_word('سافر') is not None
+    adapter.close()
+
+
+def test_unwritable_lexicon_falls_back_to_sqlite(db_path, tmp_path):
+    adapter = ArramoozAdapter(db_path, preload=True,
+                              lexicon_path=str(tmp_path / 'missing' / 'words.bylex'))
+    assert adapter.load_database()
+    assert adapter.lexicon is None and adapter.conn is not None
+    assert adapter.search_word('المدرسة').arabic == 'مدرسة'
+    adapter.close()
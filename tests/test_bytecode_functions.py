@@ -0,0 +1,174 @@
+"""
+Tests for per-function bytecode compilation run by the hybrid interpreter
+اختبارات ترجمة الدوال إلى شيفرة بايتية داخل المفسر الهجين
+"""
+
+import pytest
+
+from bayan.bayan.lexer import HybridLexer
+from bayan.bayan.parser import HybridParser
+from bayan.bayan.hybrid_interpreter import HybridInterpreter
+from bayan.bayan.bytecode.opcodes import Opcode
+
+
+def _run(code, use_bytecode=True, setup=None):
+    ast = HybridParser(HybridLexer(code).tokenize()).parse()
+    interp = HybridInterpreter(use_bytecode=use_bytecode)
+    if setup:
+        setup(interp)
+    interp.interpret(ast)
+    return interp.traditional
+
+
+HYBRID_PROGRAM = """
+hybrid {
+    parent("ali", "omar").
+    parent("omar", "sara").
+}
+class Account:
+{
+    def __init__(self, owner):
+    {
+        self.owner = owner
+        self.items = []
+    }
+    def add(self, amount):
+    {
+        self.items.append(amount)
+        return len(self.items)
+    }
+}
+def has_child(name):
+{
+    if parent(name, ?C):
+    {
+        return True
+    }
+    return False
+}
+def total(n):
+{
+    acc = Account("ali")
+    s = 0
+    for i in range(n):
+    {
+        if i % 2 == 0:
+        {
+            continue
+        }
+        acc.add(i)
+        s = s + i
+        if s > 40:
+        {
+            break
+        }
+    }
+    return [s, acc.owner, len(acc.items)]
+}
+result = [has_child("ali"), has_child("sara"), total(100)]
+"""
+
+
+def test_functions_run_on_vm_in_hybrid_program():
+    compiled = _run(HYBRID_PROGRAM)
+    walked = _run(HYBRID_PROGRAM, use_bytecode=False)
+    assert compiled.global_env["result"] == walked.global_env["result"] == [
+        True, False, [49, "ali", 7]]
+
+    code = compiled.functions["total"].code_object
+    opcodes = {instr.opcode for instr in code.instructions}
+    assert {Opcode.CALL_METHOD, Opcode.LOAD_ATTR, Opcode.FOR_ITER} <= opcodes
+    predicate_code = compiled.functions["has_child"].code_object
+    assert Opcode.CALL_PREDICATE in {i.opcode for i in predicate_code.instructions}
+    # Methods are compiled when first called
+    _, add = compiled.class_system.resolve_method("Account", "add")
+    assert Opcode.CALL_METHOD in {i.opcode for i in add.code_object.instructions}
+
+
+def test_unsupported_bodies_stay_on_tree_walker():
+    code = """
+def tally(n):
+{
+    global counter
+    counter = counter + n
+    return counter
+}
+counter = 1
+out = tally(2)
+"""
+    interp = _run(code)
+    assert interp.global_env["out"] == 3
+    assert interp.functions["tally"].code_object is False
+
+
+def test_runtime_error_does_not_rerun_program():
+    calls = []
+
+    def setup(interp):
+        interp.traditional.global_env["bump"] = lambda: calls.append(1)
+
+    with pytest.raises(Exception, match="Undefined variable: missing"):
+        _run("bump()\nx = missing + 1\n", setup=setup)
+    assert calls == [1]
+
+
+def test_module_match_with_failing_guard():
+    code = """
+number = 15
+match number:
+{
+    case n when n < 10: { category = "small" }
+    case n when n >= 10: { category = "medium" }
+}
+label = "number is " + category
+"""
+    interp = _run(code)
+    assert interp.global_env["label"] == "number is medium"
+    assert interp.local_env is None
+
+
+def test_module_loop_bodies_drop_statement_values():
+    code = """
+items = []
+for word in ["a", "b"]: { items.append(word) }
+i = 0
+while i < 3:
+{
+    i = i + 1
+    items.append(i)
+    if i > 1: { items.append(len(items)) }
+}
+exec("found = 7")
+for k in [1, 2]: { items.append(found + k) }
+"""
+    interp = _run(code)
+    assert interp.global_env["items"] == ["a", "b", 1, 2, 4, 3, 6, 8, 9]
+
+
+def test_vm_reentered_by_host_code():
+    inner = HybridParser(HybridLexer("total = total + 1\n").tokenize()).parse()
+
+    def setup(interp):
+        interp.traditional.global_env["nested"] = lambda: interp.interpret(inner)
+
+    interp = _run("total = 0\nfor k in [1, 2, 3]: { nested() }\ndone = total * 10\n", setup=setup)
+    assert interp.global_env["done"] == 30
+
+
+@pytest.mark.parametrize('use_bytecode', [True, False])
+def test_undefined_function_raises_after_its_arguments(use_bytecode):
+    calls = []
+
+    def setup(interp):
+        interp.traditional.global_env["bump"] = lambda: calls.append(1) or 1
+
+    code = """
+def run():
+{
+    return missing(bump())
+}
+run()
+"""
+    with pytest.raises(Exception, match="Undefined function or class: missing"):
+        _run(code, use_bytecode=use_bytecode, setup=setup)
+    assert calls == [1]
@@ -0,0 +1,187 @@
+"""
+Tests for the bytecode optimizer's control flow graph passes
+اختبارات مراحل تحسين الشفرة الوسيطة على مخطط التدفق
+"""
+
+import pytest
+
+from bayan.bayan.bytecode.codegen import CodeGenerator
+from bayan.bayan.bytecode.instruction import Instruction, CodeObject
+from bayan.bayan.bytecode.opcodes import Opcode
+from bayan.bayan.bytecode.optimizer import BytecodeOptimizer
+from bayan.bayan.bytecode.vm import BytecodeVM
+from bayan.bayan.hybrid_interpreter import HybridInterpreter
+from bayan.bayan.lexer import HybridLexer
+from bayan.bayan.parser import HybridParser
+
+
+def _parse(source):
+    return HybridParser(HybridLexer(source).tokenize()).parse()
+
+
+def _run(code):
+    vm = BytecodeVM()
+    vm.execute(code)
+    return vm
+
+
+def _opcodes(code):
+    return [instr.opcode for instr in code.instructions]
+
+
+def test_jump_threading_and_unreachable_blocks():
+    code = CodeObject('jumps', [
+        Instruction(Opcode.LOAD_CONST, 0),     # 0
+        Instruction(Opcode.JUMP_IF_FALSE, 4),  # 1: never taken
+        Instruction(Opcode.JUMP, 6),           # 2: jump chain 6 -> 8
+        Instruction(Opcode.LOAD_CONST, 1),     # 3: unreachable
+        Instruction(Opcode.STORE_VAR, 0),      # 4: unreachable
+        Instruction(Opcode.RETURN),            # 5
+        Instruction(Opcode.JUMP, 8),           # 6
+        Instruction(Opcode.LOAD_CONST, 2),     # 7: unreachable
+        Instruction(Opcode.LOAD_CONST, 2),     # 8
+        Instruction(Opcode.STORE_VAR, 0),
+    ], constants=[True, 'dead', 'live'], names=['x'])
+
+    optimized = BytecodeOptimizer().optimize(code)
+    assert _opcodes(optimized) == [Opcode.LOAD_CONST, Opcode.STORE_VAR]
+    assert _run(optimized).globals == _run(code).globals == {'x': 'live'}
+
+
+def test_copy_propagation_feeds_folding_and_dead_stores():
+    code = CodeGenerator().generate(_parse("x = 5\ny = x + 1\nx = 7"))
+    # y = 5 + 1 is folded, and the first store of x is overwritten
+    # before anything reads it
+    stores = [code.names[instr.arg] for instr in code.instructions
+              if instr.opcode == Opcode.STORE_VAR]
+    assert stores == ['y', 'x']
+    assert Opcode.ADD not in _opcodes(code)
+    assert _run(code).globals == {'x': 7, 'y': 6}
+
+
+def test_dead_store_kept_when_read_or_raising():
+    # print shows the first x; z = missing raises before x is reassigned
+    for source in ("x = 5\nprint(x)\nx = 7", "x = 5\nz = missing\nx = 7"):
+        code = CodeGenerator().generate(_parse(source))
+        stores = [code.names[instr.arg] for instr in code.instructions
+                  if instr.opcode == Opcode.STORE_VAR]
+        assert stores.count('x') == 2
+
+
+def test_stores_read_through_copies_are_dead():
+    code = CodeGenerator().generate(_parse("x = 5\ny = x\nx = 7"))
+    assert _opcodes(code) == [Opcode.LOAD_CONST, Opcode.STORE_VAR] * 2
+    assert _run(code).globals == {'x': 7, 'y': 5}
+
+
+def test_strength_reduction():
+    code = CodeObject('square', [
+        Instruction(Opcode.LOAD_VAR, 0),
+        Instruction(Opcode.LOAD_CONST, 0),
+        Instruction(Opcode.POW),
+        Instruction(Opcode.STORE_VAR, 1),
+    ], constants=[2], names=['x', 'y'])
+    optimized = BytecodeOptimizer().optimize(code)
+    assert _opcodes(optimized) == [Opcode.LOAD_VAR, Opcode.DUP, Opcode.MUL, Opcode.STORE_VAR]
+    vm = BytecodeVM()
+    vm.globals['x'] = 7
+    vm.execute(optimized)
+    assert vm.globals['y'] == 49
+
+
+LOOP = """
+n = 10
+scale = 3
+total = 0
+i = 0
+while i < n * 2:
+{
+    total = total + i * scale
+    i = i + 1
+}
+"""
+
+
+def test_loop_invariants_stay_on_the_stack():
+    unoptimized = CodeGenerator().generate(_parse(LOOP), optimize=False)
+    optimizer = BytecodeOptimizer()
+    optimized = optimizer.optimize(unoptimized)
+
+    # n * 2 and scale are computed before the loop and read with COPY
+    assert _opcodes(optimized).count(Opcode.COPY) == 2
+    assert [name for name, before, after in optimizer.stats].count('loop_invariant_code_motion') == 1
+    for code in (unoptimized, optimized):
+        vm = _run(code)
+        assert vm.globals['total'] == 570 and vm.globals['i'] == 20
+        assert vm.stack == []
+
+    # Nothing is hoisted out of a loop that calls functions
+    calls = CodeGenerator(host_calls=('print',)).generate(
+        _parse(LOOP.replace("i = i + 1", "i = i + 1\n    print(i)")))
+    assert Opcode.COPY not in _opcodes(calls)
+
+
+def test_pass_selection_and_report():
+    code = CodeGenerator().generate(_parse(LOOP), optimize=False)
+    legacy = BytecodeOptimizer(BytecodeOptimizer.LEGACY_PASSES)
+    legacy.optimize(code)
+    assert {name for name, _, _ in legacy.stats} == set(BytecodeOptimizer.LEGACY_PASSES)
+
+    optimizer = BytecodeOptimizer()
+    optimized = optimizer.optimize(code)
+    assert optimizer.stats[0][1] == len(code.instructions)
+    assert optimizer.stats[-1][2] == len(optimized.instructions)
+    assert optimizer.report().startswith('total')
+
+    with pytest.raises(ValueError):
+        BytecodeOptimizer(['loop_unrolling'])
+
+
+PROGRAM = """
+def count_multiples(limit, step):
+{
+    found = 0
+    k = 0
+    while k < limit:
+    {
+        if k % step == 0:
+        {
+            found = found + 1
+        }
+        k = k + 1
+    }
+    return found
+}
+total = 0
+i = 0
+while i < 6:
+{
+    j = 0
+    while j < i + 2:
+    {
+        if j == 3:
+        {
+            break
+        }
+        total = total + j * 10
+        j = j + 1
+    }
+    if i == 4:
+    {
+        i = i + 1
+        continue
+    }
+    total = total + i
+    i = i + 1
+}
+result = [total, i, j, count_multiples(30, 4)]
+"""
+
+
+def test_optimized_programs_match_tree_walker():
+    results = []
+    for use_bytecode in (False, True):
+        interp = HybridInterpreter(use_bytecode=use_bytecode)
+        interp.interpret(_parse(PROGRAM))
+        results.append(interp.traditional.global_env['result'])
+    assert results[0] == results[1] == [171, 6, 3, 8]
@@ -0,0 +1,81 @@
+"""
+Tests for the opt-in clause compiler (specialized head-matching closures)
+اختبارات مُجمِّع الجمل إلى دوال مطابقة
+"""
+
+from bayan.bayan.logical_engine import LogicalEngine, Term, Predicate, Fact, Rule, HeadMatcher
+
+
+def V(name):
+    return Term(name, True)
+
+
+def C(value):
+    return Term(value)
+
+
+def _engines():
+    for flag in (False, True):
+        engine = LogicalEngine()
+        engine.compile_clauses = flag
+        yield engine
+
+
+def _load(engine):
+    engine.add_fact(Fact(Predicate("emp", [C("ali"), C("sales"), C("10")])))
+    engine.add_fact(Fact(Predicate("emp", [C("sara"), C("dev"), C("20")])))
+    engine.add_fact(Fact(Predicate("emp", [C("omar"), C("dev"), C("30")]), probability=0.5))
+    engine.add_fact(Fact(Predicate("same", [V("X"), V("X")])))
+    engine.add_rule(Rule(
+        Predicate("colleague", [V("A"), V("B")]),
+        [Predicate("emp", [V("A"), V("D"), V("S1")]), Predicate("emp", [V("B"), V("D"), V("S2")])]
+    ))
+    engine.add_rule(Rule(Predicate("boss", [C("sara")]), []))
+
+
+def _answers(engine, goal, var):
+    return [(engine._deref(V(var), sol).value, sol.probability) for sol in engine.query(goal)]
+
+
+def test_compiled_results_match_generic_unifier():
+    goals = [
+        (Predicate("emp", [V("N"), C("dev"), V("S")]), "N"),
+        (Predicate("emp", [C("ali"), V("D"), V("S")]), "D"),
+        (Predicate("emp", [V("N"), V("N"), V("S")]), "N"),
+        (Predicate("colleague", [C("sara"), V("B")]), "B"),
+        (Predicate("same", [C("a"), V("Y")]), "Y"),
+        (Predicate("boss", [V("Who")]), "Who"),
+    ]
+    generic, compiled = _engines()
+    _load(generic)
+    _load(compiled)
+    for goal, var in goals:
+        assert _answers(compiled, goal, var) == _answers(generic, goal, var)
+    assert _answers(compiled, goals[0][0], "N") == [("sara", 1.0), ("omar", 0.5)]
+
+
+def test_matchers_built_when_clauses_are_added():
+    engine = LogicalEngine()
+    engine.compile_clauses = True
+    fact = Fact(Predicate("color", [C("sky"), C("blue")]))
+    engine.add_fact(fact)
+    assert isinstance(fact._matcher, HeadMatcher)
+
+
+def test_prefilter_rejects_clashing_constants():
+    matcher = HeadMatcher(Predicate("color", [C("sky"), V("X")]))
+    assert matcher.prefilter([C("sky"), C("blue")])
+    assert matcher.prefilter([V("Thing"), C("blue")])
+    assert not matcher.prefilter([C("sea"), V("C")])
+    assert not matcher.prefilter([C("sky")])
+
+
+def test_match_binds_goal_variables_and_leaves_input_untouched():
+    engine = LogicalEngine()
+    matcher = HeadMatcher(Predicate("color", [C("sky"), C("blue")]))
+    sub = engine.substitution_class()
+    result = matcher.match([V("T"), V("C")], sub, engine)
+    assert result.lookup("T").value == "sky"
+    assert result.lookup("C").value == "blue"
+    assert sub.bindings == {}
+    assert matcher.match([C("sea"), V("C")], sub, engine) is None
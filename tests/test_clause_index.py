@@ -0,0 +1,78 @@
+"""
+Tests for first-argument / multi-argument clause indexing
+اختبارات فهرسة وسائط الجمل في قاعدة المعرفة
+"""
+
+from bayan.bayan.logical_engine import LogicalEngine, Term, Predicate, Fact, Rule
+
+
+def _state(entity, key, value):
+    return Fact(Predicate("state", [Term(entity), Term(key), Term(value)]))
+
+
+def _values(solutions, var):
+    return [sol.lookup(var).value for sol in solutions]
+
+
+def _engine():
+    engine = LogicalEngine()
+    for i in range(50):
+        engine.add_fact(_state(f"car{i}", "speed", str(i)))
+        engine.add_fact(_state(f"car{i}", "color", "red" if i % 2 else "blue"))
+    return engine
+
+
+def test_indexed_lookup_returns_matching_facts():
+    engine = _engine()
+    goal = Predicate("state", [Term("car7"), Term("K", True), Term("V", True)])
+    sols = engine.query(goal)
+    assert _values(sols, "K") == ["speed", "color"]
+    assert _values(sols, "V") == ["7", "red"]
+
+
+def test_index_on_non_first_argument():
+    engine = _engine()
+    goal = Predicate("state", [Term("E", True), Term("color"), Term("blue")])
+    sols = engine.query(goal)
+    assert len(sols) == 25
+    assert sols[0].lookup("E").value == "car0"
+
+
+def test_index_preserves_clause_order_with_variable_heads():
+    engine = _engine()
+    # A rule with a variable first argument sits between facts
+    engine.add_rule(Rule(
+        Predicate("state", [Term("X", True), Term("kind"), Term("vehicle")]),
+        []
+    ))
+    engine.add_fact(_state("car7", "owner", "ali"))
+
+    goal = Predicate("state", [Term("car7"), Term("K", True), Term("V", True)])
+    assert _values(engine.query(goal), "K") == ["speed", "color", "kind", "owner"]
+
+
+def test_index_consistent_under_assert_and_retract():
+    engine = _engine()
+    goal = Predicate("state", [Term("car3"), Term("K", True), Term("V", True)])
+    assert _values(engine.query(goal), "K") == ["speed", "color"]
+
+    engine.asserta(_state("car3", "fuel", "full"))
+    engine.assertz(_state("car3", "owner", "sara"))
+    assert _values(engine.query(goal), "K") == ["fuel", "speed", "color", "owner"]
+
+    assert engine.retract(Predicate("state", [Term("car3"), Term("speed"), Term("V", True)]))
+    assert _values(engine.query(goal), "K") == ["fuel", "color", "owner"]
+
+    removed = engine.retractall(Predicate("state", [Term("car3"), Term("K", True), Term("V", True)]))
+    assert removed == 3
+    assert engine.query(goal) == []
+
+    # Other entities are untouched
+    other = Predicate("state", [Term("car4"), Term("K", True), Term("V", True)])
+    assert _values(engine.query(other), "K") == ["speed", "color"]
+
+
+def test_unknown_key_finds_nothing():
+    engine = _engine()
+    goal = Predicate("state", [Term("bus1"), Term("K", True), Term("V", True)])
+    assert engine.query(goal) == []
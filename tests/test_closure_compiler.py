@@ -0,0 +1,188 @@
+"""
+Tests for the closure-compiled function tier of TraditionalInterpreter
+اختبارات طبقة تنفيذ الدوال المترجمة إلى إغلاقات
+"""
+
+import pytest
+
+from bayan.bayan.lexer import HybridLexer
+from bayan.bayan.parser import HybridParser
+from bayan.bayan.hybrid_interpreter import HybridInterpreter
+
+
+def _run(code, compiled=True):
+    ast = HybridParser(HybridLexer(code).tokenize()).parse()
+    interp = HybridInterpreter()
+    interp.traditional.compile_functions = compiled
+    interp.interpret(ast)
+    return interp.traditional
+
+
+PROGRAM = """
+def fib(n):
+{
+    if n < 2:
+    {
+        return n
+    }
+    return fib(n - 1) + fib(n - 2)
+}
+def scan(limit):
+{
+    total = 0
+    i = 0
+    while True:
+    {
+        i = i + 1
+        if i > limit:
+        {
+            break
+        }
+        if i % 3 == 0:
+        {
+            continue
+        }
+        total = total + i * 2 - -1
+    }
+    for a, b in [[1, 2], [3, 4]]:
+    {
+        total = total + a * b
+    }
+    return total
+}
+class Counter:
+{
+    def __init__(self):
+    {
+        self.count = 0
+    }
+    def bump(self, by):
+    {
+        self.count = self.count + by
+        return self.count
+    }
+}
+c = Counter()
+c.bump(2)
+result = [fib(12), scan(20), c.bump(3), 7 / 2, "a" + "b"]
+"""
+
+
+def test_compiled_matches_visitor():
+    compiled = _run(PROGRAM).global_env["result"]
+    visited = _run(PROGRAM, compiled=False).global_env["result"]
+    assert compiled == visited == [144, 322, 5, 3.5, "ab"]
+
+
+def test_bodies_compiled_once():
+    interp = _run(PROGRAM)
+    compiler = interp._closure_compiler
+    fib = interp.functions["fib"]
+    assert compiler.function_body(fib) is compiler.function_body(fib)
+    # Positional calls of a plain function run on slot frames
+    slot_fib = compiler._slot_functions[fib]
+    assert slot_fib.scope.names == ["n"]
+    assert compiler.slot_function(fib) is slot_fib
+    # Methods keep the local_env scope
+    assert not any(f.name == "bump" for f in compiler._slot_functions)
+
+
+def test_local_value_shadows_function():
+    code = """
+def double(x):
+{
+    return x * 2
+}
+def use(double, x):
+{
+    return double(x)
+}
+out = use(lambda x: x * 3, 2)
+"""
+    assert _run(code).global_env["out"] == 6
+
+
+def test_errors_keep_bayan_stack():
+    code = """
+def broken(n):
+{
+    return n / 0
+}
+broken(1)
+"""
+    with pytest.raises(Exception) as ei:
+        _run(code)
+    msg = str(ei.value)
+    assert "ZeroDivisionError" in msg
+    assert "Bayan stack:" in msg
+    assert "ReturnStatement" in msg
+
+
+def test_constant_errors_raised_at_run_time():
+    code = """
+def never():
+{
+    return 1 / 0
+}
+ok = 1
+"""
+    assert _run(code).global_env["ok"] == 1
+
+
+SLOT_PROGRAM = """
+def scale(x, factor=10):
+{
+    return x * factor
+}
+def collect(n):
+{
+    items = []
+    for i in range(n):
+    {
+        items.append(i * 2)
+        last = i
+    }
+    def inner(y):
+    {
+        return y + last
+    }
+    adder = lambda v: v + last
+    return [items, inner(1), adder(2)]
+}
+def tally(n):
+{
+    global counter
+    counter = counter + n
+    return counter
+}
+counter = 1
+result = [scale(2), scale(2, 3), scale(x=4), collect(3), tally(5), counter]
+"""
+
+
+def test_slot_frames_match_visitor():
+    compiled = _run(SLOT_PROGRAM)
+    visited = _run(SLOT_PROGRAM, compiled=False)
+    expected = [20, 6, 40, [[0, 2, 4], 3, 4], 6, 6]
+    assert compiled.global_env["result"] == visited.global_env["result"] == expected
+    compiler = compiled._closure_compiler
+    assert compiler._slot_functions[compiled.functions["collect"]].scope.names == [
+        "n", "items", "last", "i", "adder"]
+    # global declarations keep the dict scope
+    assert compiler._slot_functions[compiled.functions["tally"]] is None
+
+
+def test_slot_frames_report_binding_errors():
+    code = """
+def add(a, b=1):
+{
+    return a + b
+}
+add(1, 2, 3)
+"""
+    with pytest.raises(Exception, match="Too many positional arguments"):
+        _run(code)
+    with pytest.raises(Exception, match="Missing required parameter: a"):
+        _run(code.replace("add(1, 2, 3)", "add()"))
+    with pytest.raises(Exception, match="Undefined"):
+        _run(code.replace("return a + b", "return a + c").replace("add(1, 2, 3)", "add(1)"))
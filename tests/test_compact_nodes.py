@@ -0,0 +1,95 @@
+"""
+Tests for slot-based AST nodes and tokens, interning and shared literals
+اختبارات العقد والرموز المضغوطة ومشاركة القيم الحرفية
+"""
+
+import pytest
+
+from bayan.bayan import ast_nodes
+from bayan.bayan.ast_nodes import (ASTNode, Assignment, FunctionDef, Number, String,
+                                   Block, iter_nodes, node_fields)
+from bayan.bayan.hybrid_interpreter import HybridInterpreter
+from bayan.bayan.lexer import HybridLexer, Token, TokenType
+from bayan.bayan.logical_engine import Predicate, Term
+from bayan.bayan.parser import HybridParser
+
+
+def _node_classes():
+    return [cls for cls in vars(ast_nodes).values()
+            if isinstance(cls, type) and issubclass(cls, ASTNode)]
+
+
+def test_nodes_and_tokens_have_no_instance_dict():
+    for cls in _node_classes():
+        assert '__dict__' not in dir(cls), cls.__name__
+    assert not hasattr(Token(TokenType.IDENTIFIER, 'x', 1, 1), '__dict__')
+
+
+def test_optional_fields_have_defaults():
+    func = FunctionDef('f', [], Block([]))
+    assert (func.requires, func.ensures, func.return_type, func.code_object) == (None, None, None, None)
+    assert not func._is_abstract and func.decorators == []
+
+    node = Number(1)
+    assert (node.line, node.column, node.filename) == (None, None, None)
+    assert node.with_pos(3, 4).line == 3
+    with pytest.raises(AttributeError):
+        node.colour = 'red'
+    assert not hasattr(node, 'parent')
+
+
+def test_node_fields_and_iter_nodes():
+    value = Number(5)
+    node = Assignment('x', value).with_pos(1, 1)
+    assert node_fields(node) == {'line': 1, 'column': 1, 'filename': None, 'name': 'x', 'value': value}
+    assert node_fields(value) == {'value': 5}
+    assert node_fields('text') is None
+    assert [type(n) for n in iter_nodes(Block([node]))] == [Block, Assignment, Number]
+
+
+def test_interned_identifiers():
+    code = "total = 1\n" + "total = total + 1\n"
+    plain = [tok.value for tok in HybridLexer(code).tokenize() if tok.type == TokenType.IDENTIFIER]
+    interned = [tok.value for tok in HybridLexer(code, intern=True).tokenize()
+                if tok.type == TokenType.IDENTIFIER]
+    assert plain == interned
+    assert all(name is interned[0] for name in interned)
+
+
+FACTS = """
+parent("ali", "omar").
+parent("omar", "zaid").
+age(ali, 60).
+age(omar, 35).
+grandparent(?a, ?c) :- parent(?a, ?b), parent(?b, ?c).
+x = "ali"
+y = "ali"
+z = [1, 1.0, True, 1]
+"""
+
+
+def test_shared_literals_parse_and_run_the_same():
+    plain = HybridParser(HybridLexer(FACTS).tokenize()).parse()
+    shared = HybridParser(HybridLexer(FACTS, intern=True).tokenize(), share_literals=True).parse()
+
+    x, y, z = shared.statements[-3:]
+    assert x.value is y.value and x.value.line is None
+    one, one_float, true, one_again = z.value.elements
+    assert one is one_again
+    assert len({id(one), id(one_float), id(true)}) == 3
+    assert plain.statements[-3].value is not plain.statements[-2].value
+
+    first, second = (statement.predicate.arguments for statement in shared.statements[:2])
+    assert second[0] is first[1] and second[0] is not first[0]
+    body = shared.statements[4].body
+    assert body[0].args[1] is body[1].args[0]
+
+    results = []
+    for ast in (plain, shared):
+        interp = HybridInterpreter()
+        interp.interpret(ast)
+        env = interp.traditional.global_env
+        children = interp.traditional.logical_engine.query(
+            Predicate('parent', [Term('ali'), Term('who', is_variable=True)]))
+        results.append((env['x'], env['z'], [str(s.lookup('who')) for s in children]))
+    assert results[0] == results[1] == ("ali", [1, 1.0, True, 1], ["omar"])
@@ -0,0 +1,123 @@
+"""
+Tests for the serialized AST / code object format and the .bayanc cache
+اختبارات صيغة الحفظ وذاكرة ملفات .bayanc
+"""
+
+import marshal
+import os
+
+import pytest
+
+from bayan.bayan import compile_cache
+from bayan.bayan.bytecode import serializer
+from bayan.bayan.bytecode.codegen import CodeGenerator
+from bayan.bayan.bytecode.instruction import CodeObject
+from bayan.bayan.bytecode.vm import BytecodeVM
+from bayan.bayan.hybrid_interpreter import HybridInterpreter
+
+
+PROGRAM = """
+class Point:
+{
+    def __init__(self, x):
+    {
+        self.x = x
+    }
+}
+def total(n):
+{
+    s = 0
+    for i in range(n):
+    {
+        s = s + i
+    }
+    return s
+}
+parent("ali", "omar").
+p = Point(3)
+result = [total(5), p.x, "نص", 2.5, None]
+"""
+
+
+def _result(ast):
+    interp = HybridInterpreter()
+    interp.interpret(ast)
+    return interp.traditional.global_env["result"]
+
+
+def test_ast_round_trip_runs_the_same():
+    ast = compile_cache.parse_source(PROGRAM)
+    data = serializer.dumps(ast)
+    loaded = serializer.loads(data)
+    assert type(loaded) is type(ast)
+    assert serializer.dumps(loaded) == data
+    assert _result(loaded) == _result(ast) == [10, 3, "نص", 2.5, None]
+
+
+def test_shared_objects_stay_shared():
+    ast = compile_cache.parse_source("x = 1")
+    node = ast.statements[0]
+    node.parent = ast
+    loaded = serializer.loads(serializer.dumps([node, node]))
+    assert loaded[0] is loaded[1]
+    assert type(loaded[0].parent) is type(ast)
+
+
+def test_code_object_round_trip():
+    ast = compile_cache.parse_source("a = 2\nb = a * 3 + 1\nc = [a, b]")
+    code = CodeGenerator().generate(ast)
+    loaded = CodeObject.decode(code.encode())
+    assert [(i.opcode, i.arg) for i in loaded.instructions] == [
+        (i.opcode, i.arg) for i in code.instructions]
+    vm = BytecodeVM()
+    vm.execute(loaded)
+    assert vm.globals["c"] == [2, 7]
+
+
+def test_unsupported_values_are_refused():
+    with pytest.raises(TypeError):
+        serializer.dumps(lambda: None)
+    with pytest.raises(ValueError):
+        serializer.loads(marshal.dumps((serializer.FORMAT_VERSION + 1, 1)))
+
+
+def test_parse_file_uses_cache(tmp_path, monkeypatch):
+    monkeypatch.delenv("BAYAN_CACHE_DIR", raising=False)
+    monkeypatch.delenv("BAYAN_NO_CACHE", raising=False)
+    source = tmp_path / "prog.bayan"
+    source.write_text(PROGRAM, encoding="utf-8")
+
+    ast = compile_cache.parse_file(str(source))
+    cache_dir = tmp_path / compile_cache.CACHE_DIR_NAME
+    entries = os.listdir(cache_dir)
+    assert len(entries) == 1 and entries[0].startswith("prog.")
+
+    # A second run skips the front end
+    def no_parse(text):
+        raise AssertionError("parsed again")
+    monkeypatch.setattr(compile_cache, "_parse", no_parse)
+    assert _result(compile_cache.parse_file(str(source))) == _result(ast)
+
+    # Editing the file replaces its entry
+    monkeypatch.undo()
+    source.write_text(PROGRAM.replace("total(5)", "total(4)"), encoding="utf-8")
+    assert _result(compile_cache.parse_file(str(source)))[0] == 6
+    assert len(os.listdir(cache_dir)) == 1
+    assert os.listdir(cache_dir) != entries
+
+
+def test_bad_entries_are_reparsed(tmp_path, monkeypatch):
+    monkeypatch.setenv("BAYAN_CACHE_DIR", str(tmp_path / "cache"))
+    source = tmp_path / "prog.bayan"
+    source.write_text(PROGRAM, encoding="utf-8")
+    entry = compile_cache.cache_path(str(source), PROGRAM)
+    os.makedirs(os.path.dirname(entry))
+    with open(entry, "wb") as f:
+        f.write(b"not a cache entry")
+    assert _result(compile_cache.parse_file(str(source)))[0] == 10
+    assert serializer.loads(open(entry, "rb").read()) is not None
+
+    monkeypatch.setenv("BAYAN_NO_CACHE", "1")
+    os.remove(entry)
+    compile_cache.parse_file(str(source))
+    assert not os.path.exists(entry)
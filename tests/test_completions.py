@@ -0,0 +1,201 @@
+"""
+Tests for break, continue and return passed as completion records
+اختبارات تمرير التوقف والمتابعة والإرجاع كسجلات إكمال
+"""
+
+import pytest
+
+from bayan import HybridLexer, HybridParser, HybridInterpreter
+from bayan.bayan.control_flow import (Completion, BREAK, CONTINUE, ReturnValue,
+                                      BreakException, ContinueException)
+
+
+def _run(code, interp=None):
+    interp = interp or HybridInterpreter()
+    interp.interpret(HybridParser(HybridLexer(code).tokenize()).parse())
+    return interp.traditional.global_env
+
+
+PROGRAM = """
+def find(items, wanted):
+{
+    for index in range(len(items)):
+    {
+        if items[index] == wanted:
+        {
+            return index
+        }
+    }
+    return -1
+}
+def classify(n):
+{
+    if n < 0:
+    {
+        return "negative"
+    }
+    else:
+    {
+        if n == 0:
+        {
+            return "zero"
+        }
+    }
+    return "positive"
+}
+odd = 0
+i = 0
+while i < 20:
+{
+    i = i + 1
+    if i % 2 == 0:
+    {
+        continue
+    }
+    odd = odd + 1
+}
+pairs = []
+for a in range(4):
+{
+    for b in range(4):
+    {
+        if b > a:
+        {
+            break
+        }
+        pairs.append([a, b])
+    }
+    if a == 2:
+    {
+        break
+    }
+}
+last = 0
+for k in range(5):
+{
+    last = k * 10
+}
+result = [odd, len(pairs), pairs[-1], find([5, 6, 7], 7), find([5], 9),
+          classify(-3), classify(0), classify(4), last]
+"""
+
+EXPECTED = [10, 6, [2, 2], 2, -1, "negative", "zero", "positive", 40]
+
+
+def test_control_flow_results():
+    assert _run(PROGRAM)['result'] == EXPECTED
+
+
+def test_blocks_and_loops_do_not_raise():
+    interp = HybridInterpreter()
+
+    def refuse(node):
+        raise AssertionError(f"{type(node).__name__} was raised as an exception")
+
+    # The exception raising visitors are only reached outside the protocol
+    for name in ('visit_break_statement', 'visit_continue_statement', 'visit_return_statement'):
+        setattr(interp.traditional, name, refuse)
+    assert _run(PROGRAM, interp)['result'] == EXPECTED
+
+
+def test_exceptions_still_cross_other_statements():
+    env = _run("""
+total = 0
+for i in range(10):
+{
+    try: {
+        if i == 2:
+        {
+            continue
+        }
+        if i == 5:
+        {
+            break
+        }
+        total = total + i
+    } except: {
+        total = -1
+    }
+}
+def early():
+{
+    try: {
+        return "inside try"
+    } except: {
+        return "handler"
+    }
+}
+result = [total, early()]
+""")
+    assert env['result'] == [0 + 1 + 3 + 4, "inside try"]
+
+
+def test_functions_called_from_generators_return_values():
+    env = _run("""
+def helper(x):
+{
+    if x > 1:
+    {
+        return x * 10
+    }
+    return x
+}
+def gen(n):
+{
+    for i in range(n):
+    {
+        yield helper(i)
+    }
+}
+result = list(gen(4))
+""")
+    assert env['result'] == [0, 1, 20, 30]
+
+
+def test_helpers_called_from_generators_assign_locals():
+    env = _run("""
+def squares(n):
+{
+    for i in range(n):
+    {
+        yield i * i
+    }
+}
+def helper(x):
+{
+    y = x * 10
+    total = 0
+    for k in range(x):
+    {
+        total = total + k
+    }
+    try:
+    {
+        z = 1 / x
+    }
+    except ZeroDivisionError:
+    {
+        z = 0
+    }
+    found = list(squares(x))
+    return [y, total, z, found]
+}
+def gen(n):
+{
+    for i in range(n):
+    {
+        yield helper(i)
+    }
+}
+result = list(gen(3))
+""")
+    assert env['result'] == [[0, 0, 0, []], [10, 0, 1.0, [0]], [20, 1, 0.5, [0, 1]]]
+
+
+def test_completion_signals():
+    assert isinstance(BREAK.signal(), BreakException)
+    assert isinstance(CONTINUE.signal(), ContinueException)
+    signal = Completion('return', 7).signal()
+    assert isinstance(signal, ReturnValue) and signal.value == 7
+    with pytest.raises(ReturnValue):
+        HybridInterpreter().traditional._raise_completion(Completion('return', 1))
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the batch corpus pipeline
+اختبارات خط معالجة المدونات الدفعي
+"""
+
+import pytest
+
+from bayan.bayan.arabic_adapter import ArabicNLPAdapter
+from bayan.bayan.corpus_pipeline import CorpusPipeline, tokenize
+from bayan.bayan.letter_semiotics import WordAnalyzer
+from bayan.bayan.unified_lexicon_system import UnifiedLexiconSystem
+from bayan.bayan.word_energy_matrix import WordEnergyMatrix
+from tests.test_arramooz_lexicon import _make_db
+
+TEXTS = [
+    'ذهب الطالب إلى المدرسة، والمدرسة جميلة!',
+    'the water is flowing 123',
+    '',
+    'كتاب مدرسة كتاب الكتاب جميل',
+    'مدرسة مدرسة the water',
+]
+
+
+class FakeAnalyzer:
+    """Stands in for the CAMeL Tools morphology analyzer"""
+
+    def __init__(self):
+        self.calls = []
+
+    def analyze(self, word):
+        self.calls.append(word)
+        return [{'root': '.'.join(word[-3:])}] if len(word) > 3 else []
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return _make_db(tmp_path / 'arramooz_dictionary.db')
+
+
+def test_tokenize_keeps_diacritics():
+    assert tokenize('كَتَبَ الطالبُ، 3 كتبٍ: done_it!') == ['كَتَبَ', 'الطالبُ', 'كتبٍ', 'done', 'it']
+
+
+def test_pipeline_matches_word_at_a_time_apis(db_path, monkeypatch):
+    analysed = []
+    original = WordEnergyMatrix.analyze_word
+    monkeypatch.setattr(WordEnergyMatrix, 'analyze_word',
+                        lambda self, word, lang='en': analysed.append(word) or original(self, word, lang))
+    lexicon = UnifiedLexiconSystem(db_path)
+    lexicon.initialize()
+    energy = WordEnergyMatrix()
+    letters = WordAnalyzer()
+
+    with CorpusPipeline(arramooz_db_path=db_path, batch_tokens=8) as pipeline:
+        results = list(pipeline.process(iter(TEXTS)))
+        stats = pipeline.get_statistics()
+
+    tokens = [tokenize(text) for text in TEXTS]
+    assert [[analysis.word for analysis in text] for text in results] == tokens
+    types = set(word for text in tokens for word in text)
+    assert sorted(analysed) == sorted(types)
+    assert stats['tokens'] == sum(map(len, tokens)) and stats['types_analysed'] == len(types)
+    # 'the' and 'water' come back from the type cache in the second batch
+    assert stats['cache'].hits == 2
+
+    for text in results:
+        for analysis in text:
+            word = analysis.word
+            lang = 'en' if word.isascii() else 'ar'
+            assert analysis.root == word
+            assert analysis.lexicon == lexicon.lookup(word)
+            assert analysis.energy == original(energy, word, lang)
+            assert analysis.letters == letters.analyze_word(word)
+    assert results[3][0] is results[3][2]
+    lexicon.close()
+
+
+def test_lexicon_lookup_many(db_path):
+    words = ['المدرسة', 'مدرسة', 'غائب', 'ذهب', 'غائب', 'كتاب', 'الكتاب']
+    batch = UnifiedLexiconSystem(db_path)
+    single = UnifiedLexiconSystem(db_path)
+    batch.initialize()
+    single.initialize()
+
+    assert batch.lookup_many(words) == [single.lookup(word) for word in words]
+    assert batch.lookup_many([]) == []
+    # One probe per distinct normalized word, then hits from the cache
+    assert (batch.cache_hits, batch.cache_misses) == (0, 4)
+    assert batch.lookup_many(words) == batch.lookup_many(words[::-1])[::-1]
+    assert batch.cache_misses == 4
+    batch.close()
+    single.close()
+
+
+def test_roots_are_analysed_once():
+    adapter = ArabicNLPAdapter()
+    adapter.morphology_analyzer = FakeAnalyzer()
+    assert adapter.extract_roots(iter(['مدرسة', 'كتب', 'مدرسة'])) == ['رسة', 'كتب', 'رسة']
+    assert adapter.extract_root('مدرسة') == 'رسة'
+    assert adapter.morphology_analyzer.calls == ['مدرسة', 'كتب']
+    assert adapter.root_cache.stats().negative_hits == 0
+
+
+def test_worker_processes_give_the_same_results(db_path):
+    with CorpusPipeline(arramooz_db_path=db_path) as local:
+        expected = list(local.process(TEXTS))
+    with CorpusPipeline(('lexicon', 'letters', 'root', 'energy'), arramooz_db_path=db_path,
+                        workers=2, chunk_size=3) as pooled:
+        found = list(pooled.process(TEXTS))
+        assert pooled._pool is not None
+    assert found == expected
+
+    with pytest.raises(ValueError):
+        CorpusPipeline(('root', 'syntax'))
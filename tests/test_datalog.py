@@ -0,0 +1,125 @@
+"""
+Tests for bottom-up semi-naive Datalog evaluation (LogicalEngine.materialize)
+اختبارات التقييم من الأسفل إلى الأعلى بنمط داتالوغ
+"""
+
+from bayan.bayan.logical_engine import LogicalEngine, Term, Predicate, Fact, Rule
+from bayan.bayan.hierarchy_engine import HierarchyEngine
+
+
+def V(name):
+    return Term(name, True)
+
+
+def C(value):
+    return Term(value)
+
+
+def _values(engine, goal, var):
+    return sorted(engine._deref(V(var), sol).value for sol in engine.query(goal))
+
+
+def _graph_engine(edges):
+    engine = LogicalEngine()
+    for a, b in edges:
+        engine.add_fact(Fact(Predicate("edge", [C(a), C(b)])))
+    engine.add_rule(Rule(
+        Predicate("path", [V("X"), V("Y")]),
+        [Predicate("path", [V("X"), V("Z")]), Predicate("edge", [V("Z"), V("Y")])]
+    ))
+    engine.add_rule(Rule(
+        Predicate("path", [V("X"), V("Y")]),
+        [Predicate("edge", [V("X"), V("Y")])]
+    ))
+    return engine
+
+
+def test_materialize_computes_recursive_closure():
+    engine = _graph_engine([("a", "b"), ("b", "c"), ("c", "a"), ("c", "d")])
+    sizes = engine.materialize()
+    assert engine.mode == 'datalog'
+    assert sizes[("path", 2)] == 12
+    assert _values(engine, Predicate("path", [C("a"), V("Y")]), "Y") == ["a", "b", "c", "d"]
+    assert engine.query(Predicate("path", [C("d"), V("Y")])) == []
+
+
+def test_stratified_negation():
+    engine = _graph_engine([("a", "b"), ("b", "c")])
+    engine.add_fact(Fact(Predicate("blocked", [C("c")])))
+    engine.add_rule(Rule(
+        Predicate("open_path", [V("X"), V("Y")]),
+        [Predicate("path", [V("X"), V("Y")]), Predicate("not", [Predicate("blocked", [V("Y")])])]
+    ))
+    engine.materialize()
+    assert _values(engine, Predicate("open_path", [C("a"), V("Y")]), "Y") == ["b"]
+
+    engine.retract(Predicate("blocked", [C("c")]))
+    assert _values(engine, Predicate("open_path", [C("a"), V("Y")]), "Y") == ["b", "c"]
+
+
+def test_incremental_assert_and_retract():
+    engine = _graph_engine([("a", "b"), ("b", "c")])
+    engine.materialize()
+    goal = Predicate("path", [C("a"), V("Y")])
+
+    engine.assertz(Fact(Predicate("edge", [C("c"), C("d")])))
+    assert not engine._datalog.stale
+    assert _values(engine, goal, "Y") == ["b", "c", "d"]
+
+    engine.retract(Predicate("edge", [C("b"), C("c")]))
+    assert not engine._datalog.stale
+    assert _values(engine, goal, "Y") == ["b"]
+    assert _values(engine, Predicate("path", [C("c"), V("Y")]), "Y") == ["d"]
+
+
+def test_retract_keeps_rows_with_other_derivations():
+    engine = _graph_engine([("a", "b"), ("b", "d"), ("a", "c"), ("c", "d")])
+    engine.materialize()
+    engine.retract(Predicate("edge", [C("b"), C("d")]))
+    assert _values(engine, Predicate("path", [C("a"), V("Y")]), "Y") == ["b", "c", "d"]
+
+
+def test_rule_change_recomputes_model():
+    engine = _graph_engine([("a", "b")])
+    engine.materialize()
+    engine.add_rule(Rule(Predicate("linked", [V("X")]), [Predicate("edge", [V("X"), V("Y")])]))
+    assert engine._datalog.stale
+    assert _values(engine, Predicate("linked", [V("X")]), "X") == ["a"]
+
+
+def test_non_datalog_predicates_fall_back_to_top_down():
+    engine = _graph_engine([("a", "b")])
+    engine.add_fact(Fact(Predicate("score", [C("a"), C(3)])))
+    # findall is not Datalog, so scores/1 is answered by SLD resolution
+    engine.add_rule(Rule(
+        Predicate("scores", [V("L")]),
+        [Predicate("findall", [V("S"), Predicate("score", [V("X"), V("S")]), V("L")])]
+    ))
+    engine.materialize()
+    assert ("scores", 1) in engine._datalog.excluded
+    sols = engine.query(Predicate("scores", [V("L")]))
+    assert len(sols) == 1
+
+
+def test_comparisons_and_probabilities():
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate("age", [C("ali"), C(30)]), probability=0.9))
+    engine.add_fact(Fact(Predicate("age", [C("sara"), C(12)])))
+    engine.add_rule(Rule(
+        Predicate("adult", [V("P")]),
+        [Predicate("age", [V("P"), V("A")]), Predicate("_compare_>=", [V("A"), 18])]
+    ))
+    engine.materialize()
+    sols = engine.query(Predicate("adult", [V("P")]))
+    assert [s.lookup("P").value for s in sols] == ["ali"]
+    assert abs(sols[0].probability - 0.9) < 1e-9
+
+
+def test_hierarchy_engine_rules_materialize():
+    engine = LogicalEngine()
+    hierarchy = HierarchyEngine(engine)
+    hierarchy.define_hierarchy("family", "jad", {"jad": ["ab"], "ab": ["ibn"]})
+    engine.materialize()
+    assert ("ancestor", 3) not in engine._datalog.excluded
+    goal = Predicate("ancestor", [C("family"), C("jad"), V("D")])
+    assert _values(engine, goal, "D") == ["ab", "ibn"]
@@ -0,0 +1,115 @@
+"""
+Tests for the embedding store and the batched neural search path
+اختبارات مخزن المتجهات والبحث العصبي المجمع
+"""
+
+import zlib
+
+import numpy as np
+import pytest
+
+from bayan.bayan.logical_engine import Fact, Predicate, Term
+from bayan.bayan.neural.embedding_store import EmbeddingStore
+from bayan.bayan.neural.neural_engine import NeuralEngine
+from bayan.bayan.neural.tensor_bridge import TensorBridge
+
+
+def _vectors(texts, dim=8):
+    rows = [np.random.default_rng(zlib.crc32(text.encode('utf-8'))).standard_normal(dim)
+            for text in texts]
+    matrix = np.array(rows, dtype=np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    """The shared NeuralEngine with a fresh store and a counting fake model"""
+    neural = NeuralEngine()
+    calls = []
+
+    def batch_embed(texts):
+        calls.append(list(texts))
+        return _vectors(texts)
+
+    monkeypatch.setattr(neural, 'store', EmbeddingStore('fake', capacity=1000))
+    monkeypatch.setattr(neural, 'batch_embed', batch_embed)
+    monkeypatch.setattr(neural, 'batch_size', 64)
+    neural.calls = calls
+    yield neural
+    del neural.calls
+
+
+def _facts(count):
+    return [Fact(Predicate('knows', [Term(f"person{i}"), Term(f"person{i + 1}")]))
+            for i in range(count)]
+
+
+def test_store_persists_rows(tmp_path):
+    texts = ["ali", "omar", "zaid"]
+    store = EmbeddingStore('model', str(tmp_path))
+    assert store.get_many(texts) == (None, [0, 1, 2])
+    store.put_many(texts, _vectors(texts))
+    store.put_many(["ali", "ali"], _vectors(["ali", "ali"]))
+
+    reopened = EmbeddingStore('model', str(tmp_path))
+    matrix, missing = reopened.get_many(["zaid", "huda", "ali"])
+    assert missing == [1] and reopened.dim == 8
+    np.testing.assert_array_equal(matrix[[0, 2]], _vectors(["zaid", "ali"]))
+
+    # Another model never sees these rows
+    assert EmbeddingStore('other', str(tmp_path)).get("ali") is None
+
+
+def test_store_drops_torn_files(tmp_path):
+    store = EmbeddingStore('model', str(tmp_path))
+    store.put_many(["a", "b"], _vectors(["a", "b"]))
+    matrix_file = next(tmp_path.glob('*.f32'))
+    matrix_file.write_bytes(matrix_file.read_bytes()[:-3])
+    assert EmbeddingStore('model', str(tmp_path)).get("a") is None
+    assert not list(tmp_path.iterdir())
+
+
+def test_store_is_lru():
+    store = EmbeddingStore('model', capacity=2)
+    store.put_many(["a", "b"], _vectors(["a", "b"]))
+    store.get("a")
+    store.put_many(["c"], _vectors(["c"]))
+    assert store.get("b") is None
+    assert store.get("a") is not None and store.get("c") is not None
+
+
+def test_facts_are_embedded_once(engine):
+    facts = _facts(300)
+    bridge = TensorBridge(engine)
+    texts = [bridge.fact_to_text(fact) for fact in facts]
+
+    results = bridge.find_similar_facts("person7 knows person8", facts, top_k=5)
+    # The query is one of the fact texts, so it is embedded only once
+    assert sum(len(batch) for batch in engine.calls) == 300
+    assert max(len(batch) for batch in engine.calls) == 64
+
+    scores = _vectors(texts) @ _vectors(["person7 knows person8"])[0]
+    expected = sorted(range(len(facts)), key=lambda i: -scores[i])[:5]
+    assert [fact for fact, _, _ in results] == [facts[i] for i in expected]
+    assert results[0][2] == "person7 knows person8"
+    assert results[0][1] == pytest.approx(1.0, abs=1e-5)
+
+    engine.calls.clear()
+    bridge.find_similar_facts("someone else", facts + _facts(2), top_k=3)
+    assert engine.calls == [["someone else"]]
+
+
+def test_small_store_and_duplicate_texts(engine, monkeypatch):
+    monkeypatch.setattr(engine, 'store', EmbeddingStore('fake', capacity=4))
+    texts = [f"text {i % 10}" for i in range(30)]
+    matrix = engine.embed_texts(texts)
+    np.testing.assert_allclose(matrix, _vectors(texts))
+    assert sum(len(batch) for batch in engine.calls) == 10
+    assert engine.compute_similarity("x", "x") == pytest.approx(1.0, abs=1e-5)
+
+
+def test_without_a_model(engine, monkeypatch):
+    monkeypatch.setattr(engine, 'batch_embed', lambda texts: None)
+    assert engine.embed("anything") is None
+    assert engine.compute_similarity("a", "b") == 0.0
+    assert TensorBridge(engine).find_similar_facts("a", _facts(3)) == []
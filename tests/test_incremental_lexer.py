@@ -0,0 +1,105 @@
+"""
+Tests for streaming tokenization and incremental relexing
+اختبارات التحليل المعجمي المتدفق والتزايدي
+"""
+
+import random
+
+from bayan.bayan.lexer import HybridLexer, TokenStream, TokenType
+from bayan.bayan.parser import HybridParser
+from bayan.bayan.hybrid_interpreter import HybridInterpreter
+
+
+SOURCE = '''x = 10
+# comment
+/* block
+comment */ y = x + 2.5
+دالة f(a):
+    أرجع a * 2
+hybrid {
+    parent("ali", "omar").
+}
+print(f(y))
+'''
+
+
+def _shape(tokens):
+    return [(t.type, t.value, t.line, t.column, t.offset) for t in tokens]
+
+
+def _relex(old_code, new_code):
+    old_tokens = HybridLexer(old_code).tokenize()
+    edit = HybridLexer.edit_range(old_code, new_code)
+    return HybridLexer(new_code).relex(old_tokens, *edit)
+
+
+def test_iter_tokens_matches_tokenize():
+    streamed = list(HybridLexer(SOURCE).iter_tokens())
+    assert _shape(streamed) == _shape(HybridLexer(SOURCE).tokenize())
+    assert streamed[-1].type == TokenType.EOF
+
+
+def test_iter_tokens_is_lazy():
+    tokens = HybridLexer("a b c $").iter_tokens()
+    assert next(tokens).value == "a"  # The bad character is not reached yet
+
+
+def test_offsets_point_into_source():
+    for token in HybridLexer(SOURCE).tokenize()[:-1]:
+        assert SOURCE[token.offset:token.offset + len(token.value)] == token.value
+
+
+def test_token_stream_pulls_on_demand():
+    stream = TokenStream(HybridLexer("a b c").iter_tokens())
+    assert stream[1].value == "b"
+    assert len(stream._buffer) == 2
+    assert stream.has(3) and not stream.has(4)
+    assert [t.value for t in stream] == ["a", "b", "c", ""]
+
+
+def test_parser_accepts_token_iterator():
+    code = "x = 1\ny = x + 2\n"
+    from_list = HybridParser(HybridLexer(code).tokenize()).parse()
+    from_stream = HybridParser(HybridLexer(code).iter_tokens()).parse()
+    assert repr(from_stream) == repr(from_list)
+
+    interp = HybridInterpreter()
+    interp.interpret(from_stream)
+    assert interp.traditional.global_env.get("y") == 3
+
+
+def test_relex_edits_match_full_tokenize():
+    edits = [
+        SOURCE.replace("10", "1000"),
+        SOURCE.replace("x + 2.5", "x+2.5 - 7"),
+        SOURCE.replace("/* block", "/* a\nlonger block"),
+        SOURCE.replace("comment */", "comment"),  # Comment now runs to the end
+        SOURCE.replace("# comment", ""),
+        SOURCE.replace("print", "اطبع"),
+        "z = 1\n" + SOURCE,
+        SOURCE + "w = 2\n",
+    ]
+    for new_code in edits:
+        assert _shape(_relex(SOURCE, new_code)) == _shape(HybridLexer(new_code).tokenize())
+
+
+def test_relex_reuses_unchanged_tail():
+    old_tokens = HybridLexer(SOURCE).tokenize()
+    new_code = SOURCE.replace("x = 10", "x = 11")
+    tokens = HybridLexer(new_code).relex(old_tokens, *HybridLexer.edit_range(SOURCE, new_code))
+    # Same-length edit: tokens after the sync point are the old objects
+    assert tokens[-1] is old_tokens[-1]
+
+
+def test_relex_random_edits():
+    rng = random.Random(7)
+    pieces = ["x", "1", ".5", "(", ")", ":-", "\n", " ", "#", "/*", "*/", "إذا", "'s'", '"', "?X"]
+    for _ in range(300):
+        start = rng.randint(0, len(SOURCE))
+        end = min(len(SOURCE), start + rng.randint(0, 6))
+        new_code = SOURCE[:start] + "".join(rng.choice(pieces) for _ in range(rng.randint(0, 3))) + SOURCE[end:]
+        try:
+            expected = _shape(HybridLexer(new_code).tokenize())
+        except SyntaxError:
+            continue
+        assert _shape(_relex(SOURCE, new_code)) == expected
@@ -0,0 +1,68 @@
+"""
+Tests for the type-keyed node dispatch and position tracking modes
+اختبارات جدول توزيع العقد ووضع تتبع المواقع
+"""
+
+import pytest
+
+from bayan.bayan.lexer import HybridLexer
+from bayan.bayan.parser import HybridParser
+from bayan.bayan.hybrid_interpreter import HybridInterpreter
+from bayan.bayan.traditional_interpreter import TraditionalInterpreter
+from bayan.bayan.ast_nodes import Number, String
+
+
+def _run(code, mode=None):
+    ast = HybridParser(HybridLexer(code).tokenize()).parse()
+    interp = HybridInterpreter()
+    if mode:
+        interp.traditional.set_position_tracking(mode)
+    interp.interpret(ast)
+    return interp
+
+
+def test_subclassed_node_uses_parent_visitor():
+    class Decimal(Number):
+        pass
+
+    interp = TraditionalInterpreter()
+    assert interp.interpret(Decimal("2.5")) == 2.5
+    assert interp.interpret(String("x")) == "x"
+
+
+def test_unknown_node_type_is_reported():
+    with pytest.raises(Exception) as ei:
+        TraditionalInterpreter().interpret(object())
+    assert "Unknown node type" in str(ei.value)
+
+
+def test_statement_mode_gives_same_results():
+    code = """
+def square(n):
+{
+    return n * n
+}
+total = 0
+for i in range(5):
+{
+    total = total + square(i)
+}
+"""
+    for mode in ("node", "statement"):
+        interp = _run(code, mode)
+        assert interp.traditional.global_env["total"] == 30
+        assert interp.traditional._call_stack == []
+
+
+def test_statement_mode_reports_enclosing_statement():
+    with pytest.raises(Exception) as ei:
+        _run("a = b + 1\n", "statement")
+    msg = str(ei.value)
+    assert "Undefined variable: b" in msg
+    assert "Assignment" in msg
+    assert "BinaryOp" not in msg
+
+
+def test_unknown_tracking_mode_rejected():
+    with pytest.raises(ValueError):
+        TraditionalInterpreter().set_position_tracking("everything")
@@ -0,0 +1,137 @@
+"""
+Tests for lazy solution streaming (LogicalEngine.iter_query)
+اختبارات توليد الحلول بشكل كسول
+"""
+
+import contextlib
+import itertools
+import sys
+
+from bayan.bayan.logical_engine import LogicalEngine, Term, Predicate, Fact, Rule
+from bayan.bayan.ast_nodes import FunctionCall
+from bayan.bayan.lexer import HybridLexer
+from bayan.bayan.parser import HybridParser
+from bayan.bayan.hybrid_interpreter import HybridInterpreter
+
+
+def _number_engine(count):
+    engine = LogicalEngine()
+    for i in range(count):
+        engine.add_fact(Fact(Predicate("number", [Term(str(i))])))
+    return engine
+
+
+@contextlib.contextmanager
+def frame_budget(frames):
+    """Allow `frames` Python frames on top of the caller's stack"""
+    depth = 0
+    frame = sys._getframe()
+    while frame is not None:
+        depth += 1
+        frame = frame.f_back
+    old = sys.getrecursionlimit()
+    sys.setrecursionlimit(depth + frames)
+    try:
+        yield
+    finally:
+        sys.setrecursionlimit(old)
+
+
+def ancestor_engine(depth):
+    """parent(p0, p1) ... parent(p{depth-1}, p{depth}) with an untabled anc/2"""
+    engine = LogicalEngine()
+    for i in range(depth):
+        engine.add_fact(Fact(Predicate("parent", [Term(f"p{i}"), Term(f"p{i + 1}")])))
+    engine.add_rule(Rule(Predicate("anc", [Term("X", True), Term("Z", True)]),
+                         [Predicate("parent", [Term("X", True), Term("Z", True)])]))
+    engine.add_rule(Rule(Predicate("anc", [Term("X", True), Term("Z", True)]),
+                         [Predicate("parent", [Term("X", True), Term("Y", True)]),
+                          Predicate("anc", [Term("Y", True), Term("Z", True)])]))
+    return engine
+
+
+def test_iter_query_matches_query():
+    engine = _number_engine(5)
+    goal = Predicate("number", [Term("X", True)])
+
+    eager = [sol.lookup("X").value for sol in engine.query(goal)]
+    lazy = [sol.lookup("X").value for sol in engine.iter_query(goal)]
+
+    assert lazy == eager == ["0", "1", "2", "3", "4"]
+
+
+def test_iter_query_is_lazy():
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate("item", [Term("1")])))
+    engine.add_fact(Fact(Predicate("item", [Term("2")])))
+    # checked(X) :- item(X), mark(X) > 0 -- record which facts get checked
+    seen = []
+    engine.function_evaluator = lambda name, args: seen.append(args[0]) or 1
+    head = Predicate("checked", [Term("X", True)])
+    body = [
+        Predicate("item", [Term("X", True)]),
+        Predicate("_compare_>", [FunctionCall("mark", [Term("X", True)]), 0]),
+    ]
+    engine.add_rule(Rule(head, body))
+
+    gen = engine.iter_query(Predicate("checked", [Term("X", True)]))
+    first = next(gen)
+    gen.close()
+
+    assert first.lookup("X").value == "1"
+    assert seen == [1]
+    assert engine.call_stack == []
+
+
+def test_iter_query_rule_solutions_in_order():
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate("parent", [Term("john"), Term("mary")])))
+    engine.add_fact(Fact(Predicate("parent", [Term("mary"), Term("susan")])))
+    engine.add_fact(Fact(Predicate("parent", [Term("mary"), Term("tom")])))
+    head = Predicate("grandparent", [Term("X", True), Term("Z", True)])
+    body = [
+        Predicate("parent", [Term("X", True), Term("Y", True)]),
+        Predicate("parent", [Term("Y", True), Term("Z", True)]),
+    ]
+    engine.add_rule(Rule(head, body))
+
+    goal = Predicate("grandparent", [Term("john"), Term("Z", True)])
+    first = next(engine.iter_query(goal))
+    assert first.lookup("Z").value == "susan"
+
+    all_z = [sol.lookup("Z").value for sol in engine.iter_query(goal)]
+    assert all_z == ["susan", "tom"]
+
+
+def test_islice_stops_large_search():
+    engine = _number_engine(1000)
+    goal = Predicate("number", [Term("X", True)])
+    sols = list(itertools.islice(engine.iter_query(goal), 3))
+    assert [s.lookup("X").value for s in sols] == ["0", "1", "2"]
+
+
+def test_limit_goal_returns_first_n():
+    code = """
+hybrid {
+    number(1).
+    number(2).
+    number(3).
+    number(4).
+}
+"""
+    tokens = HybridLexer(code).tokenize()
+    ast = HybridParser(tokens).parse()
+    interp = HybridInterpreter()
+    interp.interpret(ast)
+
+    goal = Predicate("number", [Term("N", True)])
+    sols = interp.traditional._query_solutions(goal, max_solutions=2)
+    assert [s.lookup("N").value for s in sols] == ["1", "2"]
+
+
+def test_deep_recursion_fits_the_eager_frame_budget():
+    # The list-returning solver proved a 300-deep chain within 1000
+    # frames; streaming must not use more frames per resolution step
+    engine = ancestor_engine(300)
+    with frame_budget(1000):
+        assert len(engine.query(Predicate("anc", [Term("p0"), Term("p300")]))) == 1
@@ -0,0 +1,57 @@
+"""
+Tests for the table-driven master-regex scanner in HybridLexer
+اختبارات الماسح المعجمي المعتمد على جدول الأنماط
+"""
+
+from bayan.bayan.lexer import HybridLexer, TokenType
+
+
+def _tokens(code):
+    return [(t.type, t.value, t.line, t.column) for t in HybridLexer(code).tokenize()]
+
+
+def test_every_pattern_is_one_group():
+    assert HybridLexer._MASTER_PATTERN.groups == len(HybridLexer.TOKEN_PATTERNS)
+
+
+def test_pattern_priority_keeps_longest_operators():
+    types = [t[0] for t in _tokens("a |> b >> c -> d ** e ?? f ?.g := h ~= i \\= j \\+ k @=< l ?- ?X")]
+    assert types[:-1] == [
+        TokenType.IDENTIFIER, TokenType.PIPELINE, TokenType.IDENTIFIER, TokenType.COMPOSE,
+        TokenType.IDENTIFIER, TokenType.ARROW, TokenType.IDENTIFIER, TokenType.STAR_STAR,
+        TokenType.IDENTIFIER, TokenType.NULLISH, TokenType.IDENTIFIER, TokenType.QUESTION_DOT,
+        TokenType.IDENTIFIER, TokenType.WALRUS, TokenType.IDENTIFIER, TokenType.OPERATOR,
+        TokenType.IDENTIFIER, TokenType.OPERATOR, TokenType.IDENTIFIER, TokenType.NOT,
+        TokenType.IDENTIFIER, TokenType.OPERATOR, TokenType.IDENTIFIER, TokenType.QUERY,
+        TokenType.VARIABLE,
+    ]
+
+
+def test_keywords_and_identifiers():
+    tokens = _tokens("إذا شرط دالة format")
+    assert [t[0] for t in tokens[:-1]] == [TokenType.IF, TokenType.IDENTIFIER, TokenType.DEF, TokenType.IDENTIFIER]
+
+
+def test_strings_and_positions_across_comments():
+    code = 'x = f"v={x}" # note\n/* multi\nline */ y = """a\nb""" + \'c\'\n  ٣.٥'
+    assert _tokens(code) == [
+        (TokenType.IDENTIFIER, 'x', 1, 1),
+        (TokenType.ASSIGN, '=', 1, 3),
+        (TokenType.FSTRING, 'f"v={x}"', 1, 5),
+        (TokenType.IDENTIFIER, 'y', 3, 9),
+        (TokenType.ASSIGN, '=', 3, 11),
+        (TokenType.STRING, '"""a\nb"""', 3, 13),
+        (TokenType.OPERATOR, '+', 4, 6),
+        (TokenType.STRING, "'c'", 4, 8),
+        (TokenType.NUMBER, '٣.٥', 5, 3),
+        (TokenType.EOF, '', 5, 6),
+    ]
+
+
+def test_unknown_character_reports_position():
+    try:
+        HybridLexer("x = 1\n  $").tokenize()
+    except SyntaxError as e:
+        assert "'$' at 2:3" in str(e)
+    else:
+        assert False, "expected SyntaxError"
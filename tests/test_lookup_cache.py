@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the bounded lookup cache and its use in the lexicon layers
+اختبارات الذاكرة المؤقتة المحدودة في طبقات المعجم
+"""
+
+import pytest
+
+from bayan.bayan.arramooz_adapter import ArramoozAdapter
+from bayan.bayan.lookup_cache import LookupCache, cache_statistics
+from bayan.bayan.smart_lexicon import SmartLexicon
+from bayan.bayan.unified_lexicon_system import UnifiedLexiconSystem
+from tests.test_arramooz_lexicon import _make_db
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_eviction_and_stats():
+    cache = LookupCache('test.lru', maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.lookup('a') == (True, 1)
+    cache.put('c', 3)
+    assert 'b' not in cache and 'a' in cache and 'c' in cache
+    assert cache.lookup('b') == (False, None)
+
+    stats = cache.stats()
+    assert (stats.size, stats.hits, stats.misses, stats.evictions) == (2, 1, 1, 1)
+    assert stats.hit_rate == 0.5
+    assert stats in cache_statistics()
+
+
+def test_negative_results_and_ttl():
+    clock = FakeClock()
+    cache = LookupCache('test.ttl', ttl=10, clock=clock)
+    cache.put('unknown', None)
+    assert cache.lookup('unknown') == (True, None)
+    assert cache.negative_hits == 1
+
+    cache['known'] = 'value'
+    assert cache['known'] == 'value' and len(cache) == 2
+    clock.now = 10
+    assert 'known' not in cache
+    assert cache.lookup('known') == (False, None)
+    with pytest.raises(KeyError):
+        cache['unknown']
+    assert cache.expirations == 2 and len(cache) == 0
+
+    no_negatives = LookupCache('test.positive', cache_negative=False)
+    calls = []
+    for _ in range(3):
+        no_negatives.get_or_compute('x', lambda: calls.append(1))
+    assert len(calls) == 3 and len(no_negatives) == 0
+
+
+def test_caches_with_one_name_are_reported_together():
+    first, second = LookupCache('test.shared', maxsize=4), LookupCache('test.shared', maxsize=8)
+    first.put('a', 1)
+    first.lookup('a')
+    second.lookup('b')
+    shared = [stats for stats in cache_statistics() if stats.name == 'test.shared']
+    assert len(shared) == 1
+    assert (shared[0].size, shared[0].maxsize, shared[0].hits, shared[0].misses) == (1, 12, 1, 1)
+    assert first.stats().maxsize == 4
+
+
+def test_arramooz_caches_unknown_words(tmp_path):
+    adapter = ArramoozAdapter(_make_db(tmp_path / 'arramooz_dictionary.db'), cache_size=2)
+    assert adapter.load_database()
+    queries = []
+    adapter.conn.set_trace_callback(queries.append)
+
+    for _ in range(5):
+        assert adapter.search_word('غائب') is None
+    assert len(queries) == 2  # nouns then verbs, once
+    assert adapter.search_word('كتاب').arabic == 'كتاب'
+    assert adapter.search_word('مدرسة').arabic == 'مدرسة'
+    assert len(adapter.cache) == 2  # 'غائب' was evicted
+
+    words, roots = adapter.cache_statistics()
+    assert (words.name, words.hits, words.negative_hits, words.evictions) == ('arramooz.words', 4, 4, 1)
+    assert roots.name == 'arramooz.roots'
+    adapter.close()
+
+
+def test_unified_lexicon_statistics(tmp_path):
+    lexicon = UnifiedLexiconSystem(_make_db(tmp_path / 'arramooz_dictionary.db'), cache_size=100)
+    lexicon.initialize()
+    for word in ('المدرسة', 'مدرسة', 'غائب', 'غائب', 'غائب'):
+        lexicon.lookup(word)
+
+    stats = lexicon.get_statistics()
+    assert (stats.cache_hits, stats.cache_misses, stats.negative_hits) == (3, 2, 2)
+    assert stats.cache_hit_rate == pytest.approx(0.6)
+    assert [layer.name for layer in stats.cache_layers] == [
+        'lexicon.words', 'lexicon.roots', 'arramooz.words', 'arramooz.roots']
+    # The unknown word reached the adapter once
+    assert stats.cache_layers[2].misses == 2
+
+    lexicon.clear_cache()
+    assert (lexicon.cache_hits, lexicon.cache_misses, len(lexicon.cache)) == (0, 0, 0)
+    lexicon.close()
+
+
+def test_smart_lexicon_caches_entries(tmp_path, monkeypatch):
+    source = tmp_path / 'lexicon.bayan'
+    source.write_text('def lexicon():\n{\n    return {\n'
+                      '        "water": {"en": {"lemma": "water"}}\n    }\n}\n', encoding='utf-8')
+    lexicon = SmartLexicon(str(source))
+    analysed = []
+    original = lexicon.wem.analyze_word
+    monkeypatch.setattr(lexicon.wem, 'analyze_word',
+                        lambda word, lang: analysed.append(word) or original(word, lang))
+
+    first = lexicon.enrich_entry('water', 'en')
+    assert first is not None and lexicon.enrich_entry('water', 'en') is first
+    assert lexicon.enrich_entry('fire', 'en') is None and lexicon.enrich_entry('fire', 'en') is None
+    assert analysed == ['water']
+    stats = lexicon.get_statistics()['cache']
+    assert (stats.hits, stats.misses, stats.negative_hits) == (2, 2, 1)
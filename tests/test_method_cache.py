@@ -0,0 +1,104 @@
+"""
+Tests for the class system's method lookup caches and call signatures
+اختبارات ذاكرة البحث عن الدوال وتواقيع الاستدعاء في نظام الأصناف
+"""
+
+import pytest
+
+from bayan import HybridLexer, HybridParser, HybridInterpreter
+
+
+def _run(code):
+    interp = HybridInterpreter()
+    interp.interpret(HybridParser(HybridLexer(code).tokenize()).parse())
+    return interp
+
+
+CLASSES = """
+class A:
+{
+    def who():
+    {
+        return "A"
+    }
+    def pack(head, second=2, *rest, **options):
+    {
+        return [head, second, rest, options]
+    }
+}
+class B(A):
+{
+}
+b = B()
+inherited = b.who()
+"""
+
+
+def test_lookups_are_cached_until_a_class_is_registered():
+    interp = _run(CLASSES)
+    classes = interp.traditional.class_system
+    assert interp.traditional.global_env['inherited'] == "A"
+
+    found = classes.resolve_call('B', 'who')
+    assert found[0] == 'A'
+    assert classes.resolve_call('B', 'who') is found
+    assert classes.resolve_method('B', 'who') == found[:2]
+    assert classes.get_mro('B') == ['B', 'A']
+
+    # Redefining the base class changes what B inherits
+    interp.interpret(HybridParser(HybridLexer("""
+class A:
+{
+    def who():
+    {
+        return "new A"
+    }
+}
+redefined = b.who()
+""").tokenize()).parse())
+    assert interp.traditional.global_env['redefined'] == "new A"
+    assert classes.resolve_call('B', 'who') is not found
+
+
+def test_signatures_bind_like_before():
+    interp = _run(CLASSES)
+    b = interp.traditional.global_env['b']
+    signature = interp.traditional.class_system.resolve_call('B', 'pack')[2]
+    assert signature.positional == ('head', 'second')
+    assert (signature.varargs, signature.kwargs) == ('rest', 'options')
+    assert list(signature.defaults) == ['second']
+
+    assert b.call_method('pack', [1]) == [1, 2, [], {}]
+    assert b.call_method('pack', [1, 5, 6, 7], {'second': 9, 'x': 0}) == [1, 9, [6, 7], {'x': 0}]
+
+
+def test_call_errors():
+    interp = _run(CLASSES)
+    b = interp.traditional.global_env['b']
+    with pytest.raises(AttributeError):
+        b.call_method('missing', [])
+    assert not b.has_method('missing')
+
+    interp = _run("""
+class C:
+{
+    def one(x):
+    {
+        return x
+    }
+}
+c = C()
+""")
+    c = interp.traditional.global_env['c']
+    with pytest.raises(RuntimeError, match="Too many positional"):
+        c.call_method('one', [1, 2])
+    with pytest.raises(RuntimeError, match="Unexpected keyword"):
+        c.call_method('one', [1], {'y': 2})
+    assert interp.traditional._owner_stack == []
+
+
+def test_instances_share_their_class_methods():
+    interp = _run(CLASSES + "b2 = B()\na = A()")
+    env = interp.traditional.global_env
+    assert env['b'].methods is env['b2'].methods
+    assert 'who' in env['a'].methods
@@ -0,0 +1,59 @@
+"""
+Tests for the cached parenthesis lookahead used by fact/rule detection
+اختبارات النظر المسبق للأقواس في المحلل
+"""
+
+from bayan.bayan.lexer import HybridLexer
+from bayan.bayan.parser import HybridParser
+from bayan.bayan.ast_nodes import HybridBlock
+
+
+def _parser(code):
+    return HybridParser(HybridLexer(code).tokenize())
+
+
+def test_fact_and_rule_detection():
+    assert _parser("parent(ali, (sara)).").is_logical_fact()
+    assert not _parser("parent(ali, sara).").is_logical_rule()
+    assert _parser("anc(?X, ?Y) :- parent(?X, ?Y).").is_logical_rule()
+    assert not _parser("anc(?X, ?Y) :- parent(?X, ?Y).").is_logical_fact()
+
+
+def test_top_level_operator_is_not_a_fact():
+    assert not _parser("total(a + b).").is_logical_fact()
+    # Operators nested in inner parentheses do not count
+    assert _parser("total(f(a + b)).").is_logical_fact()
+
+
+def test_unbalanced_parentheses_are_neither():
+    parser = _parser("broken(a, (b.")
+    assert not parser.is_logical_fact()
+    assert not parser.is_logical_rule()
+
+
+def test_probes_do_not_move_the_parser():
+    parser = _parser("edge(a, b).")
+    first = parser.current_token
+    parser.is_logical_rule()
+    parser.is_logical_fact()
+    assert parser.position == 0
+    assert parser.current_token is first
+
+
+def test_spans_are_shared_between_probes():
+    parser = _parser("outer(inner(a), other(b)).")
+    assert parser.is_logical_fact()
+    # The outer scan recorded the nested groups as well
+    assert len(parser._paren_spans) == 3
+
+
+def test_large_fact_block_parses():
+    lines = ["hybrid {"]
+    for i in range(2000):
+        lines.append(f"    edge(n{i}, n{i + 1}).")
+    lines.append("    path(?X, ?Y) :- edge(?X, ?Y).")
+    lines.append("}")
+    ast = _parser("\n".join(lines)).parse()
+    block = ast.statements[0]
+    assert isinstance(block, HybridBlock)
+    assert len(block.logical_stmts) == 2001
@@ -0,0 +1,95 @@
+"""
+Tests for PersistentSubstitution (layered substitution with O(1) copies)
+اختبارات الاستبدال الطبقي
+"""
+
+from bayan.bayan.logical_engine import (
+    LogicalEngine, Term, Predicate, Fact, Rule, Substitution, PersistentSubstitution
+)
+
+
+def V(name):
+    return Term(name, True)
+
+
+def C(value):
+    return Term(value)
+
+
+def test_copy_is_isolated():
+    sub = PersistentSubstitution()
+    sub.bind("X", C("a"))
+    child = sub.copy()
+    child.bind("Y", C("b"))
+    sub.bind("Z", C("c"))
+
+    assert child.lookup("X").value == "a"
+    assert child.lookup("Y").value == "b"
+    assert child.lookup("Z") is None
+    assert sub.lookup("Y") is None
+    assert sub.lookup("Z").value == "c"
+
+
+def test_newer_binding_shadows_older_layer():
+    sub = PersistentSubstitution()
+    sub.bind("X", C("old"))
+    child = sub.copy()
+    child.bind("X", C("new"))
+    assert child.lookup("X").value == "new"
+    assert sub.lookup("X").value == "old"
+
+
+def test_rebinding_to_none_shadows_older_layer():
+    sub = PersistentSubstitution()
+    sub.bind("X", C("old"))
+    child = sub.copy()
+    child.bind("X", None)
+    assert child.lookup("X") is None
+    grandchild = child.copy()
+    assert grandchild.lookup("X") is None
+    assert sub.lookup("X").value == "old"
+    assert child.bindings == {"X": None}
+
+
+def test_bindings_flatten_and_setter():
+    sub = PersistentSubstitution()
+    sub.bind("X", C("a"))
+    child = sub.copy()
+    child.bind("Y", C("b"))
+    assert set(child.bindings) == {"X", "Y"}
+
+    child.bindings = {"Z": C("z")}
+    assert child.lookup("X") is None
+    assert child.lookup("Z").value == "z"
+
+
+def test_long_chains_are_merged():
+    sub = PersistentSubstitution()
+    for i in range(PersistentSubstitution.max_layers * 3):
+        sub.bind(f"V{i}", C(str(i)))
+        sub = sub.copy()
+    assert len(sub._layers) <= PersistentSubstitution.max_layers
+    assert sub.lookup("V0").value == "0"
+    assert sub.lookup(f"V{PersistentSubstitution.max_layers * 3 - 1}") is not None
+
+
+def test_engine_results_match_default_substitution():
+    def build(substitution_class):
+        engine = LogicalEngine()
+        engine.substitution_class = substitution_class
+        for i in range(30):
+            engine.add_fact(Fact(Predicate("parent", [C(f"p{i}"), C(f"p{i + 1}")])))
+        engine.add_rule(Rule(Predicate("anc", [V("X"), V("Z")]),
+                             [Predicate("parent", [V("X"), V("Z")])]))
+        engine.add_rule(Rule(Predicate("anc", [V("X"), V("Z")]),
+                             [Predicate("parent", [V("X"), V("Y")]),
+                              Predicate("anc", [V("Y"), V("Z")])]))
+        return engine
+
+    goal = Predicate("anc", [C("p0"), V("W")])
+    plain = [sol.lookup("W").value for sol in build(Substitution).query(goal)]
+    layered_engine = build(PersistentSubstitution)
+    layered = layered_engine.query(goal)
+    assert all(isinstance(sol, PersistentSubstitution) for sol in layered)
+    assert [sol.lookup("W").value for sol in layered] == plain
+    assert len(plain) == 30
@@ -0,0 +1,68 @@
+"""
+Tests for counter-based rule renaming with precompiled variable slots
+اختبارات إعادة تسمية متغيرات القواعد بعدّاد رتيب
+"""
+
+from bayan.bayan.logical_engine import LogicalEngine, Term, Predicate, Fact, Rule
+
+
+def V(name):
+    return Term(name, True)
+
+
+def _ancestor_rule():
+    return Rule(
+        Predicate("ancestor", [V("X"), V("Z")]),
+        [Predicate("parent", [V("X"), V("Y")]), Predicate("ancestor", [V("Y"), V("Z")])]
+    )
+
+
+def test_consecutive_renames_never_collide():
+    engine = LogicalEngine()
+    rule = _ancestor_rule()
+    names = set()
+    for _ in range(1000):
+        renamed = engine._rename_variables(rule)
+        names.add(renamed.head.args[0].value)
+    assert len(names) == 1000
+
+
+def test_rename_shares_one_term_per_variable():
+    engine = LogicalEngine()
+    renamed, mapping = engine._instantiate_rule(_ancestor_rule())
+    x_head = renamed.head.args[0]
+    x_body = renamed.body[0].args[0]
+    assert x_head is x_body
+    assert x_head.is_variable
+    assert mapping[x_head.value] == "X"
+    assert sorted(mapping.values()) == ["X", "Y", "Z"]
+
+
+def test_rule_template_compiled_once():
+    engine = LogicalEngine()
+    rule = _ancestor_rule()
+    engine._rename_variables(rule)
+    compiled = rule._compiled
+    engine._rename_variables(rule)
+    assert rule._compiled is compiled
+
+    # Replacing the body invalidates the cached template
+    rule.body = [Predicate("parent", [V("X"), V("Z")])]
+    renamed = engine._rename_variables(rule)
+    assert rule._compiled is not compiled
+    assert renamed.body[0].args[1] is renamed.head.args[1]
+
+
+def test_deep_recursion_with_renaming():
+    engine = LogicalEngine()
+    for i in range(30):
+        engine.add_fact(Fact(Predicate("parent", [Term(f"p{i}"), Term(f"p{i + 1}")])))
+    engine.add_rule(Rule(
+        Predicate("ancestor", [V("X"), V("Z")]),
+        [Predicate("parent", [V("X"), V("Z")])]
+    ))
+    engine.add_rule(_ancestor_rule())
+
+    sols = engine.query(Predicate("ancestor", [Term("p0"), V("Who")]))
+    assert len(sols) == 30
+    assert not hasattr(engine, "var_mapping")
@@ -0,0 +1,130 @@
+"""
+Tests for tabling (memoized answers with fixpoint completion)
+اختبارات الجدولة في المحرك المنطقي
+"""
+
+from bayan.bayan.logical_engine import LogicalEngine, Term, Predicate, Fact, Rule
+from bayan.bayan.lexer import HybridLexer
+from bayan.bayan.parser import HybridParser
+from bayan.bayan.hybrid_interpreter import HybridInterpreter
+from bayan.bayan.ast_nodes import TableDirective
+from tests.test_iter_query import ancestor_engine, frame_budget
+
+
+def V(name):
+    return Term(name, True)
+
+
+def C(value):
+    return Term(value)
+
+
+def _values(engine, solutions, var):
+    return sorted(engine._deref(V(var), sol).value for sol in solutions)
+
+
+def _graph_engine(edges):
+    engine = LogicalEngine()
+    for a, b in edges:
+        engine.add_fact(Fact(Predicate("edge", [C(a), C(b)])))
+    # Left-recursive definition: loops forever without tabling
+    engine.add_rule(Rule(
+        Predicate("path", [V("X"), V("Y")]),
+        [Predicate("path", [V("X"), V("Z")]), Predicate("edge", [V("Z"), V("Y")])]
+    ))
+    engine.add_rule(Rule(
+        Predicate("path", [V("X"), V("Y")]),
+        [Predicate("edge", [V("X"), V("Y")])]
+    ))
+    engine.table("path", 2)
+    return engine
+
+
+def test_left_recursion_terminates():
+    engine = _graph_engine([("a", "b"), ("b", "c"), ("c", "d")])
+    sols = engine.query(Predicate("path", [C("a"), V("Y")]))
+    assert _values(engine, sols, "Y") == ["b", "c", "d"]
+
+
+def test_cyclic_graph_reaches_fixpoint():
+    engine = _graph_engine([("a", "b"), ("b", "c"), ("c", "a"), ("c", "d")])
+    sols = engine.query(Predicate("path", [C("a"), V("Y")]))
+    assert _values(engine, sols, "Y") == ["a", "b", "c", "d"]
+    # All pairs: a, b and c each reach a, b, c and d
+    assert len(engine.query(Predicate("path", [V("A"), V("B")]))) == 12
+
+
+def test_mutual_recursion():
+    engine = LogicalEngine()
+    for a, b in [("1", "2"), ("2", "3"), ("3", "1")]:
+        engine.add_fact(Fact(Predicate("link", [C(a), C(b)])))
+    # reach_a(X, Y) :- reach_b(X, Z), link(Z, Y).  reach_b(X, Y) :- reach_a(X, Y).
+    engine.add_rule(Rule(
+        Predicate("reach_a", [V("X"), V("Y")]),
+        [Predicate("reach_b", [V("X"), V("Z")]), Predicate("link", [V("Z"), V("Y")])]
+    ))
+    engine.add_rule(Rule(
+        Predicate("reach_a", [V("X"), V("Y")]),
+        [Predicate("link", [V("X"), V("Y")])]
+    ))
+    engine.add_rule(Rule(
+        Predicate("reach_b", [V("X"), V("Y")]),
+        [Predicate("reach_a", [V("X"), V("Y")])]
+    ))
+    engine.table("reach_a", 2)
+    engine.table("reach_b", 2)
+
+    sols = engine.query(Predicate("reach_b", [C("1"), V("Y")]))
+    assert _values(engine, sols, "Y") == ["1", "2", "3"]
+
+
+def test_tables_invalidated_by_assert_and_retract():
+    engine = _graph_engine([("a", "b")])
+    goal = Predicate("path", [C("a"), V("Y")])
+    assert _values(engine, engine.query(goal), "Y") == ["b"]
+
+    engine.assertz(Fact(Predicate("edge", [C("b"), C("c")])))
+    assert _values(engine, engine.query(goal), "Y") == ["b", "c"]
+
+    engine.retract(Predicate("edge", [C("a"), C("b")]))
+    assert engine.query(goal) == []
+
+
+def test_unrelated_assert_keeps_tables():
+    engine = _graph_engine([("a", "b")])
+    engine.query(Predicate("path", [C("a"), V("Y")]))
+    engine.assertz(Fact(Predicate("color", [C("red")])))
+    assert ("path", 2) in engine._tables
+
+
+def test_table_directive_parses_and_runs():
+    code = """
+hybrid {
+    :- table path/2.
+    edge(a, b).
+    edge(b, a).
+    path(?X, ?Y) :- path(?X, ?Z), edge(?Z, ?Y).
+    path(?X, ?Y) :- edge(?X, ?Y).
+}
+"""
+    ast = HybridParser(HybridLexer(code).tokenize()).parse()
+    block = ast.statements[0]
+    assert isinstance(block.logical_stmts[0], TableDirective)
+    assert block.logical_stmts[0].predicates == [("path", 2)]
+
+    interp = HybridInterpreter()
+    interp.interpret(ast)
+    assert ("path", 2) in interp.logical.tabled
+    sols = interp.logical.query(Predicate("path", [C("a"), V("Y")]))
+    assert _values(interp.logical, sols, "Y") == ["a", "b"]
+
+
+def test_untabled_recursion_depth():
+    # Goal dispatch adds no generator frame, so an untabled chain goes
+    # well past the 300 levels the eager solver reached in 1000 frames
+    engine = ancestor_engine(450)
+    with frame_budget(1000):
+        solutions = engine.query(Predicate("anc", [C("p0"), V("Z")]))
+    assert len(solutions) == 450
+    assert _values(engine, solutions, "Z")[:2] == ["p1", "p10"]
+
@@ -0,0 +1,205 @@
+"""
+Tests for the vector indexes and the fact index
+اختبارات فهارس المتجهات وفهرس الحقائق
+"""
+
+import zlib
+
+import numpy as np
+import pytest
+
+from bayan.bayan.istinbat_engine import IstinbatEngine
+from bayan.bayan.logical_engine import Fact, LogicalEngine, Predicate, Term
+from bayan.bayan.neural.embedding_store import EmbeddingStore
+from bayan.bayan.neural.fact_index import FactIndex, find_fact_index
+from bayan.bayan.neural.neural_engine import NeuralEngine
+from bayan.bayan.neural.tensor_bridge import TensorBridge
+from bayan.bayan.neural.vector_index import ExactIndex, IVFIndex, create_index, load_index
+
+
+def _unit(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    return matrix / np.linalg.norm(matrix, axis=-1, keepdims=True)
+
+
+def _clustered(count, dim=16, clusters=20, seed=1):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim))
+    points = centers[rng.integers(clusters, size=count)] + 0.3 * rng.standard_normal((count, dim))
+    return _unit(points)
+
+
+def _brute_force(vectors, keys, query, top_k):
+    scores = vectors @ query
+    return [keys[i] for i in np.argsort(-scores, kind='stable')[:top_k]]
+
+
+def test_exact_index_add_remove_and_labels():
+    vectors = _clustered(200)
+    keys = [f"k{i}" for i in range(200)]
+    labels = ['even' if i % 2 == 0 else 'odd' for i in range(200)]
+    index = ExactIndex()
+    index.add(keys, vectors, labels)
+    query = vectors[7]
+
+    assert [key for key, _ in index.search(query, 5)] == _brute_force(vectors, keys, query, 5)
+    odd = [key for key, _ in index.search(query, 5, labels=['odd'])]
+    assert odd[0] == 'k7' and all(int(key[1:]) % 2 for key in odd)
+    assert index.search(query, 5, labels=['missing']) == []
+
+    assert index.remove('k7') and not index.remove('k7')
+    assert 'k7' not in index and len(index) == 199
+    assert 'k7' not in [key for key, _ in index.search(query, 50)]
+
+    # Adding a key again replaces its vector
+    index.add(['k8'], -query, ['odd'])
+    assert index.search(-query, 1) == [('k8', pytest.approx(1.0, abs=1e-5))]
+
+
+@pytest.mark.parametrize('kind', ['exact', 'ivf'])
+def test_repeated_keys_keep_one_row(kind):
+    vectors = _unit(np.eye(4))
+    index = create_index(kind, train_threshold=4) if kind == 'ivf' else create_index(kind)
+    index.add(['a', 'a', 'b'], vectors[:3], ['x', 'y', 'x'])
+    assert len(index) == 2
+    assert sorted(key for key, _ in index.search(vectors[0], 5)) == ['a', 'b']
+    assert index.search(vectors[1], 1) == [('a', pytest.approx(1.0, abs=1e-5))]
+    assert index.search(vectors[1], 5, labels=['x']) == [('b', pytest.approx(0.0, abs=1e-5))]
+    assert index.remove('a')
+    assert [key for key, _ in index.search(vectors[1], 5)] == ['b']
+
+    # Replaced and removed keys give their row ids back to later adds
+    for i in range(1000):
+        index.add(['a'], vectors[i % 4], ['x'])
+    assert len(index) == 2 and len(index._keys) == 2
+
+
+def test_ivf_index_recall_and_updates():
+    vectors = _clustered(3000)
+    keys = [f"k{i}" for i in range(3000)]
+    labels = ['rare' if i % 100 == 0 else 'common' for i in range(3000)]
+    index = IVFIndex(train_threshold=1000, nprobe=4)
+    for start in range(0, 3000, 500):
+        index.add(keys[start:start + 500], vectors[start:start + 500], labels[start:start + 500])
+    # Trained at 1000 vectors and again at 2000
+    assert index.is_trained and len(index.centroids) == int(np.sqrt(2000))
+    assert len(index) == 3000
+
+    queries = _clustered(50, seed=2)
+    recall = np.mean([len(set(key for key, _ in index.search(q, 10)) &
+                          set(_brute_force(vectors, keys, q, 10))) / 10 for q in queries])
+    assert recall >= 0.9
+
+    # A rare label still fills top_k by probing further lists
+    rare = index.search(queries[0], 10, labels=['rare'])
+    assert len(rare) == 10 and all(int(key[1:]) % 100 == 0 for key, _ in rare)
+
+    index.remove('k5')
+    index.add(['new'], queries[0], ['common'])
+    hits = [key for key, _ in index.search(queries[0], 3)]
+    assert hits[0] == 'new' and 'k5' not in [key for key, _ in index.search(vectors[5], 10)]
+
+
+@pytest.mark.parametrize('kind', ['exact', 'ivf'])
+def test_save_and_load(tmp_path, kind):
+    vectors = _clustered(600)
+    keys = [f"حقيقة {i}" for i in range(600)]
+    index = create_index(kind, **({'train_threshold': 200} if kind == 'ivf' else {}))
+    index.add(keys, vectors, ['a', 'b', 'c'] * 200)
+    index.remove(keys[3])
+    path = tmp_path / 'facts.npz'
+    index.save(str(path))
+
+    loaded = load_index(str(path))
+    assert type(loaded) is type(index) and len(loaded) == 599 and loaded.dim == 16
+    for query in vectors[:5]:
+        assert loaded.search(query, 5) == index.search(query, 5)
+        assert loaded.search(query, 5, labels=['c']) == index.search(query, 5, labels=['c'])
+    loaded.add(['extra'], vectors[0], ['d'])
+    assert loaded.search(vectors[0], 1, labels=['d'])[0][0] == 'extra'
+
+    with pytest.raises(ValueError):
+        create_index('hnsw')
+
+
+def _vectors(texts, dim=16):
+    return _unit([np.random.default_rng(zlib.crc32(text.encode('utf-8'))).standard_normal(dim)
+                  for text in texts])
+
+
+@pytest.fixture
+def bridge(monkeypatch):
+    """A TensorBridge over the shared NeuralEngine with a counting fake model"""
+    neural = NeuralEngine()
+    embedded = []
+
+    def batch_embed(texts):
+        embedded.extend(texts)
+        return _vectors(texts)
+
+    monkeypatch.setattr(neural, 'store', EmbeddingStore('fake'))
+    monkeypatch.setattr(neural, 'batch_embed', batch_embed)
+    bridge = TensorBridge(neural)
+    bridge.embedded = embedded
+    return bridge
+
+
+def _fact(name, *args):
+    return Fact(Predicate(name, [Term(arg) for arg in args]))
+
+
+def test_fact_index_follows_the_engine(bridge, tmp_path):
+    engine = LogicalEngine()
+    for i in range(20):
+        engine.add_fact(_fact('knows', f"p{i}", f"p{i + 1}"))
+        engine.add_fact(_fact('likes', f"p{i}"))
+    fact_index = FactIndex(engine, bridge, create_index('exact'))
+    assert find_fact_index(engine) is fact_index and len(fact_index) == 40
+
+    results = fact_index.search("p3 knows p4", top_k=2)
+    assert results[0][2] == "p3 knows p4" and results[0][1] == pytest.approx(1.0, abs=1e-5)
+    assert all(fact.predicate.name == 'likes'
+               for fact, _, _ in fact_index.search("p3 knows p4", 5, predicates=['likes']))
+
+    bridge.embedded.clear()
+    engine.add_fact(_fact('knows', "zaid", "huda"))
+    engine.retract(Predicate('knows', [Term("p3"), Term("p4")]))
+    top = fact_index.search("zaid knows huda", top_k=3)
+    assert bridge.embedded == ["zaid knows huda"]
+    assert top[0][2] == "zaid knows huda"
+    assert "p3 knows p4" not in [text for _, _, text in fact_index.search("p3 knows p4", 40)]
+
+    # A saved index only needs the facts added since
+    path = str(tmp_path / 'kb.npz')
+    fact_index.save(path)
+    fact_index.close()
+    assert find_fact_index(engine) is None
+    engine.add_fact(_fact('likes', "omar"))
+    engine.retractall(Predicate('likes', [Term("p0")]))
+    bridge.embedded.clear()
+    reloaded = FactIndex(engine, bridge, load_index(path))
+    assert reloaded.search("omar is likes", 1)[0][2] == "omar is likes"
+    assert bridge.embedded == ["omar is likes"]
+    assert "p0 is likes" not in reloaded.index
+
+
+def test_istinbat_neural_search_uses_the_world_index(bridge, monkeypatch):
+    engine = IstinbatEngine(enable_dialect_support=False)
+    monkeypatch.setattr(engine, 'tensor_bridge', bridge)
+    for i in range(10):
+        engine.logical_engine.add_fact(_fact('owns', f"person{i}", f"book{i}"))
+    engine.logical_engine.add_fact(_fact('reads', "person1", "book1"))
+
+    brute = engine.neural_search("person1 reads book1", top_k=3, predicates=['owns'])
+    engine.build_fact_index('exact')
+    indexed = engine.neural_search("person1 reads book1", top_k=3, predicates=['owns'])
+    assert [(fact, text) for fact, _, text in indexed] == [(fact, text) for fact, _, text in brute]
+
+    engine.create_world("copy")
+    engine.switch_world("copy")
+    engine.logical_engine.add_fact(_fact('reads', "ghost", "book0"))
+    copied = find_fact_index(engine.logical_engine)
+    assert copied is not None and copied.engine is engine.logical_engine
+    assert engine.neural_search("ghost reads book0", top_k=1)[0][2] == "ghost reads book0"
+    engine.switch_world("Reality")
+    assert engine.neural_search("ghost reads book0", top_k=1)[0][2] != "ghost reads book0"
@@ -0,0 +1,152 @@
+"""
+Tests for BytecodeVM's decoded dispatch: handler table, superinstructions
+and fast locals
+اختبارات جدول التنفيذ والتعليمات المدمجة والمتغيرات المحلية السريعة
+"""
+
+import pytest
+
+from bayan.bayan.bytecode.instruction import Instruction, CodeObject
+from bayan.bayan.bytecode.opcodes import Opcode
+from bayan.bayan.bytecode.vm import BytecodeVM
+from bayan.bayan.lexer import HybridLexer
+from bayan.bayan.parser import HybridParser
+from bayan.bayan.hybrid_interpreter import HybridInterpreter
+
+
+def _loop_code():
+    # i = 0; total = 0; while i < 10: total = total + i; i = i + 1
+    return CodeObject(
+        name='loop',
+        instructions=[
+            Instruction(Opcode.LOAD_CONST, 0),
+            Instruction(Opcode.STORE_VAR, 0),
+            Instruction(Opcode.LOAD_CONST, 0),
+            Instruction(Opcode.STORE_VAR, 1),
+            Instruction(Opcode.LOAD_VAR, 0),      # 4
+            Instruction(Opcode.LOAD_CONST, 1),
+            Instruction(Opcode.LT),
+            Instruction(Opcode.JUMP_IF_FALSE, 17),
+            Instruction(Opcode.LOAD_VAR, 1),
+            Instruction(Opcode.LOAD_VAR, 0),
+            Instruction(Opcode.ADD),
+            Instruction(Opcode.STORE_VAR, 1),
+            Instruction(Opcode.LOAD_VAR, 0),
+            Instruction(Opcode.LOAD_CONST, 2),
+            Instruction(Opcode.ADD),
+            Instruction(Opcode.STORE_VAR, 0),
+            Instruction(Opcode.JUMP, 4),
+        ],
+        constants=[0, 10, 1],
+        names=['i', 'total'],
+    )
+
+
+def test_superinstructions_keep_jump_targets():
+    code = _loop_code()
+    vm = BytecodeVM()
+    vm.execute(code)
+    assert vm.globals == {'i': 10, 'total': 45}
+
+    fused, plain, names = code.decoded[False]
+    assert len(fused) == len(plain) == len(code.instructions)
+    assert fused[4][0] is BytecodeVM._op_name_const_op_jump
+    assert fused[12][0] is BytecodeVM._op_name_const_op
+    assert plain[4] == (BytecodeVM._op_load_name, 'i')
+    assert names == []
+
+    # Jumping into the middle of a fused sequence runs its plain tail
+    tail = CodeObject('tail', [
+        Instruction(Opcode.LOAD_VAR, 0),
+        Instruction(Opcode.JUMP, 3),
+        Instruction(Opcode.LOAD_VAR, 0),
+        Instruction(Opcode.LOAD_CONST, 0),
+        Instruction(Opcode.LT),
+    ], constants=[10], names=['i'])
+    vm = BytecodeVM()
+    vm.globals['i'] = 3
+    vm.execute(tail)
+    assert tail.decoded[False][0][2][0] is BytecodeVM._op_name_const_op
+    assert vm.stack == [True]
+
+
+def test_step_runs_one_instruction_at_a_time():
+    vm = BytecodeVM(debug_mode=True)
+    vm.current_code = _loop_code()
+    vm.running = True
+    vm.ip = 0
+    steps = 0
+    while vm.running and vm.ip < len(vm.current_code.instructions):
+        vm.step()
+        steps += 1
+    assert vm.globals['total'] == 45
+    # 4 setup instructions, 13 per iteration, 4 for the final test
+    assert steps == 4 + 13 * 10 + 4
+
+
+PROGRAM = """
+def body(n):
+{
+    seen = []
+    k = 0
+    while k < n:
+    {
+        seen.append(k * scale)
+        k = k + 1
+    }
+    f = lambda v: v + k
+    return [seen, f(1), g(2)]
+}
+def g(x):
+{
+    return x * 100
+}
+def call_with(g):
+{
+    return g(3)
+}
+scale = 2
+result = [body(3), call_with(lambda v: v - 1)]
+"""
+
+
+def _run(code, use_bytecode):
+    ast = HybridParser(HybridLexer(code).tokenize()).parse()
+    interp = HybridInterpreter(use_bytecode=use_bytecode)
+    interp.interpret(ast)
+    return interp
+
+
+def test_fast_locals_match_tree_walker():
+    compiled = _run(PROGRAM, True)
+    walked = _run(PROGRAM, False)
+    expected = [[[0, 2, 4], 4, 200], 2]
+    assert compiled.traditional.global_env['result'] == expected
+    assert walked.traditional.global_env['result'] == expected
+    code = compiled.traditional.functions['body'].code_object
+    _, _, names = code.decoded[True]
+    assert names[:2] == ['seen', 'k']
+    assert 'scale' in names
+
+
+def test_unbound_fast_local_reports_host_error():
+    code = """
+def broken():
+{
+    total = 1
+    return total + missing
+}
+broken()
+"""
+    with pytest.raises(Exception) as ei:
+        _run(code, True)
+    msg = str(ei.value)
+    assert "missing" in msg
+    assert "Bayan stack:" in msg
+
+
+def test_bytecode_beats_tree_walker():
+    from benchmark_performance import tree_walker_gate
+    passed, walker_time, bytecode_time = tree_walker_gate(
+        min_speedup=1.0, fib_n=12, scan_n=3000, count_n=300)
+    assert passed, (walker_time, bytecode_time)
@@ -107,6 +107,29 @@ def _expand_includes(code: str, *, visited: set[str] | None = None) -> str:
     return "\n".join(out_lines)
 
 
+# ----------------------------------
+# Incremental tokenization cache
+# ----------------------------------
+# Last (source, tokens) per editor filename, so repeated runs of a buffer
+# only re-scan the region that changed since the previous run.
+_TOKEN_CACHE: dict[str, tuple[str, list]] = {}
+TOKEN_CACHE_SIZE = 32
+
+
+def _tokenize_incremental(code: str, filename: str) -> list:
+    cached = _TOKEN_CACHE.pop(filename, None)
+    lexer = HybridLexer(code)
+    if cached is None:
+        tokens = lexer.tokenize()
+    else:
+        old_code, old_tokens = cached
+        tokens = lexer.relex(old_tokens, *HybridLexer.edit_range(old_code, code))
+    _TOKEN_CACHE[filename] = (code, tokens)
+    while len(_TOKEN_CACHE) > TOKEN_CACHE_SIZE:
+        _TOKEN_CACHE.pop(next(iter(_TOKEN_CACHE)))
+    return tokens
+
+
 # -----------------------------
 # Routes: pages
 # -----------------------------
@@ -545,8 +568,7 @@ def api_ide_run():
 
     # Prepare Bayan interpreter
     try:
-        lexer = HybridLexer(expanded)
-        tokens = lexer.tokenize()
+        tokens = _tokenize_incremental(expanded, filename)
         parser = HybridParser(tokens, filename=filename)
         ast = parser.parse()
 